@@ -382,13 +382,13 @@ async function downloadUsersCSV() {
 
 // Hospital Users feature removed
 
-// Load bottlenecks analytics via stress-test endpoint and render charts
+// Load bottlenecks analytics from the latest load-test report and render charts
 async function loadBottleneckAnalytics() {
     try {
         const token = localStorage.getItem('admin_access_token');
         if (!token) return;
 
-        const url = `${ANALYTICS_BASE_URL}/stress-test/?group=all&concurrency=4&requests=20`;
+        const url = `${ANALYTICS_BASE_URL}/stress-test/?group=all`;
         const response = await fetch(url, {
             method: 'GET',
             headers: {
@@ -492,7 +492,7 @@ function renderBottleneckCharts(data) {
     }
 }
 
-// Run stress test via analytics API
+// Show the latest load-test report via analytics API
 async function runStressTest() {
     showLoading(true);
     try {
@@ -503,10 +503,8 @@ async function runStressTest() {
         }
 
         const group = document.getElementById('stressGroup')?.value || 'all';
-        const concurrency = parseInt(document.getElementById('stressConcurrency')?.value || '8', 10);
-        const requests = parseInt(document.getElementById('stressRequests')?.value || '30', 10);
 
-        const url = `${ANALYTICS_BASE_URL}/stress-test/?group=${encodeURIComponent(group)}&concurrency=${concurrency}&requests=${requests}`;
+        const url = `${ANALYTICS_BASE_URL}/stress-test/?group=${encodeURIComponent(group)}`;
         const response = await fetch(url, {
             method: 'GET',
             headers: {
@@ -517,14 +515,14 @@ async function runStressTest() {
 
         const payload = await response.json();
         if (!response.ok || !payload.success) {
-            throw new Error(payload.message || 'Stress test failed');
+            throw new Error(payload.message || 'Failed to load load-test report');
         }
 
         renderStressResults(payload.data);
-        showToast('Success', 'Stress test completed', 'success');
+        showToast('Success', 'Load-test report loaded', 'success');
     } catch (error) {
-        console.error('Error running stress test:', error);
-        showToast('Error', error.message || 'Failed to run stress test', 'error');
+        console.error('Error loading load-test report:', error);
+        showToast('Error', error.message || 'Failed to load load-test report', 'error');
     } finally {
         showLoading(false);
     }
@@ -546,7 +544,9 @@ function renderStressResults(data) {
             `Started: <code>${started}</code> &nbsp; ` +
             `Finished: <code>${finished}</code> &nbsp; ` +
             `Duration: <code>${data?.duration_ms || '–'} ms</code> &nbsp; ` +
-            `Params: group=<code>${params.group}</code>, concurrency=<code>${params.concurrency}</code>, requests/endpoint=<code>${params.requests_per_endpoint}</code>` +
+            `Label: <code>${data?.label || '–'}</code> &nbsp; ` +
+            `Users: <code>${Object.keys(params.users || {}).map(k => `${k}=${params.users[k]}`).join(', ') || '–'}</code>, ` +
+            `ramp-up=<code>${params.ramp_up ?? '–'}s</code>, duration=<code>${params.duration ?? '–'}s</code>` +
             `</div>`;
 
     // Group summaries
@@ -571,19 +571,21 @@ function renderStressResults(data) {
                 `<table class="table table-sm">` +
                 `<thead><tr>` +
                 `<th>Endpoint</th><th>Requests</th><th>Success</th><th>Errors</th>` +
-                `<th>Avg (ms)</th><th>P95 (ms)</th><th>Max (ms)</th><th>Status Dist</th>` +
+                `<th>Avg (ms)</th><th>P50 (ms)</th><th>P95 (ms)</th><th>P99 (ms)</th><th>Max (ms)</th><th>Status Dist</th>` +
                 `</tr></thead><tbody>`;
         Object.keys(eps).forEach(ep => {
             const m = eps[ep] || {};
             const dist = m.status_distribution || {};
             const distStr = Object.keys(dist).map(k => `${k}:${dist[k]}`).join(', ');
             html += `<tr>` +
-                    `<td><code>${ep}</code></td>` +
+                    `<td><code>${m.method ? m.method + ' ' : ''}${m.path || ep}</code></td>` +
                     `<td>${m.requests ?? '–'}</td>` +
                     `<td>${m.success_count ?? '–'}</td>` +
                     `<td>${m.error_count ?? '–'}</td>` +
                     `<td>${m.avg_latency_ms ?? '–'}</td>` +
+                    `<td>${m.p50_latency_ms ?? '–'}</td>` +
                     `<td>${m.p95_latency_ms ?? '–'}</td>` +
+                    `<td>${m.p99_latency_ms ?? '–'}</td>` +
                     `<td>${m.max_latency_ms ?? '–'}</td>` +
                     `<td>${distStr || '–'}</td>` +
                     `</tr>`;
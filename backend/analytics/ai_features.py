@@ -0,0 +1,134 @@
+"""
+Fixed-schema feature extraction for MediSyncAIInsights.
+
+An analytics dict (patient_demographics, health_trends, illness_prediction,
+surge_prediction) becomes one row of ``FEATURE_COLUMNS``. A batch of dicts is
+written into one preallocated ``(n, len(FEATURE_COLUMNS))`` matrix in a single
+pass, so training and scoring never build per-sample arrays to stack.
+
+- Every row has every column. A missing section or value is 0, where the old
+  per-sample preprocessing produced a shorter vector that the scaler and
+  models could not take.
+- The column order is the one the models have always been trained on, so
+  artifacts saved before this module existed stay valid.
+- ``FEATURE_SCHEMA_VERSION`` is saved with the models. Bump it whenever a
+  column is added, removed or reordered; models trained on another version
+  are not loaded.
+"""
+import numpy as np
+
+FEATURE_SCHEMA_VERSION = 1
+
+AGE_BANDS = ('0-18', '19-35', '36-50', '51-65', '65+')
+TOP_ILLNESSES = 5
+FORECAST_MONTHS = 3
+
+FEATURE_COLUMNS = (
+    'age_0_18', 'age_19_35', 'age_36_50', 'age_51_65', 'age_65_plus',
+    'gender_male', 'gender_female',
+    'total_patients', 'average_age',
+    *(f'top_illness_{i}_count' for i in range(1, TOP_ILLNESSES + 1)),
+    'increasing_conditions', 'decreasing_conditions', 'stable_conditions',
+    'chi_square_statistic', 'p_value', 'confidence_level',
+    *(f'forecast_month_{i}_cases' for i in range(1, FORECAST_MONTHS + 1)),
+    'surge_model_accuracy',
+)
+N_FEATURES = len(FEATURE_COLUMNS)
+
+RISK_LEVELS = ('low_risk', 'moderate_risk', 'high_risk')
+# 'unknown' association results train as moderate risk.
+LABEL_CODES = {'low_risk': 0, 'moderate_risk': 1, 'high_risk': 2, 'unknown': 1}
+ELDERLY_HIGH_RISK = 0.5
+ELDERLY_MODERATE_RISK = 0.3
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _section(data, key):
+    value = data.get(key) if isinstance(data, dict) else None
+    return value if isinstance(value, dict) else {}
+
+
+def _padded(items, key, width):
+    values = [_number(item.get(key)) if isinstance(item, dict) else 0.0 for item in (items or [])[:width]]
+    return values + [0.0] * (width - len(values))
+
+
+def feature_row(data):
+    """``FEATURE_COLUMNS`` values of one analytics dict, as a list of floats."""
+    demographics = _section(data, 'patient_demographics')
+    ages = demographics.get('age_distribution') or {}
+    genders = demographics.get('gender_proportions') or {}
+    trends = _section(data, 'health_trends')
+    analysis = trends.get('trend_analysis') or {}
+    prediction = _section(data, 'illness_prediction')
+    surge = _section(data, 'surge_prediction')
+
+    return [
+        *(_number(ages.get(band)) for band in AGE_BANDS),
+        _number(genders.get('Male')),
+        _number(genders.get('Female')),
+        _number(demographics.get('total_patients')),
+        _number(demographics.get('average_age')),
+        *_padded(trends.get('top_illnesses_by_week'), 'count', TOP_ILLNESSES),
+        float(len(analysis.get('increasing_conditions') or ())),
+        float(len(analysis.get('decreasing_conditions') or ())),
+        float(len(analysis.get('stable_conditions') or ())),
+        _number(prediction.get('chi_square_statistic')),
+        _number(prediction.get('p_value')),
+        _number(prediction.get('confidence_level')),
+        *_padded(surge.get('forecasted_monthly_cases'), 'total_cases', FORECAST_MONTHS),
+        _number(surge.get('model_accuracy')),
+    ]
+
+
+def extract_features(samples, dtype=np.float64):
+    """Feature matrix of shape ``(len(samples), N_FEATURES)``, one row per analytics dict."""
+    samples = list(samples)
+    X = np.empty((len(samples), N_FEATURES), dtype=dtype)
+    for i, data in enumerate(samples):
+        X[i] = feature_row(data)
+    return X
+
+
+def association_label(data):
+    """Label from the illness prediction's association result, or None when there is none."""
+    result = _section(data, 'illness_prediction').get('association_result')
+    if not isinstance(result, str):
+        return None
+    result = result.lower()
+    if 'strong positive' in result:
+        return 'high_risk'
+    if 'moderate' in result:
+        return 'moderate_risk'
+    if 'weak' in result or 'no association' in result:
+        return 'low_risk'
+    return 'unknown'
+
+
+def _elderly_codes(X):
+    # Fallback label: the share of patients aged 51 and over.
+    ages = X[:, :len(AGE_BANDS)]
+    total = ages.sum(axis=1)
+    ratio = np.divide(ages[:, 3] + ages[:, 4], total, out=np.zeros(len(X)), where=total > 0)
+    return np.where(ratio > ELDERLY_HIGH_RISK, 2, np.where(ratio > ELDERLY_MODERATE_RISK, 1, 0))
+
+
+def risk_label(data, row):
+    """Training label of one sample, given its feature row."""
+    return association_label(data) or RISK_LEVELS[_elderly_codes(np.asarray(row).reshape(1, -1))[0]]
+
+
+def extract_labels(samples, X):
+    """Encoded training labels (``LABEL_CODES``) of ``samples``, given their feature matrix ``X``."""
+    codes = _elderly_codes(X).astype(np.int64)
+    for i, data in enumerate(samples):
+        label = association_label(data)
+        if label is not None:
+            codes[i] = LABEL_CODES[label]
+    return codes
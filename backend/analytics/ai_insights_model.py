@@ -39,11 +39,30 @@ from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_sc
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 import joblib
 import json
+import logging
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 
+from .ai_features import (
+    FEATURE_COLUMNS,
+    FEATURE_SCHEMA_VERSION,
+    RISK_LEVELS,
+    extract_features,
+    extract_labels,
+    risk_label,
+)
+from .clinical_rules import ALERT_PLAN, RECOMMENDATION_PLAN, alert_facts, build_alerts, recommendation_facts
+from .synthetic_data import synthetic_samples
+
+logger = logging.getLogger(__name__)
+
 # Define constants
 RANDOM_SEED = 42
+# Rows per Keras forward pass when scoring a batch
+PREDICT_BATCH_SIZE = 1024
+# Keras training stops once validation loss has not improved for this many epochs
+TF_MAX_EPOCHS = 100
+TF_EARLY_STOPPING_PATIENCE = 8
 np.random.seed(RANDOM_SEED)
 if TF_AVAILABLE:
     tf.random.set_seed(RANDOM_SEED)
@@ -59,10 +78,12 @@ class MediSyncAIInsights:
         Initialize the AI insights model.
         
         Args:
-            model_dir (str): Directory to save trained models
+            model_dir (str): Directory to save trained models, or None for
+                an untrained in-memory model
         """
         self.model_dir = model_dir
-        os.makedirs(model_dir, exist_ok=True)
+        if model_dir is not None:
+            os.makedirs(model_dir, exist_ok=True)
         
         # Initialize models
         self.tf_model = None
@@ -81,128 +102,24 @@ class MediSyncAIInsights:
         
         # Attempt to load any persisted models and preprocessing artifacts
         try:
-            self.load_models()
+            if model_dir is not None:
+                self.load_models()
         except Exception:
             # If loading fails, proceed; generate_insights will apply safe fallbacks
             pass
     
     def preprocess_data(self, data):
         """
-        Preprocess analytics data for model training.
+        Preprocess one analytics sample for model training.
         
         Args:
             data (dict): Raw analytics data containing various metrics
             
         Returns:
-            tuple: X (features) and y (labels) for model training
+            tuple: X (the sample's FEATURE_COLUMNS values) and y (its label)
         """
-        # Extract features from different analytics components
-        features = []
-        labels = []
-        
-        # Process patient demographics
-        if 'patient_demographics' in data and data['patient_demographics']:
-            demographics = data['patient_demographics']
-            if 'age_distribution' in demographics:
-                age_dist = demographics['age_distribution']
-                features.append([
-                    age_dist.get('0-18', 0),
-                    age_dist.get('19-35', 0),
-                    age_dist.get('36-50', 0),
-                    age_dist.get('51-65', 0),
-                    age_dist.get('65+', 0)
-                ])
-            
-            if 'gender_proportions' in demographics:
-                gender_props = demographics['gender_proportions']
-                features.append([
-                    gender_props.get('Male', 0),
-                    gender_props.get('Female', 0)
-                ])
-                
-            if 'total_patients' in demographics:
-                features.append([demographics['total_patients']])
-                
-            if 'average_age' in demographics:
-                features.append([demographics['average_age']])
-        
-        # Process health trends
-        if 'health_trends' in data and data['health_trends']:
-            trends = data['health_trends']
-            
-            if 'top_illnesses_by_week' in trends:
-                # Extract counts for top illnesses
-                illness_counts = [item['count'] for item in trends['top_illnesses_by_week'][:5]]
-                # Pad with zeros if less than 5
-                illness_counts = illness_counts + [0] * (5 - len(illness_counts))
-                features.append(illness_counts)
-                
-            if 'trend_analysis' in trends:
-                analysis = trends['trend_analysis']
-                # Count of increasing, decreasing, and stable conditions
-                features.append([
-                    len(analysis.get('increasing_conditions', [])),
-                    len(analysis.get('decreasing_conditions', [])),
-                    len(analysis.get('stable_conditions', []))
-                ])
-        
-        # Process illness prediction
-        if 'illness_prediction' in data and data['illness_prediction']:
-            prediction = data['illness_prediction']
-            
-            if 'chi_square_statistic' in prediction:
-                features.append([prediction['chi_square_statistic']])
-                
-            if 'p_value' in prediction:
-                features.append([prediction['p_value']])
-                
-            if 'confidence_level' in prediction:
-                features.append([prediction['confidence_level']])
-                
-            # Generate labels based on association result
-            if 'association_result' in prediction:
-                result = prediction['association_result'].lower()
-                if 'strong positive' in result:
-                    labels.append('high_risk')
-                elif 'moderate' in result:
-                    labels.append('moderate_risk')
-                elif 'weak' in result or 'no association' in result:
-                    labels.append('low_risk')
-                else:
-                    labels.append('unknown')
-        
-        # Process surge prediction
-        if 'surge_prediction' in data and data['surge_prediction']:
-            surge = data['surge_prediction']
-            
-            if 'forecasted_monthly_cases' in surge:
-                # Extract forecasted cases for next 3 months
-                forecast_cases = [item['total_cases'] for item in surge['forecasted_monthly_cases'][:3]]
-                # Pad with zeros if less than 3
-                forecast_cases = forecast_cases + [0] * (3 - len(forecast_cases))
-                features.append(forecast_cases)
-                
-            if 'model_accuracy' in surge:
-                features.append([surge['model_accuracy']])
-        
-        # Flatten and combine all features
-        X = np.concatenate([np.array(f).flatten() for f in features])
-        
-        # If no labels were generated, create dummy labels
-        if not labels:
-            # Create synthetic labels based on feature patterns
-            # High values in age groups 51-65 and 65+ often indicate higher risk
-            elderly_ratio = (X[3] + X[4]) / sum(X[:5]) if sum(X[:5]) > 0 else 0
-            if elderly_ratio > 0.5:
-                labels.append('high_risk')
-            elif elderly_ratio > 0.3:
-                labels.append('moderate_risk')
-            else:
-                labels.append('low_risk')
-        
-        y = np.array(labels)
-        
-        return X, y
+        X = extract_features([data])[0]
+        return X, np.array([risk_label(data, X)])
     
     def build_tensorflow_model(self, input_shape):
         """
@@ -234,95 +151,104 @@ class MediSyncAIInsights:
         
         return model
     
-    def train_models(self, data_list):
+    def fit(self, X_train, y_train, n_jobs=1):
         """
-        Train both TensorFlow and Random Forest models on the provided data.
+        Fit the scaler and both models on unscaled features.
         
         Args:
-            data_list (list): List of analytics data dictionaries
-            
-        Returns:
-            dict: Training metrics
+            X_train (np.ndarray): Feature matrix (FEATURE_COLUMNS)
+            y_train (np.ndarray): Encoded labels
+            n_jobs (int): Cores of the Random Forest; training jobs pass -1
         """
-        # Preprocess all data samples
-        X_all = []
-        y_all = []
-        
-        for data in data_list:
-            X, y = self.preprocess_data(data)
-            X_all.append(X)
-            y_all.append(y)
-        
-        X_all = np.vstack(X_all)
-        y_all = np.concatenate(y_all)
+        X_train = self.scaler.fit_transform(X_train)
         
-        # Encode labels
-        label_mapping = {'low_risk': 0, 'moderate_risk': 1, 'high_risk': 2, 'unknown': 1}
-        y_encoded = np.array([label_mapping.get(label, 1) for label in y_all])
-        
-        # Scale features
-        X_scaled = self.scaler.fit_transform(X_all)
-        
-        # Split data (70-30)
-        X_train, X_test, y_train, y_test = train_test_split(
-            X_scaled, y_encoded, test_size=0.3, random_state=RANDOM_SEED
-        )
-        
-        # Train TensorFlow model (optional)
-        tf_metrics = {}
+        # Train TensorFlow model (optional), stopping once validation loss stalls
         if TF_AVAILABLE:
             self.tf_model = self.build_tensorflow_model(X_train.shape[1])
-            history = self.tf_model.fit(
+            self.tf_model.fit(
                 X_train, y_train,
-                epochs=50,
+                epochs=TF_MAX_EPOCHS,
                 batch_size=32,
                 validation_split=0.2,
+                callbacks=[tf.keras.callbacks.EarlyStopping(
+                    monitor='val_loss', patience=TF_EARLY_STOPPING_PATIENCE, restore_best_weights=True
+                )],
                 verbose=0
             )
-
-            # Evaluate TensorFlow model
-            tf_preds = np.argmax(self.tf_model.predict(X_test), axis=1)
-            tf_metrics = {
-                'accuracy': accuracy_score(y_test, tf_preds),
-                'precision': precision_score(y_test, tf_preds, average='weighted'),
-                'recall': recall_score(y_test, tf_preds, average='weighted'),
-                'f1': f1_score(y_test, tf_preds, average='weighted')
-            }
-            self.metrics['tensorflow'] = tf_metrics
         else:
             self.tf_model = None
-            self.metrics['tensorflow'] = {
-                'accuracy': None,
-                'precision': None,
-                'recall': None,
-                'f1': None
-            }
         
         # Train Random Forest model
         self.rf_model = RandomForestClassifier(
             n_estimators=100,
             max_depth=10,
+            n_jobs=n_jobs,
             random_state=RANDOM_SEED
         )
         self.rf_model.fit(X_train, y_train)
+    
+    def evaluate(self, X_test, y_test):
+        """
+        Score the fitted models on unscaled held-out features.
         
-        # Evaluate Random Forest model
-        rf_preds = self.rf_model.predict(X_test)
-        rf_metrics = {
-            'accuracy': accuracy_score(y_test, rf_preds),
-            'precision': precision_score(y_test, rf_preds, average='weighted'),
-            'recall': recall_score(y_test, rf_preds, average='weighted'),
-            'f1': f1_score(y_test, rf_preds, average='weighted')
-        }
-        self.metrics['random_forest'] = rf_metrics
+        Returns:
+            dict: accuracy, precision, recall and f1 per model (empty for
+            the TensorFlow model when it is not available)
+        """
+        X_test = self.scaler.transform(X_test)
         
-        # Save models
-        self.save_models()
+        def scores(preds):
+            return {
+                'accuracy': accuracy_score(y_test, preds),
+                'precision': precision_score(y_test, preds, average='weighted', zero_division=0),
+                'recall': recall_score(y_test, preds, average='weighted', zero_division=0),
+                'f1': f1_score(y_test, preds, average='weighted', zero_division=0)
+            }
         
+        tf_metrics = {}
+        if TF_AVAILABLE and self.tf_model is not None:
+            tf_metrics = scores(np.argmax(self.tf_model.predict(X_test, verbose=0), axis=1))
         return {
             'tensorflow': tf_metrics,
-            'random_forest': rf_metrics
+            'random_forest': scores(self.rf_model.predict(X_test))
+        }
+    
+    def train_models(self, data_list):
+        """
+        Train both TensorFlow and Random Forest models on the provided data.
+        
+        Args:
+            data_list (list): List of analytics data dictionaries
+            
+        Returns:
+            dict: Training metrics
+        """
+        # Extract features and labels of the whole batch at once
+        data_list = list(data_list)
+        X_all = extract_features(data_list)
+        y_encoded = extract_labels(data_list, X_all)
+        
+        # Split data (70-30); the scaler is fitted on the training split only
+        X_train, X_test, y_train, y_test = train_test_split(
+            X_all, y_encoded, test_size=0.3, random_state=RANDOM_SEED
+        )
+        self.fit(X_train, y_train)
+        metrics = self.evaluate(X_test, y_test)
+        
+        self.metrics = {
+            'tensorflow': metrics['tensorflow'] or {
+                'accuracy': None,
+                'precision': None,
+                'recall': None,
+                'f1': None
+            },
+            'random_forest': metrics['random_forest']
         }
+        
+        # Save models
+        self.save_models()
+        
+        return metrics
     
     def save_models(self):
         """Save trained models to disk."""
@@ -340,9 +266,26 @@ class MediSyncAIInsights:
         # Save metrics
         with open(os.path.join(self.model_dir, 'metrics.json'), 'w') as f:
             json.dump(self.metrics, f)
+        
+        # Save the feature schema the models were trained on
+        with open(os.path.join(self.model_dir, 'features.json'), 'w') as f:
+            json.dump({'schema_version': FEATURE_SCHEMA_VERSION, 'columns': list(FEATURE_COLUMNS)}, f)
     
     def load_models(self):
         """Load trained models from disk."""
+        # Models trained on another feature schema cannot score our rows.
+        # Artifacts saved before features.json existed use schema version 1.
+        features_path = os.path.join(self.model_dir, 'features.json')
+        if os.path.exists(features_path):
+            with open(features_path, 'r') as f:
+                schema_version = json.load(f).get('schema_version')
+            if schema_version != FEATURE_SCHEMA_VERSION:
+                logger.warning(
+                    f"Models in {self.model_dir} use feature schema {schema_version}, "
+                    f"expected {FEATURE_SCHEMA_VERSION}; retrain them. Using fallbacks."
+                )
+                return
+        
         # Load TensorFlow model (only if available)
         tf_model_path = os.path.join(self.model_dir, 'tf_model.keras')
         if TF_AVAILABLE and os.path.exists(tf_model_path):
@@ -352,6 +295,8 @@ class MediSyncAIInsights:
         rf_model_path = os.path.join(self.model_dir, 'rf_model.joblib')
         if os.path.exists(rf_model_path):
             self.rf_model = joblib.load(rf_model_path)
+            # Serving predicts a few rows per request: one core, no worker pool
+            self.rf_model.n_jobs = 1
         
         # Load preprocessing objects
         scaler_path = os.path.join(self.model_dir, 'scaler.joblib')
@@ -374,74 +319,89 @@ class MediSyncAIInsights:
         Returns:
             dict: Actionable insights for doctors and nurses
         """
-        # Preprocess data
-        X, _ = self.preprocess_data(data)
-        # Safely scale features; fit on-the-fly or bypass if scaler not fitted
-        try:
-            X_scaled = self.scaler.transform(X.reshape(1, -1))
-        except Exception:
-            try:
-                self.scaler.fit(X.reshape(1, -1))
-                X_scaled = self.scaler.transform(X.reshape(1, -1))
-            except Exception:
-                X_scaled = X.reshape(1, -1)
-        
-        # Make predictions with both models
-        if TF_AVAILABLE and self.tf_model is not None:
-            tf_pred_proba = self.tf_model.predict(X_scaled)[0]
-            tf_pred_class = np.argmax(tf_pred_proba)
-            tf_confidence = float(tf_pred_proba[tf_pred_class])
-            tf_risk = {0: 'low_risk', 1: 'moderate_risk', 2: 'high_risk'}[tf_pred_class]
-        else:
-            tf_risk = 'moderate_risk'
-            tf_confidence = 0.0
-        
-        # Map class indices to risk levels
-        risk_levels = {0: 'low_risk', 1: 'moderate_risk', 2: 'high_risk'}
-        
-        # Random Forest prediction with safe fallback when model is absent/unfitted
-        rf_pred_class_idx = 1  # default to 'moderate_risk'
-        if self.rf_model is not None:
-            try:
-                rf_pred_class = self.rf_model.predict(X_scaled)[0]
-                rf_pred_proba = self.rf_model.predict_proba(X_scaled)[0]
-                rf_risk = risk_levels[rf_pred_class]
-                feature_importance = getattr(self.rf_model, 'feature_importances_', np.array([]))
-                rf_pred_class_idx = int(rf_pred_class)
-            except Exception:
-                rf_pred_proba = np.array([0.2, 0.6, 0.2])
-                rf_risk = risk_levels[1]
-                feature_importance = np.array([])
-        else:
-            rf_pred_proba = np.array([0.2, 0.6, 0.2])
-            rf_risk = risk_levels[1]
-            feature_importance = np.array([])
+        assessment = self.predict_many([data])[0]
+        tf_risk = assessment['tensorflow']['risk_level']
+        rf_risk = assessment['random_forest']['risk_level']
+        recommendations = self._evaluate_recommendations(data, assessment['consensus'])
         
         # Generate insights based on predictions and data
         insights = {
             'model_version': self.version,
             'generated_at': datetime.now().isoformat(),
-            'risk_assessment': {
-                'tensorflow': {
-                    'risk_level': tf_risk,
-                    'confidence': tf_confidence
-                },
-                'random_forest': {
-                    'risk_level': rf_risk,
-                    'confidence': float(rf_pred_proba[rf_pred_class_idx])
-                },
-                'consensus': self._get_consensus_risk(tf_risk, rf_risk)
-            },
-            'actionable_insights': self._generate_actionable_insights(data, tf_risk, rf_risk),
+            'risk_assessment': assessment,
+            'actionable_insights': recommendations['actionable_insights'],
             'comprehensive_recommendations': self._generate_comprehensive_recommendations(data, tf_risk, rf_risk),
             'recommendations': {
-                'doctors': self._generate_doctor_recommendations(data, tf_risk, rf_risk),
-                'nurses': self._generate_nurse_recommendations(data, tf_risk, rf_risk)
+                'doctors': recommendations['doctors'],
+                'nurses': recommendations['nurses']
             }
         }
         
         return insights
 
+    def _scale(self, X):
+        """Scale features; fit on-the-fly or bypass if the scaler is not fitted."""
+        try:
+            return self.scaler.transform(X)
+        except Exception:
+            try:
+                return self.scaler.fit(X).transform(X)
+            except Exception:
+                return X
+    
+    def predict_many(self, samples):
+        """
+        Assess the risk of many analytics samples (hospitals, time windows)
+        with one scaler transform and one call per model.
+        
+        Args:
+            samples (iterable): Analytics data dictionaries
+            
+        Returns:
+            list: One risk assessment per sample, in order, with the
+            tensorflow and random_forest risk levels and confidences and
+            their consensus
+        """
+        samples = list(samples)
+        n = len(samples)
+        if not n:
+            return []
+        X_scaled = self._scale(extract_features(samples))
+        rows = np.arange(n)
+        
+        if TF_AVAILABLE and self.tf_model is not None:
+            tf_proba = np.asarray(self.tf_model.predict(X_scaled, batch_size=PREDICT_BATCH_SIZE, verbose=0))
+            tf_codes = tf_proba.argmax(axis=1)
+            tf_confidence = tf_proba[rows, tf_codes]
+        else:
+            tf_codes = np.ones(n, dtype=np.int64)
+            tf_confidence = np.zeros(n)
+        
+        # Random Forest prediction with safe fallback when model is absent/unfitted
+        try:
+            rf_proba = self.rf_model.predict_proba(X_scaled)
+            best = rf_proba.argmax(axis=1)
+            rf_codes = self.rf_model.classes_[best]
+            rf_confidence = rf_proba[rows, best]
+        except Exception:
+            rf_codes = np.ones(n, dtype=np.int64)
+            rf_confidence = np.full(n, 0.6)
+        
+        consensus = {}
+        assessments = []
+        for tf_code, tf_conf, rf_code, rf_conf in zip(
+            tf_codes.tolist(), tf_confidence.tolist(), rf_codes.tolist(), rf_confidence.tolist()
+        ):
+            tf_risk, rf_risk = RISK_LEVELS[tf_code], RISK_LEVELS[rf_code]
+            if (tf_risk, rf_risk) not in consensus:
+                consensus[tf_risk, rf_risk] = self._get_consensus_risk(tf_risk, rf_risk)
+            assessments.append({
+                'tensorflow': {'risk_level': tf_risk, 'confidence': tf_conf},
+                'random_forest': {'risk_level': rf_risk, 'confidence': rf_conf},
+                'consensus': consensus[tf_risk, rf_risk],
+            })
+        return assessments
+    
     def _generate_comprehensive_recommendations(self, data, tf_risk, rf_risk):
         """
         Generate comprehensive recommendations structured into four categories:
@@ -1105,162 +1065,46 @@ class MediSyncAIInsights:
         
         return protocols
 
+    def generate_clinical_alerts(self, risk_assessment, patient_data=None):
+        """
+        Generate clinical alerts (critical, urgent, warning, informational),
+        their summary and the immediate actions from a detailed risk
+        assessment and the analytics data it was made from.
+        
+        Alerts come from the compiled ``ALERT_PLAN``.
+        """
+        facts = alert_facts(patient_data, risk_assessment)
+        return build_alerts(ALERT_PLAN.collect(facts), facts['risk_level'])
+
+    def generate_clinical_alerts_many(self, risk_assessments, patient_data):
+        """
+        ``generate_clinical_alerts`` for a sequence of risk assessments and
+        their analytics data (a cohort of hospitals, or the time windows of
+        one), each evaluated against the one before: only rules whose facts
+        changed are re-evaluated.
+        """
+        results = ALERT_PLAN.evaluate_many(
+            [alert_facts(data, assessment) for assessment, data in zip(risk_assessments, patient_data)]
+        )
+        return [build_alerts(result.collect(), result.facts['risk_level']) for result in results]
+
+    def _evaluate_recommendations(self, data, consensus_risk):
+        """Actionable insights and doctor and nurse recommendations from ``RECOMMENDATION_PLAN``."""
+        return RECOMMENDATION_PLAN.collect(recommendation_facts(data, consensus_risk))
 
-def generate_synthetic_data(num_samples=100):
+
+def generate_synthetic_data(num_samples=100, seed=None):
     """
     Generate synthetic analytics data for model training.
     
     Args:
         num_samples (int): Number of synthetic data samples to generate
+        seed (int): Seed for a reproducible batch (see synthetic_data.py)
         
     Returns:
         list: List of synthetic analytics data dictionaries
     """
-    data_list = []
-    
-    for _ in range(num_samples):
-        # Generate patient demographics
-        demographics = {
-            'age_distribution': {
-                '0-18': np.random.randint(10, 100),
-                '19-35': np.random.randint(20, 150),
-                '36-50': np.random.randint(15, 120),
-                '51-65': np.random.randint(10, 80),
-                '65+': np.random.randint(5, 60)
-            },
-            'gender_proportions': {
-                'Male': np.random.randint(40, 60),
-                'Female': np.random.randint(40, 60)
-            },
-            'total_patients': np.random.randint(100, 500),
-            'average_age': round(np.random.uniform(25, 65), 1)
-        }
-        
-        # Generate health trends
-        increasing_conditions = np.random.choice(
-            ['Hypertension', 'Diabetes', 'Heart Disease', 'Asthma', 'Arthritis',
-             'Depression', 'Anxiety', 'Obesity', 'High Cholesterol', 'Migraine'],
-            size=np.random.randint(1, 4),
-            replace=False
-        ).tolist()
-        
-        decreasing_conditions = np.random.choice(
-            ['Flu', 'Cold', 'Bronchitis', 'Pneumonia', 'Gastroenteritis'],
-            size=np.random.randint(1, 3),
-            replace=False
-        ).tolist()
-        
-        stable_conditions = np.random.choice(
-            ['Allergies', 'Eczema', 'Psoriasis', 'Gout', 'Osteoporosis'],
-            size=np.random.randint(1, 3),
-            replace=False
-        ).tolist()
-        
-        top_illnesses = []
-        for i, condition in enumerate(np.random.choice(
-            ['Hypertension', 'Diabetes', 'Heart Disease', 'Asthma', 'Arthritis',
-             'Depression', 'Anxiety', 'Obesity', 'High Cholesterol', 'Migraine'],
-            size=5,
-            replace=False
-        )):
-            top_illnesses.append({
-                'medical_condition': condition,
-                'count': np.random.randint(5, 25),
-                'date_of_admission': (datetime.now() - timedelta(days=i*7)).strftime('%Y-%m-%d')
-            })
-        
-        health_trends = {
-            'top_illnesses_by_week': top_illnesses,
-            'trend_analysis': {
-                'increasing_conditions': increasing_conditions,
-                'decreasing_conditions': decreasing_conditions,
-                'stable_conditions': stable_conditions
-            }
-        }
-        
-        # Generate illness prediction
-        # Determine risk level based on demographics and trends
-        elderly_ratio = (demographics['age_distribution']['51-65'] + demographics['age_distribution']['65+']) / sum(demographics['age_distribution'].values())
-        increasing_count = len(increasing_conditions)
-        
-        risk_level = 'low'
-        if elderly_ratio > 0.4 and increasing_count >= 2:
-            risk_level = 'high'
-            association_result = 'Strong positive association found between age and chronic conditions'
-            chi_square = np.random.uniform(30.0, 45.0)
-            p_value = np.random.uniform(0.001, 0.01)
-        elif elderly_ratio > 0.3 or increasing_count >= 2:
-            risk_level = 'moderate'
-            association_result = 'Moderate association found between patient factors and health outcomes'
-            chi_square = np.random.uniform(15.0, 29.9)
-            p_value = np.random.uniform(0.01, 0.04)
-        else:
-            association_result = 'Weak or no association found between analyzed factors'
-            chi_square = np.random.uniform(5.0, 14.9)
-            p_value = np.random.uniform(0.05, 0.2)
-        
-        illness_prediction = {
-            'association_result': association_result,
-            'chi_square_statistic': round(chi_square, 2),
-            'p_value': round(p_value, 4),
-            'confidence_level': 95,
-            'significant_factors': [
-                'Age (p < 0.001)' if risk_level == 'high' else 'Age (p < 0.05)',
-                'Family history (p < 0.01)' if risk_level != 'low' else 'Family history (p < 0.1)',
-                'Lifestyle factors (p < 0.05)' if risk_level != 'low' else 'Lifestyle factors (p < 0.2)'
-            ]
-        }
-        
-        # Generate surge prediction
-        base_date = datetime.now()
-        
-        # Higher risk levels correlate with higher forecasted cases
-        case_multiplier = 1.0
-        if risk_level == 'high':
-            case_multiplier = 1.5
-        elif risk_level == 'moderate':
-            case_multiplier = 1.2
-        
-        forecasted_cases = []
-        for i in range(1, 4):
-            # Create an increasing trend for high risk, stable for moderate, decreasing for low
-            if risk_level == 'high':
-                trend_factor = 1.1 * i
-            elif risk_level == 'moderate':
-                trend_factor = 1.0
-            else:
-                trend_factor = 1.0 / (1.05 * i)
-                
-            forecasted_cases.append({
-                'date': (base_date + timedelta(days=30*i)).strftime('%Y-%m'),
-                'total_cases': int(np.random.randint(50, 150) * case_multiplier * trend_factor),
-                'confidence_interval': {
-                    'lower': int(np.random.randint(30, 50) * case_multiplier * trend_factor),
-                    'upper': int(np.random.randint(150, 250) * case_multiplier * trend_factor)
-                }
-            })
-        
-        surge_prediction = {
-            'forecasted_monthly_cases': forecasted_cases,
-            'risk_factors': [
-                'Seasonal flu outbreak',
-                'Increased emergency visits',
-                'Staff shortage periods'
-            ],
-            'model_accuracy': round(np.random.uniform(85, 95), 1)
-        }
-        
-        # Combine all data
-        data = {
-            'patient_demographics': demographics,
-            'health_trends': health_trends,
-            'illness_prediction': illness_prediction,
-            'surge_prediction': surge_prediction
-        }
-        
-        data_list.append(data)
-    
-    return data_list
+    return synthetic_samples(num_samples, seed)
 
 
 def main():
@@ -1302,430 +1146,6 @@ def main():
         print(f"{i}. {rec}")
 
 
-    def generate_clinical_alerts(self, risk_assessment, patient_data=None):
-        """Generate comprehensive clinical alerts based on risk assessment and patient data."""
-        alerts = {
-            'critical_alerts': [],
-            'urgent_alerts': [],
-            'warning_alerts': [],
-            'informational_alerts': [],
-            'alert_summary': {},
-            'escalation_required': False,
-            'immediate_actions': []
-        }
-        
-        risk_level = risk_assessment.get('overall_risk_level', 'moderate_risk')
-        
-        # Generate risk-level specific alerts
-        if risk_level == 'critical_risk':
-            alerts['critical_alerts'].extend(self._generate_critical_alerts(risk_assessment, patient_data))
-            alerts['escalation_required'] = True
-        elif risk_level == 'high_risk':
-            alerts['urgent_alerts'].extend(self._generate_urgent_alerts(risk_assessment, patient_data))
-        elif risk_level == 'moderate_risk':
-            alerts['warning_alerts'].extend(self._generate_warning_alerts(risk_assessment, patient_data))
-        else:
-            alerts['informational_alerts'].extend(self._generate_informational_alerts(risk_assessment, patient_data))
-        
-        # Generate condition-specific alerts
-        condition_alerts = self._generate_condition_specific_alerts(patient_data)
-        self._merge_alerts(alerts, condition_alerts)
-        
-        # Generate demographic alerts
-        demographic_alerts = self._generate_demographic_alerts(patient_data)
-        self._merge_alerts(alerts, demographic_alerts)
-        
-        # Generate trend alerts
-        trend_alerts = self._generate_trend_alerts(patient_data)
-        self._merge_alerts(alerts, trend_alerts)
-        
-        # Generate capacity alerts
-        capacity_alerts = self._generate_capacity_alerts(patient_data)
-        self._merge_alerts(alerts, capacity_alerts)
-        
-        # Create alert summary
-        alerts['alert_summary'] = self._create_alert_summary(alerts)
-        
-        # Determine immediate actions
-        alerts['immediate_actions'] = self._determine_immediate_actions(alerts, risk_level)
-        
-        return alerts
-    
-    def _generate_critical_alerts(self, risk_assessment, patient_data):
-        """Generate critical alerts requiring immediate intervention."""
-        critical_alerts = []
-        
-        # Risk score based alerts
-        risk_scores = risk_assessment.get('risk_scores', {})
-        overall_score = risk_scores.get('overall_score', 0)
-        
-        if overall_score >= 80:
-            critical_alerts.append({
-                'id': 'CRIT_001',
-                'priority': 'CRITICAL',
-                'title': 'CRITICAL RISK SCORE ALERT',
-                'message': f'Overall risk score: {overall_score:.1f}% - IMMEDIATE INTERVENTION REQUIRED',
-                'action_required': 'Activate rapid response team within 15 minutes',
-                'timeframe': '< 15 minutes',
-                'responsible_party': 'Charge Nurse + Attending Physician',
-                'escalation_path': 'Rapid Response Team → ICU Consult → Department Head'
-            })
-        
-        # Clinical indicator alerts
-        clinical_indicators = risk_assessment.get('clinical_indicators', {})
-        red_flags = clinical_indicators.get('red_flags', [])
-        
-        for flag in red_flags:
-            if 'elderly patients' in flag.lower() and '>30%' in flag:
-                critical_alerts.append({
-                    'id': 'CRIT_002',
-                    'priority': 'CRITICAL',
-                    'title': 'HIGH ELDERLY POPULATION ALERT',
-                    'message': flag,
-                    'action_required': 'Implement emergency geriatric protocols',
-                    'timeframe': '< 30 minutes',
-                    'responsible_party': 'Geriatric Nurse Specialist + Physician',
-                    'escalation_path': 'Charge Nurse → Geriatric Team → Administration'
-                })
-            
-            if any(condition in flag.lower() for condition in ['heart disease', 'stroke', 'cancer', 'sepsis']):
-                critical_alerts.append({
-                    'id': 'CRIT_003',
-                    'priority': 'CRITICAL',
-                    'title': 'CRITICAL CONDITION SURGE ALERT',
-                    'message': flag,
-                    'action_required': 'Activate disease-specific emergency protocols',
-                    'timeframe': '< 30 minutes',
-                    'responsible_party': 'Specialty Team + ICU',
-                    'escalation_path': 'Attending → Specialist → Department Head'
-                })
-        
-        return critical_alerts
-    
-    def _generate_urgent_alerts(self, risk_assessment, patient_data):
-        """Generate urgent alerts requiring prompt attention."""
-        urgent_alerts = []
-        
-        risk_scores = risk_assessment.get('risk_scores', {})
-        clinical_risk = risk_scores.get('clinical_risk', 0)
-        
-        if clinical_risk >= 60:
-            urgent_alerts.append({
-                'id': 'URG_001',
-                'priority': 'URGENT',
-                'title': 'HIGH CLINICAL RISK ALERT',
-                'message': f'Clinical risk score: {clinical_risk:.1f}% - Enhanced monitoring required',
-                'action_required': 'Implement enhanced surveillance protocols',
-                'timeframe': '< 2 hours',
-                'responsible_party': 'Primary Nurse + Physician',
-                'escalation_path': 'Primary Team → Charge Nurse → Attending'
-            })
-        
-        # Intervention urgency alerts
-        intervention_urgency = risk_assessment.get('intervention_urgency', {})
-        if intervention_urgency.get('urgency') == 'Urgent':
-            urgent_alerts.append({
-                'id': 'URG_002',
-                'priority': 'URGENT',
-                'title': 'URGENT INTERVENTION REQUIRED',
-                'message': f"Intervention needed: {intervention_urgency.get('timeframe', 'Within 2-4 hours')}",
-                'action_required': intervention_urgency.get('escalation', 'Physician notification'),
-                'timeframe': intervention_urgency.get('timeframe', '< 4 hours'),
-                'responsible_party': 'Primary Care Team',
-                'escalation_path': 'Nurse → Physician → Charge Nurse'
-            })
-        
-        return urgent_alerts
-    
-    def _generate_warning_alerts(self, risk_assessment, patient_data):
-        """Generate warning alerts for moderate risk situations."""
-        warning_alerts = []
-        
-        risk_scores = risk_assessment.get('risk_scores', {})
-        demographic_risk = risk_scores.get('demographic_risk', 0)
-        
-        if demographic_risk >= 40:
-            warning_alerts.append({
-                'id': 'WARN_001',
-                'priority': 'WARNING',
-                'title': 'DEMOGRAPHIC RISK WARNING',
-                'message': f'Demographic risk score: {demographic_risk:.1f}% - Monitor population trends',
-                'action_required': 'Review and adjust care protocols',
-                'timeframe': '< 24 hours',
-                'responsible_party': 'Charge Nurse',
-                'escalation_path': 'Standard protocols'
-            })
-        
-        # Clinical indicators warnings
-        clinical_indicators = risk_assessment.get('clinical_indicators', {})
-        warning_signs = clinical_indicators.get('warning_signs', [])
-        
-        for warning in warning_signs:
-            warning_alerts.append({
-                'id': f'WARN_{len(warning_alerts) + 2:03d}',
-                'priority': 'WARNING',
-                'title': 'CLINICAL WARNING',
-                'message': warning,
-                'action_required': 'Enhanced monitoring and assessment',
-                'timeframe': '< 24 hours',
-                'responsible_party': 'Primary Care Team',
-                'escalation_path': 'Standard protocols'
-            })
-        
-        return warning_alerts
-    
-    def _generate_informational_alerts(self, risk_assessment, patient_data):
-        """Generate informational alerts for low risk situations."""
-        informational_alerts = []
-        
-        # Protective factors
-        clinical_indicators = risk_assessment.get('clinical_indicators', {})
-        protective_factors = clinical_indicators.get('protective_factors', [])
-        
-        for factor in protective_factors:
-            informational_alerts.append({
-                'id': f'INFO_{len(informational_alerts) + 1:03d}',
-                'priority': 'INFORMATIONAL',
-                'title': 'PROTECTIVE FACTOR IDENTIFIED',
-                'message': factor,
-                'action_required': 'Continue current protocols',
-                'timeframe': 'Routine',
-                'responsible_party': 'Primary Care Team',
-                'escalation_path': 'None required'
-            })
-        
-        return informational_alerts
-    
-    def _generate_condition_specific_alerts(self, patient_data):
-        """Generate alerts specific to medical conditions."""
-        alerts = {'critical_alerts': [], 'urgent_alerts': [], 'warning_alerts': [], 'informational_alerts': []}
-        
-        if not patient_data or 'health_trends' not in patient_data:
-            return alerts
-        
-        health_trends = patient_data['health_trends']
-        if 'trend_analysis' not in health_trends:
-            return alerts
-        
-        trend_analysis = health_trends['trend_analysis']
-        increasing_conditions = trend_analysis.get('increasing_conditions', [])
-        
-        critical_conditions = ['Heart Disease', 'Stroke', 'Cancer', 'Sepsis']
-        urgent_conditions = ['Pneumonia', 'Diabetes', 'Hypertension']
-        
-        for condition in increasing_conditions:
-            if condition in critical_conditions:
-                alerts['critical_alerts'].append({
-                    'id': f'COND_CRIT_{condition.replace(" ", "_").upper()}',
-                    'priority': 'CRITICAL',
-                    'title': f'CRITICAL CONDITION ALERT: {condition}',
-                    'message': f'Rising {condition} cases detected - Immediate protocol activation required',
-                    'action_required': f'Activate {condition} emergency protocols',
-                    'timeframe': '< 30 minutes',
-                    'responsible_party': 'Specialty Team + ICU',
-                    'escalation_path': 'Immediate specialist consultation'
-                })
-            elif condition in urgent_conditions:
-                alerts['urgent_alerts'].append({
-                    'id': f'COND_URG_{condition.replace(" ", "_").upper()}',
-                    'priority': 'URGENT',
-                    'title': f'URGENT CONDITION ALERT: {condition}',
-                    'message': f'Increasing {condition} trend - Enhanced protocols needed',
-                    'action_required': f'Implement enhanced {condition} management',
-                    'timeframe': '< 4 hours',
-                    'responsible_party': 'Primary Care Team',
-                    'escalation_path': 'Physician notification required'
-                })
-            else:
-                alerts['warning_alerts'].append({
-                    'id': f'COND_WARN_{condition.replace(" ", "_").upper()}',
-                    'priority': 'WARNING',
-                    'title': f'CONDITION TREND ALERT: {condition}',
-                    'message': f'{condition} showing upward trend - Monitor closely',
-                    'action_required': f'Enhanced {condition} monitoring',
-                    'timeframe': '< 24 hours',
-                    'responsible_party': 'Primary Care Team',
-                    'escalation_path': 'Standard protocols'
-                })
-        
-        return alerts
-    
-    def _generate_demographic_alerts(self, patient_data):
-        """Generate alerts based on demographic patterns."""
-        alerts = {'critical_alerts': [], 'urgent_alerts': [], 'warning_alerts': [], 'informational_alerts': []}
-        
-        if not patient_data or 'patient_demographics' not in patient_data:
-            return alerts
-        
-        demographics = patient_data['patient_demographics']
-        
-        # Age distribution alerts
-        if 'age_distribution' in demographics:
-            age_dist = demographics['age_distribution']
-            total_patients = sum(age_dist.values())
-            
-            if total_patients > 0:
-                elderly_ratio = age_dist.get('65+', 0) / total_patients
-                
-                if elderly_ratio > 0.4:
-                    alerts['critical_alerts'].append({
-                        'id': 'DEMO_CRIT_AGE',
-                        'priority': 'CRITICAL',
-                        'title': 'CRITICAL ELDERLY POPULATION ALERT',
-                        'message': f'Elderly population: {elderly_ratio*100:.1f}% - Emergency geriatric protocols required',
-                        'action_required': 'Activate emergency geriatric care protocols',
-                        'timeframe': '< 30 minutes',
-                        'responsible_party': 'Geriatric Team + Administration',
-                        'escalation_path': 'Immediate administrative notification'
-                    })
-                elif elderly_ratio > 0.25:
-                    alerts['urgent_alerts'].append({
-                        'id': 'DEMO_URG_AGE',
-                        'priority': 'URGENT',
-                        'title': 'HIGH ELDERLY POPULATION ALERT',
-                        'message': f'Elderly population: {elderly_ratio*100:.1f}% - Enhanced geriatric care needed',
-                        'action_required': 'Implement enhanced geriatric protocols',
-                        'timeframe': '< 4 hours',
-                        'responsible_party': 'Charge Nurse + Geriatric Specialist',
-                        'escalation_path': 'Geriatric team consultation'
-                    })
-        
-        return alerts
-    
-    def _generate_trend_alerts(self, patient_data):
-        """Generate alerts based on trending data."""
-        alerts = {'critical_alerts': [], 'urgent_alerts': [], 'warning_alerts': [], 'informational_alerts': []}
-        
-        if not patient_data or 'surge_prediction' not in patient_data:
-            return alerts
-        
-        surge_prediction = patient_data['surge_prediction']
-        forecasts = surge_prediction.get('forecasted_monthly_cases', [])
-        
-        if len(forecasts) >= 2:
-            current_cases = forecasts[0]['total_cases']
-            next_cases = forecasts[1]['total_cases']
-            
-            if current_cases > 0:
-                increase_percent = ((next_cases - current_cases) / current_cases) * 100
-                
-                if increase_percent > 50:
-                    alerts['critical_alerts'].append({
-                        'id': 'TREND_CRIT_SURGE',
-                        'priority': 'CRITICAL',
-                        'title': 'CRITICAL SURGE ALERT',
-                        'message': f'Projected {increase_percent:.0f}% case increase - Emergency capacity activation required',
-                        'action_required': 'Activate emergency surge protocols immediately',
-                        'timeframe': '< 30 minutes',
-                        'responsible_party': 'Hospital Administration + Department Heads',
-                        'escalation_path': 'Emergency command center activation'
-                    })
-                elif increase_percent > 25:
-                    alerts['urgent_alerts'].append({
-                        'id': 'TREND_URG_SURGE',
-                        'priority': 'URGENT',
-                        'title': 'URGENT SURGE ALERT',
-                        'message': f'Projected {increase_percent:.0f}% case increase - Prepare surge capacity',
-                        'action_required': 'Prepare surge capacity protocols',
-                        'timeframe': '< 4 hours',
-                        'responsible_party': 'Department Heads + Charge Nurses',
-                        'escalation_path': 'Administrative notification'
-                    })
-        
-        return alerts
-    
-    def _generate_capacity_alerts(self, patient_data):
-        """Generate alerts related to capacity and resource management."""
-        alerts = {'critical_alerts': [], 'urgent_alerts': [], 'warning_alerts': [], 'informational_alerts': []}
-        
-        # This would typically integrate with real capacity data
-        # generate alerts based on predicted surge
-        
-        if not patient_data or 'surge_prediction' not in patient_data:
-            return alerts
-        
-        surge_prediction = patient_data['surge_prediction']
-        
-        # Check for surge risk factors
-        if 'surge_risk_factors' in surge_prediction:
-            risk_factors = surge_prediction['surge_risk_factors']
-            
-            if len(risk_factors) >= 3:
-                alerts['urgent_alerts'].append({
-                    'id': 'CAP_URG_RESOURCES',
-                    'priority': 'URGENT',
-                    'title': 'RESOURCE CAPACITY ALERT',
-                    'message': f'Multiple surge risk factors identified: {", ".join(risk_factors[:3])}',
-                    'action_required': 'Review resource allocation and staffing levels',
-                    'timeframe': '< 4 hours',
-                    'responsible_party': 'Resource Management + Administration',
-                    'escalation_path': 'Department heads notification'
-                })
-        
-        return alerts
-    
-    def _merge_alerts(self, main_alerts, new_alerts):
-        """Merge new alerts into the main alerts dictionary."""
-        for category in ['critical_alerts', 'urgent_alerts', 'warning_alerts', 'informational_alerts']:
-            if category in new_alerts:
-                main_alerts[category].extend(new_alerts[category])
-    
-    def _create_alert_summary(self, alerts):
-        """Create a summary of all alerts."""
-        summary = {
-            'total_alerts': 0,
-            'critical_count': len(alerts['critical_alerts']),
-            'urgent_count': len(alerts['urgent_alerts']),
-            'warning_count': len(alerts['warning_alerts']),
-            'informational_count': len(alerts['informational_alerts']),
-            'highest_priority': 'INFORMATIONAL',
-            'requires_immediate_action': False
-        }
-        
-        summary['total_alerts'] = (summary['critical_count'] + summary['urgent_count'] + 
-                                 summary['warning_count'] + summary['informational_count'])
-        
-        if summary['critical_count'] > 0:
-            summary['highest_priority'] = 'CRITICAL'
-            summary['requires_immediate_action'] = True
-        elif summary['urgent_count'] > 0:
-            summary['highest_priority'] = 'URGENT'
-            summary['requires_immediate_action'] = True
-        elif summary['warning_count'] > 0:
-            summary['highest_priority'] = 'WARNING'
-        
-        return summary
-    
-    def _determine_immediate_actions(self, alerts, risk_level):
-        """Determine immediate actions based on alerts and risk level."""
-        immediate_actions = []
-        
-        # Critical alert actions
-        for alert in alerts['critical_alerts']:
-            immediate_actions.append({
-                'action': alert['action_required'],
-                'timeframe': alert['timeframe'],
-                'responsible': alert['responsible_party'],
-                'priority': 'CRITICAL'
-            })
-        
-        # Risk level specific actions
-        if risk_level == 'critical_risk':
-            immediate_actions.append({
-                'action': 'Activate rapid response team',
-                'timeframe': '< 15 minutes',
-                'responsible': 'Charge Nurse',
-                'priority': 'CRITICAL'
-            })
-            immediate_actions.append({
-                'action': 'Notify attending physician immediately',
-                'timeframe': '< 5 minutes',
-                'responsible': 'Primary Nurse',
-                'priority': 'CRITICAL'
-            })
-        
-        return immediate_actions
-
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,773 @@
+"""
+Declarative clinical alert and recommendation rules.
+
+Alerts (``generate_clinical_alerts``) and the doctor, nurse and actionable
+recommendation lists of ``generate_insights`` are produced by rule sets
+instead of chains of conditionals:
+
+- ``alert_facts`` and ``recommendation_facts`` flatten a risk assessment or
+  the consensus risk and an analytics dict into a dict of hashable values
+  (risk level, elderly share, increasing conditions, forecast increase, ...).
+  Every rule names the facts it reads in ``inputs``; a rule with
+  ``when=(fact, value)`` only applies while that fact has that value (e.g.
+  the rules of one risk level, or of one band of the elderly share).
+- A ``RulePlan`` is compiled once at import: templates are split into static
+  and formatted fields, rules are indexed by the facts they read and guarded
+  rules by their ``when`` value, so an evaluation never looks at the rules of
+  another risk level.
+- ``RulePlan.evaluate`` evaluates the facts of one request. Loops over a
+  cohort or the time windows of a hospital pass it the previous
+  ``RuleResult`` (or use ``evaluate_many``), so only the rules whose inputs
+  changed are re-evaluated and the other rules' outputs are reused.
+- Outputs are memoized per rule on its input values, and rendered outputs on
+  the values they are rendered from (an LRU per rule), so alerts repeated
+  across a cohort are formatted once. Rules reading a continuous fact (a
+  score, a share) only use the second memo.
+
+Rule outputs are shared between evaluations; ``RulePlan.collect`` and
+``RuleResult.collect`` return fresh lists and copies of dict outputs for
+callers to keep or change.
+"""
+from collections import defaultdict
+from functools import lru_cache
+from operator import itemgetter
+from typing import Callable, NamedTuple, Optional
+
+RULE_MEMO_SIZE = 4096
+# What a rule's match returns when it does not fire
+NO_OUTPUT = ()
+
+ALERT_CATEGORIES = ('critical_alerts', 'urgent_alerts', 'warning_alerts', 'informational_alerts')
+RECOMMENDATION_TARGETS = ('actionable_insights', 'doctors', 'nurses')
+CONSENSUS_RISK_LEVELS = ('low_risk', 'moderate_risk', 'high_risk', 'critical_risk')
+
+CRITICAL_CONDITIONS = ('Heart Disease', 'Stroke', 'Cancer', 'Sepsis')
+URGENT_CONDITIONS = ('Pneumonia', 'Diabetes', 'Hypertension')
+# Red flags naming one of these conditions raise a condition surge alert.
+CRITICAL_FLAG_TERMS = ('heart disease', 'stroke', 'cancer', 'sepsis')
+
+# Demographic risk score from which moderate risk raises a demographic warning
+DEMOGRAPHIC_WARNING = 40
+# Share of 65+ patients above which elderly care recommendations apply
+ELDERLY_SHARE = 0.15
+# Forecast increase (%) above which surge recommendations apply
+SURGE_INCREASE = 25
+SIGNIFICANCE_LEVEL = 0.05
+
+
+class Rule(NamedTuple):
+    """
+    One rule: ``match(*values of inputs)`` returns or yields a template
+    context (dict) per output, none when the rule does not fire.
+    ``template`` is a format string or a dict of format strings rendered
+    with each context.
+    """
+    id: str
+    target: str
+    inputs: tuple
+    match: Callable
+    template: object
+    when: Optional[tuple] = None
+
+
+class RuleResult(NamedTuple):
+    """Facts an evaluation ran on and the rendered outputs of each rule."""
+    plan: object
+    facts: dict
+    outputs: tuple
+    evaluated: int
+
+    def collect(self):
+        """Outputs by target, in rule declaration order."""
+        outputs = self.outputs
+        collected = {}
+        for target, positions, copy in self.plan.layout:
+            bucket = collected[target] = []
+            for position in positions:
+                if outputs[position]:
+                    bucket.extend([output.copy() for output in outputs[position]] if copy else outputs[position])
+        return collected
+
+
+def _compile_template(template):
+    """Render function of a template: static strings are returned as is, only fields with a placeholder are formatted."""
+    if isinstance(template, str):
+        if '{' not in template:
+            return lambda ctx: template
+        return template.format_map
+    template = dict(template)
+    formatted = tuple((key, value.format_map) for key, value in template.items() if '{' in value)
+
+    def render(ctx):
+        # Copying keeps the template's key order; placeholders are overwritten
+        rendered = template.copy()
+        for key, format_map in formatted:
+            rendered[key] = format_map(ctx)
+        return rendered
+    return render
+
+
+class RulePlan:
+    """
+    Rules compiled into renderers, an index of rules by input fact and an
+    index of guarded rules by ``when`` value. Facts passed to ``evaluate``
+    must hold every input and guard fact of every rule.
+    """
+
+    def __init__(self, rules, targets, continuous=()):
+        self.rules = tuple(rules)
+        continuous = frozenset(continuous)
+        self.targets = tuple(targets)
+        ids = [rule.id for rule in self.rules]
+        if len(set(ids)) != len(ids):
+            raise ValueError('Duplicate rule ids')
+        unknown = {rule.target for rule in self.rules} - set(self.targets)
+        if unknown:
+            raise ValueError(f'Unknown rule targets: {sorted(unknown)}')
+
+        index = defaultdict(list)
+        guarded = defaultdict(lambda: defaultdict(list))
+        for position, rule in enumerate(self.rules):
+            names = rule.inputs + ((rule.when[0],) if rule.when else ())
+            for name in dict.fromkeys(names):
+                index[name].append(position)
+            if rule.when:
+                fact, value = rule.when
+                guarded[fact][value].append(position)
+        self.by_input = {name: tuple(positions) for name, positions in index.items()}
+        self.inputs = frozenset(self.by_input)
+        self._input_index = tuple(self.by_input.items())
+        self._full_threshold = len(self._input_index) // 2
+        self.unguarded = tuple(p for p, rule in enumerate(self.rules) if not rule.when)
+        self.by_guard = {
+            fact: {value: tuple(positions) for value, positions in by_value.items()}
+            for fact, by_value in guarded.items()
+        }
+        # (target, rule positions, whether outputs are dicts to copy) in target order
+        self.layout = tuple(
+            (target,
+             tuple(p for p, rule in enumerate(self.rules) if rule.target == target),
+             any(isinstance(rule.template, dict) for rule in self.rules if rule.target == target))
+            for target in self.targets
+        )
+        self._keys = tuple(itemgetter(*rule.inputs) for rule in self.rules)
+        self._guard_key = itemgetter(*self.by_guard) if self.by_guard else None
+        # Guard values (e.g. the 4 risk levels) -> positions of the rules that apply
+        self._active_by_guard = {}
+        renders = tuple(_compile_template(rule.template) for rule in self.rules)
+        self._renders = tuple(self._memoized(render) for render in renders)
+        self._fire_unmemoized = tuple(
+            self._firing(rule, render, memo=False) for rule, render in zip(self.rules, renders)
+        )
+        # Outputs per rule by input values. Rules reading a continuous fact (a
+        # score, a share) rarely see the same values twice: they are not
+        # memoized and their outputs are fresh
+        self._memos = tuple({} if continuous.isdisjoint(rule.inputs) else None for rule in self.rules)
+        self._fire = tuple(
+            self._memoizing(memo, self._firing(rule, render, memo=True)) if memo is not None else fire
+            for rule, render, memo, fire in zip(self.rules, self._renders, self._memos, self._fire_unmemoized)
+        )
+
+    @staticmethod
+    def _memoizing(memo, fire):
+        """``fire``, with outputs kept in ``memo``; a full memo is cleared first."""
+        def memoized(key):
+            outputs = memo.get(key)
+            if outputs is None:
+                if len(memo) >= RULE_MEMO_SIZE:
+                    memo.clear()
+                outputs = memo[key] = fire(key)
+            return outputs
+        return memoized
+
+    @staticmethod
+    def _memoized(render):
+        @lru_cache(maxsize=RULE_MEMO_SIZE)
+        def render_items(items):
+            return render(dict(items))
+        return render_items
+
+    @staticmethod
+    def _firing(rule, render, memo):
+        """
+        ``fire(key)``: the rule's outputs for the value(s) of its inputs.
+        ``render`` takes the items of a context when ``memo``, else a context.
+        """
+        match = rule.match
+        spread = len(rule.inputs) > 1  # itemgetter of one name returns the value itself
+
+        if memo:
+            def fire(key):
+                contexts = match(*key) if spread else match(key)
+                if not contexts:
+                    return ()
+                return tuple([render(tuple(ctx.items())) for ctx in contexts])
+        else:
+            def fire(key):
+                contexts = match(*key) if spread else match(key)
+                if not contexts:
+                    return ()
+                return tuple(map(render, contexts))
+        return fire
+
+    def _active(self, facts):
+        """Positions of the rules that apply to ``facts``: unguarded ones and guards matching their value."""
+        guard = self._guard_key(facts) if self._guard_key else None
+        active = self._active_by_guard.get(guard)
+        if active is None:
+            positions = list(self.unguarded)
+            for fact, by_value in self.by_guard.items():
+                positions.extend(by_value.get(facts[fact], ()))
+            active = self._active_by_guard[guard] = tuple(positions)
+        return active
+
+    def evaluate(self, facts, previous=None, memo=True):
+        """
+        Evaluate the rules on ``facts``. With the ``previous`` result of this
+        plan, only rules reading a fact that changed since are re-evaluated;
+        ``memo=False`` renders every firing rule again.
+        """
+        fires = self._fire if memo else self._fire_unmemoized
+        keys = self._keys
+        if previous is None or previous.plan is not self:
+            outputs = [()] * len(self.rules)
+            active = self._active(facts)
+            for position in active:
+                outputs[position] = fires[position](keys[position](facts))
+            return RuleResult(self, facts, tuple(outputs), len(active))
+
+        before = previous.facts
+        changed = [positions for name, positions in self._input_index if facts[name] != before[name]]
+        if not changed:
+            return RuleResult(self, facts, previous.outputs, 0)
+        if len(changed) > self._full_threshold:
+            # Most inputs changed: diffing rules costs more than a fresh evaluation
+            return self.evaluate(facts, memo=memo)
+        dirty = set().union(*changed)
+        outputs = list(previous.outputs)
+        evaluated = 0
+        for position in dirty:
+            when = self.rules[position].when
+            if when and facts[when[0]] != when[1]:
+                outputs[position] = ()
+            else:
+                outputs[position] = fires[position](keys[position](facts))
+                evaluated += 1
+        return RuleResult(self, facts, tuple(outputs), evaluated)
+
+    def collect(self, facts):
+        """Outputs of the rules on ``facts`` by target, for a one-off evaluation."""
+        return self.evaluate(facts).collect()
+
+    def evaluate_many(self, facts_list):
+        """Evaluate a cohort in order, each sample incrementally against the one before."""
+        results = []
+        previous = None
+        for facts in facts_list:
+            previous = self.evaluate(facts, previous)
+            results.append(previous)
+        return results
+
+    def clear_memo(self):
+        for render in self._renders:
+            render.cache_clear()
+        for memo in self._memos:
+            if memo is not None:
+                memo.clear()
+
+
+# --- Facts ---
+
+def _dict(value):
+    return value if isinstance(value, dict) else {}
+
+
+def _names(values):
+    return tuple(str(value) for value in values) if values else ()
+
+
+def _number(value, default=0):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _elderly_share(ages):
+    try:
+        total = sum(ages.values())
+    except TypeError:
+        total = sum(_number(v) for v in ages.values())
+    return _number(ages.get('65+')) / total if total > 0 else None
+
+
+def _forecast(surge):
+    """Cases forecast for next month and their projected increase (%) the month after."""
+    forecasts = surge.get('forecasted_monthly_cases')
+    first = forecasts[0] if forecasts else None
+    cases = first.get('total_cases') if isinstance(first, dict) else None
+    if cases is None:
+        return None, None
+    current = _number(cases)
+    if current > 0 and len(forecasts) >= 2 and isinstance(forecasts[1], dict):
+        return current, (_number(forecasts[1].get('total_cases')) - current) / current * 100
+    return current, None
+
+
+def _band(value, critical, urgent):
+    """'critical' above ``critical``, 'urgent' above ``urgent``, None below both or without a value."""
+    if value is None or value <= urgent:
+        return None
+    return 'critical' if value > critical else 'urgent'
+
+
+# Elderly share and forecast increase (%) above which demographic and trend alerts are critical or urgent
+ELDERLY_CRITICAL, ELDERLY_URGENT = 0.4, 0.25
+SURGE_CRITICAL, SURGE_URGENT = 50, 25
+
+
+def alert_facts(data=None, risk_assessment=None):
+    """
+    Hashable facts the alert rules read, from an analytics dict and a
+    detailed risk assessment (a moderate risk with no scores or indicators
+    when missing).
+    """
+    data = _dict(data)
+    assessment = _dict(risk_assessment)
+    scores = _dict(assessment.get('risk_scores'))
+    indicators = _dict(assessment.get('clinical_indicators'))
+    urgency = _dict(assessment.get('intervention_urgency'))
+    surge = _dict(data.get('surge_prediction'))
+
+    risk_level = assessment.get('overall_risk_level', 'moderate_risk')
+    demographic_risk = _number(scores.get('demographic_risk'))
+    elderly_share = _elderly_share(_dict(_dict(data.get('patient_demographics')).get('age_distribution')))
+    forecast_increase = _forecast(surge)[1]
+    return {
+        # Any other level gets the low risk (informational) alerts
+        'risk_level': risk_level if risk_level in CONSENSUS_RISK_LEVELS else 'low_risk',
+        'overall_score': _number(scores.get('overall_score')),
+        'clinical_risk': _number(scores.get('clinical_risk')),
+        'demographic_risk': demographic_risk,
+        'demographic_warning': risk_level == 'moderate_risk' and demographic_risk >= DEMOGRAPHIC_WARNING,
+        'red_flags': _names(indicators.get('red_flags')),
+        'warning_signs': _names(indicators.get('warning_signs')),
+        'protective_factors': _names(indicators.get('protective_factors')),
+        'urgency': urgency.get('urgency'),
+        'urgency_timeframe': urgency.get('timeframe'),
+        'urgency_escalation': urgency.get('escalation'),
+        'elderly_share': elderly_share,
+        'elderly_band': _band(elderly_share, ELDERLY_CRITICAL, ELDERLY_URGENT),
+        'increasing_conditions': _names(_dict(_dict(data.get('health_trends')).get('trend_analysis')).get(
+            'increasing_conditions'
+        )),
+        'forecast_increase': forecast_increase,
+        'surge_band': _band(forecast_increase, SURGE_CRITICAL, SURGE_URGENT),
+        'surge_risk_factors': _names(surge.get('surge_risk_factors') or surge.get('risk_factors')),
+    }
+
+
+def recommendation_facts(data=None, consensus_risk=None):
+    """Hashable facts the recommendation rules read, from an analytics dict and the consensus risk level."""
+    data = _dict(data)
+    analysis = _dict(_dict(data.get('health_trends')).get('trend_analysis'))
+    next_cases, forecast_increase = _forecast(_dict(data.get('surge_prediction')))
+    p_value = _dict(data.get('illness_prediction')).get('p_value')
+    return {
+        'consensus_risk': consensus_risk,
+        'elderly_share': _elderly_share(_dict(_dict(data.get('patient_demographics')).get('age_distribution'))),
+        'increasing_conditions': _names(analysis.get('increasing_conditions')),
+        'decreasing_conditions': _names(analysis.get('decreasing_conditions')),
+        # Memo keys compare 120 == 120.0; render counts one way
+        'next_month_cases': None if next_cases is None else round(next_cases),
+        'forecast_increase': forecast_increase,
+        'p_value': None if p_value is None else _number(p_value, None),
+    }
+
+
+# --- Alert rules ---
+
+def _alert(id, priority, title, message, action, timeframe, responsible, escalation):
+    return {
+        'id': id,
+        'priority': priority,
+        'title': title,
+        'message': message,
+        'action_required': action,
+        'timeframe': timeframe,
+        'responsible_party': responsible,
+        'escalation_path': escalation,
+    }
+
+
+def _condition_key(condition):
+    return condition.replace(' ', '_').upper()
+
+
+RED_FLAG_ALERTS = {
+    'elderly': {
+        'id': 'CRIT_002',
+        'title': 'HIGH ELDERLY POPULATION ALERT',
+        'action': 'Implement emergency geriatric protocols',
+        'timeframe': '< 30 minutes',
+        'responsible': 'Geriatric Nurse Specialist + Physician',
+        'escalation': 'Charge Nurse → Geriatric Team → Administration',
+    },
+    'condition': {
+        'id': 'CRIT_003',
+        'title': 'CRITICAL CONDITION SURGE ALERT',
+        'action': 'Activate disease-specific emergency protocols',
+        'timeframe': '< 30 minutes',
+        'responsible': 'Specialty Team + ICU',
+        'escalation': 'Attending → Specialist → Department Head',
+    },
+}
+
+
+def _red_flags(flags):
+    for flag in flags:
+        lowered = flag.lower()
+        if 'elderly patients' in lowered and '>30%' in flag:
+            yield {**RED_FLAG_ALERTS['elderly'], 'flag': flag}
+        if any(term in lowered for term in CRITICAL_FLAG_TERMS):
+            yield {**RED_FLAG_ALERTS['condition'], 'flag': flag}
+
+
+def _warning_signs(demographic_warning, warning_signs):
+    # Numbered after WARN_001 whether or not it fired
+    first = 2 + demographic_warning
+    return ({'n': first + i, 'warning': warning} for i, warning in enumerate(warning_signs))
+
+
+def _protective_factors(factors):
+    return ({'n': i, 'factor': factor} for i, factor in enumerate(factors, 1))
+
+
+def _increasing(conditions, kind):
+    for condition in conditions:
+        if kind == 'critical' and condition in CRITICAL_CONDITIONS:
+            yield {'condition': condition, 'key': _condition_key(condition)}
+        elif kind == 'urgent' and condition in URGENT_CONDITIONS:
+            yield {'condition': condition, 'key': _condition_key(condition)}
+        elif kind == 'warning' and condition not in CRITICAL_CONDITIONS and condition not in URGENT_CONDITIONS:
+            yield {'condition': condition, 'key': _condition_key(condition)}
+
+
+ALERT_RULES = (
+    # Risk-level alerts
+    Rule(
+        'CRIT_001', 'critical_alerts', ('overall_score',),
+        lambda score: ({'score': score},) if score >= 80 else NO_OUTPUT,
+        _alert('CRIT_001', 'CRITICAL', 'CRITICAL RISK SCORE ALERT',
+               'Overall risk score: {score:.1f}% - IMMEDIATE INTERVENTION REQUIRED',
+               'Activate rapid response team within 15 minutes', '< 15 minutes',
+               'Charge Nurse + Attending Physician', 'Rapid Response Team → ICU Consult → Department Head'),
+        when=('risk_level', 'critical_risk'),
+    ),
+    Rule(
+        'CRIT_FLAGS', 'critical_alerts', ('red_flags',),
+        _red_flags,
+        _alert('{id}', 'CRITICAL', '{title}', '{flag}', '{action}', '{timeframe}', '{responsible}', '{escalation}'),
+        when=('risk_level', 'critical_risk'),
+    ),
+    Rule(
+        'URG_001', 'urgent_alerts', ('clinical_risk',),
+        lambda risk: ({'risk': risk},) if risk >= 60 else NO_OUTPUT,
+        _alert('URG_001', 'URGENT', 'HIGH CLINICAL RISK ALERT',
+               'Clinical risk score: {risk:.1f}% - Enhanced monitoring required',
+               'Implement enhanced surveillance protocols', '< 2 hours',
+               'Primary Nurse + Physician', 'Primary Team → Charge Nurse → Attending'),
+        when=('risk_level', 'high_risk'),
+    ),
+    Rule(
+        'URG_002', 'urgent_alerts', ('urgency', 'urgency_timeframe', 'urgency_escalation'),
+        lambda urgency, timeframe, escalation: ({
+            'message_timeframe': timeframe or 'Within 2-4 hours',
+            'action': escalation or 'Physician notification',
+            'timeframe': timeframe or '< 4 hours',
+        },) if urgency == 'Urgent' else NO_OUTPUT,
+        _alert('URG_002', 'URGENT', 'URGENT INTERVENTION REQUIRED', 'Intervention needed: {message_timeframe}',
+               '{action}', '{timeframe}', 'Primary Care Team', 'Nurse → Physician → Charge Nurse'),
+        when=('risk_level', 'high_risk'),
+    ),
+    Rule(
+        'WARN_001', 'warning_alerts', ('demographic_risk',),
+        lambda risk: ({'risk': risk},),
+        _alert('WARN_001', 'WARNING', 'DEMOGRAPHIC RISK WARNING',
+               'Demographic risk score: {risk:.1f}% - Monitor population trends',
+               'Review and adjust care protocols', '< 24 hours', 'Charge Nurse', 'Standard protocols'),
+        when=('demographic_warning', True),
+    ),
+    Rule(
+        'WARN_SIGNS', 'warning_alerts', ('demographic_warning', 'warning_signs'),
+        _warning_signs,
+        _alert('WARN_{n:03d}', 'WARNING', 'CLINICAL WARNING', '{warning}',
+               'Enhanced monitoring and assessment', '< 24 hours', 'Primary Care Team', 'Standard protocols'),
+        when=('risk_level', 'moderate_risk'),
+    ),
+    Rule(
+        'INFO_FACTORS', 'informational_alerts', ('protective_factors',),
+        _protective_factors,
+        _alert('INFO_{n:03d}', 'INFORMATIONAL', 'PROTECTIVE FACTOR IDENTIFIED', '{factor}',
+               'Continue current protocols', 'Routine', 'Primary Care Team', 'None required'),
+        when=('risk_level', 'low_risk'),
+    ),
+    # Condition-specific alerts
+    Rule(
+        'COND_CRIT', 'critical_alerts', ('increasing_conditions',),
+        lambda conditions: _increasing(conditions, 'critical'),
+        _alert('COND_CRIT_{key}', 'CRITICAL', 'CRITICAL CONDITION ALERT: {condition}',
+               'Rising {condition} cases detected - Immediate protocol activation required',
+               'Activate {condition} emergency protocols', '< 30 minutes',
+               'Specialty Team + ICU', 'Immediate specialist consultation'),
+    ),
+    Rule(
+        'COND_URG', 'urgent_alerts', ('increasing_conditions',),
+        lambda conditions: _increasing(conditions, 'urgent'),
+        _alert('COND_URG_{key}', 'URGENT', 'URGENT CONDITION ALERT: {condition}',
+               'Increasing {condition} trend - Enhanced protocols needed',
+               'Implement enhanced {condition} management', '< 4 hours',
+               'Primary Care Team', 'Physician notification required'),
+    ),
+    Rule(
+        'COND_WARN', 'warning_alerts', ('increasing_conditions',),
+        lambda conditions: _increasing(conditions, 'warning'),
+        _alert('COND_WARN_{key}', 'WARNING', 'CONDITION TREND ALERT: {condition}',
+               '{condition} showing upward trend - Monitor closely',
+               'Enhanced {condition} monitoring', '< 24 hours', 'Primary Care Team', 'Standard protocols'),
+    ),
+    # Demographic alerts
+    Rule(
+        'DEMO_CRIT_AGE', 'critical_alerts', ('elderly_share',),
+        lambda share: ({'percent': share * 100},),
+        _alert('DEMO_CRIT_AGE', 'CRITICAL', 'CRITICAL ELDERLY POPULATION ALERT',
+               'Elderly population: {percent:.1f}% - Emergency geriatric protocols required',
+               'Activate emergency geriatric care protocols', '< 30 minutes',
+               'Geriatric Team + Administration', 'Immediate administrative notification'),
+        when=('elderly_band', 'critical'),
+    ),
+    Rule(
+        'DEMO_URG_AGE', 'urgent_alerts', ('elderly_share',),
+        lambda share: ({'percent': share * 100},),
+        _alert('DEMO_URG_AGE', 'URGENT', 'HIGH ELDERLY POPULATION ALERT',
+               'Elderly population: {percent:.1f}% - Enhanced geriatric care needed',
+               'Implement enhanced geriatric protocols', '< 4 hours',
+               'Charge Nurse + Geriatric Specialist', 'Geriatric team consultation'),
+        when=('elderly_band', 'urgent'),
+    ),
+    # Trend alerts
+    Rule(
+        'TREND_CRIT_SURGE', 'critical_alerts', ('forecast_increase',),
+        lambda increase: ({'increase': increase},),
+        _alert('TREND_CRIT_SURGE', 'CRITICAL', 'CRITICAL SURGE ALERT',
+               'Projected {increase:.0f}% case increase - Emergency capacity activation required',
+               'Activate emergency surge protocols immediately', '< 30 minutes',
+               'Hospital Administration + Department Heads', 'Emergency command center activation'),
+        when=('surge_band', 'critical'),
+    ),
+    Rule(
+        'TREND_URG_SURGE', 'urgent_alerts', ('forecast_increase',),
+        lambda increase: ({'increase': increase},),
+        _alert('TREND_URG_SURGE', 'URGENT', 'URGENT SURGE ALERT',
+               'Projected {increase:.0f}% case increase - Prepare surge capacity',
+               'Prepare surge capacity protocols', '< 4 hours',
+               'Department Heads + Charge Nurses', 'Administrative notification'),
+        when=('surge_band', 'urgent'),
+    ),
+    # Capacity alerts
+    Rule(
+        'CAP_URG_RESOURCES', 'urgent_alerts', ('surge_risk_factors',),
+        lambda factors: ({'factors': ', '.join(factors[:3])},) if len(factors) >= 3 else NO_OUTPUT,
+        _alert('CAP_URG_RESOURCES', 'URGENT', 'RESOURCE CAPACITY ALERT',
+               'Multiple surge risk factors identified: {factors}',
+               'Review resource allocation and staffing levels', '< 4 hours',
+               'Resource Management + Administration', 'Department heads notification'),
+    ),
+)
+
+
+# --- Recommendation rules ---
+
+RISK_LABELS = {
+    'low_risk': 'low',
+    'moderate_risk': 'moderate',
+    'high_risk': 'high',
+    'critical_risk': 'critical',
+}
+
+DOCTOR_RISK_GUIDANCE = {
+    'critical_risk': 'Activate multidisciplinary emergency protocols and review every critical-risk patient in person.',
+    'high_risk': 'Review high-risk patients within 2-4 hours and plan early interventions.',
+    'moderate_risk': 'Schedule targeted follow-up within 24-48 hours for patients with identified risk factors.',
+    'low_risk': 'Continue routine preventive care at standard follow-up intervals.',
+}
+
+NURSE_RISK_GUIDANCE = {
+    'critical_risk': 'Monitor vital signs continuously or hourly and keep the rapid response team on standby.',
+    'high_risk': 'Check vital signs every 2-4 hours and document comprehensive assessments every 4 hours.',
+    'moderate_risk': 'Check vital signs every 6-8 hours and report any abnormality to the charge nurse.',
+    'low_risk': 'Keep routine vital signs every 8-12 hours with one assessment per shift.',
+}
+
+
+def _risk_guidance(guidance):
+    return lambda risk: ({'text': guidance.get(risk, guidance['moderate_risk'])},)
+
+
+def _elderly(share):
+    return ({'percent': share * 100},) if share is not None and share > ELDERLY_SHARE else NO_OUTPUT
+
+
+def _surge(increase):
+    return ({'increase': increase},) if increase is not None and increase > SURGE_INCREASE else NO_OUTPUT
+
+
+def _conditions(conditions, critical):
+    return ({'condition': c} for c in conditions if (c in CRITICAL_CONDITIONS) == critical)
+
+
+def _trend_balance(increasing, decreasing):
+    if not increasing and not decreasing:
+        return NO_OUTPUT
+    return ({'up': len(increasing), 'down': len(decreasing)},)
+
+
+RECOMMENDATION_RULES = (
+    # Actionable insights
+    Rule(
+        'INSIGHT_RISK', 'actionable_insights', ('consensus_risk',),
+        lambda risk: ({'level': RISK_LABELS.get(risk, 'moderate')},),
+        'Overall patient risk is {level}; align monitoring and staffing with this risk level.',
+    ),
+    Rule(
+        'INSIGHT_VOLUME', 'actionable_insights', ('next_month_cases',),
+        lambda cases: ({'cases': cases},) if cases is not None else NO_OUTPUT,
+        'Expect approximately {cases} cases next month; plan schedules and supplies accordingly.',
+    ),
+    Rule(
+        'INSIGHT_TRENDS', 'actionable_insights', ('increasing_conditions', 'decreasing_conditions'),
+        _trend_balance,
+        '{up} condition(s) are increasing and {down} decreasing; focus resources on the rising ones.',
+    ),
+    Rule(
+        'INSIGHT_ELDERLY', 'actionable_insights', ('elderly_share',),
+        _elderly,
+        'Patients aged 65+ make up {percent:.0f}% of the population; geriatric care needs are elevated.',
+    ),
+    # Doctors
+    Rule('DOC_RISK', 'doctors', ('consensus_risk',), _risk_guidance(DOCTOR_RISK_GUIDANCE), '{text}'),
+    Rule(
+        'DOC_CRITICAL_CONDITIONS', 'doctors', ('increasing_conditions',),
+        lambda conditions: _conditions(conditions, critical=True),
+        'Rising {condition} cases: confirm specialist referral pathways and disease-specific protocols.',
+    ),
+    Rule(
+        'DOC_CONDITIONS', 'doctors', ('increasing_conditions',),
+        lambda conditions: _conditions(conditions, critical=False),
+        'Increasing {condition} trend: review screening criteria and treatment plans.',
+    ),
+    Rule(
+        'DOC_ELDERLY', 'doctors', ('elderly_share',),
+        _elderly,
+        'Review medications of patients over 65 for age-appropriate dosing and polypharmacy '
+        '({percent:.0f}% of patients are 65+).',
+    ),
+    Rule(
+        'DOC_ASSOCIATION', 'doctors', ('p_value',),
+        lambda p: ({'p': p},) if p is not None and p < SIGNIFICANCE_LEVEL else NO_OUTPUT,
+        'Demographic factors are significantly associated with illness (p = {p:.3f}); '
+        'factor age and gender into screening decisions.',
+    ),
+    Rule(
+        'DOC_SURGE', 'doctors', ('forecast_increase',),
+        _surge,
+        'Projected {increase:.0f}% rise in cases: plan additional clinic capacity and on-call coverage.',
+    ),
+    # Nurses
+    Rule('NURSE_RISK', 'nurses', ('consensus_risk',), _risk_guidance(NURSE_RISK_GUIDANCE), '{text}'),
+    Rule(
+        'NURSE_ELDERLY', 'nurses', ('elderly_share',),
+        _elderly,
+        'Apply fall prevention and delirium screening for elderly patients ({percent:.0f}% of patients are 65+).',
+    ),
+    Rule(
+        'NURSE_CONDITIONS', 'nurses', ('increasing_conditions',),
+        lambda conditions: ({'condition': c} for c in conditions),
+        'Monitor {condition} patients closely and reinforce self-care education.',
+    ),
+    Rule(
+        'NURSE_SURGE', 'nurses', ('forecast_increase',),
+        _surge,
+        'Prepare for a projected {increase:.0f}% increase in patient volume: review shift coverage and supplies.',
+    ),
+)
+
+# Facts that rarely repeat across samples: not worth memoizing rule outputs on
+CONTINUOUS_FACTS = (
+    'overall_score', 'clinical_risk', 'demographic_risk', 'elderly_share', 'forecast_increase', 'p_value',
+)
+
+ALERT_PLAN = RulePlan(ALERT_RULES, ALERT_CATEGORIES, CONTINUOUS_FACTS)
+RECOMMENDATION_PLAN = RulePlan(RECOMMENDATION_RULES, RECOMMENDATION_TARGETS, CONTINUOUS_FACTS)
+
+
+# --- Alerts ---
+
+def summarize_alerts(alerts):
+    """Counts and highest priority of a set of alerts."""
+    critical = len(alerts['critical_alerts'])
+    urgent = len(alerts['urgent_alerts'])
+    warning = len(alerts['warning_alerts'])
+    informational = len(alerts['informational_alerts'])
+    if critical:
+        highest = 'CRITICAL'
+    elif urgent:
+        highest = 'URGENT'
+    elif warning:
+        highest = 'WARNING'
+    else:
+        highest = 'INFORMATIONAL'
+    return {
+        'total_alerts': critical + urgent + warning + informational,
+        'critical_count': critical,
+        'urgent_count': urgent,
+        'warning_count': warning,
+        'informational_count': informational,
+        'highest_priority': highest,
+        'requires_immediate_action': bool(critical or urgent),
+    }
+
+
+def immediate_actions(alerts, risk_level):
+    """Actions of the critical alerts, plus the rapid response steps of critical risk."""
+    actions = [
+        {
+            'action': alert['action_required'],
+            'timeframe': alert['timeframe'],
+            'responsible': alert['responsible_party'],
+            'priority': 'CRITICAL'
+        }
+        for alert in alerts['critical_alerts']
+    ]
+    if risk_level == 'critical_risk':
+        actions.append({
+            'action': 'Activate rapid response team',
+            'timeframe': '< 15 minutes',
+            'responsible': 'Charge Nurse',
+            'priority': 'CRITICAL'
+        })
+        actions.append({
+            'action': 'Notify attending physician immediately',
+            'timeframe': '< 5 minutes',
+            'responsible': 'Primary Nurse',
+            'priority': 'CRITICAL'
+        })
+    return actions
+
+
+def build_alerts(alerts, risk_level):
+    """The ``generate_clinical_alerts`` structure of collected ``ALERT_PLAN`` outputs."""
+    alerts['alert_summary'] = summarize_alerts(alerts)
+    alerts['escalation_required'] = risk_level == 'critical_risk'
+    alerts['immediate_actions'] = immediate_actions(alerts, risk_level)
+    return alerts
@@ -0,0 +1,50 @@
+"""
+Response compression for large analytics payloads.
+
+``compress_response`` compresses a view's response with Brotli when the
+client accepts ``br`` and the optional ``brotli`` package is installed,
+otherwise with gzip (Django's GZipMiddleware). It wraps single views rather
+than the whole site, so small API responses are not compressed for nothing.
+"""
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.decorators import decorator_from_middleware
+from django.utils.regex_helper import _lazy_re_compile
+
+try:
+    import brotli  # Optional: better ratios than gzip for JSON
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+MIN_SIZE = 200
+BROTLI_QUALITY = 5
+
+re_accepts_brotli = _lazy_re_compile(r'\bbr\b')
+
+
+class ResultCompressionMiddleware(GZipMiddleware):
+    def process_response(self, request, response):
+        if not BROTLI_AVAILABLE or response.streaming or response.has_header('Content-Encoding'):
+            return super().process_response(request, response)
+        if not re_accepts_brotli.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            return super().process_response(request, response)
+        if len(response.content) < MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed = brotli.compress(response.content, quality=BROTLI_QUALITY)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        # The body changed, so a strong ETag no longer matches it byte for byte.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+
+compress_response = decorator_from_middleware(ResultCompressionMiddleware)
@@ -0,0 +1,114 @@
+"""
+Materialized "latest result per analysis type" snapshots for the dashboards.
+
+The doctor, nurse, real-time and full dashboards each read the latest
+completed ``AnalyticsResult`` of several analysis types. ``latest_results``
+fetches all of them in one query:
+
+- ``DISTINCT ON (analysis_type)`` on PostgreSQL;
+- a correlated "latest id for this type" subquery elsewhere.
+
+Both are backed by the (analysis_type, status, created_at) index.
+
+``rebuild_snapshots`` runs that query once for every role and publishes each
+role's sections to the shared two-tier cache (result_cache.py). It is called
+after any result completes (see signals.py). ``get_snapshot`` serves a role
+from that cache, building it on a miss.
+
+Snapshots hold the stored ``results`` unchanged; views apply their own
+role-specific shaping.
+"""
+from django.db import connection
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .models import AnalyticsResult
+from .result_cache import TwoTierCache, digest, result_version
+
+snapshot_cache = TwoTierCache('analytics:snapshot')
+
+# role -> ((section name, analysis_type), ...)
+ROLE_SECTIONS = {
+    'doctor': (
+        ('patient_demographics', 'patient_demographics'),
+        ('illness_prediction', 'illness_prediction'),
+        ('health_trends', 'patient_health_trends'),
+        ('surge_prediction', 'illness_surge_prediction'),
+        ('monthly_illness_forecast', 'monthly_illness_forecast'),
+        ('volume_prediction', 'patient_volume_prediction'),
+        ('performance_factors', 'performance_factors'),
+        ('ai_insights', 'ai_insights'),
+    ),
+    'nurse': (
+        ('medication_analysis', 'medication_analysis'),
+        ('patient_demographics', 'patient_demographics'),
+        ('health_trends', 'patient_health_trends'),
+        ('volume_prediction', 'patient_volume_prediction'),
+        ('performance_factors', 'performance_factors'),
+        ('ai_insights', 'ai_insights'),
+    ),
+    'realtime': tuple((t, t) for t in (
+        'patient_health_trends',
+        'patient_demographics',
+        'illness_prediction',
+        'medication_analysis',
+        'patient_volume_prediction',
+    )),
+    'full': (
+        ('patient_demographics', 'patient_demographics'),
+        ('illness_prediction', 'illness_prediction'),
+        ('medication_analysis', 'medication_analysis'),
+        ('health_trends', 'patient_health_trends'),
+        ('volume_prediction', 'patient_volume_prediction'),
+        ('surge_prediction', 'illness_surge_prediction'),
+        ('monthly_illness_forecast', 'monthly_illness_forecast'),
+    ),
+}
+
+
+def latest_results(analysis_types):
+    """``{analysis_type: AnalyticsResult}`` of the latest completed result of each type, in one query."""
+    analysis_types = sorted(set(analysis_types))
+    completed = AnalyticsResult.objects.filter(status='completed', analysis_type__in=analysis_types)
+    if connection.vendor == 'postgresql':
+        rows = completed.order_by('analysis_type', '-created_at', '-id').distinct('analysis_type')
+    else:
+        latest_id = (AnalyticsResult.objects
+                     .filter(status='completed', analysis_type=OuterRef('analysis_type'))
+                     .order_by('-created_at', '-id')
+                     .values('id')[:1])
+        rows = completed.filter(id=Subquery(latest_id)).order_by()
+    return {row.analysis_type: row for row in rows.only('id', 'analysis_type', 'results', 'updated_at')}
+
+
+def _shape(role, latest, built_at):
+    """``(version, snapshot)`` of ``role``; the version changes with any of its results."""
+    sections = {}
+    updated = {}
+    versions = []
+    for name, analysis_type in ROLE_SECTIONS[role]:
+        result = latest.get(analysis_type)
+        sections[name] = result.results if result else None
+        updated[name] = result.updated_at.isoformat() if result else None
+        versions.append(result_version(result))
+    return digest(role, *versions), {'sections': sections, 'updated': updated, 'built_at': built_at}
+
+
+def build_snapshots(roles=None):
+    roles = list(roles or ROLE_SECTIONS)
+    latest = latest_results(t for role in roles for _, t in ROLE_SECTIONS[role])
+    built_at = timezone.now().isoformat()
+    return {role: _shape(role, latest, built_at) for role in roles}
+
+
+def rebuild_snapshots():
+    """Rebuild every role's snapshot with one query and push them to the shared cache."""
+    snapshots = build_snapshots()
+    for role, (version, snapshot) in snapshots.items():
+        snapshot_cache.publish(role, version, snapshot)
+    return {role: snapshot for role, (_, snapshot) in snapshots.items()}
+
+
+def get_snapshot(role):
+    """A role's snapshot from the two-tier cache (one query to build it on a miss)."""
+    return snapshot_cache.get(role, lambda: build_snapshots([role])[role])
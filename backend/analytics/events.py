@@ -0,0 +1,186 @@
+"""
+Change notifications for completed analytics results.
+
+When an ``AnalyticsResult`` is saved as completed, ``publish_result_event``
+publishes a small JSON message (``type``, ``id``, ``updated_at``) to the
+Redis channel ``ANALYTICS_EVENTS_CHANNEL`` after the transaction commits.
+
+``/api/analytics/stream/`` relays these messages as Server-Sent Events. Each
+ASGI process has one ``AnalyticsEventHub`` per event loop, holding a single
+Redis subscription that fans out to one bounded queue per connected
+dashboard. An idle connection therefore costs a queue and a suspended
+coroutine, not a worker thread or a Redis connection. The subscription is
+dropped when the last dashboard disconnects.
+
+Event IDs are ``<updated_at in µs>-<pk>``. A client reconnecting with
+``Last-Event-ID`` first gets the results completed since then from the
+database, then live events.
+"""
+import asyncio
+import json
+import logging
+import weakref
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHANNEL = 'medisync:analytics:results'
+SUBSCRIBER_QUEUE_SIZE = 100
+RECONNECT_DELAY = (1, 2, 5, 10, 30)
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+_publisher = None
+
+
+def channel_name():
+    return getattr(settings, 'ANALYTICS_EVENTS_CHANNEL', DEFAULT_CHANNEL)
+
+
+def redis_url():
+    return getattr(settings, 'ANALYTICS_EVENTS_REDIS_URL', 'redis://localhost:6379/0')
+
+
+def result_event(result):
+    """The lightweight payload announced for a completed result."""
+    return {
+        'type': result.analysis_type,
+        'id': result.pk,
+        'updated_at': result.updated_at.isoformat(),
+    }
+
+
+def event_id(updated_at, pk):
+    return f'{(updated_at - _EPOCH) // _MICROSECOND}-{pk}'
+
+
+def parse_event_id(value):
+    """``(updated_at, pk)`` from an event ID, or None when it is not one of ours."""
+    try:
+        micros, pk = str(value).split('-', 1)
+        return _EPOCH + timedelta(microseconds=int(micros)), int(pk)
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+def format_sse(data, event=None, id=None):
+    lines = []
+    if id is not None:
+        lines.append(f'id: {id}')
+    if event:
+        lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, separators=(",", ":"))}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def _get_publisher():
+    global _publisher
+    if _publisher is None:
+        import redis
+        _publisher = redis.Redis.from_url(redis_url(), socket_connect_timeout=0.5, socket_timeout=0.5)
+    return _publisher
+
+
+def _publish(payload):
+    try:
+        _get_publisher().publish(channel_name(), json.dumps(payload, separators=(',', ':')))
+    except Exception as e:
+        # Dashboards resync from the database on reconnect; a lost event is not fatal.
+        logger.warning(f"Could not publish analytics event {payload.get('id')}: {e}")
+
+
+def publish_result_event(result):
+    """Announce a completed result once the surrounding transaction commits."""
+    payload = result_event(result)
+    transaction.on_commit(lambda: _publish(payload))
+
+
+class AnalyticsEventHub:
+    """One Redis subscription shared by every stream connected to this event loop."""
+
+    def __init__(self):
+        self._subscribers = set()
+        self._listener = None
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.add(queue)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+        if not self._subscribers and self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def dispatch(self, raw):
+        try:
+            payload = json.loads(raw)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring malformed analytics event: {raw!r}")
+            return
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # A consumer this far behind is dropped; it resumes with Last-Event-ID.
+                self._subscribers.discard(queue)
+                _close(queue)
+
+    async def _listen(self):
+        import redis.asyncio as aioredis
+
+        attempt = 0
+        while True:
+            client = aioredis.Redis.from_url(redis_url())
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(channel_name())
+                attempt = 0
+                async for message in pubsub.listen():
+                    if message.get('type') == 'message':
+                        self.dispatch(message['data'])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                delay = RECONNECT_DELAY[min(attempt, len(RECONNECT_DELAY) - 1)]
+                attempt += 1
+                logger.warning(f"Analytics event subscription lost ({e}); retrying in {delay}s")
+                await asyncio.sleep(delay)
+            finally:
+                try:
+                    await pubsub.aclose()
+                    await client.aclose()
+                except Exception:
+                    pass
+
+
+def _close(queue):
+    """Tell a dropped subscriber to end its stream."""
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            break
+    queue.put_nowait(None)
+
+
+_hubs = weakref.WeakKeyDictionary()
+
+
+def get_hub():
+    """The hub of the running event loop."""
+    loop = asyncio.get_running_loop()
+    hub = _hubs.get(loop)
+    if hub is None:
+        hub = _hubs[loop] = AnalyticsEventHub()
+    return hub
@@ -0,0 +1,507 @@
+"""
+Load-testing harness for the doctor, nurse and patient API flows.
+
+Load is generated outside the web workers (``manage.py load_test``), so the
+server being measured isn't also generating it. Each role has a
+``Scenario``:
+
+- an ordered list of HTTP steps: the frontends' GETs, plus the patient
+  ``join_queue`` POST;
+- WebSocket subscriptions, held open for the whole run as the frontends do.
+
+Virtual users log in once. They are started linearly over the ramp-up
+period, then loop over their scenario with randomised think time until the
+run ends.
+
+Latencies go into HDR-style histograms (``LatencyHistogram``) and are
+reported as nearest-rank p50/p95/p99. Reports are plain JSON with sorted
+keys, saved under ``LOAD_TEST_REPORT_DIR``. ``diff_reports`` compares two of
+them (``load_test --compare``), and ``/api/analytics/stress-test/`` serves
+the latest one to the admin dashboard.
+
+aiohttp is only needed by the machine generating the load, not by the
+server.
+"""
+import asyncio
+import glob
+import json
+import math
+import os
+import random
+import time
+from collections import Counter, defaultdict
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+try:
+    import aiohttp  # Optional: async HTTP/WebSocket client for load generation
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+REPORT_FORMAT = 1
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyHistogram:
+    """
+    Latencies in microseconds, bucketed like HdrHistogram. Values below
+    ``2 ** SUB_BUCKET_BITS`` are exact. Larger values keep their top
+    ``SUB_BUCKET_BITS`` bits, so a recorded value is within 1/128 (< 0.8%)
+    of the true one. Memory depends on the range of values, not on how many
+    are recorded.
+    """
+    SUB_BUCKET_BITS = 8
+
+    def __init__(self):
+        self.counts = Counter()
+        self.total = 0
+        self.sum_us = 0
+        self.min_us = None
+        self.max_us = 0
+
+    @classmethod
+    def _index(cls, value):
+        shift = max(0, value.bit_length() - cls.SUB_BUCKET_BITS)
+        return (shift << (cls.SUB_BUCKET_BITS - 1)) + (value >> shift)
+
+    @classmethod
+    def _highest_equivalent(cls, index):
+        shift = max(0, (index >> (cls.SUB_BUCKET_BITS - 1)) - 1)
+        mantissa = index - (shift << (cls.SUB_BUCKET_BITS - 1))
+        return ((mantissa + 1) << shift) - 1
+
+    def record(self, latency_ms):
+        value = max(0, int(round(latency_ms * 1000)))
+        self.counts[self._index(value)] += 1
+        self.total += 1
+        self.sum_us += value
+        self.min_us = value if self.min_us is None else min(self.min_us, value)
+        self.max_us = max(self.max_us, value)
+
+    def merge(self, other):
+        self.counts.update(other.counts)
+        self.total += other.total
+        self.sum_us += other.sum_us
+        if other.min_us is not None:
+            self.min_us = other.min_us if self.min_us is None else min(self.min_us, other.min_us)
+        self.max_us = max(self.max_us, other.max_us)
+        return self
+
+    def to_dict(self):
+        """JSON-serializable form (bucket counts keyed by bucket index), for storing sketches."""
+        return {'counts': {str(index): count for index, count in self.counts.items()},
+                'total': self.total, 'sum_us': self.sum_us, 'min_us': self.min_us, 'max_us': self.max_us}
+
+    @classmethod
+    def from_dict(cls, data):
+        histogram = cls()
+        if data:
+            histogram.counts.update({int(index): count for index, count in data.get('counts', {}).items()})
+            histogram.total = data.get('total', 0)
+            histogram.sum_us = data.get('sum_us', 0)
+            histogram.min_us = data.get('min_us')
+            histogram.max_us = data.get('max_us', 0)
+        return histogram
+
+    def percentile(self, pct):
+        """Nearest-rank percentile in milliseconds (None when empty)."""
+        if not self.total:
+            return None
+        rank = max(1, math.ceil(pct / 100.0 * self.total))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._highest_equivalent(index), self.max_us) / 1000.0
+        return self.max_us / 1000.0
+
+    def summary(self, prefix=''):
+        if not self.total:
+            return {f'{prefix}avg_latency_ms': None, f'{prefix}max_latency_ms': None,
+                    **{f'{prefix}p{p}_latency_ms': None for p in PERCENTILES}}
+        return {
+            f'{prefix}avg_latency_ms': round(self.sum_us / self.total / 1000.0, 2),
+            **{f'{prefix}p{p}_latency_ms': round(self.percentile(p), 2) for p in PERCENTILES},
+            f'{prefix}max_latency_ms': round(self.max_us / 1000.0, 2),
+        }
+
+
+class Step(NamedTuple):
+    name: str
+    method: str
+    path: str
+    body: Optional[dict] = None
+
+
+class Subscription(NamedTuple):
+    name: str
+    path: str  # may reference {user_id}
+
+
+class Scenario(NamedTuple):
+    role: str
+    steps: tuple
+    subscriptions: tuple = ()
+
+
+# join_queue is idempotent per patient: after the first POST of a run it takes
+# the "Already in queue" branch, which is the common case in production too.
+SCENARIOS = {
+    'doctor': Scenario('doctor', steps=(
+        Step('dashboard_stats', 'GET', '/api/operations/dashboard/stats/'),
+        Step('appointments', 'GET', '/api/operations/appointments/'),
+        Step('queue_patients', 'GET', '/api/operations/queue/patients/'),
+        Step('notifications', 'GET', '/api/operations/notifications/'),
+        Step('doctor_assignments', 'GET', '/api/operations/doctor/assignments/'),
+        Step('doctor_patients', 'GET', '/api/users/doctor/patients/'),
+    ), subscriptions=(
+        Subscription('queue_updates', '/ws/queue/OPD/{user_id}/'),
+    )),
+    'nurse': Scenario('nurse', steps=(
+        Step('nurse_queue_patients', 'GET', '/api/operations/nurse/queue/patients/'),
+        Step('available_doctors', 'GET', '/api/operations/available-doctors/'),
+        Step('medicine_inventory', 'GET', '/api/operations/medicine-inventory/'),
+        Step('queue_status', 'GET', '/api/operations/queue/status/?department=OPD'),
+        Step('messaging_notifications', 'GET', '/api/operations/messaging/notifications/'),
+        Step('nurse_patients', 'GET', '/api/users/nurse/patients/'),
+    ), subscriptions=(
+        Subscription('queue_updates', '/ws/queue/OPD/{user_id}/'),
+    )),
+    'patient': Scenario('patient', steps=(
+        Step('patient_dashboard', 'GET', '/api/operations/patient/dashboard/summary/'),
+        Step('patient_appointments', 'GET', '/api/operations/patient/appointments/'),
+        Step('queue_availability', 'GET', '/api/operations/queue/availability/'),
+        Step('queue_status', 'GET', '/api/operations/queue/status/?department=OPD'),
+        Step('join_queue', 'POST', '/api/operations/queue/join/', {'department': 'OPD'}),
+    ), subscriptions=(
+        Subscription('queue_updates', '/ws/queue/OPD/{user_id}/'),
+    )),
+}
+
+
+class _EndpointRecorder:
+    def __init__(self, step):
+        self.step = step
+        self.histogram = LatencyHistogram()
+        self.statuses = Counter()
+        self.errors = Counter()
+
+    def report(self, elapsed):
+        success = sum(n for code, n in self.statuses.items() if code.isdigit() and 200 <= int(code) < 300)
+        requests = sum(self.statuses.values())
+        return {
+            'method': self.step.method,
+            'path': self.step.path,
+            'requests': requests,
+            'success_count': success,
+            'error_count': requests - success,
+            'status_distribution': dict(self.statuses),
+            'errors': dict(self.errors),
+            'throughput_rps': round(requests / elapsed, 2) if elapsed else None,
+            **self.histogram.summary(),
+        }
+
+
+class _SubscriptionRecorder:
+    def __init__(self, subscription):
+        self.subscription = subscription
+        self.connect = LatencyHistogram()
+        self.first_message = LatencyHistogram()
+        self.connections = 0
+        self.messages = 0
+        self.closed_early = 0
+        self.errors = Counter()
+
+    def report(self):
+        return {
+            'path': self.subscription.path,
+            'connections': self.connections,
+            'messages': self.messages,
+            'closed_early': self.closed_early,
+            'errors': dict(self.errors),
+            **self.connect.summary('connect_'),
+            **self.first_message.summary('first_message_'),
+        }
+
+
+def _error_name(exc):
+    return type(exc).__name__
+
+
+class LoadTest:
+    """
+    One load-test run.
+
+    ``accounts`` maps a role to a list of ``{'email', 'password'}`` (logged in
+    through ``/api/users/login/``) or ``{'access', 'user_id'}`` entries; virtual
+    users take them round-robin. ``users`` maps a role to its number of
+    virtual users. WebSocket handshakes send ``origin`` (default: the base
+    URL), which the server's ``AllowedHostsOriginValidator`` requires.
+    """
+
+    def __init__(self, base_url, accounts, users, duration=60.0, ramp_up=10.0, think_time=1.0,
+                 timeout=10.0, seed=None, scenarios=None, label='', origin=None):
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError('aiohttp is required to generate load (pip install aiohttp).')
+        self.base_url = base_url.rstrip('/')
+        self.ws_base_url = 'ws' + self.base_url[len('http'):] if self.base_url.startswith('http') else self.base_url
+        self.origin = (origin or self.base_url).rstrip('/')
+        self.scenarios = scenarios or SCENARIOS
+        self.accounts = accounts
+        self.users = {role: count for role, count in users.items() if count > 0}
+        unknown = set(self.users) - set(self.scenarios)
+        if unknown:
+            raise ValueError(f"No scenario for role(s): {', '.join(sorted(unknown))}")
+        missing = [role for role in self.users if not accounts.get(role)]
+        if missing:
+            raise ValueError(f"No accounts for role(s): {', '.join(sorted(missing))}")
+        self.duration = duration
+        self.ramp_up = ramp_up
+        self.think_time = think_time
+        self.timeout = timeout
+        self.seed = seed
+        self.label = label
+        self._random = random.Random(seed)
+        self._endpoints = {}
+        self._subscriptions = {}
+        self._logins = defaultdict(Counter)
+
+    def run(self):
+        return asyncio.run(self._run())
+
+    async def _run(self):
+        started_at = timezone.now()
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        self._deadline = loop.time() + self.ramp_up + self.duration
+        total = sum(self.users.values())
+        connector = aiohttp.TCPConnector(limit=0)
+        client_timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=client_timeout) as session:
+            # Interleave roles so each one ramps up over the whole period.
+            order = sorted((i / count, role, i) for role, count in self.users.items() for i in range(count))
+            await asyncio.gather(*(
+                self._virtual_user(session, role, i, self.ramp_up * position / total)
+                for position, (_, role, i) in enumerate(order)
+            ))
+        elapsed = time.perf_counter() - start
+        return self._report(started_at, timezone.now(), elapsed)
+
+    def _think(self):
+        return self._random.uniform(0.5, 1.5) * self.think_time if self.think_time > 0 else 0
+
+    async def _virtual_user(self, session, role, number, delay):
+        await asyncio.sleep(delay)
+        accounts = self.accounts[role]
+        auth = await self._authenticate(session, role, accounts[number % len(accounts)])
+        if auth is None:
+            return
+        access, user_id = auth
+        headers = {'Authorization': f'Bearer {access}'}
+        scenario = self.scenarios[role]
+        loop = asyncio.get_running_loop()
+        listeners = [asyncio.create_task(self._subscribe(session, role, sub, user_id))
+                     for sub in scenario.subscriptions]
+        try:
+            while loop.time() < self._deadline:
+                for step in scenario.steps:
+                    if loop.time() >= self._deadline:
+                        break
+                    await self._request(session, role, step, headers)
+                    await asyncio.sleep(min(self._think(), max(0.0, self._deadline - loop.time())))
+        finally:
+            for listener in listeners:
+                listener.cancel()
+            await asyncio.gather(*listeners, return_exceptions=True)
+
+    async def _authenticate(self, session, role, account):
+        if account.get('access'):
+            self._logins[role]['ok'] += 1
+            return account['access'], account.get('user_id', '')
+        try:
+            async with session.post(f'{self.base_url}/api/users/login/',
+                                    json={'email': account['email'], 'password': account['password']}) as resp:
+                payload = await resp.json(content_type=None)
+        except Exception as e:
+            self._logins[role][_error_name(e)] += 1
+            return None
+        access = payload.get('access') if isinstance(payload, dict) else None
+        if resp.status != 200 or not access:
+            reason = '2fa_required' if isinstance(payload, dict) and payload.get('requires_2fa') else str(resp.status)
+            self._logins[role][reason] += 1
+            return None
+        self._logins[role]['ok'] += 1
+        return access, (payload.get('user') or {}).get('id', '')
+
+    def _endpoint(self, role, step):
+        key = (role, step.name)
+        if key not in self._endpoints:
+            self._endpoints[key] = _EndpointRecorder(step)
+        return self._endpoints[key]
+
+    async def _request(self, session, role, step, headers):
+        recorder = self._endpoint(role, step)
+        start = time.perf_counter()
+        try:
+            async with session.request(step.method, self.base_url + step.path, headers=headers,
+                                       json=step.body) as resp:
+                await resp.read()
+                recorder.statuses[str(resp.status)] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            recorder.statuses['none'] += 1
+            recorder.errors[_error_name(e)] += 1
+        recorder.histogram.record((time.perf_counter() - start) * 1000.0)
+
+    async def _subscribe(self, session, role, subscription, user_id):
+        key = (role, subscription.name)
+        recorder = self._subscriptions.get(key)
+        if recorder is None:
+            recorder = self._subscriptions[key] = _SubscriptionRecorder(subscription)
+        url = self.ws_base_url + subscription.path.format(user_id=user_id or 'anonymous')
+        start = time.perf_counter()
+        try:
+            async with session.ws_connect(url, origin=self.origin, receive_timeout=None) as ws:
+                recorder.connections += 1
+                recorder.connect.record((time.perf_counter() - start) * 1000.0)
+                received = False
+                async for message in ws:
+                    if message.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                        if not received:
+                            recorder.first_message.record((time.perf_counter() - start) * 1000.0)
+                            received = True
+                        recorder.messages += 1
+                    elif message.type == aiohttp.WSMsgType.ERROR:
+                        recorder.errors['ws_error'] += 1
+                        break
+                # The server closed the socket before the run ended.
+                recorder.closed_early += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            recorder.errors[_error_name(e)] += 1
+
+    def _report(self, started_at, finished_at, elapsed):
+        groups = {}
+        for role in self.users:
+            group_histogram = LatencyHistogram()
+            endpoints = {}
+            total = success = 0
+            for step in self.scenarios[role].steps:
+                recorder = self._endpoints.get((role, step.name))
+                if recorder is None:
+                    continue
+                endpoints[step.name] = recorder.report(elapsed)
+                group_histogram.merge(recorder.histogram)
+                total += endpoints[step.name]['requests']
+                success += endpoints[step.name]['success_count']
+            websockets = {
+                sub.name: self._subscriptions[(role, sub.name)].report()
+                for sub in self.scenarios[role].subscriptions if (role, sub.name) in self._subscriptions
+            }
+            groups[role] = {
+                'virtual_users': self.users[role],
+                'logins': dict(self._logins[role]),
+                'endpoints': endpoints,
+                'websockets': websockets,
+                'summary': {
+                    'total_requests': total,
+                    'success_rate': round(success / total * 100.0, 2) if total else 0.0,
+                    'throughput_rps': round(total / elapsed, 2) if elapsed else None,
+                    **group_histogram.summary(),
+                },
+            }
+        return {
+            'format': REPORT_FORMAT,
+            'label': self.label,
+            'base_url': self.base_url,
+            'started_at': started_at.isoformat(),
+            'finished_at': finished_at.isoformat(),
+            'duration_ms': int(elapsed * 1000),
+            'params': {
+                'users': self.users,
+                'duration': self.duration,
+                'ramp_up': self.ramp_up,
+                'think_time': self.think_time,
+                'timeout': self.timeout,
+                'seed': self.seed,
+            },
+            'groups': groups,
+        }
+
+
+def report_dir():
+    return str(getattr(settings, 'LOAD_TEST_REPORT_DIR', os.path.join(settings.BASE_DIR, 'load_test_reports')))
+
+
+def save_report(report, path=None):
+    """Write ``report`` as sorted, indented JSON; returns the path."""
+    if path is None:
+        directory = report_dir()
+        os.makedirs(directory, exist_ok=True)
+        stamp = timezone.now().strftime('%Y%m%dT%H%M%S')
+        label = ''.join(c if c.isalnum() or c in '-_.' else '-' for c in report.get('label') or '')
+        path = os.path.join(directory, f"loadtest-{stamp}{'-' + label if label else ''}.json")
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump(report, fh, indent=2, sort_keys=True)
+        fh.write('\n')
+    return path
+
+
+def load_report(path):
+    with open(path, encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+def latest_report():
+    """The most recent report in the report directory, or None."""
+    paths = glob.glob(os.path.join(report_dir(), 'loadtest-*.json'))
+    if not paths:
+        return None
+    return load_report(max(paths, key=os.path.getmtime))
+
+
+DIFF_METRICS = ('p50_latency_ms', 'p95_latency_ms', 'p99_latency_ms', 'success_rate')
+
+
+def diff_reports(before, after):
+    """
+    Per-endpoint comparison of two reports. Returns rows of
+    ``{'group', 'endpoint', 'metric', 'before', 'after', 'change_pct'}`` for
+    every endpoint present in both; ``change_pct`` is positive when the value
+    went up. Group summaries are compared under the endpoint name ``*``.
+    """
+    rows = []
+    for group, after_group in sorted(after.get('groups', {}).items()):
+        before_group = before.get('groups', {}).get(group)
+        if not before_group:
+            continue
+        pairs = [('*', before_group.get('summary', {}), after_group.get('summary', {}))]
+        for name, metrics in sorted(after_group.get('endpoints', {}).items()):
+            if name in before_group.get('endpoints', {}):
+                pairs.append((name, before_group['endpoints'][name], metrics))
+        for name, old, new in pairs:
+            for metric in DIFF_METRICS:
+                if metric == 'success_rate':
+                    old_value = _success_rate(old)
+                    new_value = _success_rate(new)
+                else:
+                    old_value, new_value = old.get(metric), new.get(metric)
+                if old_value is None or new_value is None:
+                    continue
+                change = round((new_value - old_value) / old_value * 100.0, 1) if old_value else None
+                rows.append({'group': group, 'endpoint': name, 'metric': metric,
+                             'before': old_value, 'after': new_value, 'change_pct': change})
+    return rows
+
+
+def _success_rate(metrics):
+    if 'success_rate' in metrics:
+        return metrics['success_rate']
+    if metrics.get('requests'):
+        return round(metrics['success_count'] / metrics['requests'] * 100.0, 2)
+    return None
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.analytics.retention import DEFAULT_POLICIES, apply_retention, retention_report
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete rows older than their table's retention period (DATA_RETENTION) in throttled, "
+        "keyset-ordered batches. Use --dry-run to report what would be deleted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only report expired rows per table')
+        parser.add_argument(
+            '--table', action='append', choices=list(DEFAULT_POLICIES), metavar='APP.MODEL',
+            help=f"Limit to these tables (repeatable): {', '.join(DEFAULT_POLICIES)}",
+        )
+        parser.add_argument(
+            '--max-seconds', type=float,
+            help='Stop after this many seconds (default: DATA_RETENTION_MAX_SECONDS; 0 = no limit)',
+        )
+
+    def handle(self, *args, **options):
+        tables = options['table']
+        if options['dry_run']:
+            self.stdout.write(
+                f"{'table':<28} {'keep':>6} {'cutoff':<20} {'expired':>10} {'batches':>8} oldest"
+            )
+            for row in retention_report(tables):
+                keep = f"{row['days']}d" if row['days'] is not None else 'all'
+                self.stdout.write(
+                    f"{row['table']:<28} {keep:>6} {(row['cutoff'] or '-')[:19]:<20} "
+                    f"{row['expired']:>10} {row['batches']:>8} {(row['oldest'] or '-')[:19]}"
+                )
+            return
+
+        try:
+            deleted = apply_retention(tables, max_seconds=options['max_seconds'])
+        except LookupError as e:
+            raise CommandError(str(e))
+        for label, count in deleted.items():
+            self.stdout.write(f'{label}: {count} rows deleted')
+        skipped = [label for label in (tables or DEFAULT_POLICIES) if label not in deleted]
+        if skipped:
+            self.stdout.write(self.style.WARNING(f"Time budget reached before: {', '.join(skipped)}"))
+        self.stdout.write(self.style.SUCCESS('Retention completed'))
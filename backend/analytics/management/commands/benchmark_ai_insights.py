@@ -0,0 +1,60 @@
+import tempfile
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.analytics.ai_features import extract_features
+from backend.analytics.ai_insights_model import MediSyncAIInsights, generate_synthetic_data
+
+
+class Command(BaseCommand):
+    help = (
+        'Micro-benchmark MediSyncAIInsights feature extraction and risk scoring on synthetic samples: '
+        'one sample at a time (extract, vstack, score each) versus one batch (extract_features, predict_many).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=10000, help='Samples extracted and scored per mode')
+        parser.add_argument('--train-samples', type=int, default=1000, help='Synthetic samples the models are trained on')
+        parser.add_argument('--seed', type=int, default=42, help='Seed of the synthetic samples')
+        parser.add_argument(
+            '--single-limit', type=int, default=500,
+            help='Score at most this many samples one at a time and extrapolate (per-sample calls are slow)',
+        )
+
+    def _timed(self, func):
+        start = time.perf_counter()
+        result = func()
+        return result, time.perf_counter() - start
+
+    def handle(self, *args, **options):
+        n = max(1, options['samples'])
+        samples = generate_synthetic_data(num_samples=n, seed=options['seed'])
+
+        with tempfile.TemporaryDirectory() as model_dir:
+            model = MediSyncAIInsights(model_dir=model_dir)
+            model.train_models(generate_synthetic_data(
+                num_samples=max(10, options['train_samples']), seed=options['seed'] + 1
+            ))
+
+            single_X, single_extract = self._timed(lambda: np.vstack([extract_features([s]) for s in samples]))
+            batch_X, batch_extract = self._timed(lambda: extract_features(samples))
+            if not np.array_equal(single_X, batch_X):
+                raise CommandError('Batched feature matrix differs from the per-sample rows')
+
+            scored = samples[:max(1, min(n, options['single_limit']))]
+            single, single_score = self._timed(lambda: [model.predict_many([s])[0] for s in scored])
+            single_score *= n / len(scored)
+            batch, batch_score = self._timed(lambda: model.predict_many(samples))
+            if single != batch[:len(scored)]:
+                raise CommandError('Batched risk assessments differ from the per-sample ones')
+
+        self.stdout.write(f"{'stage':<10} {'single/s':>12} {'batch/s':>12} {'speedup':>9}")
+        for stage, before, after in (('extract', single_extract, batch_extract), ('score', single_score, batch_score)):
+            self.stdout.write(
+                f"{stage:<10} {n / before:>12.0f} {n / after:>12.0f} {before / after:>8.1f}x"
+            )
+        if len(scored) < n:
+            self.stdout.write(f"Single-sample scoring timed on {len(scored)} samples and extrapolated to {n}.")
+        self.stdout.write(self.style.SUCCESS('Single-process run: figures are samples per second.'))
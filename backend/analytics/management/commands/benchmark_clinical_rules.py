@@ -0,0 +1,92 @@
+import gc
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.analytics.ai_features import RISK_LEVELS
+from backend.analytics.ai_insights_model import MediSyncAIInsights
+from backend.analytics.clinical_rules import ALERT_PLAN, RECOMMENDATION_PLAN, alert_facts, recommendation_facts
+from backend.analytics.synthetic_data import synthetic_features, synthetic_samples
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the compiled clinical alert and recommendation rule plans on a synthetic cohort: '
+        'every rule rendered per sample, memoized renders, one-off collection per request, incremental '
+        'evaluation against the previous sample, and a refresh of every sample after a new surge forecast.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=100000, help='Cohort size (hospitals or time windows)')
+        parser.add_argument('--seed', type=int, default=42, help='Seed of the synthetic cohort')
+
+    def _timed(self, func):
+        # Results of the previous mode are still alive: collect them now, not mid-run
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        return result, time.perf_counter() - start
+
+    def _risk_assessments(self, samples, labels):
+        model = MediSyncAIInsights(model_dir=None)
+        assessments = []
+        for data, label in zip(samples, labels.tolist()):
+            risk_level = RISK_LEVELS[label]
+            assessments.append({
+                'overall_risk_level': risk_level,
+                'risk_scores': model._calculate_risk_scores(data),
+                'clinical_indicators': model._assess_clinical_indicators(data, risk_level),
+                'intervention_urgency': model._determine_intervention_urgency(risk_level),
+            })
+        return assessments
+
+    def _with_new_forecast(self, data):
+        """``data`` with 10% more cases forecast for the second month."""
+        forecasts = [dict(month) for month in data['surge_prediction']['forecasted_monthly_cases']]
+        if len(forecasts) >= 2:
+            forecasts[1]['total_cases'] += forecasts[0]['total_cases'] // 10
+        return {**data, 'surge_prediction': {**data['surge_prediction'], 'forecasted_monthly_cases': forecasts}}
+
+    def handle(self, *args, **options):
+        n = max(1, options['samples'])
+        samples = synthetic_samples(n, seed=options['seed'])
+        _, labels = synthetic_features(n, seed=options['seed'])
+        assessments = self._risk_assessments(samples, labels)
+
+        self.stdout.write(f"{'plan':<16} {'mode':<12} {'samples/s':>11} {'rules/sample':>13}")
+        for name, plan, facts_of in (
+            ('alerts', ALERT_PLAN, alert_facts),
+            ('recommendations', RECOMMENDATION_PLAN, lambda d, a: recommendation_facts(d, a['overall_risk_level'])),
+        ):
+            facts_list, elapsed = self._timed(lambda: [facts_of(d, a) for d, a in zip(samples, assessments)])
+            self.stdout.write(f"{name:<16} {'facts':<12} {n / elapsed:>11.0f}")
+
+            plan.clear_memo()
+            full, full_time = self._timed(lambda: [plan.evaluate(f, memo=False) for f in facts_list])
+            memoized, memo_time = self._timed(lambda: [plan.evaluate(f) for f in facts_list])
+            collected, collect_time = self._timed(lambda: [plan.collect(f) for f in facts_list])
+            incremental, incremental_time = self._timed(lambda: plan.evaluate_many(facts_list))
+            # A new surge forecast for every member: only the rules reading it run again
+            updated = [facts_of(self._with_new_forecast(d), a) for d, a in zip(samples, assessments)]
+            refreshed, refresh_time = self._timed(
+                lambda: [plan.evaluate(f, before) for f, before in zip(updated, memoized)]
+            )
+            if not [r.outputs for r in full] == [r.outputs for r in memoized] == [r.outputs for r in incremental]:
+                raise CommandError(f'{name}: memoized or incremental outputs differ from a full evaluation')
+            if collected != [r.collect() for r in full]:
+                raise CommandError(f'{name}: collected outputs differ from a full evaluation')
+            if [r.outputs for r in refreshed] != [plan.evaluate(f, memo=False).outputs for f in updated]:
+                raise CommandError(f'{name}: refreshed outputs differ from a full evaluation')
+
+            for mode, results, elapsed in (
+                ('full', full, full_time),
+                ('memoized', memoized, memo_time),
+                ('collect', full, collect_time),
+                ('incremental', incremental, incremental_time),
+                ('refresh', refreshed, refresh_time),
+            ):
+                evaluated = sum(r.evaluated for r in results)
+                self.stdout.write(f"{name:<16} {mode:<12} {n / elapsed:>11.0f} {evaluated / n:>13.1f}")
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(ALERT_PLAN.rules)} alert and {len(RECOMMENDATION_PLAN.rules)} recommendation rules on {n} samples.'
+        ))
@@ -0,0 +1,154 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.analytics.load_testing import (
+    AIOHTTP_AVAILABLE,
+    SCENARIOS,
+    LoadTest,
+    diff_reports,
+    load_report,
+    save_report,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the doctor/nurse/patient load-test scenarios (HTTP steps, the join_queue POST and queue "
+        "WebSocket subscriptions) against a running server with async virtual users, and write a JSON "
+        "report with p50/p95/p99 latencies. Run it from a separate machine or process, not the web tier. "
+        "Use --compare to diff the new report against a previous release, or --diff to compare two "
+        "existing reports without generating load."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server under test')
+        parser.add_argument('--origin', help='Origin header of WebSocket handshakes (default: --base-url)')
+        parser.add_argument(
+            '--accounts',
+            help='JSON file mapping role to a list of {"email", "password"} or {"access", "user_id"} entries',
+        )
+        parser.add_argument(
+            '--token', action='append', default=[], metavar='ROLE=ACCESS[:USER_ID]',
+            help='Use an existing access token for a role (repeatable)',
+        )
+        for role, default in (('doctor', 5), ('nurse', 5), ('patient', 20)):
+            parser.add_argument(f'--{role}s', type=int, default=default, help=f'Virtual {role}s (default: {default})')
+        parser.add_argument('--duration', type=float, default=60.0, help='Seconds at full load after ramp-up')
+        parser.add_argument('--ramp-up', type=float, default=10.0, help='Seconds over which users are started')
+        parser.add_argument('--think-time', type=float, default=1.0, help='Mean pause between steps (seconds)')
+        parser.add_argument('--timeout', type=float, default=10.0, help='Per-request timeout (seconds)')
+        parser.add_argument('--seed', type=int, help='Seed for think-time jitter')
+        parser.add_argument('--label', default='', help='Release or build label stored in the report')
+        parser.add_argument('--output', help='Report path (default: LOAD_TEST_REPORT_DIR/loadtest-<time>.json)')
+        parser.add_argument('--compare', metavar='REPORT', help='Diff the new report against this one')
+        parser.add_argument('--diff', nargs=2, metavar=('BEFORE', 'AFTER'), help='Only diff two reports')
+        parser.add_argument(
+            '--fail-on-regression', type=float, metavar='PCT',
+            help='Exit with an error when any p95 grew by more than PCT percent',
+        )
+
+    def handle(self, *args, **options):
+        if options['diff']:
+            before, after = (self._load(path) for path in options['diff'])
+            self._print_diff(before, after, options['fail_on_regression'])
+            return
+
+        if not AIOHTTP_AVAILABLE:
+            raise CommandError('aiohttp is required to generate load: pip install aiohttp')
+
+        baseline = self._load(options['compare']) if options['compare'] else None
+        users = {role: options[f'{role}s'] for role in SCENARIOS}
+        accounts = self._accounts(options)
+        try:
+            test = LoadTest(
+                options['base_url'], accounts, users,
+                duration=options['duration'], ramp_up=options['ramp_up'], think_time=options['think_time'],
+                timeout=options['timeout'], seed=options['seed'], label=options['label'],
+                origin=options['origin'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f"Load test against {options['base_url']}: "
+            + ', '.join(f'{n} {role}(s)' for role, n in test.users.items())
+            + f"; ramp-up {options['ramp_up']}s, duration {options['duration']}s"
+        )
+        report = test.run()
+        path = save_report(report, options['output'])
+        self._print_report(report)
+        self.stdout.write(self.style.SUCCESS(f'Report written to {path}'))
+
+        if baseline is not None:
+            self._print_diff(baseline, report, options['fail_on_regression'])
+
+    def _load(self, path):
+        try:
+            return load_report(path)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read report {path}: {e}')
+
+    def _accounts(self, options):
+        accounts = {}
+        if options['accounts']:
+            try:
+                with open(options['accounts'], encoding='utf-8') as fh:
+                    accounts = json.load(fh)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read accounts file {options['accounts']}: {e}")
+        for spec in options['token']:
+            role, sep, value = spec.partition('=')
+            if not sep or not value:
+                raise CommandError(f'Invalid --token {spec!r}; expected ROLE=ACCESS[:USER_ID]')
+            access, _, user_id = value.partition(':')
+            accounts.setdefault(role, []).append({'access': access, 'user_id': user_id})
+        return accounts
+
+    def _print_report(self, report):
+        self.stdout.write(
+            f"{'group':<8} {'endpoint':<26} {'reqs':>6} {'ok%':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+        )
+        for group, data in report['groups'].items():
+            rows = list(data['endpoints'].items()) + [('* all', data['summary'])]
+            for name, m in rows:
+                requests = m.get('requests', m.get('total_requests', 0))
+                ok = m['success_rate'] if 'success_rate' in m else (
+                    m['success_count'] / requests * 100.0 if requests else 0.0)
+                self.stdout.write(
+                    f"{group:<8} {name:<26} {requests:>6} {ok:>6.1f} "
+                    + ' '.join(_ms(m.get(f'{k}_latency_ms')) for k in ('p50', 'p95', 'p99', 'max'))
+                )
+            for name, ws in data['websockets'].items():
+                self.stdout.write(
+                    f"{group:<8} ws:{name:<23} {ws['connections']:>6} connections, {ws['messages']} messages, "
+                    f"connect p95 {_ms(ws['connect_p95_latency_ms']).strip()} ms, "
+                    f"{ws['closed_early']} closed early, errors {ws['errors'] or '-'}"
+                )
+            if data['logins'].keys() - {'ok'}:
+                self.stdout.write(self.style.WARNING(f"{group}: login results {data['logins']}"))
+
+    def _print_diff(self, before, after, threshold):
+        rows = diff_reports(before, after)
+        self.stdout.write(
+            f"Comparing {before.get('label') or before.get('started_at')} -> "
+            f"{after.get('label') or after.get('started_at')}"
+        )
+        self.stdout.write(f"{'group':<8} {'endpoint':<26} {'metric':<16} {'before':>9} {'after':>9} {'change':>8}")
+        regressions = []
+        for row in rows:
+            change = f"{row['change_pct']:+.1f}%" if row['change_pct'] is not None else 'n/a'
+            line = (f"{row['group']:<8} {row['endpoint']:<26} {row['metric']:<16} "
+                    f"{row['before']:>9.2f} {row['after']:>9.2f} {change:>8}")
+            regressed = (threshold is not None and row['metric'] == 'p95_latency_ms'
+                         and row['change_pct'] is not None and row['change_pct'] > threshold)
+            if regressed:
+                regressions.append(row)
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+        if regressions:
+            raise CommandError(f'{len(regressions)} p95 regression(s) above {threshold}%')
+
+
+def _ms(value):
+    return f'{value:>8.1f}' if value is not None else f"{'-':>8}"
@@ -1,12 +1,15 @@
 from django.core.management.base import BaseCommand
-from django.utils import timezone
 from backend.analytics.models import PatientRecord
+from backend.analytics.synthetic_data import DEFAULT_COPY_BATCH_SIZE, copy_patient_records
 from backend.users.models import User
-import random
-from datetime import datetime, timedelta
+import time
 
 class Command(BaseCommand):
-    help = 'Populate database with sample patient records for analytics testing'
+    help = (
+        'Populate database with sample patient records for analytics testing. Records are generated '
+        'in vectorized chunks and loaded with COPY on PostgreSQL, so millions of rows are practical '
+        'for analytics benchmarks.'
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -20,6 +23,17 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear existing patient records before creating new ones',
         )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            help='Seed for a reproducible dataset',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_COPY_BATCH_SIZE,
+            help=f'Records generated and loaded per chunk (default: {DEFAULT_COPY_BATCH_SIZE})',
+        )
 
     def handle(self, *args, **options):
         if options['clear']:
@@ -27,58 +41,24 @@ class Command(BaseCommand):
             self.stdout.write(self.style.WARNING('Cleared existing patient records'))
 
         count = options['count']
-        
+
         # Get existing users (patients)
-        patients = User.objects.filter(role='patient')
-        if not patients.exists():
+        patient_ids = list(User.objects.filter(role='patient').values_list('id', flat=True))
+        if not patient_ids:
             self.stdout.write(self.style.ERROR('No patient users found. Please create some patient accounts first.'))
             return
 
-        # Medical conditions and medications
-        medical_conditions = [
-            'Hypertension', 'Diabetes', 'Heart Disease', 'Asthma', 'Arthritis',
-            'Depression', 'Anxiety', 'Obesity', 'High Cholesterol', 'Migraine',
-            'Pneumonia', 'Bronchitis', 'Flu', 'Cold', 'Fever',
-            'Gastroenteritis', 'Appendicitis', 'Fracture', 'Sprain', 'Burn'
-        ]
-        
-        medications = [
-            'Metformin', 'Lisinopril', 'Atorvastatin', 'Omeprazole', 'Albuterol',
-            'Sertraline', 'Lorazepam', 'Ibuprofen', 'Acetaminophen', 'Aspirin',
-            'Amoxicillin', 'Ciprofloxacin', 'Prednisone', 'Warfarin', 'Insulin',
-            'Furosemide', 'Digoxin', 'Morphine', 'Codeine', 'Tramadol'
-        ]
-
         self.stdout.write(f'Creating {count} patient records for analytics testing...')
-        
-        created_count = 0
-        for i in range(count):
-            try:
-                # Get a random patient
-                patient = random.choice(patients)
-                
-                # Generate random date within the last 2 years
-                start_date = datetime.now() - timedelta(days=730)
-                random_date = start_date + timedelta(days=random.randint(0, 730))
-                
-                # Create patient record
-                PatientRecord.objects.create(
-                    patient=patient,
-                    date_of_admission=random_date,
-                    medical_condition=random.choice(medical_conditions),
-                    age=random.randint(18, 80),
-                    gender=random.choice(['Male', 'Female', 'Other']),
-                    medication=random.choice(medications) if random.random() > 0.3 else None,
-                    severity=random.choice(['Low', 'Medium', 'High', 'Critical']),
-                    treatment_outcome=random.choice(['Recovered', 'Ongoing', 'Transferred', 'Deceased']),
-                    is_dummy_data=True  # Mark as dummy data
-                )
-                created_count += 1
-                
-            except Exception as e:
-                self.stdout.write(f'Error creating record {i}: {str(e)}')
-                continue
+
+        start = time.perf_counter()
+        created_count = copy_patient_records(
+            count, patient_ids, seed=options['seed'], batch_size=max(1, options['batch_size'])
+        )
+        elapsed = time.perf_counter() - start
 
         self.stdout.write(
-            self.style.SUCCESS(f'Successfully created {created_count} patient records for analytics!')
+            self.style.SUCCESS(
+                f'Successfully created {created_count} patient records for analytics '
+                f'in {elapsed:.1f}s ({created_count / elapsed if elapsed else 0:.0f} rows/s)!'
+            )
         )
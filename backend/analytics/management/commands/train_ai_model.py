@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.analytics.model_registry import (
+    RegistryError,
+    current_version,
+    import_version,
+    list_versions,
+    promote,
+    read_manifest,
+    run_training,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Train a new AI insights model version on AnalyticsResult history and promote it if it beats "
+        "the current version on held-out samples (the nightly train_ai_models task). Use --list to "
+        "show registered versions, --promote VERSION to roll back or forward and --import-dir DIR to "
+        "register and promote models saved outside the registry (e.g. the old models/ directory)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Promote the new version even if it scores worse')
+        parser.add_argument('--list', action='store_true', help='List registered versions and exit')
+        parser.add_argument('--promote', metavar='VERSION', help='Make an existing version current and exit')
+        parser.add_argument('--import-dir', metavar='DIR', help='Register and promote the models saved in DIR and exit')
+
+    def handle(self, *args, **options):
+        if options['list']:
+            active = current_version()
+            self.stdout.write(f"  {'version':<27} {'samples':>8} {'score':>7}")
+            for version in list_versions():
+                manifest = read_manifest(version)
+                score = manifest.get('score')
+                self.stdout.write(
+                    f"{'*' if version == active else ' '} {version:<27} {manifest['training'].get('samples', '-')!s:>8} "
+                    f"{score if score is None else round(score, 4)!s:>7}"
+                )
+            return
+
+        if options['promote']:
+            version = options['promote']
+            try:
+                promote(version, read_manifest(version).get('score'))
+            except (RegistryError, FileNotFoundError) as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f'Version {version} is now current'))
+            return
+
+        if options['import_dir']:
+            try:
+                version = import_version(options['import_dir'])
+                promote(version, read_manifest(version).get('score'))
+            except RegistryError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(f"Imported {options['import_dir']} as version {version}, now current"))
+            return
+
+        report = run_training(force=options['force'])
+        if report['status'] == 'skipped':
+            self.stdout.write(self.style.WARNING(f"Training skipped: {report['reason']}"))
+            return
+        self.stdout.write(
+            f"Trained {report['version']} on {report['samples']} samples: score {report['score']} "
+            f"(current {report['previous_version'] or '-'}: {report['previous_score']}, "
+            f"compared on {report['compared_samples']} samples)"
+        )
+        if report['status'] == 'promoted':
+            self.stdout.write(self.style.SUCCESS(f"Version {report['version']} promoted"))
+        else:
+            self.stdout.write(self.style.WARNING(f"Version {report['version']} kept but not promoted"))
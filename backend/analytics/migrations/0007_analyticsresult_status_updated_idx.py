@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:23
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0006_rename_analytics_u_service_1e4b29_idx_uptime_ping_service_85679e_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='analyticsresult',
+            index=models.Index(fields=['status', 'updated_at'], name='analytics_r_status_a35084_idx'),
+        ),
+    ]
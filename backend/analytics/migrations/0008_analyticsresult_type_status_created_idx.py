@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0007_analyticsresult_status_updated_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='analyticsresult',
+            index=models.Index(fields=['analysis_type', 'status', '-created_at'], name='analytics_r_analysi_4dab6d_idx'),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0008_analyticsresult_type_status_created_idx'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='AnalyticsCache',
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:34
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import migrations, models
+
+# Frozen copies of backend.analytics.result_summary as of this migration, so
+# later changes there cannot change what this migration writes.
+MAX_KPIS = 12
+MAX_SECTIONS = 12
+MAX_STRING_LENGTH = 80
+
+
+def payload_size(results):
+    return len(json.dumps(results, cls=DjangoJSONEncoder, separators=(',', ':')).encode('utf-8'))
+
+
+def _is_kpi(value):
+    if isinstance(value, bool) or value is None:
+        return True
+    if isinstance(value, (int, float)):
+        return True
+    return isinstance(value, str) and len(value) <= MAX_STRING_LENGTH
+
+
+def summarize_results(results):
+    if not isinstance(results, dict):
+        return {}
+    kpis = {}
+    sections = {}
+    nested = []
+    for key, value in results.items():
+        if key == 'error':
+            continue
+        if isinstance(value, (dict, list)):
+            if len(sections) < MAX_SECTIONS:
+                sections[key] = len(value)
+            if isinstance(value, dict):
+                nested.append((key, value))
+        elif _is_kpi(value) and len(kpis) < MAX_KPIS:
+            kpis[key] = value
+    for parent, value in nested:
+        for key, item in value.items():
+            if len(kpis) >= MAX_KPIS:
+                break
+            if not isinstance(item, (dict, list)) and _is_kpi(item):
+                kpis[f'{parent}.{key}'] = item
+
+    summary = {'kpis': kpis, 'sections': sections}
+    error = results.get('error')
+    if error:
+        summary['error'] = str(error)[:200]
+    return summary
+
+
+def backfill_summaries(apps, schema_editor):
+    AnalyticsResult = apps.get_model('analytics', 'AnalyticsResult')
+    batch = []
+    for result in AnalyticsResult.objects.only('id', 'results').iterator(chunk_size=200):
+        result.summary = summarize_results(result.results)
+        result.payload_bytes = payload_size(result.results)
+        batch.append(result)
+        if len(batch) >= 200:
+            AnalyticsResult.objects.bulk_update(batch, ['summary', 'payload_bytes'])
+            batch = []
+    if batch:
+        AnalyticsResult.objects.bulk_update(batch, ['summary', 'payload_bytes'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0009_delete_analyticscache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analyticsresult',
+            name='payload_bytes',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='analyticsresult',
+            name='summary',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddIndex(
+            model_name='analyticsresult',
+            index=models.Index(fields=['-created_at', '-id'], name='analytics_r_created_f3e872_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='analyticsresult',
+            index=models.Index(fields=['analysis_type', '-created_at', '-id'], name='analytics_r_analysi_b3a9b2_idx'),
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0010_analyticsresult_summary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dataupdatelog',
+            index=models.Index(fields=['created_at'], name='data_update_created_23854b_idx'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:43
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0011_dataupdatelog_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usageevent',
+            name='sample_rate',
+            field=models.FloatField(default=1.0),
+        ),
+        migrations.AlterField(
+            model_name='usageevent',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.CreateModel(
+            name='UsageEventRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(max_length=100)),
+                ('hour', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('estimated_count', models.FloatField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'usage_event_rollups',
+                'ordering': ['-hour', 'event_type'],
+                'indexes': [models.Index(fields=['hour'], name='usage_event_hour_747259_idx')],
+                'constraints': [models.UniqueConstraint(fields=('event_type', 'hour'), name='usage_rollup_type_hour_uniq')],
+            },
+        ),
+    ]
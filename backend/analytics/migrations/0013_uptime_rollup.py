@@ -0,0 +1,49 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0012_usage_event_ingestion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UptimeRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('service', models.CharField(max_length=100)),
+                ('region', models.CharField(blank=True, default='', max_length=50)),
+                ('period', models.CharField(choices=[('minute', 'Minute'), ('hour', 'Hour')], max_length=10)),
+                ('start', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('up_count', models.PositiveIntegerField(default=0)),
+                ('down_count', models.PositiveIntegerField(default=0)),
+                ('degraded_count', models.PositiveIntegerField(default=0)),
+                ('latency_count', models.PositiveIntegerField(default=0)),
+                ('latency_sum_ms', models.BigIntegerField(default=0)),
+                ('latency_min_ms', models.IntegerField(blank=True, null=True)),
+                ('latency_max_ms', models.IntegerField(blank=True, null=True)),
+                ('latency_sketch', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'uptime_rollups',
+                'ordering': ['-start'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='uptimeping',
+            index=models.Index(fields=['service', 'region', '-created_at'], name='uptime_ping_service_5a4cd7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uptimerollup',
+            index=models.Index(fields=['period', 'start'], name='uptime_roll_period_4a4edc_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='uptimerollup',
+            constraint=models.UniqueConstraint(fields=('service', 'region', 'period', 'start'), name='uptime_rollup_key_uniq'),
+        ),
+    ]
@@ -0,0 +1,466 @@
+"""
+Versioned registry of trained MediSyncAIInsights models.
+
+Layout under ``AI_MODEL_REGISTRY_DIR``:
+
+- ``versions/<version>/``: the model artifacts (rf_model.joblib,
+  scaler.joblib, tf_model.keras, metrics.json, features.json) and a
+  ``manifest.json`` with the feature schema, sample and label counts,
+  held-out metrics and a sha256 of every artifact;
+- ``current.json``: the promoted version.
+
+Writes never expose partial files:
+
+- a version is trained into a hidden staging directory and renamed into
+  ``versions/`` once every artifact is written, so a version directory is
+  either complete or absent. Versions are never modified afterwards;
+- ``current.json`` is replaced with ``os.replace``, so readers see the old
+  or the new pointer.
+
+``train_and_promote`` (Celery task ``train_ai_models``, nightly) trains on
+completed ``AnalyticsResult`` history, holding out the most recent 30% of
+samples. Every manifest records the training ``cutoff``: the creation time
+of the newest sample the version was trained on (for imported versions, the
+time they were registered). Both versions are scored only on held-out
+samples newer than the current version's cutoff, so neither is scored on
+samples it was trained on. With fewer than ``AI_MODEL_MIN_COMPARISON_SAMPLES``
+of them the run is skipped (``force`` trains and promotes anyway). The new
+version is promoted only when its score beats the current one by more than
+``AI_MODEL_MIN_IMPROVEMENT``.
+
+``import_version`` (``train_ai_model --import-dir``) registers artifacts
+saved outside the registry, such as the ``models/`` directory models were
+loaded from before it existed; serving no longer reads that directory.
+
+``get_serving_model`` keeps one loaded model per process and re-reads
+``current.json`` at most every ``AI_MODEL_RELOAD_SECONDS``. When the pointer
+has moved, it loads the new version and swaps it in without a restart. Web
+and worker hosts must share the registry directory.
+"""
+import bisect
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .ai_features import FEATURE_COLUMNS, FEATURE_SCHEMA_VERSION, RISK_LEVELS, extract_features, extract_labels
+from .ai_insights_model import MediSyncAIInsights
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = 'manifest.json'
+CURRENT = 'current.json'
+ARTIFACTS = ('tf_model.keras', 'rf_model.joblib', 'scaler.joblib', 'metrics.json', 'features.json')
+STAGING_PREFIX = '.staging-'
+HOLDOUT_FRACTION = 0.3
+TRAINING_LOCK_KEY = 'analytics:ai-training-lock'
+TRAINING_LOCK_TIMEOUT = 3600
+
+DEFAULT_MIN_SAMPLES = 50
+DEFAULT_MAX_SAMPLES = 50000
+DEFAULT_MIN_IMPROVEMENT = 0.0
+DEFAULT_MIN_COMPARISON_SAMPLES = 10
+DEFAULT_KEEP_VERSIONS = 5
+DEFAULT_RELOAD_SECONDS = 30
+
+# model input section -> analysis_type whose results fill it
+TRAINING_SECTIONS = {
+    'patient_demographics': 'patient_demographics',
+    'health_trends': 'patient_health_trends',
+    'illness_prediction': 'illness_prediction',
+    'surge_prediction': 'illness_surge_prediction',
+}
+# model input section -> key of the same results inside a full_analysis result
+FULL_ANALYSIS_KEYS = {
+    'patient_demographics': 'patient_demographics',
+    'health_trends': 'patient_health_trends',
+    'illness_prediction': 'illness_prediction_chi_square',
+    'surge_prediction': 'illness_surge_prediction',
+}
+
+
+class RegistryError(Exception):
+    pass
+
+
+def registry_dir():
+    return str(getattr(settings, 'AI_MODEL_REGISTRY_DIR', os.path.join(settings.BASE_DIR, 'ai_models')))
+
+
+def versions_dir():
+    return os.path.join(registry_dir(), 'versions')
+
+
+def version_dir(version):
+    return os.path.join(versions_dir(), version)
+
+
+def _write_json_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(data, f, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_manifest(version):
+    with open(os.path.join(version_dir(version), MANIFEST)) as f:
+        return json.load(f)
+
+
+def current():
+    """The promoted version's pointer (``version``, ``promoted_at``, ``score``), or None."""
+    try:
+        with open(os.path.join(registry_dir(), CURRENT)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def current_version():
+    pointer = current()
+    return pointer['version'] if pointer else None
+
+
+def list_versions():
+    """Registered versions, oldest first (version names sort by creation time)."""
+    try:
+        names = os.listdir(versions_dir())
+    except FileNotFoundError:
+        return []
+    return sorted(n for n in names if not n.startswith('.') and os.path.exists(os.path.join(version_dir(n), MANIFEST)))
+
+
+def load_version(version):
+    """A MediSyncAIInsights loaded from a registered version, after checking its manifest."""
+    manifest = read_manifest(version)
+    if manifest.get('feature_schema_version') != FEATURE_SCHEMA_VERSION:
+        raise RegistryError(
+            f"Version {version} uses feature schema {manifest.get('feature_schema_version')}, "
+            f"expected {FEATURE_SCHEMA_VERSION}"
+        )
+    path = version_dir(version)
+    for name, expected in manifest['artifacts'].items():
+        if _sha256(os.path.join(path, name)) != expected['sha256']:
+            raise RegistryError(f"Artifact {name} of version {version} does not match its manifest")
+    model = MediSyncAIInsights(model_dir=None)
+    model.model_dir = path
+    model.load_models()
+    model.version = version
+    return model
+
+
+def training_samples(since=None, max_samples=None, with_times=False):
+    """
+    Analytics dicts built from completed AnalyticsResult history, oldest first.
+
+    Every illness_prediction result (the label source) gives one sample,
+    joined with the latest result of each other section completed at or
+    before it. Every full_analysis result gives one sample on its own.
+    Only the newest ``max_samples`` are kept. With ``with_times``, returns
+    ``(created_at, sample)`` pairs, ``created_at`` being that of the
+    result the sample was built on.
+    """
+    from .models import AnalyticsResult
+
+    max_samples = max_samples or getattr(settings, 'AI_TRAINING_MAX_SAMPLES', DEFAULT_MAX_SAMPLES)
+    section_of = {analysis_type: section for section, analysis_type in TRAINING_SECTIONS.items()}
+    rows = AnalyticsResult.objects.filter(
+        status='completed', analysis_type__in=[*section_of, 'full_analysis']
+    )
+    if since is not None:
+        rows = rows.filter(created_at__gte=since)
+
+    latest = {}
+    samples = deque(maxlen=max_samples)
+    for analysis_type, results, created_at in (rows.order_by('created_at', 'id')
+                                               .values_list('analysis_type', 'results', 'created_at')
+                                               .iterator(chunk_size=200)):
+        if not isinstance(results, dict) or results.get('error'):
+            continue
+        if analysis_type == 'full_analysis':
+            samples.append((created_at, {section: results.get(key) for section, key in FULL_ANALYSIS_KEYS.items()}))
+            continue
+        latest[section_of[analysis_type]] = results
+        if analysis_type == 'illness_prediction':
+            samples.append((created_at, dict(latest)))
+    return list(samples) if with_times else [sample for _, sample in samples]
+
+
+def training_cutoff(version):
+    """
+    Creation time of the newest sample ``version`` may have been trained on:
+    the manifest's training cutoff, or when it was registered.
+    """
+    manifest = read_manifest(version)
+    return datetime.fromisoformat(manifest['training'].get('cutoff') or manifest['created_at'])
+
+
+def score(metrics):
+    """Promotion score: the mean weighted f1 of the models that were evaluated."""
+    f1s = [m['f1'] for m in metrics.values() if m and m.get('f1') is not None]
+    return sum(f1s) / len(f1s) if f1s else None
+
+
+def _new_version(now):
+    return f"{now.strftime('%Y%m%dT%H%M%S%f')[:-3]}-{uuid.uuid4().hex[:6]}"
+
+
+def _register(staging, version, now, training, metrics):
+    """Write the manifest of the artifacts in ``staging`` and move them into ``versions/``."""
+    artifacts = {
+        name: {'sha256': _sha256(os.path.join(staging, name)), 'bytes': os.path.getsize(os.path.join(staging, name))}
+        for name in ARTIFACTS if os.path.exists(os.path.join(staging, name))
+    }
+    _write_json_atomic(os.path.join(staging, MANIFEST), {
+        'version': version,
+        'created_at': now.isoformat(),
+        'feature_schema_version': FEATURE_SCHEMA_VERSION,
+        'feature_columns': list(FEATURE_COLUMNS),
+        'training': training,
+        'metrics': metrics,
+        'score': score(metrics),
+        'artifacts': artifacts,
+    })
+    os.rename(staging, version_dir(version))
+
+
+def _train_version(samples, X_train, y_train, X_test, y_test, now, cutoff):
+    """Train, evaluate and register a new version; returns ``(version, metrics)``."""
+    version = _new_version(now)
+    os.makedirs(versions_dir(), exist_ok=True)
+    staging = os.path.join(versions_dir(), STAGING_PREFIX + version)
+    try:
+        model = MediSyncAIInsights(model_dir=staging)
+        # Training gets every core; the saved model serves on one (see load_models)
+        model.fit(X_train, y_train, n_jobs=-1)
+        metrics = model.evaluate(X_test, y_test)
+        model.rf_model.n_jobs = 1
+        model.metrics = metrics
+        model.version = version
+        model.save_models()
+
+        codes, counts = np.unique(y_train, return_counts=True)
+        _register(staging, version, now, {
+            'samples': len(samples),
+            'train_samples': len(y_train),
+            'holdout_samples': len(y_test),
+            'cutoff': cutoff.isoformat(),
+            'train_labels': {RISK_LEVELS[code]: count for code, count in zip(codes.tolist(), counts.tolist())},
+        }, metrics)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return version, metrics
+
+
+def import_version(source, now=None):
+    """
+    Register the artifacts ``save_models`` wrote to ``source`` (e.g. the
+    ``models/`` directory used before the registry) as a new version, with
+    the metrics saved next to them. Returns the version; it is not promoted.
+    """
+    now = now or timezone.now()
+    model = MediSyncAIInsights(model_dir=None)
+    model.model_dir = source
+    model.load_models()
+    if model.rf_model is None and model.tf_model is None:
+        raise RegistryError(f"No model trained on feature schema {FEATURE_SCHEMA_VERSION} in {source}")
+
+    version = _new_version(now)
+    os.makedirs(versions_dir(), exist_ok=True)
+    staging = os.path.join(versions_dir(), STAGING_PREFIX + version)
+    try:
+        os.makedirs(staging)
+        model.model_dir = staging
+        model.save_models()
+        _register(staging, version, now, {'imported_from': os.path.abspath(source)}, model.metrics)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return version
+
+
+def promote(version, score_value=None, now=None):
+    """Point ``current.json`` at ``version``."""
+    if version not in list_versions():
+        raise RegistryError(f"Unknown model version {version}")
+    _write_json_atomic(os.path.join(registry_dir(), CURRENT), {
+        'version': version,
+        'promoted_at': (now or timezone.now()).isoformat(),
+        'score': score_value,
+    })
+
+
+def prune_versions(keep=None):
+    """Delete all but the newest ``keep`` versions (never the current one) and stale staging directories."""
+    keep = keep or getattr(settings, 'AI_MODEL_KEEP_VERSIONS', DEFAULT_KEEP_VERSIONS)
+    active = current_version()
+    versions = list_versions()
+    removed = []
+    for version in versions[:-keep]:
+        if version != active:
+            shutil.rmtree(version_dir(version), ignore_errors=True)
+            removed.append(version)
+    cutoff = time.time() - 24 * 3600
+    for name in os.listdir(versions_dir()) if os.path.isdir(versions_dir()) else ():
+        path = os.path.join(versions_dir(), name)
+        if name.startswith(STAGING_PREFIX) and os.path.getmtime(path) < cutoff:
+            shutil.rmtree(path, ignore_errors=True)
+    return removed
+
+
+def train_and_promote(samples=None, now=None, force=False):
+    """
+    Train a new version on ``samples`` (``(created_at, sample)`` pairs, oldest
+    first; default: ``training_samples(with_times=True)``) and promote it if it
+    beats the current version on the held-out samples neither has seen.
+    Returns a report dict whose ``status`` is promoted, rejected or skipped.
+    """
+    now = now or timezone.now()
+    samples = training_samples(with_times=True) if samples is None else list(samples)
+    min_samples = getattr(settings, 'AI_TRAINING_MIN_SAMPLES', DEFAULT_MIN_SAMPLES)
+    if len(samples) < min_samples:
+        return {'status': 'skipped', 'reason': f'{len(samples)} samples, need {min_samples}', 'samples': len(samples)}
+
+    # Samples are oldest first: hold out the most recent ones.
+    times = [created_at for created_at, _ in samples]
+    X = extract_features([sample for _, sample in samples])
+    y = extract_labels([sample for _, sample in samples], X)
+    split = len(samples) - max(1, int(len(samples) * HOLDOUT_FRACTION))
+
+    # The current version is compared on held-out samples newer than its own training data.
+    previous = current_version()
+    unseen = slice(split, None)
+    if previous is not None:
+        try:
+            previous_cutoff = training_cutoff(previous)
+            unseen = slice(max(split, bisect.bisect_right(times, previous_cutoff)), None)
+        except Exception as e:
+            logger.warning(f"Could not read the training cutoff of model version {previous}: {e}")
+        min_comparison = getattr(settings, 'AI_MODEL_MIN_COMPARISON_SAMPLES', DEFAULT_MIN_COMPARISON_SAMPLES)
+        compared = len(times[unseen])
+        if compared < min_comparison and not force:
+            return {
+                'status': 'skipped',
+                'reason': f'{compared} held-out samples newer than version {previous}, need {min_comparison}',
+                'samples': len(samples),
+            }
+
+    X_train, X_test, y_train, y_test = X[:split], X[split:], y[:split], y[split:]
+    version, metrics = _train_version(samples, X_train, y_train, X_test, y_test, now, times[split - 1])
+    new_score = score(metrics)
+
+    previous_score = None
+    if previous is not None and len(y[unseen]):
+        if unseen.start != split:
+            new_score = score(load_version(version).evaluate(X[unseen], y[unseen]))
+        try:
+            previous_score = score(load_version(previous).evaluate(X[unseen], y[unseen]))
+        except Exception as e:
+            logger.warning(f"Could not evaluate current model version {previous}: {e}")
+
+    min_improvement = getattr(settings, 'AI_MODEL_MIN_IMPROVEMENT', DEFAULT_MIN_IMPROVEMENT)
+    promoted = (force or previous_score is None
+                or (new_score is not None and new_score > previous_score + min_improvement))
+    if promoted:
+        promote(version, new_score, now)
+    prune_versions()
+    return {
+        'status': 'promoted' if promoted else 'rejected',
+        'version': version,
+        'previous_version': previous,
+        'score': new_score,
+        'previous_score': previous_score,
+        'compared_samples': len(y[unseen]),
+        'metrics': metrics,
+        'samples': len(samples),
+    }
+
+
+def run_training(force=False):
+    """``train_and_promote`` under a cross-process lock; skipped while another run holds it."""
+    try:
+        acquired = cache.add(TRAINING_LOCK_KEY, 1, timeout=TRAINING_LOCK_TIMEOUT)
+    except Exception:
+        acquired = None  # cache unavailable: run unlocked
+    if acquired is False:
+        return {'status': 'skipped', 'reason': 'another training run is in progress'}
+    try:
+        return train_and_promote(force=force)
+    finally:
+        if acquired:
+            try:
+                cache.delete(TRAINING_LOCK_KEY)
+            except Exception:
+                pass
+
+
+class ServingModel:
+    """The promoted model of this process, swapped when ``current.json`` moves."""
+
+    def __init__(self):
+        self.model = None
+        self.version = None
+        self.checked_at = None
+        self._lock = threading.Lock()
+
+    def _fresh(self):
+        interval = getattr(settings, 'AI_MODEL_RELOAD_SECONDS', DEFAULT_RELOAD_SECONDS)
+        return self.model is not None and time.monotonic() - self.checked_at < interval
+
+    def get(self):
+        if self._fresh():
+            return self.model
+        with self._lock:
+            if self._fresh():
+                return self.model
+            version = current_version()
+            if self.model is None or version != self.version:
+                try:
+                    self.model = load_version(version) if version else MediSyncAIInsights(model_dir=None)
+                    self.version = version
+                    logger.info(f"Serving AI model version {version}")
+                except Exception as e:
+                    logger.error(f"Could not load AI model version {version}: {e}", exc_info=True)
+                    if self.model is None:
+                        self.model = MediSyncAIInsights(model_dir=None)
+            self.checked_at = time.monotonic()
+            return self.model
+
+    def reset(self):
+        with self._lock:
+            self.model = self.version = self.checked_at = None
+
+
+serving_model = ServingModel()
+
+
+def get_serving_model():
+    return serving_model.get()
@@ -3,6 +3,8 @@ from django.contrib.auth import get_user_model
 from django.utils import timezone
 import json
 
+from .result_summary import payload_size, summarize_results
+
 User = get_user_model()
 
 class PatientRecord(models.Model):
@@ -69,6 +71,9 @@ class AnalyticsResult(models.Model):
     analysis_type = models.CharField(max_length=50, choices=ANALYSIS_TYPES)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     results = models.JSONField(default=dict, blank=True)
+    # Derived from ``results`` on save (see result_summary.py)
+    summary = models.JSONField(default=dict, blank=True)
+    payload_bytes = models.PositiveIntegerField(default=0)
     error_message = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -79,10 +84,28 @@ class AnalyticsResult(models.Model):
         db_table = 'analytics_results'
         verbose_name = 'Analytics Result'
         verbose_name_plural = 'Analytics Results'
+        indexes = [
+            # Last-Event-ID catch-up of the analytics stream
+            models.Index(fields=['status', 'updated_at']),
+            # Latest completed result per type (dashboard snapshots)
+            models.Index(fields=['analysis_type', 'status', '-created_at']),
+            # Keyset pagination of the history, with and without a type filter
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['analysis_type', '-created_at', '-id']),
+        ]
     
     def __str__(self):
         return f"{self.get_analysis_type_display()} - {self.get_status_display()} ({self.created_at.strftime('%Y-%m-%d %H:%M')})"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'results' in update_fields:
+            self.summary = summarize_results(self.results)
+            self.payload_bytes = payload_size(self.results)
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'summary', 'payload_bytes'}
+        super().save(*args, **kwargs)
+
 class AnalyticsTask(models.Model):
     """
     Tracks background analytics tasks
@@ -124,32 +147,14 @@ class DataUpdateLog(models.Model):
         db_table = 'data_update_logs'
         verbose_name = 'Data Update Log'
         verbose_name_plural = 'Data Update Logs'
+        indexes = [
+            # Retention deletes (retention.py)
+            models.Index(fields=['created_at']),
+        ]
     
     def __str__(self):
         return f"{self.action} {self.model_name} #{self.record_id}"
 
-class AnalyticsCache(models.Model):
-    """
-    Caches frequently accessed analytics results for performance
-    """
-    cache_key = models.CharField(max_length=255, unique=True)
-    data = models.JSONField()
-    expires_at = models.DateTimeField()
-    created_at = models.DateTimeField(auto_now_add=True)
-    
-    class Meta:
-        ordering = ['-created_at']
-        db_table = 'analytics_cache'
-        verbose_name = 'Analytics Cache'
-        verbose_name_plural = 'Analytics Cache'
-    
-    def __str__(self):
-        return f"Cache: {self.cache_key}"
-    
-    @property
-    def is_expired(self):
-        return timezone.now() > self.expires_at
-
 
 class UsageEvent(models.Model):
     """
@@ -161,7 +166,10 @@ class UsageEvent(models.Model):
     session_id = models.CharField(max_length=255, blank=True, null=True)
     ip_address = models.CharField(max_length=64, blank=True, null=True)
     context = models.JSONField(default=dict, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Fraction of this event type that was kept (see usage_events.py); each row stands for 1 / sample_rate events
+    sample_rate = models.FloatField(default=1.0)
+    # Set when the event happens, not when the buffered writer flushes it (see usage_events.py)
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         ordering = ['-created_at']
@@ -175,6 +183,32 @@ class UsageEvent(models.Model):
         return f"{self.event_type} by {getattr(self.user, 'username', 'anonymous')} at {self.created_at}"
 
 
+class UsageEventRollup(models.Model):
+    """
+    Usage event counts per type and hour, rebuilt from UsageEvent by the
+    ``rollup_usage_events`` task for dashboards.
+    """
+    event_type = models.CharField(max_length=100)
+    hour = models.DateTimeField()
+    # Rows stored, and the events they stand for once sampling is undone
+    count = models.PositiveIntegerField(default=0)
+    estimated_count = models.FloatField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-hour', 'event_type']
+        db_table = 'usage_event_rollups'
+        constraints = [
+            models.UniqueConstraint(fields=['event_type', 'hour'], name='usage_rollup_type_hour_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['hour']),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} @ {self.hour:%Y-%m-%d %H:00}: {self.count}"
+
+
 class UptimePing(models.Model):
     """
     Stores uptime heartbeat pings for services, used to monitor availability.
@@ -198,7 +232,49 @@ class UptimePing(models.Model):
         indexes = [
             models.Index(fields=['service']),
             models.Index(fields=['created_at']),
+            # Latest ping per (service, region): DISTINCT ON in uptime.py
+            models.Index(fields=['service', 'region', '-created_at']),
         ]
 
     def __str__(self):
         return f"{self.service} {self.status} ({self.latency_ms}ms)"
+
+
+class UptimeRollup(models.Model):
+    """
+    Uptime pings of one service and region aggregated per minute or per hour
+    by the ``rollup_uptime`` task (see uptime.py).
+    """
+    PERIOD_CHOICES = [
+        ('minute', 'Minute'),
+        ('hour', 'Hour'),
+    ]
+
+    service = models.CharField(max_length=100)
+    region = models.CharField(max_length=50, blank=True, default='')
+    period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
+    start = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+    up_count = models.PositiveIntegerField(default=0)
+    down_count = models.PositiveIntegerField(default=0)
+    degraded_count = models.PositiveIntegerField(default=0)
+    latency_count = models.PositiveIntegerField(default=0)
+    latency_sum_ms = models.BigIntegerField(default=0)
+    latency_min_ms = models.IntegerField(null=True, blank=True)
+    latency_max_ms = models.IntegerField(null=True, blank=True)
+    # Mergeable latency histogram for percentiles (LatencyHistogram.to_dict)
+    latency_sketch = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-start']
+        db_table = 'uptime_rollups'
+        constraints = [
+            models.UniqueConstraint(fields=['service', 'region', 'period', 'start'], name='uptime_rollup_key_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['period', 'start']),
+        ]
+
+    def __str__(self):
+        return f"{self.service}/{self.region or '-'} {self.period} {self.start:%Y-%m-%d %H:%M}: {self.count}"
@@ -0,0 +1,269 @@
+"""
+Shared two-tier cache for analytics payloads.
+
+Analytics results are global, so they are cached once per analysis type
+rather than once per user.
+
+Tier 1 is a small in-process LRU. Tier 2 is the configured Django cache
+(Redis). Each entry has a version: the result's id and ``updated_at``, or a
+digest of the section versions for dashboard snapshots. Redis stores two
+keys per entry:
+
+- a small pointer ``<namespace>:current:<name>`` holding the version;
+- the payload under ``<namespace>:<name>:<version>``.
+
+A process serves its local copy without touching Redis for
+``ANALYTICS_LOCAL_CACHE_TTL`` seconds. After that it re-reads only the
+pointer, and fetches the payload again only when the version changed.
+
+On a miss, the payload is recomputed by one caller (single flight). Threads
+of a process wait on a lock. Processes race for a short-lived Redis lock;
+the losers poll for the winner's payload before giving up and computing
+themselves.
+
+When a new ``AnalyticsResult`` is committed, ``refresh_result`` and
+``dashboard_snapshot.rebuild_snapshots`` push the new version (see
+signals.py). The next lookup in any process picks it up without a cold
+miss. Only these pushes replace a pointer: a caller that recomputed on a
+miss sets it only when there is none (``cache.add``), since its value may
+predate a commit that was published meanwhile. When the cache backend is unavailable, everything degrades to
+computing from the database.
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT = 1
+LOCK_TIMEOUT = 30
+SINGLE_FLIGHT_WAIT = 5.0
+SINGLE_FLIGHT_POLL = 0.05
+
+
+class _LocalLRU:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, version, value):
+        with self._lock:
+            self._entries[key] = [version, value, time.monotonic()]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def touch(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[2] = time.monotonic()
+
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class TwoTierCache:
+    """
+    ``get(name, compute)`` returns the cached value of ``name``. On a miss it
+    calls ``compute()``, which returns ``(version, value)``. ``value`` must be
+    picklable and is shared between callers, so treat it as read-only.
+    """
+
+    def __init__(self, namespace, maxsize=None, local_ttl=None, timeout=None):
+        self.namespace = f'{namespace}:v{CACHE_FORMAT}'
+        self.local = _LocalLRU(maxsize or getattr(settings, 'ANALYTICS_LOCAL_CACHE_SIZE', 32))
+        self._local_ttl = local_ttl
+        self._timeout = timeout
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+
+    @property
+    def local_ttl(self):
+        if self._local_ttl is not None:
+            return self._local_ttl
+        return getattr(settings, 'ANALYTICS_LOCAL_CACHE_TTL', 5)
+
+    @property
+    def timeout(self):
+        return self._timeout or getattr(settings, 'ANALYTICS_CACHE_TIMEOUT', 24 * 3600)
+
+    def _pointer_key(self, name):
+        return f'{self.namespace}:current:{name}'
+
+    def _payload_key(self, name, version):
+        return f'{self.namespace}:{name}:{version}'
+
+    def _lock_key(self, name):
+        return f'{self.namespace}:lock:{name}'
+
+    def get(self, name, compute):
+        entry = self.local.get(name)
+        if entry is not None and time.monotonic() - entry[2] < self.local_ttl:
+            return entry[1]
+
+        try:
+            version = cache.get(self._pointer_key(name))
+            if version is not None:
+                if entry is not None and entry[0] == version:
+                    self.local.touch(name)
+                    return entry[1]
+                payload = cache.get(self._payload_key(name, version))
+                if payload is not None:
+                    self.local.put(name, version, payload['value'])
+                    return payload['value']
+        except Exception as e:
+            logger.warning(f"Analytics cache read failed for {name}: {e}")
+        return self._single_flight(name, compute)
+
+    def publish(self, name, version, value, replace=True):
+        """
+        Store a freshly computed value and make it current in every process.
+        With ``replace=False`` the pointer is only set when there is none, so
+        a reader that computed before a commit cannot replace the version
+        the commit pushed.
+        """
+        self.local.put(name, version, value)
+        try:
+            cache.set(self._payload_key(name, version), {'value': value}, timeout=self.timeout)
+            if replace:
+                cache.set(self._pointer_key(name), version, timeout=self.timeout)
+            else:
+                cache.add(self._pointer_key(name), version, timeout=self.timeout)
+        except Exception as e:
+            logger.warning(f"Could not publish analytics cache entry {name}: {e}")
+
+    def invalidate(self, name):
+        self.local.pop(name)
+        try:
+            cache.delete(self._pointer_key(name))
+        except Exception as e:
+            logger.warning(f"Could not invalidate analytics cache entry {name}: {e}")
+
+    def clear_local(self):
+        self.local.clear()
+
+    def _compute(self, name, compute, shared=True):
+        version, value = compute()
+        if shared:
+            self.publish(name, version, value, replace=False)
+        else:
+            self.local.put(name, version, value)
+        return value
+
+    def _single_flight(self, name, compute):
+        with self._flights_lock:
+            flight = self._flights.get(name)
+            leader = flight is None
+            if leader:
+                flight = self._flights[name] = {'done': threading.Event(), 'value': None, 'error': None}
+        if not leader:
+            flight['done'].wait(LOCK_TIMEOUT)
+            if flight['error'] is None and flight['done'].is_set():
+                return flight['value']
+            return self._compute(name, compute, shared=False)
+
+        try:
+            flight['value'] = self._fill(name, compute)
+            return flight['value']
+        except Exception as e:
+            flight['error'] = e
+            raise
+        finally:
+            flight['done'].set()
+            with self._flights_lock:
+                self._flights.pop(name, None)
+
+    def _fill(self, name, compute):
+        """Compute under the cross-process lock, or wait for the process holding it."""
+        try:
+            acquired = cache.add(self._lock_key(name), 1, timeout=LOCK_TIMEOUT)
+        except Exception:
+            return self._compute(name, compute, shared=False)
+        if acquired:
+            try:
+                return self._compute(name, compute)
+            finally:
+                try:
+                    cache.delete(self._lock_key(name))
+                except Exception:
+                    pass
+
+        deadline = time.monotonic() + SINGLE_FLIGHT_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(SINGLE_FLIGHT_POLL)
+            try:
+                version = cache.get(self._pointer_key(name))
+                payload = cache.get(self._payload_key(name, version)) if version is not None else None
+            except Exception:
+                break
+            if payload is not None:
+                self.local.put(name, version, payload['value'])
+                return payload['value']
+        return self._compute(name, compute)
+
+
+def digest(*parts):
+    return hashlib.sha1('|'.join(str(p) for p in parts).encode()).hexdigest()[:16]
+
+
+def result_version(result):
+    return f'{result.pk}-{result.updated_at.timestamp():.6f}' if result is not None else 'none'
+
+
+results_cache = TwoTierCache('analytics:result')
+
+
+def _latest_completed(analysis_type):
+    from .models import AnalyticsResult
+
+    return AnalyticsResult.objects.filter(
+        analysis_type=analysis_type,
+        status='completed'
+    ).order_by('-created_at').first()
+
+
+def _serialize(result):
+    from .serializers import AnalyticsResultSerializer
+
+    return dict(AnalyticsResultSerializer(result).data) if result is not None else None
+
+
+def get_latest_result(analysis_type, on_miss=None):
+    """
+    Serialized latest completed result of ``analysis_type`` (None when there
+    is none). ``on_miss`` is called when it had to be read from the database.
+    """
+    def compute():
+        if on_miss is not None:
+            on_miss()
+        result = _latest_completed(analysis_type)
+        return result_version(result), _serialize(result)
+
+    return results_cache.get(analysis_type, compute)
+
+
+def refresh_result(analysis_type):
+    """Recompute ``analysis_type`` from the database and push it to every process."""
+    result = _latest_completed(analysis_type)
+    data = _serialize(result)
+    results_cache.publish(analysis_type, result_version(result), data)
+    return data
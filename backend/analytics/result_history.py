@@ -0,0 +1,80 @@
+"""
+Analytics result history used by ``get_analytics_history``.
+
+A history page lists results without their ``results`` body. Each row has
+the type, status and timestamps, the timings of the task that produced it,
+the payload size and the summary stored at save time (result_summary.py).
+Pages are keyset-paginated on (created_at, id) with a bounded ``limit``, so
+a page costs the same however large the results or the table are. The body
+of a single result is fetched from ``results/<id>/``.
+"""
+import base64
+import json
+
+from django.db.models import OuterRef, Q, Subquery
+from django.utils.dateparse import parse_datetime
+
+from .models import AnalyticsResult, AnalyticsTask
+from .serializers import AnalyticsResultSummarySerializer
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+HISTORY_FIELDS = (
+    'id', 'analysis_type', 'status', 'summary', 'payload_bytes', 'error_message',
+    'created_at', 'updated_at', 'processed_by_id',
+)
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(result) -> str:
+    raw = json.dumps([result.created_at.isoformat(), result.id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, result_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        created_at = parse_datetime(created_at)
+        if created_at is None:
+            raise ValueError
+        return created_at, int(result_id)
+    except Exception:
+        raise InvalidCursor('Invalid cursor')
+
+
+def history_queryset(analysis_type=None, status=None):
+    task = AnalyticsTask.objects.filter(result=OuterRef('pk')).order_by('-created_at')
+    qs = AnalyticsResult.objects.only(*HISTORY_FIELDS).annotate(
+        task_started_at=Subquery(task.values('started_at')[:1]),
+        task_completed_at=Subquery(task.values('completed_at')[:1]),
+    )
+    if analysis_type:
+        qs = qs.filter(analysis_type=analysis_type)
+    if status:
+        qs = qs.filter(status=status)
+    return qs.order_by('-created_at', '-id')
+
+
+def history_page(params):
+    """``{'results', 'next_cursor'}`` for the query parameters of a history request."""
+    try:
+        limit = int(params.get('limit') or DEFAULT_PAGE_SIZE)
+    except (TypeError, ValueError):
+        limit = DEFAULT_PAGE_SIZE
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    qs = history_queryset(params.get('type'), params.get('status'))
+    cursor = params.get('cursor')
+    if cursor:
+        created_at, result_id = decode_cursor(cursor)
+        qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=result_id))
+    rows = list(qs[:limit + 1])
+    page = rows[:limit]
+    return {
+        'results': AnalyticsResultSummarySerializer(page, many=True).data,
+        'next_cursor': encode_cursor(page[-1]) if len(rows) > limit else None,
+    }
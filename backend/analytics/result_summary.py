@@ -0,0 +1,71 @@
+"""
+Compact summaries of analytics results.
+
+``AnalyticsResult.results`` can hold full series, tables and base64 chart
+images. Listing pages only need a few headline numbers, so when a result is
+saved, ``summarize_results`` extracts a bounded set of KPIs and
+``payload_size`` records how large the body is. Both are stored on the row
+(``summary``, ``payload_bytes``). The history endpoint reads only those
+columns, and the body is fetched on demand from ``results/<id>/``.
+
+A summary holds:
+
+- ``kpis``: scalar values (numbers, booleans, short strings) from the top
+  level of the results and from one level of nested objects, keyed by their
+  dotted path;
+- ``sections``: the item count of each top-level list or object;
+- ``error``: the error message, when the analysis reported one.
+
+Both maps are capped, so a summary has a bounded size whatever the result.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+MAX_KPIS = 12
+MAX_SECTIONS = 12
+MAX_STRING_LENGTH = 80
+
+
+def payload_size(results):
+    """Size in bytes of ``results`` as compact JSON."""
+    return len(json.dumps(results, cls=DjangoJSONEncoder, separators=(',', ':')).encode('utf-8'))
+
+
+def _is_kpi(value):
+    if isinstance(value, bool) or value is None:
+        return True
+    if isinstance(value, (int, float)):
+        return True
+    return isinstance(value, str) and len(value) <= MAX_STRING_LENGTH
+
+
+def summarize_results(results):
+    if not isinstance(results, dict):
+        return {}
+    kpis = {}
+    sections = {}
+    nested = []
+    for key, value in results.items():
+        if key == 'error':
+            continue
+        if isinstance(value, (dict, list)):
+            if len(sections) < MAX_SECTIONS:
+                sections[key] = len(value)
+            if isinstance(value, dict):
+                nested.append((key, value))
+        elif _is_kpi(value) and len(kpis) < MAX_KPIS:
+            kpis[key] = value
+    # Nested objects (e.g. ``summary``, ``evaluation_metrics``) fill the remaining KPI slots.
+    for parent, value in nested:
+        for key, item in value.items():
+            if len(kpis) >= MAX_KPIS:
+                break
+            if not isinstance(item, (dict, list)) and _is_kpi(item):
+                kpis[f'{parent}.{key}'] = item
+
+    summary = {'kpis': kpis, 'sections': sections}
+    error = results.get('error')
+    if error:
+        summary['error'] = str(error)[:200]
+    return summary
@@ -0,0 +1,154 @@
+"""
+Retention for append-heavy tables.
+
+Each table has a policy: how many days of rows to keep, judged by a
+timestamp column. ``DATA_RETENTION`` in settings overrides the defaults
+below per table (``days``, ``batch_size``, ``pause``); ``days: None`` keeps
+a table forever.
+
+Expired rows are deleted in keyset-ordered batches on (timestamp, id):
+
+- each batch selects at most ``batch_size`` ids after the previous batch's
+  last key, so the timestamp index is never rescanned from the start
+  (where the just-deleted, not yet vacuumed rows are);
+- each batch is deleted in its own short transaction;
+- the job sleeps ``pause`` seconds between batches and stops after
+  ``DATA_RETENTION_MAX_SECONDS``, leaving the rest for the next run.
+
+These tables keep single-column primary keys and are referenced by foreign
+keys (``AnalyticsTask.result``), which PostgreSQL declarative partitioning
+does not allow, so retention is done with batched deletes rather than
+partition drops. Cascades still apply, one batch at a time.
+
+``retention_report`` is the dry run: what each policy would delete, without
+deleting anything (``manage.py apply_retention --dry-run``).
+"""
+import logging
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_PAUSE = 0.1
+
+# model label -> (timestamp field, default days)
+DEFAULT_POLICIES = {
+    'analytics.AnalyticsResult': ('created_at', 30),
+    'analytics.UsageEvent': ('created_at', 90),
+    'analytics.UsageEventRollup': ('hour', 2 * 365),
+    'analytics.UptimePing': ('created_at', 30),
+    'analytics.UptimeRollup': ('start', 90),
+    'analytics.DataUpdateLog': ('created_at', 30),
+    # Audit trail of access to patient archives
+    'operations.ArchiveAccessLog': ('accessed_at', 6 * 365),
+}
+
+
+class Policy:
+    def __init__(self, label, field, days, batch_size, pause):
+        self.label = label
+        self.field = field
+        self.days = days
+        self.batch_size = batch_size
+        self.pause = pause
+
+    @property
+    def model(self):
+        return apps.get_model(self.label)
+
+    def cutoff(self, now=None):
+        return (now or timezone.now()) - timedelta(days=self.days)
+
+    def expired(self, now=None):
+        return self.model._base_manager.filter(**{f'{self.field}__lt': self.cutoff(now)})
+
+
+def get_policies(labels=None):
+    """Configured policies, in ``DEFAULT_POLICIES`` order; unknown labels raise KeyError."""
+    overrides = getattr(settings, 'DATA_RETENTION', {})
+    policies = []
+    for label in labels or DEFAULT_POLICIES:
+        field, days = DEFAULT_POLICIES[label]
+        config = overrides.get(label, {})
+        policies.append(Policy(
+            label,
+            field,
+            config.get('days', days),
+            config.get('batch_size', getattr(settings, 'DATA_RETENTION_BATCH_SIZE', DEFAULT_BATCH_SIZE)),
+            config.get('pause', getattr(settings, 'DATA_RETENTION_BATCH_PAUSE', DEFAULT_PAUSE)),
+        ))
+    return policies
+
+
+def retention_report(labels=None, now=None):
+    """Dry run: one row per table with what its policy would delete."""
+    now = now or timezone.now()
+    rows = []
+    for policy in get_policies(labels):
+        row = {'table': policy.label, 'field': policy.field, 'days': policy.days,
+               'cutoff': None, 'expired': 0, 'oldest': None, 'batches': 0}
+        if policy.days is not None:
+            stats = policy.expired(now).aggregate(oldest=Min(policy.field), newest=Max(policy.field))
+            expired = policy.expired(now).count()
+            row.update(
+                cutoff=policy.cutoff(now).isoformat(),
+                expired=expired,
+                oldest=stats['oldest'].isoformat() if stats['oldest'] else None,
+                batches=-(-expired // policy.batch_size),
+            )
+        rows.append(row)
+    return rows
+
+
+def purge(policy, now=None, deadline=None):
+    """
+    Delete ``policy``'s expired rows in batches; returns the number of rows
+    deleted (cascades excluded). Stops early at ``deadline`` (monotonic time).
+    """
+    if policy.days is None:
+        return 0
+    model = policy.model
+    field = policy.field
+    expired = policy.expired(now).order_by(field, 'pk')
+    deleted = 0
+    last = None
+    while True:
+        batch = expired
+        if last is not None:
+            batch = batch.filter(Q(**{f'{field}__gt': last[0]}) | Q(**{field: last[0], 'pk__gt': last[1]}))
+        keys = list(batch.values_list(field, 'pk')[:policy.batch_size])
+        if not keys:
+            break
+        with transaction.atomic():
+            _, per_model = model._base_manager.filter(pk__in=[pk for _, pk in keys]).delete()
+        deleted += per_model.get(model._meta.label, 0)
+        last = keys[-1]
+        if len(keys) < policy.batch_size:
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            logger.info(f"Retention for {policy.label} paused after {deleted} rows; continuing next run")
+            break
+        if policy.pause:
+            time.sleep(policy.pause)
+    return deleted
+
+
+def apply_retention(labels=None, now=None, max_seconds=None):
+    """Run every configured policy; returns ``{label: rows deleted}``."""
+    if max_seconds is None:
+        max_seconds = getattr(settings, 'DATA_RETENTION_MAX_SECONDS', 300)
+    deadline = time.monotonic() + max_seconds if max_seconds else None
+    results = {}
+    for policy in get_policies(labels):
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        results[policy.label] = purge(policy, now, deadline)
+        logger.info(f"Retention: {results[policy.label]} {policy.label} rows older than {policy.days} days deleted")
+    return results
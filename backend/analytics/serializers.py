@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import AnalyticsResult, AnalyticsTask, DataUpdateLog, AnalyticsCache, UsageEvent, UptimePing
+from .models import AnalyticsResult, AnalyticsTask, DataUpdateLog, UsageEvent, UptimePing
 
 class AnalyticsResultSerializer(serializers.ModelSerializer):
     analysis_type_display = serializers.CharField(source='get_analysis_type_display', read_only=True)
@@ -18,6 +18,30 @@ class AnalyticsResultSerializer(serializers.ModelSerializer):
     def get_created_at_formatted(self, obj):
         return obj.created_at.strftime('%Y-%m-%d %H:%M:%S')
 
+class AnalyticsResultSummarySerializer(serializers.ModelSerializer):
+    """History row: metadata and the stored summary, without the results body"""
+    analysis_type_display = serializers.CharField(source='get_analysis_type_display', read_only=True)
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    started_at = serializers.DateTimeField(source='task_started_at', read_only=True, default=None)
+    completed_at = serializers.DateTimeField(source='task_completed_at', read_only=True, default=None)
+    duration_ms = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AnalyticsResult
+        fields = [
+            'id', 'analysis_type', 'analysis_type_display', 'status', 'status_display',
+            'summary', 'payload_bytes', 'error_message', 'created_at', 'updated_at',
+            'started_at', 'completed_at', 'duration_ms', 'processed_by'
+        ]
+        read_only_fields = fields
+
+    def get_duration_ms(self, obj):
+        started = getattr(obj, 'task_started_at', None)
+        completed = getattr(obj, 'task_completed_at', None)
+        if started and completed:
+            return int((completed - started).total_seconds() * 1000)
+        return None
+
 class AnalyticsTaskSerializer(serializers.ModelSerializer):
     analysis_type_display = serializers.CharField(source='get_analysis_type_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
@@ -43,14 +67,6 @@ class DataUpdateLogSerializer(serializers.ModelSerializer):
         fields = ['id', 'model_name', 'record_id', 'action', 'triggered_analytics', 'created_at']
         read_only_fields = ['id', 'created_at']
 
-class AnalyticsCacheSerializer(serializers.ModelSerializer):
-    is_expired = serializers.BooleanField(read_only=True)
-    
-    class Meta:
-        model = AnalyticsCache
-        fields = ['id', 'cache_key', 'data', 'expires_at', 'created_at', 'is_expired']
-        read_only_fields = ['id', 'created_at']
-
 class AnalyticsRequestSerializer(serializers.Serializer):
     """Serializer for analytics request parameters"""
     analysis_type = serializers.ChoiceField(choices=AnalyticsResult.ANALYSIS_TYPES)
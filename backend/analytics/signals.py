@@ -1,4 +1,5 @@
 from django.db.models.signals import post_save, post_delete
+from django.db import transaction
 from django.dispatch import receiver
 from django.utils import timezone
 import uuid
@@ -6,6 +7,9 @@ import logging
 
 from backend.users.models import PatientProfile, User
 from .models import AnalyticsResult
+from .events import publish_result_event
+from .dashboard_snapshot import rebuild_snapshots
+from .result_cache import refresh_result
 
 # Import tasks with error handling
 try:
@@ -71,6 +75,14 @@ from backend.operations.models import Notification
 #         logger.error(f"Error in appointment_saved signal: {str(e)}")
 
 
+def _refresh_analytics_caches(analysis_type):
+    try:
+        refresh_result(analysis_type)
+        rebuild_snapshots()
+    except Exception as e:
+        logger.error(f"Error refreshing analytics caches for {analysis_type}: {str(e)}")
+
+
 @receiver(post_save, sender=AnalyticsResult)
 def analytics_result_completed(sender, instance, created, **kwargs):
     """
@@ -79,6 +91,12 @@ def analytics_result_completed(sender, instance, created, **kwargs):
     try:
         # Only notify when analytics are completed (not when created or failed)
         if instance.status == 'completed':
+            # Push the new version to the shared analytics cache and dashboard
+            # snapshots, then wake connected dashboards (analytics_stream)
+            analysis_type = instance.analysis_type
+            transaction.on_commit(lambda: _refresh_analytics_caches(analysis_type))
+            publish_result_event(instance)
+
             # Get all doctors to notify them about new analytics findings
             doctors = User.objects.filter(role='doctor', is_active=True)
             
@@ -0,0 +1,275 @@
+"""
+Vectorized synthetic data for AI model training, benchmarks and load tests.
+
+Every random value of a batch is drawn at once from one seeded
+``numpy.random.Generator`` into arrays (``draw_samples``). The same seed
+gives the same batch, and the batch can be emitted as:
+
+- ``synthetic_samples``: analytics dicts in the format ``train_models`` and
+  ``generate_insights`` take (what ``generate_synthetic_data`` returns);
+- ``synthetic_features``: the ``FEATURE_COLUMNS`` matrix and encoded labels,
+  built straight from the arrays without any dicts. Its rows equal
+  ``extract_features`` of the dicts from the same seed.
+
+The risk level of a sample follows from its draws, as before: a sample is
+high risk when more than 40% of patients are aged 51 and over and at least
+two conditions are increasing. It is moderate risk when either holds. The
+chi-square statistic, p-value and forecast trend are drawn to match the
+risk level.
+
+``copy_patient_records`` bulk-loads ``PatientRecord`` rows for analytics
+benchmarks. It streams CSV chunks through ``COPY`` on PostgreSQL and falls
+back to ``bulk_create`` elsewhere.
+"""
+import io
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .ai_features import AGE_BANDS, FEATURE_COLUMNS, FORECAST_MONTHS, TOP_ILLNESSES
+
+CHRONIC_CONDITIONS = np.array([
+    'Hypertension', 'Diabetes', 'Heart Disease', 'Asthma', 'Arthritis',
+    'Depression', 'Anxiety', 'Obesity', 'High Cholesterol', 'Migraine',
+])
+ACUTE_CONDITIONS = np.array(['Flu', 'Cold', 'Bronchitis', 'Pneumonia', 'Gastroenteritis'])
+STABLE_CONDITIONS = np.array(['Allergies', 'Eczema', 'Psoriasis', 'Gout', 'Osteoporosis'])
+
+# [low, high) of each age band's patient count, in AGE_BANDS order
+AGE_BAND_RANGES = ((10, 100), (20, 150), (15, 120), (10, 80), (5, 60))
+
+LOW, MODERATE, HIGH = 0, 1, 2
+ASSOCIATION_RESULTS = (
+    'Weak or no association found between analyzed factors',
+    'Moderate association found between patient factors and health outcomes',
+    'Strong positive association found between age and chronic conditions',
+)
+SIGNIFICANT_FACTORS = (
+    ['Age (p < 0.05)', 'Family history (p < 0.1)', 'Lifestyle factors (p < 0.2)'],
+    ['Age (p < 0.05)', 'Family history (p < 0.01)', 'Lifestyle factors (p < 0.05)'],
+    ['Age (p < 0.001)', 'Family history (p < 0.01)', 'Lifestyle factors (p < 0.05)'],
+)
+SURGE_RISK_FACTORS = ['Seasonal flu outbreak', 'Increased emergency visits', 'Staff shortage periods']
+# [low, high) of the chi-square statistic and p-value per risk level
+CHI_SQUARE_RANGES = np.array([(5.0, 14.9), (15.0, 29.9), (30.0, 45.0)])
+P_VALUE_RANGES = np.array([(0.05, 0.2), (0.01, 0.04), (0.001, 0.01)])
+CASE_MULTIPLIERS = np.array([1.0, 1.2, 1.5])
+
+
+def _trend_factors():
+    # Forecast trend per risk level and month: falling, flat, rising.
+    months = np.arange(1, FORECAST_MONTHS + 1)
+    return np.vstack([1.0 / (1.05 * months), np.ones(FORECAST_MONTHS), 1.1 * months])
+
+
+def _subsets(rng, n, pool_size, count):
+    """Row-wise random permutations of ``range(pool_size)``, cut to ``count`` columns."""
+    return rng.random((n, pool_size)).argsort(axis=1)[:, :count]
+
+
+def draw_samples(num_samples, seed=None):
+    """All random draws of ``num_samples`` samples, as a dict of arrays with one row per sample."""
+    rng = np.random.default_rng(seed)
+    n = num_samples
+    draws = {
+        'ages': np.column_stack([rng.integers(low, high, n) for low, high in AGE_BAND_RANGES]),
+        'genders': rng.integers(40, 60, (n, 2)),
+        'total_patients': rng.integers(100, 500, n),
+        'average_age': np.round(rng.uniform(25, 65, n), 1),
+        'increasing': _subsets(rng, n, len(CHRONIC_CONDITIONS), 3),
+        'increasing_count': rng.integers(1, 4, n),
+        'decreasing': _subsets(rng, n, len(ACUTE_CONDITIONS), 2),
+        'decreasing_count': rng.integers(1, 3, n),
+        'stable': _subsets(rng, n, len(STABLE_CONDITIONS), 2),
+        'stable_count': rng.integers(1, 3, n),
+        'top_illnesses': _subsets(rng, n, len(CHRONIC_CONDITIONS), TOP_ILLNESSES),
+        'top_counts': rng.integers(5, 25, (n, TOP_ILLNESSES)),
+        'model_accuracy': np.round(rng.uniform(85, 95, n), 1),
+    }
+
+    ages = draws['ages']
+    elderly_ratio = (ages[:, 3] + ages[:, 4]) / ages.sum(axis=1)
+    rising = draws['increasing_count'] >= 2
+    risk = np.where((elderly_ratio > 0.4) & rising, HIGH,
+                    np.where((elderly_ratio > 0.3) | rising, MODERATE, LOW))
+    draws['risk'] = risk
+
+    chi, p = CHI_SQUARE_RANGES[risk], P_VALUE_RANGES[risk]
+    draws['chi_square'] = np.round(rng.uniform(chi[:, 0], chi[:, 1]), 2)
+    draws['p_value'] = np.round(rng.uniform(p[:, 0], p[:, 1]), 4)
+
+    scale = CASE_MULTIPLIERS[risk][:, None] * _trend_factors()[risk]
+    draws['forecast'] = (rng.integers(50, 150, (n, FORECAST_MONTHS)) * scale).astype(np.int64)
+    draws['forecast_lower'] = (rng.integers(30, 50, (n, FORECAST_MONTHS)) * scale).astype(np.int64)
+    draws['forecast_upper'] = (rng.integers(150, 250, (n, FORECAST_MONTHS)) * scale).astype(np.int64)
+    return draws
+
+
+def synthetic_features(num_samples=100, seed=None):
+    """``(X, y)``: the FEATURE_COLUMNS matrix and encoded risk labels of a synthetic batch."""
+    d = draw_samples(num_samples, seed)
+    X = np.empty((num_samples, len(FEATURE_COLUMNS)), dtype=np.float64)
+    columns = [
+        d['ages'], d['genders'], d['total_patients'], d['average_age'], d['top_counts'],
+        d['increasing_count'], d['decreasing_count'], d['stable_count'],
+        d['chi_square'], d['p_value'], np.full(num_samples, 95),
+        d['forecast'], d['model_accuracy'],
+    ]
+    start = 0
+    for values in columns:
+        width = values.shape[1] if values.ndim == 2 else 1
+        X[:, start:start + width] = values.reshape(num_samples, width)
+        start += width
+    return X, d['risk'].astype(np.int64)
+
+
+def synthetic_samples(num_samples=100, seed=None, now=None):
+    """Synthetic analytics dicts (patient_demographics, health_trends, illness_prediction, surge_prediction)."""
+    d = draw_samples(num_samples, seed)
+    now = now or timezone.now()
+    week_dates = [(now - timedelta(days=7 * i)).strftime('%Y-%m-%d') for i in range(TOP_ILLNESSES)]
+    forecast_months = [(now + timedelta(days=30 * i)).strftime('%Y-%m') for i in range(1, FORECAST_MONTHS + 1)]
+
+    # Python lists of Python scalars, so the loop below only indexes
+    columns = {key: values.tolist() for key, values in d.items()}
+    increasing = CHRONIC_CONDITIONS[d['increasing']].tolist()
+    decreasing = ACUTE_CONDITIONS[d['decreasing']].tolist()
+    stable = STABLE_CONDITIONS[d['stable']].tolist()
+    top_illnesses = CHRONIC_CONDITIONS[d['top_illnesses']].tolist()
+
+    samples = []
+    for i in range(num_samples):
+        risk = columns['risk'][i]
+        forecast = columns['forecast'][i]
+        lower, upper = columns['forecast_lower'][i], columns['forecast_upper'][i]
+        samples.append({
+            'patient_demographics': {
+                'age_distribution': dict(zip(AGE_BANDS, columns['ages'][i])),
+                'gender_proportions': dict(zip(('Male', 'Female'), columns['genders'][i])),
+                'total_patients': columns['total_patients'][i],
+                'average_age': columns['average_age'][i],
+            },
+            'health_trends': {
+                'top_illnesses_by_week': [
+                    {'medical_condition': condition, 'count': count, 'date_of_admission': date}
+                    for condition, count, date in zip(top_illnesses[i], columns['top_counts'][i], week_dates)
+                ],
+                'trend_analysis': {
+                    'increasing_conditions': increasing[i][:columns['increasing_count'][i]],
+                    'decreasing_conditions': decreasing[i][:columns['decreasing_count'][i]],
+                    'stable_conditions': stable[i][:columns['stable_count'][i]],
+                },
+            },
+            'illness_prediction': {
+                'association_result': ASSOCIATION_RESULTS[risk],
+                'chi_square_statistic': columns['chi_square'][i],
+                'p_value': columns['p_value'][i],
+                'confidence_level': 95,
+                'significant_factors': list(SIGNIFICANT_FACTORS[risk]),
+            },
+            'surge_prediction': {
+                'forecasted_monthly_cases': [
+                    {'date': month, 'total_cases': forecast[m],
+                     'confidence_interval': {'lower': lower[m], 'upper': upper[m]}}
+                    for m, month in enumerate(forecast_months)
+                ],
+                'risk_factors': list(SURGE_RISK_FACTORS),
+                'model_accuracy': columns['model_accuracy'][i],
+            },
+        })
+    return samples
+
+
+# PatientRecord datasets -------------------------------------------------------
+
+RECORD_CONDITIONS = np.array([
+    'Hypertension', 'Diabetes', 'Heart Disease', 'Asthma', 'Arthritis',
+    'Depression', 'Anxiety', 'Obesity', 'High Cholesterol', 'Migraine',
+    'Pneumonia', 'Bronchitis', 'Flu', 'Cold', 'Fever',
+    'Gastroenteritis', 'Appendicitis', 'Fracture', 'Sprain', 'Burn',
+])
+RECORD_MEDICATIONS = np.array([
+    'Metformin', 'Lisinopril', 'Atorvastatin', 'Omeprazole', 'Albuterol',
+    'Sertraline', 'Lorazepam', 'Ibuprofen', 'Acetaminophen', 'Aspirin',
+    'Amoxicillin', 'Ciprofloxacin', 'Prednisone', 'Warfarin', 'Insulin',
+    'Furosemide', 'Digoxin', 'Morphine', 'Codeine', 'Tramadol',
+])
+RECORD_GENDERS = np.array(['Male', 'Female', 'Other'])
+RECORD_SEVERITIES = np.array(['Low', 'Medium', 'High', 'Critical'])
+RECORD_OUTCOMES = np.array(['Recovered', 'Ongoing', 'Transferred', 'Deceased'])
+RECORD_COLUMNS = (
+    'patient_id', 'date_of_admission', 'medical_condition', 'age', 'gender',
+    'medication', 'severity', 'treatment_outcome', 'created_at', 'updated_at',
+)
+# Share of records without a medication
+NO_MEDICATION_RATE = 0.3
+DEFAULT_COPY_BATCH_SIZE = 100000
+
+
+def synthetic_patient_records(num_records, patient_ids, rng, now=None, days=730):
+    """
+    A DataFrame of ``num_records`` PatientRecord rows (``RECORD_COLUMNS``)
+    admitted in the last ``days`` days. Timestamps are ISO 8601 strings in
+    UTC, formatted in bulk, since formatting datetimes row by row is what
+    would dominate a large load.
+    """
+    now = now or timezone.now()
+    start = np.datetime64(int((now - timedelta(days=days)).timestamp()), 's')
+    admitted = np.char.add(np.datetime_as_string(start + rng.integers(0, days * 86400, num_records)), 'Z')
+    medication = RECORD_MEDICATIONS[rng.integers(0, len(RECORD_MEDICATIONS), num_records)].astype(object)
+    medication[rng.random(num_records) < NO_MEDICATION_RATE] = None
+    stamp = now.isoformat()
+    return pd.DataFrame({
+        'patient_id': rng.choice(np.asarray(patient_ids), num_records),
+        'date_of_admission': admitted,
+        'medical_condition': RECORD_CONDITIONS[rng.integers(0, len(RECORD_CONDITIONS), num_records)],
+        'age': rng.integers(18, 81, num_records),
+        'gender': RECORD_GENDERS[rng.integers(0, len(RECORD_GENDERS), num_records)],
+        'medication': medication,
+        'severity': RECORD_SEVERITIES[rng.integers(0, len(RECORD_SEVERITIES), num_records)],
+        'treatment_outcome': RECORD_OUTCOMES[rng.integers(0, len(RECORD_OUTCOMES), num_records)],
+        'created_at': stamp,
+        'updated_at': stamp,
+    }, columns=RECORD_COLUMNS)
+
+
+def _copy_frame(cursor, table, frame):
+    # Empty unquoted CSV fields load as NULL.
+    buffer = io.StringIO()
+    frame.to_csv(buffer, header=False, index=False)
+    buffer.seek(0)
+    sql = f"COPY {table} ({', '.join(frame.columns)}) FROM STDIN WITH (FORMAT csv)"
+    if hasattr(cursor, 'copy_expert'):  # psycopg2
+        cursor.copy_expert(sql, buffer)
+    else:  # psycopg 3
+        with cursor.copy(sql) as copy:
+            copy.write(buffer.getvalue())
+
+
+def copy_patient_records(num_records, patient_ids, seed=None, batch_size=DEFAULT_COPY_BATCH_SIZE, now=None):
+    """
+    Insert ``num_records`` synthetic PatientRecord rows for ``patient_ids``,
+    ``batch_size`` rows per chunk. Returns the number of rows inserted.
+    """
+    from .models import PatientRecord
+
+    rng = np.random.default_rng(seed)
+    now = now or timezone.now()
+    table = PatientRecord._meta.db_table
+    inserted = 0
+    with transaction.atomic():
+        while inserted < num_records:
+            frame = synthetic_patient_records(min(batch_size, num_records - inserted), patient_ids, rng, now)
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    _copy_frame(cursor, table, frame)
+            else:
+                PatientRecord.objects.bulk_create(
+                    [PatientRecord(**row) for row in frame.to_dict('records')],
+                    batch_size=1000,
+                )
+            inserted += len(frame)
+    return inserted
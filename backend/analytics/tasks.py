@@ -7,7 +7,12 @@ from django.db import transaction
 from celery import shared_task
 from celery.utils.log import get_task_logger
 
-from .models import AnalyticsResult, AnalyticsTask, DataUpdateLog, AnalyticsCache, PatientRecord
+from .models import AnalyticsResult, AnalyticsTask, DataUpdateLog, PatientRecord
+from .result_cache import refresh_result
+from .dashboard_snapshot import rebuild_snapshots
+from .retention import apply_retention
+from .usage_events import ROLLUP_LOOKBACK_HOURS, rollup_usage_events as build_usage_rollups
+from .uptime import rollup_uptime as build_uptime_rollups
 
 # Import analytics functions with error handling
 try:
@@ -73,6 +78,9 @@ def run_analytics_task_async(self, task_id, analysis_type):
             results = perform_patient_health_trends(df)
         elif analysis_type == 'patient_demographics':
             results = analyze_patient_demographics(df)
+            # Registered patients, aggregated from the precomputed PatientSummary ages.
+            from backend.users.patient_summary import patient_demographics_summary
+            results['patient_directory'] = patient_demographics_summary()
         elif analysis_type == 'illness_prediction':
             results = analyze_illness_prediction_chi_square(df)
         elif analysis_type == 'medication_analysis':
@@ -166,31 +174,63 @@ def process_data_update_analytics(model_name, record_id, action):
         logger.error(f"Error processing data update analytics: {str(exc)}")
 
 @shared_task
-def cleanup_old_analytics():
+def apply_data_retention():
     """
-    Clean up old analytics results and cache
+    Delete rows past their retention period (see retention.py) in throttled
+    batches. Runs nightly; a run that hits its time budget resumes next night.
     """
     try:
-        # Delete analytics results older than 30 days
-        cutoff_date = timezone.now() - timedelta(days=30)
-        old_results = AnalyticsResult.objects.filter(created_at__lt=cutoff_date)
-        deleted_count = old_results.count()
-        old_results.delete()
-        
-        # Delete expired cache entries
-        expired_cache = AnalyticsCache.objects.filter(expires_at__lt=timezone.now())
-        expired_count = expired_cache.count()
-        expired_cache.delete()
-        
-        logger.info(f"Cleanup completed: {deleted_count} old results, {expired_count} expired cache entries deleted")
-        
+        deleted = apply_retention()
+        logger.info(f"Retention completed: {deleted}")
+        return deleted
+    except Exception as exc:
+        logger.error(f"Error during retention: {str(exc)}")
+
+@shared_task
+def rollup_usage_events(hours=ROLLUP_LOOKBACK_HOURS):
+    """
+    Rebuild the hourly usage event rollups of the last ``hours`` hours.
+    Pass a larger ``hours`` once to backfill.
+    """
+    try:
+        written = build_usage_rollups(hours=hours)
+        logger.info(f"Usage rollup completed: {written} hourly rows")
+        return written
     except Exception as exc:
-        logger.error(f"Error during cleanup: {str(exc)}")
+        logger.error(f"Error during usage rollup: {str(exc)}")
+
+@shared_task
+def rollup_uptime():
+    """Rebuild the recent per-minute and per-hour uptime rollups (see uptime.py)."""
+    try:
+        minutes, hours = build_uptime_rollups()
+        logger.info(f"Uptime rollup completed: {minutes} minute rows, {hours} hour rows")
+        return minutes, hours
+    except Exception as exc:
+        logger.error(f"Error during uptime rollup: {str(exc)}")
+
+@shared_task
+def train_ai_models(force=False):
+    """
+    Train a new AI insights model version on AnalyticsResult history and
+    promote it if it beats the current one (see model_registry.py). Serving
+    processes pick up a promoted version within AI_MODEL_RELOAD_SECONDS.
+    """
+    try:
+        from .model_registry import run_training
+
+        report = run_training(force=force)
+        logger.info(f"AI model training {report['status']}: {report}")
+        return report
+    except Exception as exc:
+        logger.error(f"Error training AI models: {str(exc)}")
 
 @shared_task
 def refresh_analytics_cache():
     """
-    Refresh analytics cache with latest results
+    Warm the shared analytics cache (result_cache.py) with the latest result
+    of every analysis type and the dashboard snapshots. New results are pushed
+    as they complete; this only repairs entries lost to eviction or restarts.
     """
     try:
         analysis_types = [
@@ -200,34 +240,14 @@ def refresh_analytics_cache():
             'medication_analysis',
             'patient_volume_prediction',
             'illness_surge_prediction',
+            'monthly_illness_forecast',
             'performance_factors',
             'ai_insights'
         ]
         
         for analysis_type in analysis_types:
-            # Get latest result
-            latest_result = AnalyticsResult.objects.filter(
-                analysis_type=analysis_type,
-                status='completed'
-            ).order_by('-created_at').first()
-            
-            if latest_result:
-                # Cache the result
-                cache_key = f"analytics_{analysis_type}"
-                cache_data = {
-                    'results': latest_result.results,
-                    'updated_at': latest_result.updated_at.isoformat(),
-                    'analysis_type': analysis_type
-                }
-                
-                # Store in database cache
-                AnalyticsCache.objects.update_or_create(
-                    cache_key=cache_key,
-                    defaults={
-                        'data': cache_data,
-                        'expires_at': timezone.now() + timedelta(hours=1)
-                    }
-                )
+            refresh_result(analysis_type)
+        rebuild_snapshots()
         
         logger.info("Analytics cache refreshed successfully")
         
@@ -249,9 +269,6 @@ def run_scheduled_analytics():
         # Refresh cache
         refresh_analytics_cache.apply()
         
-        # Cleanup old data
-        cleanup_old_analytics.apply()
-        
         logger.info("Scheduled analytics completed")
         
     except Exception as exc:
@@ -0,0 +1,843 @@
+import asyncio
+import gzip
+import io
+import json
+import os
+import tempfile
+import time
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock, skipUnless
+
+import numpy as np
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from backend.users.models import User
+from backend.analytics.ai_features import FEATURE_COLUMNS, FEATURE_SCHEMA_VERSION, extract_features, extract_labels
+from backend.analytics.ai_insights_model import MediSyncAIInsights, generate_synthetic_data
+from backend.analytics import model_registry
+from backend.analytics.clinical_rules import (
+    ALERT_PLAN, CONSENSUS_RISK_LEVELS, RECOMMENDATION_PLAN, alert_facts, recommendation_facts,
+)
+from backend.analytics.events import (
+    AnalyticsEventHub, SUBSCRIBER_QUEUE_SIZE, event_id, get_hub, parse_event_id, result_event,
+)
+from backend.analytics.dashboard_snapshot import get_snapshot, latest_results
+from backend.analytics.load_testing import (
+    AIOHTTP_AVAILABLE, SCENARIOS, LatencyHistogram, LoadTest, diff_reports, save_report,
+)
+from backend.analytics.models import (
+    AnalyticsResult, AnalyticsTask, PatientRecord, UptimePing, UptimeRollup, UsageEvent, UsageEventRollup,
+)
+from backend.analytics.retention import apply_retention, retention_report
+from backend.analytics.synthetic_data import copy_patient_records, synthetic_features, synthetic_samples
+from backend.analytics.result_cache import TwoTierCache
+from backend.analytics.result_summary import MAX_KPIS, summarize_results
+from backend.analytics import usage_events
+from backend.analytics.uptime import latest_pings, rollup_uptime, uptime_summary
+
+
+class LatencyHistogramTests(TestCase):
+    def test_nearest_rank_percentiles(self):
+        histogram = LatencyHistogram()
+        for ms in range(1, 101):
+            histogram.record(ms)
+        # Nearest rank over 1..100 ms: p50 is the 50th value, p95 the 95th, p99 the 99th.
+        self.assertAlmostEqual(histogram.percentile(50), 50, delta=50 * 0.008)
+        self.assertAlmostEqual(histogram.percentile(95), 95, delta=95 * 0.008)
+        self.assertAlmostEqual(histogram.percentile(99), 99, delta=99 * 0.008)
+        self.assertEqual(histogram.percentile(100), 100)
+
+    def test_small_samples_do_not_undershoot(self):
+        histogram = LatencyHistogram()
+        for ms in (1, 2, 3, 4, 500):
+            histogram.record(ms)
+        self.assertEqual(histogram.percentile(95), 500)
+
+    def test_merge_and_summary(self):
+        a, b = LatencyHistogram(), LatencyHistogram()
+        a.record(10)
+        b.record(30)
+        summary = a.merge(b).summary()
+        self.assertEqual(summary['avg_latency_ms'], 20)
+        self.assertEqual(summary['max_latency_ms'], 30)
+        self.assertEqual(LatencyHistogram().summary()['p95_latency_ms'], None)
+
+
+def _report(p95, label):
+    endpoint = {'requests': 10, 'success_count': 10, 'p50_latency_ms': 5.0, 'p95_latency_ms': p95,
+                'p99_latency_ms': p95}
+    summary = {'total_requests': 10, 'success_rate': 100.0, 'p50_latency_ms': 5.0, 'p95_latency_ms': p95,
+               'p99_latency_ms': p95}
+    return {'label': label, 'groups': {'patient': {'endpoints': {'join_queue': endpoint}, 'summary': summary}}}
+
+
+class LoadTestReportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            email='lt_admin@example.com', password='testpass', role='admin', full_name='Admin'
+        )
+        self.client.force_authenticate(self.admin)
+
+    def test_diff_reports_change_pct(self):
+        rows = diff_reports(_report(100.0, 'before'), _report(150.0, 'after'))
+        p95 = [r for r in rows if r['endpoint'] == 'join_queue' and r['metric'] == 'p95_latency_ms']
+        self.assertEqual(p95[0]['change_pct'], 50.0)
+        self.assertIn('*', {r['endpoint'] for r in rows})
+
+    def test_stress_test_serves_latest_report(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(LOAD_TEST_REPORT_DIR=directory):
+            response = self.client.get('/api/analytics/stress-test/')
+            self.assertEqual(response.status_code, 404)
+
+            path = save_report(_report(42.0, 'r1'))
+            self.assertEqual(os.path.dirname(path), directory)
+            with open(path) as fh:
+                self.assertEqual(json.load(fh)['label'], 'r1')
+
+            response = self.client.get('/api/analytics/stress-test/', {'group': 'patient'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['data']['groups']['patient']['summary']['p95_latency_ms'], 42.0)
+            self.assertEqual(self.client.get('/api/analytics/stress-test/', {'group': 'x'}).status_code, 400)
+
+
+@skipUnless(AIOHTTP_AVAILABLE, 'aiohttp is not installed')
+class LoadTestSubscriptionTests(TestCase):
+    async def _subscribe(self, origin=None):
+        import aiohttp
+        from aiohttp import web
+
+        origins = []
+
+        async def queue_socket(request):
+            # Like AllowedHostsOriginValidator: a handshake without an allowed Origin is refused
+            origins.append(request.headers.get('Origin'))
+            if request.headers.get('Origin') != base_url:
+                raise web.HTTPForbidden()
+            ws = web.WebSocketResponse()
+            await ws.prepare(request)
+            await ws.send_str('{"type": "queue_update"}')
+            await ws.close()
+            return ws
+
+        app = web.Application()
+        app.router.add_get('/ws/queue/OPD/{user_id}/', queue_socket)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        base_url = f"http://127.0.0.1:{runner.addresses[0][1]}"
+        try:
+            test = LoadTest(base_url, {'patient': [{'access': 'token', 'user_id': 7}]}, {'patient': 1}, origin=origin)
+            async with aiohttp.ClientSession() as session:
+                await test._subscribe(session, 'patient', SCENARIOS['patient'].subscriptions[0], 7)
+        finally:
+            await runner.cleanup()
+        return test._subscriptions[('patient', 'queue_updates')].report(), origins, base_url
+
+    def test_queue_subscription_sends_origin_and_connects(self):
+        report, origins, base_url = asyncio.run(self._subscribe())
+        self.assertEqual(origins, [base_url])
+        self.assertEqual((report['connections'], report['messages'], report['errors']), (1, 1, {}))
+
+    def test_foreign_origin_is_counted_as_an_error(self):
+        report, origins, _ = asyncio.run(self._subscribe(origin='http://elsewhere.example'))
+        self.assertEqual(origins, ['http://elsewhere.example'])
+        self.assertEqual(report['connections'], 0)
+        self.assertTrue(report['errors'])
+
+
+class AnalyticsStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='stream_doc@example.com', password='testpass', role='doctor', full_name='Dr. Stream'
+        )
+        self.auth = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+    async def _read(self, chunks, count):
+        return [(await anext(chunks)).decode() for _ in range(count)]
+
+    async def test_requires_token(self):
+        response = await self.async_client.get('/api/analytics/stream/')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_last_event_id_replays_only_missed_results(self):
+        seen = await AnalyticsResult.objects.acreate(analysis_type='patient_demographics', status='completed')
+        missed = await AnalyticsResult.objects.acreate(
+            analysis_type='illness_prediction', status='completed', results={'chart': 'x' * 5000}
+        )
+        await AnalyticsResult.objects.acreate(analysis_type='full_analysis', status='pending')
+
+        response = await self.async_client.get(
+            '/api/analytics/stream/', headers={**self.auth, 'Last-Event-ID': event_id(seen.updated_at, seen.pk)}
+        )
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = response.streaming_content
+        retry, event = await self._read(chunks, 2)
+        self.assertTrue(retry.startswith('retry: '))
+        self.assertIn('event: analytics_result', event)
+        self.assertIn(f'id: {event_id(missed.updated_at, missed.pk)}', event)
+        data = json.loads(event.split('data: ', 1)[1])
+        self.assertEqual(data, {'type': 'illness_prediction', 'id': missed.pk,
+                                'updated_at': missed.updated_at.isoformat()})
+
+        # Live events: the replayed one is not sent twice.
+        newer = await AnalyticsResult.objects.acreate(analysis_type='full_analysis', status='completed')
+        hub = get_hub()
+        hub.dispatch(json.dumps(result_event(missed)))
+        hub.dispatch(json.dumps(result_event(newer)))
+        (live,) = await self._read(chunks, 1)
+        self.assertIn(f'id: {event_id(newer.updated_at, newer.pk)}', live)
+        await chunks.aclose()
+
+    def test_event_id_round_trip(self):
+        result = AnalyticsResult.objects.create(analysis_type='patient_demographics', status='completed')
+        self.assertEqual(parse_event_id(event_id(result.updated_at, result.pk)), (result.updated_at, result.pk))
+        self.assertIsNone(parse_event_id('garbage'))
+
+    async def test_hub_fans_out_and_drops_slow_consumers(self):
+        async def idle(hub):
+            await asyncio.sleep(3600)
+
+        with mock.patch.object(AnalyticsEventHub, '_listen', idle):
+            hub = AnalyticsEventHub()
+            fast, slow = hub.subscribe(), hub.subscribe()
+            for i in range(SUBSCRIBER_QUEUE_SIZE):
+                hub.dispatch(json.dumps({'id': i}))
+                fast.get_nowait()
+            hub.dispatch(json.dumps({'id': 'overflow'}))
+            self.assertEqual(fast.get_nowait(), {'id': 'overflow'})
+            self.assertEqual(hub.subscriber_count, 1)
+            self.assertIsNone(slow.get_nowait())  # told to end its stream
+            hub.unsubscribe(fast)
+            self.assertIsNone(hub._listener)
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'snapshots'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class DashboardSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.doctor = User.objects.create_user(
+            email='snap_doc@example.com', password='testpass', role='doctor', full_name='Dr. Snap'
+        )
+        self.nurse = User.objects.create_user(
+            email='snap_nurse@example.com', password='testpass', role='nurse', full_name='Nurse Snap'
+        )
+
+    def _result(self, analysis_type, results, status='completed'):
+        return AnalyticsResult.objects.create(analysis_type=analysis_type, status=status, results=results)
+
+    def test_latest_results_one_query(self):
+        self._result('illness_prediction', {'v': 1})
+        newest = self._result('illness_prediction', {'v': 2})
+        self._result('illness_prediction', {'v': 3}, status='pending')
+        demographics = self._result('patient_demographics', {'total_patients': 4})
+        with self.assertNumQueries(1):
+            latest = latest_results(['illness_prediction', 'patient_demographics', 'ai_insights'])
+        self.assertEqual(latest['illness_prediction'].pk, newest.pk)
+        self.assertEqual(latest['patient_demographics'].pk, demographics.pk)
+        self.assertNotIn('ai_insights', latest)
+
+    def test_dashboards_served_from_snapshot(self):
+        self._result('patient_volume_prediction', {'forecast': [1], 'evaluation_metrics': {'mae': 1}})
+        self._result('performance_factors', {'corr': 1})
+        self.client.force_authenticate(self.doctor)
+        self.client.get('/api/analytics/doctor/')
+        with self.assertNumQueries(0):
+            data = get_snapshot('doctor')
+        self.assertEqual(data['sections']['performance_factors'], {'corr': 1})
+
+        response = self.client.get('/api/analytics/doctor/')
+        self.assertEqual(response.data['data']['volume_prediction'], {'forecast': [1]})
+        self.assertIsNone(response.data['data']['illness_prediction'])
+
+        self.client.force_authenticate(self.nurse)
+        response = self.client.get('/api/analytics/nurse/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['performance_factors'], {'corr': 1})
+
+    def test_completion_rebuilds_snapshot(self):
+        self._result('medication_analysis', {'v': 1})
+        self.assertEqual(get_snapshot('nurse')['sections']['medication_analysis'], {'v': 1})
+        with self.captureOnCommitCallbacks(execute=True):
+            self._result('medication_analysis', {'v': 2})
+        with self.assertNumQueries(0):
+            self.assertEqual(get_snapshot('nurse')['sections']['medication_analysis'], {'v': 2})
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SharedResultCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.doctor = User.objects.create_user(
+            email='cache_doc@example.com', password='testpass', role='doctor', full_name='Dr. Cache'
+        )
+        self.nurse = User.objects.create_user(
+            email='cache_nurse@example.com', password='testpass', role='nurse', full_name='Nurse Cache'
+        )
+        AnalyticsResult.objects.create(
+            analysis_type='patient_volume_prediction', status='completed',
+            results={'forecast': [3], 'evaluation_metrics': {'mae': 1.2}},
+        )
+
+    def _get(self, user):
+        self.client.force_authenticate(user)
+        return self.client.get('/api/analytics/', {'type': 'patient_volume_prediction'})
+
+    def test_one_entry_shared_by_users_and_shaped_per_role(self):
+        first = self._get(self.nurse)
+        self.assertFalse(first.data['cached'])
+        self.assertEqual(first.data['data']['results']['evaluation_metrics'], {'mae': 1.2})
+        with self.assertNumQueries(0):
+            second = self._get(self.doctor)
+        self.assertTrue(second.data['cached'])
+        self.assertEqual(second.data['data']['results'], {'forecast': [3]})
+        # Shaping must not leak into the shared entry
+        self.assertIn('evaluation_metrics', self._get(self.nurse).data['data']['results'])
+
+    def test_new_result_is_pushed_on_commit(self):
+        self._get(self.nurse)
+        with self.captureOnCommitCallbacks(execute=True):
+            AnalyticsResult.objects.create(
+                analysis_type='patient_volume_prediction', status='completed', results={'forecast': [9]}
+            )
+        with self.assertNumQueries(0):
+            response = self._get(self.nurse)
+        self.assertEqual(response.data['data']['results'], {'forecast': [9]})
+
+    def test_single_flight_computes_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return 'v1', {'value': 1}
+
+        shared = TwoTierCache('tests:single_flight')
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            values = list(pool.map(lambda _: shared.get('item', compute), range(8)))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(values, [{'value': 1}] * 8)
+
+    def test_reader_computed_before_a_commit_does_not_replace_its_version(self):
+        shared = TwoTierCache('tests:monotonic', local_ttl=0)
+
+        def stale_compute():
+            # A commit publishes while this reader is still computing
+            shared.publish('item', 'v2', {'value': 2})
+            return 'v1', {'value': 1}
+
+        self.assertEqual(shared.get('item', stale_compute), {'value': 1})
+        self.assertEqual(shared.get('item', lambda: self.fail('recomputed')), {'value': 2})
+        self.assertEqual(TwoTierCache('tests:monotonic').get('item', lambda: self.fail('recomputed')), {'value': 2})
+
+
+class AnalyticsHistoryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.doctor = User.objects.create_user(
+            email='history_doc@example.com', password='testpass', role='doctor', full_name='Dr. History'
+        )
+        self.client.force_authenticate(self.doctor)
+        self.chart = 'data:image/png;base64,' + 'A' * 20000
+
+    def test_summary_is_stored_and_bounded(self):
+        result = AnalyticsResult.objects.create(
+            analysis_type='illness_prediction', status='completed',
+            results={'p_value': 0.01, 'chart': self.chart, 'significant_factors': ['Age', 'Sex'],
+                     'summary': {'high_risk_illnesses': 2}},
+        )
+        self.assertEqual(result.summary['kpis'], {'p_value': 0.01, 'summary.high_risk_illnesses': 2})
+        self.assertEqual(result.summary['sections'], {'significant_factors': 2, 'summary': 1})
+        self.assertGreater(result.payload_bytes, 20000)
+
+        result.results = {'error': 'Insufficient data'}
+        result.save(update_fields=['results'])
+        result.refresh_from_db()
+        self.assertEqual(result.summary['error'], 'Insufficient data')
+
+        wide = summarize_results({f'k{i}': i for i in range(100)})
+        self.assertEqual(len(wide['kpis']), MAX_KPIS)
+
+    def test_history_pages_without_results_body(self):
+        created = [
+            AnalyticsResult.objects.create(
+                analysis_type='patient_volume_prediction', status='completed',
+                results={'chart': self.chart, 'evaluation_metrics': {'mae': 1.5}, 'total': i},
+            )
+            for i in range(3)
+        ]
+        task = AnalyticsTask.objects.create(task_id='history-task', analysis_type='patient_volume_prediction',
+                                            status='completed', result=created[-1])
+        task.started_at = created[-1].created_at
+        task.completed_at = task.started_at + timedelta(seconds=2)
+        task.save()
+
+        response = self.client.get('/api/analytics/history/', {'limit': 2})
+        self.assertEqual(response.status_code, 200)
+        rows = response.data['data']
+        self.assertEqual([row['id'] for row in rows], [created[2].pk, created[1].pk])
+        self.assertNotIn('results', rows[0])
+        self.assertEqual(rows[0]['duration_ms'], 2000)
+        # Doctors do not see MAE/RMSE, in the summary either
+        self.assertEqual(rows[0]['summary']['kpis'], {'total': 2})
+        self.assertLess(len(json.dumps(response.data)), 2000)
+
+        response = self.client.get('/api/analytics/history/', {'limit': 2, 'cursor': response.data['next_cursor']})
+        self.assertEqual([row['id'] for row in response.data['data']], [created[0].pk])
+        self.assertIsNone(response.data['next_cursor'])
+
+        self.assertEqual(len(self.client.get('/api/analytics/history/', {'limit': 10 ** 6}).data['data']), 3)
+        self.assertEqual(self.client.get('/api/analytics/history/', {'cursor': 'bad'}).status_code, 400)
+
+    def test_result_body_is_compressed_and_conditional(self):
+        result = AnalyticsResult.objects.create(
+            analysis_type='illness_prediction', status='completed', results={'chart': self.chart}
+        )
+        url = f'/api/analytics/results/{result.pk}/'
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        body = json.loads(gzip.decompress(response.content))
+        self.assertEqual(body['data']['results']['chart'], self.chart)
+        self.assertLess(len(response.content), 1000)
+
+        etag = response['ETag']
+        self.assertIn('Authorization', response['Vary'])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('Authorization', response['Vary'])
+        self.assertEqual(self.client.get('/api/analytics/results/999999/').status_code, 404)
+
+        # Another role gets its own body, not the doctor's copy
+        nurse = User.objects.create_user(
+            email='history_nurse@example.com', password='testpass', role='nurse', full_name='Nurse History'
+        )
+        self.client.force_authenticate(nurse)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@override_settings(DATA_RETENTION={'analytics.UsageEvent': {'days': 7, 'batch_size': 2, 'pause': 0},
+                                   'analytics.AnalyticsResult': {'days': 30, 'batch_size': 2, 'pause': 0},
+                                   'analytics.UptimePing': {'days': None}})
+class RetentionTests(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        for days in (1, 8, 9, 10, 11, 12):
+            event = UsageEvent.objects.create(event_type='page_view')
+            UsageEvent.objects.filter(pk=event.pk).update(created_at=now - timedelta(days=days))
+        self.old_result = AnalyticsResult.objects.create(analysis_type='illness_prediction', status='completed')
+        AnalyticsResult.objects.filter(pk=self.old_result.pk).update(created_at=now - timedelta(days=45))
+        AnalyticsTask.objects.create(task_id='old-task', analysis_type='illness_prediction', result=self.old_result)
+        self.recent_result = AnalyticsResult.objects.create(analysis_type='illness_prediction', status='completed')
+
+    def test_dry_run_reports_without_deleting(self):
+        report = {row['table']: row for row in retention_report()}
+        self.assertEqual(report['analytics.UsageEvent']['expired'], 5)
+        self.assertEqual(report['analytics.UsageEvent']['batches'], 3)
+        self.assertEqual(report['analytics.AnalyticsResult']['expired'], 1)
+        self.assertIsNone(report['analytics.UptimePing']['cutoff'])
+
+        out = io.StringIO()
+        call_command('apply_retention', '--dry-run', stdout=out)
+        self.assertIn('analytics.UsageEvent', out.getvalue())
+        self.assertEqual(UsageEvent.objects.count(), 6)
+
+    def test_batched_delete_keeps_recent_rows_and_cascades(self):
+        deleted = apply_retention(['analytics.UsageEvent', 'analytics.AnalyticsResult', 'analytics.UptimePing'])
+        self.assertEqual(deleted, {'analytics.UsageEvent': 5, 'analytics.AnalyticsResult': 1,
+                                   'analytics.UptimePing': 0})
+        self.assertEqual(UsageEvent.objects.count(), 1)
+        self.assertEqual(list(AnalyticsResult.objects.values_list('pk', flat=True)), [self.recent_result.pk])
+        self.assertFalse(AnalyticsTask.objects.filter(task_id='old-task').exists())
+
+
+class UsageEventIngestionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='usage_nurse@example.com', password='testpass', role='nurse', full_name='Nurse Usage'
+        )
+        self.client.force_authenticate(self.user)
+
+    def test_batch_is_accepted_validated_and_bulk_inserted(self):
+        happened = timezone.now() - timedelta(minutes=3)
+        events = [
+            {'event_type': 'page_view', 'context': {'page': 'queue'}, 'timestamp': happened.isoformat()},
+            {'event_type': 'click', 'source': 'web', 'timestamp': '1999-01-01T00:00:00Z'},
+            # Older than the rollup window: would never be counted
+            {'event_type': 'scroll', 'timestamp': (timezone.now() - timedelta(hours=3)).isoformat()},
+            {'context': {}},
+            {'event_type': 'click', 'context': 'not a dict'},
+        ]
+        with self.assertNumQueries(3):  # savepoint, one INSERT, release
+            response = self.client.post('/api/analytics/events/batch/', {'events': events}, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['data'], {'accepted': 3, 'sampled_out': 0, 'rejected': 2})
+        self.assertEqual(UsageEvent.objects.get(event_type='page_view').created_at, happened)
+        # Implausible client clocks fall back to the receive time
+        self.assertGreater(UsageEvent.objects.get(event_type='click').created_at, happened)
+        self.assertGreater(UsageEvent.objects.get(event_type='scroll').created_at, happened)
+
+        with override_settings(USAGE_EVENTS_MAX_PER_REQUEST=1):
+            response = self.client.post('/api/analytics/events/batch/', events, format='json')
+        self.assertEqual(response.status_code, 413)
+
+    @override_settings(USAGE_EVENTS_SAMPLE_RATES={'*': 1.0, 'scroll': 0.25, 'hover': 0})
+    def test_sampling_keeps_rate_for_rollups(self):
+        rng = mock.Mock()
+        rng.random.side_effect = [0.1, 0.9, 0.5, 0.2]
+        rows, sampled_out, rejected = usage_events.build_rows(
+            [{'event_type': 'scroll'}] * 4 + [{'event_type': 'hover'}, {'event_type': 'page_view'}], rng=rng,
+        )
+        self.assertEqual([(r['event_type'], r['sample_rate']) for r in rows],
+                         [('scroll', 0.25), ('scroll', 0.25), ('page_view', 1.0)])
+        self.assertEqual((sampled_out, rejected), (3, 0))
+
+        UsageEvent.objects.bulk_create([UsageEvent(**row) for row in rows])
+        self.assertEqual(usage_events.rollup_usage_events(), 2)
+        scroll = UsageEventRollup.objects.get(event_type='scroll')
+        self.assertEqual((scroll.count, scroll.estimated_count), (2, 8.0))
+        # Re-running recomputes the hour instead of adding to it
+        usage_events.rollup_usage_events()
+        self.assertEqual(UsageEventRollup.objects.get(event_type='scroll').count, 2)
+
+        response = self.client.get('/api/analytics/events/rollup/', {'event_type': 'scroll'})
+        self.assertEqual(response.data['data']['totals'], {'scroll': 8.0})
+
+    def test_full_buffer_answers_429(self):
+        buffer = usage_events.UsageEventBuffer(batch_size=10, flush_interval_ms=3000, max_buffer=3, run_async=True)
+        with mock.patch.object(buffer, '_ensure_thread'), mock.patch.object(usage_events, '_buffer', buffer):
+            first = self.client.post('/api/analytics/events/batch/', [{'event_type': 'a'}] * 2, format='json')
+            second = self.client.post('/api/analytics/events/batch/', [{'event_type': 'b'}] * 2, format='json')
+        self.assertEqual(first.status_code, 202)
+        self.assertEqual(second.status_code, 429)
+        self.assertEqual(second['Retry-After'], '3')
+        self.assertEqual(UsageEvent.objects.count(), 0)
+        buffer.flush()
+        self.assertEqual(UsageEvent.objects.count(), 2)
+
+
+class UptimeRollupTests(TestCase):
+    def setUp(self):
+        # Half past an hour that has already passed, so every ping is in the past
+        self.now = (timezone.now() - timedelta(hours=1)).replace(minute=30, second=15, microsecond=0)
+        # 1..180 ms pings over the last three hours; every tenth one is down.
+        for i in range(180):
+            ping = UptimePing.objects.create(
+                service='web', region='ap' if i % 2 else None,
+                status='down' if i % 10 == 0 else 'up', latency_ms=i + 1,
+            )
+            UptimePing.objects.filter(pk=ping.pk).update(created_at=self.now - timedelta(minutes=i, seconds=5))
+
+    def test_rollups_match_raw_pings(self):
+        since = self.now - timedelta(hours=2, minutes=50, seconds=20)
+        raw = uptime_summary(since, self.now)
+        # Three completed hours (the oldest partly) for two regions
+        self.assertEqual(rollup_uptime(self.now - timedelta(minutes=2), minutes=24 * 60), (177, 6))
+        with self.assertNumQueries(4):  # watermark, hour rows, minute rows, raw tail
+            rolled = uptime_summary(since, self.now)
+        self.assertEqual(rolled, raw)
+        self.assertEqual(rolled['summary']['total'], 171)
+        self.assertEqual(rolled['summary']['down'], 18)
+        self.assertAlmostEqual(rolled['summary']['p95_latency_ms'], 163, delta=2)
+        self.assertEqual({(s['service'], s['region']) for s in rolled['services']}, {('web', None), ('web', 'ap')})
+
+        # Re-running recomputes rather than double counts
+        rollup_uptime(self.now - timedelta(minutes=2))
+        self.assertEqual(uptime_summary(since, self.now), raw)
+
+    def test_status_endpoint_latest_per_key_and_multi_day_window(self):
+        before = latest_pings(self.now - timedelta(hours=1), self.now)
+        rollup_uptime(self.now)
+        # The null-region ping is in the raw tail, the 'ap' one in its latest rolled-up minute
+        with self.assertNumQueries(3):  # watermark, latest minute per key, pings of those minutes
+            latest = latest_pings(self.now - timedelta(days=30), self.now)
+        self.assertEqual([(p.region, p.latency_ms) for p in latest], [(None, 1), ('ap', 2)])
+        self.assertEqual(latest, before)
+        # Minutes cut by the window edges are read raw
+        latest = latest_pings(self.now - timedelta(minutes=179, seconds=30), self.now - timedelta(minutes=3))
+        self.assertEqual([(p.region, p.latency_ms) for p in latest], [(None, 5), ('ap', 4)])
+        self.assertEqual([p.latency_ms for p in latest_pings(self.now - timedelta(hours=3), self.now - timedelta(
+            minutes=178, seconds=30))], [180])
+
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(
+            email='uptime_admin@example.com', password='testpass', role='admin', full_name='Admin'
+        ))
+        response = client.get('/api/analytics/uptime/status/', {'window_days': 3, 'region': 'ap'})
+        self.assertEqual(response.status_code, 200)
+        data = response.data['data']
+        self.assertEqual(data['summary']['window_minutes'], 3 * 1440)
+        self.assertEqual(data['summary']['total'], 90)
+        self.assertIn('p99_latency_ms', data['summary'])
+        self.assertEqual([p['region'] for p in data['latest']], ['ap'])
+
+
+class AIFeatureTests(TestCase):
+    def test_fixed_schema_for_partial_samples(self):
+        partial = {
+            'patient_demographics': {'age_distribution': {'51-65': 30, '65+': 40, '0-18': 30}},
+            'surge_prediction': {'forecasted_monthly_cases': [{'total_cases': 12}]},
+        }
+        X = extract_features([partial, {}, generate_synthetic_data(1)[0]])
+        self.assertEqual(X.shape, (3, len(FEATURE_COLUMNS)))
+        row = dict(zip(FEATURE_COLUMNS, X[0]))
+        self.assertEqual((row['age_65_plus'], row['forecast_month_1_cases'], row['forecast_month_2_cases']), (40, 12, 0))
+        self.assertFalse(X[1].any())
+        # No association result: labelled by the share of patients aged 51+
+        self.assertEqual(extract_labels([partial, {}], X[:2]).tolist(), [2, 0])
+
+    def test_batched_scoring_matches_single_samples(self):
+        samples = generate_synthetic_data(60)
+        with tempfile.TemporaryDirectory() as model_dir:
+            model = MediSyncAIInsights(model_dir=model_dir)
+            self.assertEqual(model.predict_many(samples[:1])[0]['random_forest']['confidence'], 0.6)
+            model.train_models(samples)
+            with open(os.path.join(model_dir, 'features.json')) as f:
+                self.assertEqual(json.load(f)['columns'], list(FEATURE_COLUMNS))
+
+            batch = model.predict_many(samples)
+            self.assertEqual(len(batch), 60)
+            self.assertEqual(batch[:5], [model.predict_many([s])[0] for s in samples[:5]])
+            X, _ = model.preprocess_data(samples[0])
+            self.assertEqual(X.tolist(), extract_features(samples[:1])[0].tolist())
+            self.assertEqual(batch, MediSyncAIInsights(model_dir=model_dir).predict_many(samples))
+
+            with open(os.path.join(model_dir, 'features.json'), 'w') as f:
+                json.dump({'schema_version': FEATURE_SCHEMA_VERSION + 1}, f)
+            self.assertIsNone(MediSyncAIInsights(model_dir=model_dir).rf_model)
+
+
+class ModelRegistryTests(TestCase):
+    def setUp(self):
+        self.registry = tempfile.TemporaryDirectory()
+        self.addCleanup(self.registry.cleanup)
+        self.settings_override = override_settings(
+            AI_MODEL_REGISTRY_DIR=self.registry.name, AI_TRAINING_MIN_SAMPLES=20, AI_MODEL_RELOAD_SECONDS=0,
+        )
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.addCleanup(model_registry.serving_model.reset)
+
+        start = timezone.now() - timedelta(days=5)
+        for i in range(60):
+            elderly = i % 3 == 0
+            rows = [
+                ('patient_demographics', {'age_distribution': {'0-18': 10, '51-65': 40 if elderly else 5,
+                                                              '65+': 30 if elderly else 5}}),
+                ('illness_prediction', {'chi_square_statistic': 30 if elderly else 8,
+                                        'association_result': 'Strong positive' if elderly else 'Weak'}),
+            ]
+            for offset, (analysis_type, results) in enumerate(rows):
+                result = AnalyticsResult.objects.create(analysis_type=analysis_type, status='completed', results=results)
+                AnalyticsResult.objects.filter(pk=result.pk).update(created_at=start + timedelta(hours=i, minutes=offset))
+
+    def test_samples_join_latest_sections_from_history(self):
+        samples = model_registry.training_samples()
+        self.assertEqual(len(samples), 60)
+        self.assertEqual(samples[0]['patient_demographics']['age_distribution']['65+'], 30)
+        self.assertEqual(samples[1]['illness_prediction']['association_result'], 'Weak')
+        self.assertEqual(len(model_registry.training_samples(max_samples=10)), 10)
+
+    def test_train_promote_and_hot_swap(self):
+        first = model_registry.train_and_promote()
+        self.assertEqual(first['status'], 'promoted')
+        self.assertEqual(model_registry.current_version(), first['version'])
+        manifest = model_registry.read_manifest(first['version'])
+        self.assertEqual(manifest['training']['holdout_samples'], 18)
+        # Trained on the 42 oldest samples
+        cutoff = model_registry.training_samples(with_times=True)[41][0]
+        self.assertEqual(model_registry.training_cutoff(first['version']), cutoff)
+        self.assertIn('rf_model.joblib', manifest['artifacts'])
+        serving = model_registry.get_serving_model()
+        self.assertEqual(serving.version, first['version'])
+        # Trained on every core, served on one
+        self.assertEqual(serving.rf_model.n_jobs, 1)
+
+        with override_settings(AI_MODEL_MIN_IMPROVEMENT=1.0):
+            second = model_registry.train_and_promote()
+        self.assertEqual((second['status'], second['compared_samples']), ('rejected', 18))
+        self.assertEqual(model_registry.current_version(), first['version'])
+        self.assertEqual(model_registry.list_versions(), sorted([first['version'], second['version']]))
+
+        # Promoting moves the pointer; serving processes swap without a restart
+        call_command('train_ai_model', '--promote', second['version'], stdout=io.StringIO())
+        self.assertEqual(model_registry.get_serving_model().version, second['version'])
+
+    def test_import_dir_registers_and_promotes_saved_models(self):
+        legacy = tempfile.TemporaryDirectory()
+        self.addCleanup(legacy.cleanup)
+        samples = model_registry.training_samples()
+        X = extract_features(samples)
+        model = MediSyncAIInsights(model_dir=legacy.name)
+        model.fit(X, extract_labels(samples, X))
+        model.save_models()
+
+        call_command('train_ai_model', '--import-dir', legacy.name, stdout=io.StringIO())
+        version = model_registry.current_version()
+        self.assertEqual(model_registry.read_manifest(version)['training'], {'imported_from': legacy.name})
+        serving = model_registry.get_serving_model()
+        self.assertEqual((serving.version, serving.rf_model.n_jobs), (version, 1))
+
+        with self.assertRaises(CommandError):
+            call_command('train_ai_model', '--import-dir', self.registry.name, stdout=io.StringIO())
+
+    def test_compares_only_samples_newer_than_the_current_training_cutoff(self):
+        legacy = tempfile.TemporaryDirectory()
+        self.addCleanup(legacy.cleanup)
+        timed = model_registry.training_samples(with_times=True)
+        samples = [sample for _, sample in timed]
+        X = extract_features(samples)
+        model = MediSyncAIInsights(model_dir=legacy.name)
+        model.fit(X, extract_labels(samples, X))
+        model.save_models()
+        # Imported when sample 50 was the newest: it may have been trained on any of 0-50
+        imported = model_registry.import_version(legacy.name, now=timed[50][0])
+        model_registry.promote(imported, None)
+
+        report = model_registry.train_and_promote()
+        self.assertEqual(report['status'], 'skipped')
+        self.assertIn('9 held-out samples', report['reason'])
+        self.assertEqual(model_registry.list_versions(), [imported])
+
+        with override_settings(AI_MODEL_MIN_COMPARISON_SAMPLES=5):
+            report = model_registry.train_and_promote()
+        self.assertEqual((report['previous_version'], report['compared_samples']), (imported, 9))
+        self.assertIsNotNone(report['previous_score'])
+
+        forced = model_registry.train_and_promote(force=True)
+        self.assertEqual(forced['status'], 'promoted')
+        self.assertEqual(model_registry.current_version(), forced['version'])
+
+    def test_skips_without_enough_history(self):
+        AnalyticsResult.objects.all().delete()
+        self.assertEqual(model_registry.train_and_promote()['status'], 'skipped')
+        self.assertIsNone(model_registry.get_serving_model().rf_model)
+        self.assertFalse(os.path.exists(os.path.join(self.registry.name, 'current.json')))
+
+
+class SyntheticDataTests(TestCase):
+    def test_feature_matrix_matches_samples(self):
+        samples = synthetic_samples(500, seed=7)
+        X, y = synthetic_features(500, seed=7)
+        self.assertTrue(np.array_equal(X, extract_features(samples)))
+        self.assertTrue(np.array_equal(y, extract_labels(samples, X)))
+        self.assertEqual(set(y.tolist()), {0, 1, 2})
+        self.assertEqual(synthetic_samples(3, seed=7), synthetic_samples(3, seed=7))
+        for sample in samples[:20]:
+            trends = sample['health_trends']['trend_analysis']
+            self.assertEqual(len(set(trends['increasing_conditions'])), len(trends['increasing_conditions']))
+
+    def test_patient_records_loaded_in_chunks(self):
+        patients = [
+            User.objects.create_user(email=f'synthetic{i}@example.com', password='testpass',
+                                     role='patient', full_name=f'Patient {i}')
+            for i in range(3)
+        ]
+        now = timezone.now()
+        self.assertEqual(copy_patient_records(250, [p.id for p in patients], seed=3, batch_size=100, now=now), 250)
+        records = PatientRecord.objects.all()
+        self.assertEqual(records.count(), 250)
+        self.assertEqual(set(records.values_list('patient_id', flat=True)), {p.id for p in patients})
+        self.assertTrue(records.filter(medication__isnull=True).exists())
+        self.assertFalse(records.filter(date_of_admission__gt=now).exists())
+        self.assertFalse(records.filter(date_of_admission__lt=now - timedelta(days=731)).exists())
+
+
+class ClinicalRulesTests(TestCase):
+    def setUp(self):
+        self.data = {
+            'patient_demographics': {'age_distribution': {'19-35': 50, '51-65': 5, '65+': 45}},
+            'health_trends': {'trend_analysis': {'increasing_conditions': ['Stroke', 'Diabetes', 'Asthma']}},
+            'surge_prediction': {
+                'forecasted_monthly_cases': [{'total_cases': 100}, {'total_cases': 160}],
+                'surge_risk_factors': ['Flu season', 'Staff shortage', 'Holidays'],
+            },
+            'illness_prediction': {'p_value': 0.01},
+        }
+        self.assessment = {
+            'overall_risk_level': 'critical_risk',
+            'risk_scores': {'overall_score': 85.0},
+            'clinical_indicators': {'red_flags': ['High proportion of elderly patients (>30%)', 'Rising Stroke cases']},
+        }
+
+    def test_clinical_alerts(self):
+        model = MediSyncAIInsights(model_dir=None)
+        alerts = model.generate_clinical_alerts(self.assessment, self.data)
+        self.assertEqual(
+            [a['id'] for a in alerts['critical_alerts']],
+            ['CRIT_001', 'CRIT_002', 'CRIT_003', 'COND_CRIT_STROKE', 'DEMO_CRIT_AGE', 'TREND_CRIT_SURGE'],
+        )
+        self.assertEqual([a['id'] for a in alerts['urgent_alerts']], ['COND_URG_DIABETES', 'CAP_URG_RESOURCES'])
+        self.assertEqual([a['id'] for a in alerts['warning_alerts']], ['COND_WARN_ASTHMA'])
+        self.assertEqual(alerts['critical_alerts'][0]['message'],
+                         'Overall risk score: 85.0% - IMMEDIATE INTERVENTION REQUIRED')
+        self.assertEqual(alerts['alert_summary']['total_alerts'], 9)
+        self.assertEqual(alerts['alert_summary']['highest_priority'], 'CRITICAL')
+        self.assertTrue(alerts['escalation_required'])
+        self.assertEqual(len(alerts['immediate_actions']), 8)
+
+        # Rules of other risk levels never fire; unknown levels get the informational alerts
+        low = model.generate_clinical_alerts(
+            {'overall_risk_level': 'unknown', 'clinical_indicators': {'protective_factors': ['Younger patients']}}
+        )
+        self.assertEqual([a['id'] for a in low['informational_alerts']], ['INFO_001'])
+        self.assertFalse(low['critical_alerts'] or low['escalation_required'])
+
+        # Callers get their own copies of memoized alerts
+        alerts['critical_alerts'][0]['message'] = 'changed'
+        again = model.generate_clinical_alerts(self.assessment, self.data)
+        self.assertNotEqual(again['critical_alerts'][0]['message'], 'changed')
+
+    def test_alerts_do_not_depend_on_earlier_calls(self):
+        model = MediSyncAIInsights(model_dir=None)
+        first = model.generate_clinical_alerts(self.assessment, self.data)
+        model.generate_clinical_alerts({'overall_risk_level': 'low_risk'}, synthetic_samples(1, seed=3)[0])
+        self.assertEqual(model.generate_clinical_alerts(self.assessment, self.data), first)
+
+        # Cohorts are evaluated against the previous member, with the same alerts
+        samples = synthetic_samples(40, seed=7)
+        assessments = [dict(self.assessment, overall_risk_level=level) for level in CONSENSUS_RISK_LEVELS * 10]
+        self.assertEqual(model.generate_clinical_alerts_many(assessments, samples),
+                         [model.generate_clinical_alerts(a, s) for a, s in zip(assessments, samples)])
+
+    def test_only_changed_rules_are_evaluated(self):
+        facts = alert_facts(self.data, self.assessment)
+        first = ALERT_PLAN.evaluate(facts)
+        self.assertEqual(ALERT_PLAN.evaluate(dict(facts), first).evaluated, 0)
+
+        changed = dict(facts, surge_risk_factors=('Flu season',))
+        result = ALERT_PLAN.evaluate(changed, first)
+        self.assertEqual(result.evaluated, len(ALERT_PLAN.by_input['surge_risk_factors']))
+        self.assertEqual(result.outputs, ALERT_PLAN.evaluate(changed, memo=False).outputs)
+        self.assertNotIn('CAP_URG_RESOURCES', [a['id'] for a in result.collect()['urgent_alerts']])
+
+        cohort = [recommendation_facts(s, 'high_risk') for s in synthetic_samples(200, seed=5)]
+        incremental = RECOMMENDATION_PLAN.evaluate_many(cohort)
+        self.assertEqual([r.outputs for r in incremental],
+                         [RECOMMENDATION_PLAN.evaluate(f, memo=False).outputs for f in cohort])
+
+    def test_recommendations(self):
+        insights = MediSyncAIInsights(model_dir=None).generate_insights(self.data)
+        self.assertEqual(insights['risk_assessment']['consensus'], 'moderate_risk')
+        doctors = insights['recommendations']['doctors']
+        nurses = insights['recommendations']['nurses']
+        self.assertTrue(all(isinstance(text, str) for text in doctors + nurses + insights['actionable_insights']))
+        self.assertIn('Rising Stroke cases: confirm specialist referral pathways and disease-specific protocols.',
+                      doctors)
+        self.assertIn('Prepare for a projected 60% increase in patient volume: review shift coverage and supplies.',
+                      nurses)
+        self.assertIn('Expect approximately 100 cases next month; plan schedules and supplies accordingly.',
+                      insights['actionable_insights'])
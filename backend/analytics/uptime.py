@@ -0,0 +1,262 @@
+"""
+Uptime rollups and the ``uptime_status`` summary.
+
+``rollup_uptime`` (Celery beat, every minute) aggregates ``UptimePing`` rows
+into ``UptimeRollup`` rows per service, region and minute, and merges the
+minutes of each completed hour into an hour row. A rollup holds:
+
+- the ping count per status;
+- the latency count, sum, min and max;
+- a latency sketch (``LatencyHistogram``, within 0.8%), which can be merged
+  across rows for p50/p95/p99.
+
+Each run recomputes the last ``ROLLUP_REBUILD_MINUTES`` minutes, which
+absorbs pings committed late. It also catches up from the last rolled-up
+minute, up to ``MAX_CATCHUP``, after downtime. Rollups are recomputed, never
+incremented, so re-running is safe.
+
+``uptime_summary`` answers a window by stitching:
+
+- hour rows for the whole hours in the window;
+- minute rows for the partial hours at either end;
+- raw pings for the sub-minute edge and for the time after the last
+  rolled-up minute.
+
+The rows read depend on the window length in hours, not on the ping volume.
+
+``latest_pings`` finds the latest rolled-up minute of each (service, region)
+from the minute rows and reads only the pings of those minutes, plus the
+raw edges that the rollups do not cover.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .load_testing import LatencyHistogram
+from .models import UptimePing, UptimeRollup
+
+ROLLUP_REBUILD_MINUTES = 10
+MAX_CATCHUP = timedelta(hours=24)
+MINUTE = timedelta(minutes=1)
+HOUR = timedelta(hours=1)
+STATUSES = ('up', 'down', 'degraded')
+
+
+def floor_minute(value):
+    return value.replace(second=0, microsecond=0)
+
+
+def floor_hour(value):
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def ceil(value, floor, step):
+    floored = floor(value)
+    return floored if floored == value else floored + step
+
+
+class UptimeStats:
+    """Counts and latency sketch of a set of pings, built from pings or merged rollups."""
+
+    def __init__(self):
+        self.counts = dict.fromkeys(STATUSES, 0)
+        self.total = 0
+        self.latency = LatencyHistogram()
+
+    def add_ping(self, status, latency_ms):
+        self.total += 1
+        if status in self.counts:
+            self.counts[status] += 1
+        if latency_ms is not None:
+            self.latency.record(latency_ms)
+
+    def add_rollup(self, rollup):
+        self.total += rollup.count
+        self.counts['up'] += rollup.up_count
+        self.counts['down'] += rollup.down_count
+        self.counts['degraded'] += rollup.degraded_count
+        self.latency.merge(LatencyHistogram.from_dict(rollup.latency_sketch))
+
+    def merge(self, other):
+        self.total += other.total
+        for status in STATUSES:
+            self.counts[status] += other.counts[status]
+        self.latency.merge(other.latency)
+        return self
+
+    def rollup_fields(self):
+        latency = self.latency
+        return {
+            'count': self.total,
+            'up_count': self.counts['up'],
+            'down_count': self.counts['down'],
+            'degraded_count': self.counts['degraded'],
+            'latency_count': latency.total,
+            # Latencies are whole milliseconds, so the histogram's sums are exact.
+            'latency_sum_ms': latency.sum_us // 1000,
+            'latency_min_ms': latency.min_us // 1000 if latency.min_us is not None else None,
+            'latency_max_ms': latency.max_us // 1000 if latency.total else None,
+            'latency_sketch': latency.to_dict(),
+        }
+
+    def summary(self):
+        latency = self.latency
+        data = {
+            'total': self.total,
+            **self.counts,
+            'uptime_pct': round(self.counts['up'] / self.total * 100.0, 2) if self.total else None,
+            'avg_latency_ms': round(latency.sum_us / latency.total / 1000.0, 2) if latency.total else None,
+            'min_latency_ms': latency.min_us / 1000.0 if latency.min_us is not None else None,
+            'max_latency_ms': latency.max_us / 1000.0 if latency.total else None,
+        }
+        for pct in (50, 95, 99):
+            data[f'p{pct}_latency_ms'] = latency.percentile(pct)
+        return data
+
+
+def _upsert(rollups):
+    UptimeRollup.objects.bulk_create(
+        rollups, update_conflicts=True, unique_fields=['service', 'region', 'period', 'start'],
+        update_fields=['count', 'up_count', 'down_count', 'degraded_count', 'latency_count',
+                       'latency_sum_ms', 'latency_min_ms', 'latency_max_ms', 'latency_sketch', 'updated_at'],
+    )
+
+
+def rolled_up_until():
+    """End of the last minute that has a rollup row (None before the first run)."""
+    latest = UptimeRollup.objects.filter(period='minute').aggregate(start=Max('start'))['start']
+    return latest + MINUTE if latest else None
+
+
+def rollup_uptime(now=None, minutes=ROLLUP_REBUILD_MINUTES):
+    """
+    Rebuild the minute rollups of the last ``minutes`` completed minutes (or
+    since the last rolled-up minute, after downtime) and the hour rollups of
+    the completed hours they touch. Returns ``(minute rows, hour rows)``.
+    """
+    with transaction.atomic():
+        return _rollup(floor_minute(now or timezone.now()), minutes)
+
+
+def _rollup(now_minute, minutes):
+    start = now_minute - timedelta(minutes=minutes)
+    rolled = rolled_up_until()
+    if rolled is None or rolled < start:
+        start = max(rolled or now_minute - MAX_CATCHUP, now_minute - MAX_CATCHUP)
+
+    per_minute = defaultdict(UptimeStats)
+    pings = (UptimePing.objects
+             .filter(created_at__gte=start, created_at__lt=now_minute)
+             .values_list('service', 'region', 'status', 'latency_ms', 'created_at'))
+    for service, region, status, latency_ms, created_at in pings.iterator(chunk_size=2000):
+        per_minute[(service, region or '', floor_minute(created_at))].add_ping(status, latency_ms)
+    _upsert([
+        UptimeRollup(service=service, region=region, period='minute', start=minute, **stats.rollup_fields())
+        for (service, region, minute), stats in per_minute.items()
+    ])
+
+    hours_start, hours_end = floor_hour(start), floor_hour(now_minute)
+    per_hour = defaultdict(UptimeStats)
+    if hours_start < hours_end:
+        minute_rows = UptimeRollup.objects.filter(period='minute', start__gte=hours_start, start__lt=hours_end)
+        for row in minute_rows.iterator(chunk_size=2000):
+            per_hour[(row.service, row.region, floor_hour(row.start))].add_rollup(row)
+        _upsert([
+            UptimeRollup(service=service, region=region, period='hour', start=hour, **stats.rollup_fields())
+            for (service, region, hour), stats in per_hour.items()
+        ])
+    return len(per_minute), len(per_hour)
+
+
+def _key_filter(qs, service, region):
+    if service:
+        qs = qs.filter(service=service)
+    if region:
+        qs = qs.filter(region=region)
+    return qs
+
+
+def _ranges(field, ranges):
+    q = Q()
+    for start, end in ranges:
+        if start < end:
+            q |= Q(**{f'{field}__gte': start, f'{field}__lt': end})
+    return q
+
+
+def _region_q(region):
+    # Rollups store a missing region as ''
+    return Q(region=region) if region else Q(region__isnull=True) | Q(region='')
+
+
+def _window_split(since, until, rolled):
+    """``(first_minute, boundary)``: rollups cover [first_minute, boundary), raw pings the rest."""
+    boundary = min(rolled, floor_minute(until)) if rolled else since
+    boundary = max(boundary, since)
+    return min(ceil(since, floor_minute, MINUTE), boundary), boundary
+
+
+def latest_pings(since, until, service=None, region=None):
+    """
+    The latest ping of each (service, region) in the window. Reads the
+    latest minute row of each key, then only the pings of those minutes and
+    of the raw edges, whatever the window length.
+    """
+    first_minute, boundary = _window_split(since, until, rolled_up_until())
+    minutes = _key_filter(
+        UptimeRollup.objects.filter(period='minute', start__gte=first_minute, start__lt=boundary), service, region
+    ).values_list('service', 'region').annotate(latest=Max('start')).order_by()
+
+    q = _ranges('created_at', [(since, first_minute), (boundary, until + MINUTE)])
+    for key_service, key_region, minute in minutes:
+        q |= Q(_region_q(key_region), service=key_service, created_at__gte=minute, created_at__lt=minute + MINUTE)
+    latest = {}
+    if q:
+        pings = _key_filter(UptimePing.objects.filter(q, created_at__gte=since, created_at__lte=until),
+                            service, region)
+        for ping in pings:
+            key = (ping.service, ping.region or '')
+            if key not in latest or (ping.created_at, ping.id) > (latest[key].created_at, latest[key].id):
+                latest[key] = ping
+    return [latest[key] for key in sorted(latest)]
+
+
+def uptime_summary(since, until=None, service=None, region=None):
+    """``{'summary', 'services'}`` for pings in [since, until], from rollups plus a raw tail."""
+    until = until or timezone.now()
+    first_minute, boundary = _window_split(since, until, rolled_up_until())
+
+    raw_ranges = [(boundary, until + MINUTE)]
+    minute_ranges, hour_ranges = [], []
+    if boundary > since:
+        raw_ranges.append((since, first_minute))
+        first_hour, last_hour = ceil(first_minute, floor_hour, HOUR), floor_hour(boundary)
+        if first_hour < last_hour:
+            minute_ranges = [(first_minute, first_hour), (last_hour, boundary)]
+            hour_ranges = [(first_hour, last_hour)]
+        else:
+            minute_ranges = [(first_minute, boundary)]
+
+    per_key = defaultdict(UptimeStats)
+    for period, ranges in (('hour', hour_ranges), ('minute', minute_ranges)):
+        q = _ranges('start', ranges)
+        if q:
+            rows = _key_filter(UptimeRollup.objects.filter(q, period=period), service, region)
+            for row in rows:
+                per_key[(row.service, row.region)].add_rollup(row)
+
+    pings = _key_filter(
+        UptimePing.objects.filter(_ranges('created_at', raw_ranges), created_at__lte=until), service, region
+    ).values_list('service', 'region', 'status', 'latency_ms')
+    for ping_service, ping_region, status, latency_ms in pings:
+        per_key[(ping_service, ping_region or '')].add_ping(status, latency_ms)
+
+    total = UptimeStats()
+    services = []
+    for (key_service, key_region), stats in sorted(per_key.items()):
+        total.merge(stats)
+        services.append({'service': key_service, 'region': key_region or None, **stats.summary()})
+    return {'summary': total.summary(), 'services': services}
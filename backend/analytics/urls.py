@@ -6,10 +6,12 @@ urlpatterns = [
     path('', views.AnalyticsView.as_view(), name='analytics'),
     path('status/<str:task_id>/', views.get_analytics_status, name='analytics_status'),
     path('history/', views.get_analytics_history, name='analytics_history'),
+    path('results/<int:result_id>/', views.get_analytics_result, name='analytics_result'),
     path('refresh/', views.trigger_data_refresh, name='trigger_refresh'),
     path('realtime/', views.get_real_time_analytics, name='real_time_analytics'),
     path('stream/', views.analytics_stream, name='analytics_stream'),
     path('performance/', views.system_performance, name='system_performance'),
+    path('performance/endpoints/', views.endpoint_performance, name='endpoint_performance'),
     path('stress-test/', views.stress_test_analytics, name='stress_test_analytics'),
     
     # Role-specific analytics endpoints
@@ -25,6 +27,8 @@ urlpatterns = [
     # Telemetry and uptime
     path('events/', views.list_usage_events, name='list_usage_events'),
     path('events/log/', views.log_usage_event, name='log_usage_event'),
+    path('events/batch/', views.ingest_usage_events, name='ingest_usage_events'),
+    path('events/rollup/', views.usage_event_rollups, name='usage_event_rollups'),
     path('uptime/ping/', views.uptime_ping, name='uptime_ping'),
     path('uptime/status/', views.uptime_status, name='uptime_status'),
 ]
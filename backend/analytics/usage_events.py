@@ -0,0 +1,192 @@
+"""
+Batched ingestion of usage telemetry.
+
+Clients post arrays of events to ``events/batch/``. ``ingest`` validates
+them and applies sampling, then queues the rows in a per-process
+``UsageEventBuffer``, which ``bulk_create``s them off the request path (see
+backend/utils/buffered_writer.py). The endpoint answers 202 as soon as the
+events are queued.
+
+Controls:
+
+- Sampling: ``USAGE_EVENTS_SAMPLE_RATES`` maps an event type to the
+  fraction of its events that are kept; the ``'*'`` key is the default.
+  Stored rows record their ``sample_rate`` so counts can be scaled back up.
+- Backpressure: when the buffer is full, the batch is refused with
+  ``BufferFull``. The endpoint turns that into 429 with ``Retry-After``,
+  and clients resend the batch later.
+- Request size: at most ``USAGE_EVENTS_MAX_PER_REQUEST`` events per batch.
+
+Events are stamped with the client's ``timestamp`` when it is plausible
+(no older than ``MAX_EVENT_AGE``, no further ahead than
+``MAX_CLOCK_SKEW``), otherwise with the time they were received.
+
+``rollup_usage_events`` rebuilds ``UsageEventRollup`` rows (counts per event
+type and hour) for the last ``ROLLUP_LOOKBACK_HOURS`` hours. Dashboards read
+the rollups instead of counting raw events. ``MAX_EVENT_AGE`` stays an hour
+inside that window, so an accepted event always lands in an hour that the
+next rollup run (every 10 minutes) recomputes; older timestamps would land
+in hours that are never rolled up again.
+"""
+import atexit
+import math
+import random
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, F, FloatField, Sum, Value
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from backend.utils.buffered_writer import BufferedBulkWriter
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL_MS = 2000
+DEFAULT_MAX_BUFFER = 20000
+DEFAULT_MAX_PER_REQUEST = 500
+ROLLUP_LOOKBACK_HOURS = 2
+
+MAX_EVENT_AGE = timedelta(hours=ROLLUP_LOOKBACK_HOURS - 1)
+MAX_CLOCK_SKEW = timedelta(minutes=5)
+
+
+class BufferFull(Exception):
+    pass
+
+
+class UsageEventBuffer(BufferedBulkWriter):
+    model_label = 'analytics.UsageEvent'
+    thread_name = 'usage-events'
+    # Telemetry can wait: refuse new batches rather than make requests flush.
+    reject_when_full = True
+
+    def __init__(self, batch_size=None, flush_interval_ms=None, max_buffer=None, run_async=None):
+        super().__init__(
+            batch_size or getattr(settings, 'USAGE_EVENTS_BATCH_SIZE', DEFAULT_BATCH_SIZE),
+            flush_interval_ms or getattr(settings, 'USAGE_EVENTS_FLUSH_INTERVAL_MS', DEFAULT_FLUSH_INTERVAL_MS),
+            max_buffer or getattr(settings, 'USAGE_EVENTS_MAX_BUFFER', DEFAULT_MAX_BUFFER),
+            getattr(settings, 'USAGE_EVENTS_ASYNC', True) if run_async is None else run_async,
+        )
+
+    @property
+    def retry_after(self):
+        """Seconds a refused client should wait: about one flush interval."""
+        return max(1, math.ceil(self.flush_interval))
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer() -> UsageEventBuffer:
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = UsageEventBuffer()
+                atexit.register(_buffer.flush)
+    return _buffer
+
+
+def max_per_request():
+    return getattr(settings, 'USAGE_EVENTS_MAX_PER_REQUEST', DEFAULT_MAX_PER_REQUEST)
+
+
+def sample_rate(event_type):
+    rates = getattr(settings, 'USAGE_EVENTS_SAMPLE_RATES', {})
+    rate = rates.get(event_type, rates.get('*', 1.0))
+    return min(max(float(rate), 0.0), 1.0)
+
+
+def _event_time(value, now):
+    timestamp = parse_datetime(value) if isinstance(value, str) else None
+    if timestamp is None:
+        return now
+    if timezone.is_naive(timestamp):
+        timestamp = timezone.make_aware(timestamp)
+    if now - MAX_EVENT_AGE <= timestamp <= now + MAX_CLOCK_SKEW:
+        return timestamp
+    return now
+
+
+def _optional_str(value, max_length):
+    if value is None or value == '':
+        return None
+    if not isinstance(value, str):
+        value = str(value)
+    return value[:max_length]
+
+
+def build_rows(events, user_id=None, ip_address=None, now=None, rng=random):
+    """
+    UsageEvent field dicts for the valid, sampled-in ``events``.
+    Returns ``(rows, sampled_out, rejected)``.
+    """
+    now = now or timezone.now()
+    rows = []
+    sampled_out = rejected = 0
+    for event in events:
+        event_type = event.get('event_type') if isinstance(event, dict) else None
+        context = event.get('context') if isinstance(event, dict) else None
+        if not isinstance(event_type, str) or not event_type or len(event_type) > 100 \
+                or not isinstance(context, (dict, type(None))):
+            rejected += 1
+            continue
+        rate = sample_rate(event_type)
+        if rate <= 0 or (rate < 1 and rng.random() >= rate):
+            sampled_out += 1
+            continue
+        rows.append({
+            'user_id': user_id,
+            'event_type': event_type,
+            'source': _optional_str(event.get('source'), 100),
+            'session_id': _optional_str(event.get('session_id'), 255),
+            'ip_address': ip_address,
+            'context': context or {},
+            'sample_rate': rate,
+            'created_at': _event_time(event.get('timestamp'), now),
+        })
+    return rows, sampled_out, rejected
+
+
+def ingest(events, user_id=None, ip_address=None):
+    """
+    Validate, sample and queue a batch of events. Returns counts of
+    ``accepted``, ``sampled_out`` and ``rejected`` events; raises
+    ``BufferFull`` when the buffer cannot take the batch.
+    """
+    rows, sampled_out, rejected = build_rows(events, user_id, ip_address)
+    if rows and not get_buffer().enqueue(rows):
+        raise BufferFull(f'Usage event buffer is full ({get_buffer().max_buffer} events)')
+    return {'accepted': len(rows), 'sampled_out': sampled_out, 'rejected': rejected}
+
+
+def rollup_usage_events(hours=ROLLUP_LOOKBACK_HOURS, now=None):
+    """
+    Rebuild the per-type, per-hour rollups of the last ``hours`` hours
+    (including the current one) from UsageEvent. Returns the number of rows
+    written. Safe to re-run: each hour is recomputed, not incremented.
+    """
+    from .models import UsageEvent, UsageEventRollup
+
+    now = now or timezone.now()
+    since = (now - timedelta(hours=hours)).replace(minute=0, second=0, microsecond=0)
+    counts = (UsageEvent.objects
+              .filter(created_at__gte=since, created_at__lte=now)
+              .annotate(hour=TruncHour('created_at'))
+              .values('event_type', 'hour')
+              .annotate(count=Count('id'),
+                        estimated=Sum(Value(1.0) / F('sample_rate'), output_field=FloatField()))
+              .order_by())
+    rollups = [
+        UsageEventRollup(event_type=row['event_type'], hour=row['hour'], count=row['count'],
+                         estimated_count=round(row['estimated'] or 0, 2))
+        for row in counts
+    ]
+    UsageEventRollup.objects.bulk_create(
+        rollups, update_conflicts=True, unique_fields=['event_type', 'hour'],
+        update_fields=['count', 'estimated_count', 'updated_at'],
+    )
+    return len(rollups)
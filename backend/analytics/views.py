@@ -4,7 +4,8 @@ from datetime import datetime, timedelta
 from django.utils import timezone
 from django.db import transaction, models
 from django.core.cache import cache
-from django.http import HttpResponse
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
 from django.template.loader import render_to_string
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
@@ -13,20 +14,17 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from backend.admin_site.authentication import AdminJWTAuthentication
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from asgiref.sync import sync_to_async
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import condition, require_http_methods
+from django.views.decorators.vary import vary_on_headers
 import json
 import threading
-from concurrent.futures import ThreadPoolExecutor
 import os
 import time
 import platform
-try:
-    import requests  # Optional: used for HTTP load generation in stress tests
-    REQUESTS_AVAILABLE = True
-except ImportError:
-    REQUESTS_AVAILABLE = False
 try:
     import psutil  # Optional: provides detailed system metrics
     PSUTIL_AVAILABLE = True
@@ -55,16 +53,28 @@ try:
 except ImportError:
     PDF_AVAILABLE = False
 
-from .models import AnalyticsResult, AnalyticsTask, DataUpdateLog, AnalyticsCache, UsageEvent, UptimePing
+from .models import AnalyticsResult, AnalyticsTask, DataUpdateLog, UsageEvent, UsageEventRollup, UptimePing
 from .serializers import (
     AnalyticsResultSerializer, AnalyticsTaskSerializer, 
     AnalyticsRequestSerializer, AnalyticsResponseSerializer,
     UsageEventSerializer, UptimePingSerializer
 )
 from .tasks import run_analytics_task_async
+from .load_testing import SCENARIOS, latest_report
+from .events import event_id, format_sse, get_hub, parse_event_id, result_event
+from .dashboard_snapshot import get_snapshot
+from .result_cache import get_latest_result, refresh_result
+from .result_history import InvalidCursor, history_page
+from .compression import compress_response
+from .uptime import latest_pings, uptime_summary
+from .usage_events import (
+    BufferFull, get_buffer as get_usage_buffer, ingest as ingest_usage_events_batch,
+    max_per_request as usage_events_per_request,
+)
 from backend.users.models import PatientProfile
-from .ai_insights_model import MediSyncAIInsights
+from .model_registry import get_serving_model
 from backend.operations.pdf_templates import DoctorAnalyticsPDF, NurseAnalyticsPDF
+from backend.operations.pdf_templates.styles import get_analytics_styles
 import io
 
 class AnalyticsView(APIView):
@@ -78,35 +88,21 @@ class AnalyticsView(APIView):
         analysis_type = request.query_params.get('type', 'full_analysis')
         force_refresh = request.query_params.get('force_refresh', 'false').lower() == 'true'
         
-        # Check cache first
-        cache_key = f"analytics_{analysis_type}_{request.user.id}"
-        if not force_refresh:
-            cached_result = cache.get(cache_key)
-            if cached_result:
-                return Response({
-                    'success': True,
-                    'message': 'Analytics results retrieved from cache',
-                    'data': cached_result,
-                    'cached': True
-                })
-        
-        # Get latest result from database
+        # Shared cache entry per analysis type (results are global, not per user)
         try:
-            latest_result = AnalyticsResult.objects.filter(
-                analysis_type=analysis_type,
-                status='completed'
-            ).order_by('-created_at').first()
+            if force_refresh:
+                data, cached = refresh_result(analysis_type), False
+            else:
+                misses = []
+                data = get_latest_result(analysis_type, on_miss=lambda: misses.append(1))
+                cached = not misses
             
-            if latest_result:
-                serializer = AnalyticsResultSerializer(latest_result)
-                # Cache the result for 1 hour
-                cache.set(cache_key, serializer.data, 3600)
-                
+            if data:
                 return Response({
                     'success': True,
-                    'message': 'Analytics results retrieved',
-                    'data': serializer.data,
-                    'cached': False
+                    'message': 'Analytics results retrieved from cache' if cached else 'Analytics results retrieved',
+                    'data': shape_result_for_role(data, request.user.role),
+                    'cached': cached
                 })
             else:
                 return Response({
@@ -197,21 +193,61 @@ def get_analytics_status(request, task_id):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_analytics_history(request):
-    """Get analytics history"""
-    analysis_type = request.query_params.get('type')
-    limit = int(request.query_params.get('limit', 10))
-    
-    queryset = AnalyticsResult.objects.all()
-    if analysis_type:
-        queryset = queryset.filter(analysis_type=analysis_type)
-    
-    queryset = queryset.order_by('-created_at')[:limit]
-    serializer = AnalyticsResultSerializer(queryset, many=True)
-    
+    """
+    Get analytics history: metadata and summary KPIs only, without results.
+
+    Filters: ``type``, ``status``. Keyset-paginated: pass ``limit`` (max 100)
+    and the returned ``next_cursor`` as ``cursor``. Fetch a result's body
+    from ``results/<id>/``.
+    """
+    try:
+        page = history_page(request.query_params)
+    except InvalidCursor as e:
+        return Response({
+            'success': False,
+            'message': str(e),
+            'data': None
+        }, status=status.HTTP_400_BAD_REQUEST)
+
     return Response({
         'success': True,
         'message': 'Analytics history retrieved',
-        'data': serializer.data
+        'data': [shape_summary_for_role(row, request.user.role) for row in page['results']],
+        'next_cursor': page['next_cursor']
+    })
+
+def _result_etag(request, result_id):
+    # The body is shaped per role (shape_result_for_role), so the role is part of the tag
+    updated_at = AnalyticsResult.objects.filter(pk=result_id).values_list('updated_at', flat=True).first()
+    return f'{result_id}-{updated_at.timestamp():.6f}-{request.user.role}' if updated_at else None
+
+@compress_response
+@vary_on_headers('Authorization')
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@condition(etag_func=_result_etag)
+def get_analytics_result(request, result_id):
+    """
+    Get one analytics result with its full body.
+
+    The response is compressed (Brotli or gzip) and carries an ETag, so an
+    unchanged result is answered with 304 Not Modified. The body depends on
+    the caller's role: the ETag includes it and the response varies on
+    Authorization.
+    """
+    result = AnalyticsResult.objects.filter(pk=result_id).first()
+    if result is None:
+        return Response({
+            'success': False,
+            'message': 'Analytics result not found',
+            'data': None
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    data = AnalyticsResultSerializer(result).data
+    return Response({
+        'success': True,
+        'message': 'Analytics result retrieved',
+        'data': shape_result_for_role(data, request.user.role)
     })
 
 @api_view(['POST'])
@@ -249,35 +285,16 @@ def trigger_data_refresh(request):
 def get_real_time_analytics(request):
     """Get real-time analytics dashboard data"""
     try:
-        # Get latest results for different analysis types
+        # Latest result of each dashboard type, from the cached snapshot (one read)
+        snapshot = get_snapshot('realtime')
         dashboard_data = {}
-        
-        analysis_types = [
-            'patient_health_trends',
-            'patient_demographics', 
-            'illness_prediction',
-            'medication_analysis',
-            'patient_volume_prediction'
-        ]
-        
-        for analysis_type in analysis_types:
-            latest_result = AnalyticsResult.objects.filter(
-                analysis_type=analysis_type,
-                status='completed'
-            ).order_by('-created_at').first()
-            
-            if latest_result:
-                dashboard_data[analysis_type] = {
-                    'status': 'completed',
-                    'last_updated': latest_result.updated_at.isoformat(),
-                    'data': latest_result.results
-                }
-            else:
-                dashboard_data[analysis_type] = {
-                    'status': 'no_data',
-                    'last_updated': None,
-                    'data': None
-                }
+        for analysis_type, data in snapshot['sections'].items():
+            last_updated = snapshot['updated'][analysis_type]
+            dashboard_data[analysis_type] = {
+                'status': 'completed' if last_updated else 'no_data',
+                'last_updated': last_updated,
+                'data': data
+            }
         
         return Response({
             'success': True,
@@ -373,232 +390,163 @@ def system_performance(request):
         'data': data
     })
 
-# WebSocket-like endpoint for real-time updates (using Server-Sent Events)
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def analytics_stream(request):
-    """Stream analytics updates in real-time"""
-    import time
-    
-    def event_stream():
-        while True:
-            # Get latest analytics results
-            latest_results = AnalyticsResult.objects.filter(
-                status='completed'
-            ).order_by('-updated_at')[:5]
-            
-            data = {
-                'timestamp': timezone.now().isoformat(),
-                'results': AnalyticsResultSerializer(latest_results, many=True).data
-            }
-            
-            yield f"data: {json.dumps(data)}\n\n"
-            time.sleep(5)  # Update every 5 seconds
-    
-    from django.http import StreamingHttpResponse
-    response = StreamingHttpResponse(
-        event_stream(),
-        content_type='text/event-stream'
-    )
+def endpoint_performance(request):
+    """Rolling per-endpoint latency, query count and cache statistics of this process.
+
+    Samples are recorded by RequestMetricsMiddleware (backend/utils/request_metrics.py);
+    pass ``?over_budget=1`` to only list endpoints that exceeded their query budget.
+    """
+    from backend.utils.request_metrics import endpoint_stats
+
+    endpoints = endpoint_stats.snapshot()
+    if request.query_params.get('over_budget') in ('1', 'true'):
+        endpoints = {name: stats for name, stats in endpoints.items() if stats['over_budget']}
+    return Response({
+        'success': True,
+        'message': 'Endpoint performance metrics retrieved',
+        'data': {
+            'pid': os.getpid(),
+            'window': endpoint_stats.window,
+            'endpoints': dict(sorted(endpoints.items(), key=lambda item: -(item[1]['latency_ms']['p95'] or 0))),
+        }
+    })
+
+# Server-Sent Events for analytics dashboards. Async so that idle connections
+# do not hold a worker; served under ASGI (see events.py).
+STREAM_CATCHUP_LIMIT = 100
+
+
+async def _stream_user(request):
+    auth = JWTAuthentication()
+    header = auth.get_header(request)
+    raw = auth.get_raw_token(header) if header else None
+    if raw is None and request.GET.get('token'):
+        # EventSource cannot send headers
+        raw = request.GET['token'].encode()
+    if raw is None:
+        return None
+    try:
+        validated = auth.get_validated_token(raw)
+        return await sync_to_async(auth.get_user)(validated)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def _completed_results():
+    return AnalyticsResult.objects.filter(status='completed').only('id', 'analysis_type', 'updated_at')
+
+
+async def _catch_up(cursor):
+    """Results completed after ``cursor`` (oldest first), or None when too many to replay."""
+    since, pk = cursor
+    rows = [
+        r async for r in _completed_results()
+        .filter(models.Q(updated_at__gt=since) | models.Q(updated_at=since, id__gt=pk))
+        .order_by('updated_at', 'id')[:STREAM_CATCHUP_LIMIT + 1]
+    ]
+    return rows if len(rows) <= STREAM_CATCHUP_LIMIT else None
+
+
+@require_http_methods(['GET'])
+async def analytics_stream(request):
+    """
+    Stream analytics change events. Each ``analytics_result`` event carries
+    only ``{type, id, updated_at}``; clients fetch the result itself when they
+    need it. Reconnecting with ``Last-Event-ID`` replays what was missed; a
+    ``resync`` event means too much was missed and the client should reload.
+    """
+    user = await _stream_user(request)
+    if user is None or not user.is_active:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'},
+                            status=status.HTTP_401_UNAUTHORIZED)
+
+    cursor = parse_event_id(request.headers.get('Last-Event-ID') or request.GET.get('last_event_id'))
+    keepalive = getattr(settings, 'ANALYTICS_STREAM_KEEPALIVE', 20)
+
+    async def event_stream():
+        hub = get_hub()
+        # Subscribe before reading the backlog so nothing completed in between is lost.
+        queue = hub.subscribe()
+        last = cursor
+        try:
+            yield f'retry: {keepalive * 1000}\n\n'
+            if last is None:
+                latest = await _completed_results().order_by('-updated_at', '-id').afirst()
+                last = (latest.updated_at, latest.pk) if latest else (timezone.now(), 0)
+                yield format_sse({'connected': True}, event='ready', id=event_id(*last))
+            else:
+                backlog = await _catch_up(last)
+                if backlog is None:
+                    last = (timezone.now(), 0)
+                    yield format_sse({'reason': 'too many missed events'}, event='resync', id=event_id(*last))
+                else:
+                    for result in backlog:
+                        last = (result.updated_at, result.pk)
+                        yield format_sse(result_event(result), event='analytics_result', id=event_id(*last))
+            while True:
+                try:
+                    payload = await asyncio.wait_for(queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield ': keepalive\n\n'
+                    continue
+                if payload is None:
+                    # Dropped for falling behind; the client reconnects with Last-Event-ID.
+                    return
+                current = (datetime.fromisoformat(payload['updated_at']), payload['id'])
+                if current <= last:
+                    continue  # already sent from the backlog
+                last = current
+                yield format_sse(payload, event='analytics_result', id=event_id(*last))
+        finally:
+            hub.unsubscribe(queue)
+
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
     response['Cache-Control'] = 'no-cache'
-    response['Connection'] = 'keep-alive'
+    response['X-Accel-Buffering'] = 'no'
     return response
 
-# Stress testing endpoint to assess API performance for doctor, nurse, and patient flows
+# Latest load-test report for the admin dashboard. Load is generated by
+# `manage.py load_test` (see load_testing.py), never from inside a web worker.
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 @authentication_classes([AdminJWTAuthentication, JWTAuthentication])
 def stress_test_analytics(request):
-    """Run a lightweight concurrent stress test against key frontend API routes.
+    """Return the most recent load-test report.
 
     Parameters (query string):
     - group: one of 'doctor', 'nurse', 'patient', 'all' (default: 'all')
-    - concurrency: number of workers (default: 8, max: 64)
-    - requests: number of requests per endpoint (default: 30, max: 1000)
-    - timeout: per-request timeout in seconds (default: 10)
 
-    Returns aggregated latency and success/error metrics per endpoint and group.
+    Returns per-endpoint and per-group latency (avg/p50/p95/p99/max) and
+    success/error metrics from the last `manage.py load_test` run.
     """
-    if not REQUESTS_AVAILABLE:
+    group = (request.query_params.get('group') or 'all').lower()
+    if group not in ('all', *SCENARIOS):
         return Response({
             'success': False,
-            'message': 'Python requests library is not installed on the server.'
+            'message': 'Invalid group. Use one of: doctor, nurse, patient, all.'
         }, status=status.HTTP_400_BAD_REQUEST)
 
-    def parse_int(name, default, min_v, max_v):
-        try:
-            v = int(request.query_params.get(name, default))
-            return max(min_v, min(max_v, v))
-        except Exception:
-            return default
-
-    group = (request.query_params.get('group') or 'all').lower()
-    concurrency = parse_int('concurrency', 8, 1, 64)
-    num_requests = parse_int('requests', 30, 1, 1000)
     try:
-        timeout = float(request.query_params.get('timeout', 10))
-    except Exception:
-        timeout = 10.0
-
-    base_url = f"{request.scheme}://{request.get_host()}"
-    auth_header = request.META.get('HTTP_AUTHORIZATION')
-    headers = {'Content-Type': 'application/json'}
-    if auth_header:
-        headers['Authorization'] = auth_header
-
-    # Target endpoints used by the various frontends
-    endpoints = {
-        'doctor': [
-            '/api/operations/dashboard/stats/',
-            '/api/operations/appointments/',
-            '/api/operations/queue/patients/',
-            '/api/operations/notifications/',
-            '/api/operations/doctor/assignments/',
-        ],
-        'nurse': [
-            '/api/operations/nurse/queue/patients/',
-            '/api/operations/available-doctors/',
-            '/api/operations/medicine-inventory/',
-            '/api/operations/queue/status/?department=OPD',
-            '/api/operations/messaging/notifications/',
-        ],
-        'patient': [
-            '/api/operations/patient/dashboard/summary/',
-            '/api/operations/patient/appointments/',
-            '/api/operations/queue/availability/',
-            '/api/operations/queue/status/?department=OPD',
-        ],
-    }
-
-    if group == 'all':
-        selected_groups = ['doctor', 'nurse', 'patient']
-    else:
-        selected_groups = [group] if group in endpoints else []
-
-    if not selected_groups:
+        report = latest_report()
+    except (OSError, ValueError) as e:
         return Response({
             'success': False,
-            'message': 'Invalid group. Use one of: doctor, nurse, patient, all.'
-        }, status=status.HTTP_400_BAD_REQUEST)
-
-    def fetch_once(url: str):
-        start = time.perf_counter()
-        code = None
-        err = None
-        try:
-            resp = requests.get(url, headers=headers, timeout=timeout)
-            code = resp.status_code
-        except Exception as e:
-            err = str(e)
-        end = time.perf_counter()
-        return {
-            'latency_ms': (end - start) * 1000.0,
-            'status_code': code,
-            'error': err,
-        }
-
-    def compute_metrics(records):
-        latencies = [r['latency_ms'] for r in records if r.get('latency_ms') is not None]
-        status_dist = {}
-        success = 0
-        errors = 0
-        for r in records:
-            code = r.get('status_code')
-            key = str(code) if code is not None else 'none'
-            status_dist[key] = status_dist.get(key, 0) + 1
-            if code is not None and 200 <= code < 300:
-                success += 1
-            else:
-                errors += 1
-
-        avg = (sum(latencies) / len(latencies)) if latencies else None
-        max_v = max(latencies) if latencies else None
-        p95 = None
-        if latencies:
-            sl = sorted(latencies)
-            idx = max(0, int(0.95 * len(sl)) - 1)
-            p95 = sl[idx]
-
-        return {
-            'requests': len(records),
-            'success_count': success,
-            'error_count': errors,
-            'status_distribution': status_dist,
-            'avg_latency_ms': round(avg, 2) if avg is not None else None,
-            'p95_latency_ms': round(p95, 2) if p95 is not None else None,
-            'max_latency_ms': round(max_v, 2) if max_v is not None else None,
-            'latencies': latencies,  # included for group-level aggregation
-        }
-
-    started_at = timezone.now()
-    results = {
-        'base_url': base_url,
-        'started_at': started_at.isoformat(),
-        'params': {
-            'group': group,
-            'concurrency': concurrency,
-            'requests_per_endpoint': num_requests,
-            'timeout': timeout,
-        },
-        'groups': {},
-    }
-
-    for g in selected_groups:
-        group_results = {
-            'endpoints': {},
-            'summary': {},
-        }
-        all_latencies = []
-        total_success = 0
-        total_requests = 0
-
-        for ep in endpoints[g]:
-            target_url = base_url + ep
-            records = []
-            # Run concurrent requests per endpoint
-            with ThreadPoolExecutor(max_workers=concurrency) as executor:
-                futures = [executor.submit(fetch_once, target_url) for _ in range(num_requests)]
-                for f in futures:
-                    try:
-                        rec = f.result()
-                        records.append(rec)
-                    except Exception as e:
-                        records.append({'latency_ms': None, 'status_code': None, 'error': str(e)})
-
-            metrics = compute_metrics(records)
-            group_results['endpoints'][ep] = {k: v for k, v in metrics.items() if k != 'latencies'}
-            # Aggregate
-            all_latencies.extend(metrics.get('latencies', []))
-            total_success += metrics.get('success_count', 0)
-            total_requests += metrics.get('requests', 0)
-
-        # Compute group summary
-        avg = (sum(all_latencies) / len(all_latencies)) if all_latencies else None
-        max_v = max(all_latencies) if all_latencies else None
-        p95 = None
-        if all_latencies:
-            sl = sorted(all_latencies)
-            idx = max(0, int(0.95 * len(sl)) - 1)
-            p95 = sl[idx]
-
-        group_results['summary'] = {
-            'total_requests': total_requests,
-            'success_rate': round((total_success / total_requests) * 100.0, 2) if total_requests else 0.0,
-            'avg_latency_ms': round(avg, 2) if avg is not None else None,
-            'p95_latency_ms': round(p95, 2) if p95 is not None else None,
-            'max_latency_ms': round(max_v, 2) if max_v is not None else None,
-        }
-
-        results['groups'][g] = group_results
-
-    finished_at = timezone.now()
-    results['finished_at'] = finished_at.isoformat()
-    results['duration_ms'] = int((finished_at - started_at).total_seconds() * 1000)
+            'message': f'Could not read the latest load-test report: {e}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    if report is None:
+        return Response({
+            'success': False,
+            'message': 'No load-test report found. Run `python manage.py load_test` against this server first.'
+        }, status=status.HTTP_404_NOT_FOUND)
 
+    if group != 'all':
+        report['groups'] = {g: data for g, data in report.get('groups', {}).items() if g == group}
     return Response({
         'success': True,
-        'message': 'Stress test completed',
-        'data': results,
+        'message': 'Latest load-test report',
+        'data': report,
     })
 
 # Doctor Analytics Endpoints
@@ -614,77 +562,18 @@ def doctor_analytics(request):
         }, status=status.HTTP_403_FORBIDDEN)
     
     try:
-        # Get doctor-specific analytics
-        analytics_data = {}
-        
-        # Patient demographics for doctor's patients
-        patient_demographics = AnalyticsResult.objects.filter(
-            analysis_type='patient_demographics',
-            status='completed'
-        ).order_by('-created_at').first()
-        
-        # Illness prediction for doctor's specialty
-        illness_prediction = AnalyticsResult.objects.filter(
-            analysis_type='illness_prediction',
-            status='completed'
-        ).order_by('-created_at').first()
-        
-        # Patient health trends
-        health_trends = AnalyticsResult.objects.filter(
-            analysis_type='patient_health_trends',
-            status='completed'
-        ).order_by('-created_at').first()
-        
-        # Illness surge prediction
-        surge_prediction = AnalyticsResult.objects.filter(
-            analysis_type='illness_surge_prediction',
-            status='completed'
-        ).order_by('-created_at').first()
-
-        # Monthly illness forecast (SARIMA)
-        monthly_illness_forecast = AnalyticsResult.objects.filter(
-            analysis_type='monthly_illness_forecast',
-            status='completed'
-        ).order_by('-created_at').first()
-
-        # Patient volume prediction (include for doctor; strip evaluation metrics)
-        volume_prediction = AnalyticsResult.objects.filter(
-            analysis_type='patient_volume_prediction',
-            status='completed'
-        ).order_by('-created_at').first()
-
-        # Performance factors (correlation matrix, trends)
-        performance_factors = AnalyticsResult.objects.filter(
-            analysis_type='performance_factors',
-            status='completed'
-        ).order_by('-created_at').first()
-
-        # AI Insights
-        ai_insights = AnalyticsResult.objects.filter(
-            analysis_type='ai_insights',
-            status='completed'
-        ).order_by('-created_at').first()
-
-        vp_results = volume_prediction.results if volume_prediction else None
+        # Latest result of each doctor dashboard type, from the cached snapshot (one read)
+        sections = get_snapshot('doctor')['sections']
+
+        vp_results = sections['volume_prediction']
         if isinstance(vp_results, dict) and 'evaluation_metrics' in vp_results:
             # Remove MAE/RMSE from doctor-facing payload per requirements
             vp_results = {k: v for k, v in vp_results.items() if k != 'evaluation_metrics'}
         
-        # Normalize gender proportions in patient demographics if present
-        pd_results = patient_demographics.results if patient_demographics else None
-        if isinstance(pd_results, dict) and 'gender_proportions' in pd_results:
-            pd_results = pd_results.copy()
-            pd_results['gender_proportions'] = normalize_gender_proportions(pd_results.get('gender_proportions', {}))
-
         analytics_data = {
-            'patient_demographics': pd_results if pd_results else (patient_demographics.results if patient_demographics else None),
-            'illness_prediction': illness_prediction.results if illness_prediction else None,
-            'health_trends': health_trends.results if health_trends else None,
-            'surge_prediction': surge_prediction.results if surge_prediction else None,
-            'monthly_illness_forecast': monthly_illness_forecast.results if monthly_illness_forecast else None,
+            **sections,
+            'patient_demographics': _normalized_demographics(sections['patient_demographics']),
             'volume_prediction': vp_results,
-            'performance_factors': performance_factors.results if performance_factors else None,
-            'ai_insights': ai_insights.results if ai_insights else None,
             'doctor_name': request.user.full_name,
             'specialization': getattr(request.user.doctor_profile, 'specialization', 'General Practice') if hasattr(request.user, 'doctor_profile') else 'General Practice',
             'generated_at': timezone.now().isoformat()
@@ -715,52 +604,12 @@ def nurse_analytics(request):
         }, status=status.HTTP_403_FORBIDDEN)
     
     try:
-        # Get nurse-specific analytics
-        analytics_data = {}
-        
-        # Medication analysis
-        medication_analysis = AnalyticsResult.objects.filter(
-            analysis_type='medication_analysis',
-            status='completed'
-        ).order_by('-created_at').first()
-        
-        # Patient demographics
-        patient_demographics = AnalyticsResult.objects.filter(
-            analysis_type='patient_demographics',
-            status='completed'
-        ).order_by('-created_at').first()
-        
-        # Patient health trends
-        health_trends = AnalyticsResult.objects.filter(
-            analysis_type='patient_health_trends',
-            status='completed'
-        ).order_by('-created_at').first()
-        
-        # Patient volume prediction
-        volume_prediction = AnalyticsResult.objects.filter(
-            analysis_type='patient_volume_prediction',
-            status='completed'
-        ).order_by('-created_at').first()
-        
-        # AI Insights
-        ai_insights = AnalyticsResult.objects.filter(
-            analysis_type='ai_insights',
-            status='completed'
-        ).order_by('-created_at').first()
-        
-        # Normalize gender proportions for data integrity if available
-        pd_results = patient_demographics.results if patient_demographics else None
-        if isinstance(pd_results, dict) and 'gender_proportions' in pd_results:
-            pd_results = pd_results.copy()
-            pd_results['gender_proportions'] = normalize_gender_proportions(pd_results.get('gender_proportions', {}))
+        # Latest result of each nurse dashboard type, from the cached snapshot (one read)
+        sections = get_snapshot('nurse')['sections']
 
         analytics_data = {
-            'medication_analysis': medication_analysis.results if medication_analysis else None,
-            'patient_demographics': pd_results if pd_results else (patient_demographics.results if patient_demographics else None),
-            'health_trends': health_trends.results if health_trends else None,
-            'volume_prediction': volume_prediction.results if volume_prediction else None,
-            'performance_factors': performance_factors.results if performance_factors else None,
-            'ai_insights': ai_insights.results if ai_insights else None,
+            **sections,
+            'patient_demographics': _normalized_demographics(sections['patient_demographics']),
             'nurse_name': request.user.full_name,
             'department': getattr(request.user.nurse_profile, 'department', 'General') if hasattr(request.user, 'nurse_profile') else 'General',
             'generated_at': timezone.now().isoformat()
@@ -1004,15 +853,50 @@ def generate_analytics_pdf(request):
             'error': f'Error generating PDF report: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+def _normalized_demographics(results):
+    """Demographics results with gender proportions normalized for data integrity."""
+    if isinstance(results, dict) and 'gender_proportions' in results:
+        results = results.copy()
+        results['gender_proportions'] = normalize_gender_proportions(results.get('gender_proportions', {}))
+    return results
+
+def shape_result_for_role(data, role):
+    """Role-specific view of a cached serialized result (the cached value is never mutated)."""
+    results = data.get('results')
+    if data.get('analysis_type') == 'patient_demographics':
+        results = _normalized_demographics(results)
+    elif data.get('analysis_type') == 'patient_volume_prediction' and role == 'doctor':
+        if isinstance(results, dict) and 'evaluation_metrics' in results:
+            # Doctors do not see MAE/RMSE
+            results = {k: v for k, v in results.items() if k != 'evaluation_metrics'}
+    if results is data.get('results'):
+        return data
+    return {**data, 'results': results}
+
+def shape_summary_for_role(row, role):
+    """``shape_result_for_role`` for a history row's summary."""
+    summary = row.get('summary')
+    if row.get('analysis_type') != 'patient_volume_prediction' or role != 'doctor' or not summary:
+        return row
+    hidden = 'evaluation_metrics'
+    summary = {
+        **summary,
+        'kpis': {k: v for k, v in summary.get('kpis', {}).items() if k.split('.', 1)[0] != hidden},
+        'sections': {k: v for k, v in summary.get('sections', {}).items() if k != hidden},
+    }
+    return {**row, 'summary': summary}
+
+def _snapshot_sections(role, names):
+    sections = get_snapshot(role)['sections']
+    return {name: sections[name] for name in names}
+
 def get_doctor_analytics_data(user):
     """Get analytics data for doctors"""
     return {
-        'patient_demographics': get_latest_analytics('patient_demographics'),
-        'illness_prediction': get_latest_analytics('illness_prediction'),
-        'health_trends': get_latest_analytics('patient_health_trends'),
-        'surge_prediction': get_latest_analytics('illness_surge_prediction'),
-        'monthly_illness_forecast': get_latest_analytics('monthly_illness_forecast'),
-        'performance_factors': get_latest_analytics('performance_factors'),
+        **_snapshot_sections('doctor', (
+            'patient_demographics', 'illness_prediction', 'health_trends', 'surge_prediction',
+            'monthly_illness_forecast', 'performance_factors',
+        )),
         'doctor_name': user.full_name,
         'specialization': getattr(user.doctor_profile, 'specialization', 'General Practice') if hasattr(user, 'doctor_profile') else 'General Practice'
     }
@@ -1020,35 +904,14 @@ def get_doctor_analytics_data(user):
 def get_nurse_analytics_data(user):
     """Get analytics data for nurses"""
     return {
-        'medication_analysis': get_latest_analytics('medication_analysis'),
-        'patient_demographics': get_latest_analytics('patient_demographics'),
-        'health_trends': get_latest_analytics('patient_health_trends'),
-        'volume_prediction': get_latest_analytics('patient_volume_prediction'),
-        'performance_factors': get_latest_analytics('performance_factors'),
-        'ai_insights': get_latest_analytics('ai_insights'),
+        **get_snapshot('nurse')['sections'],
         'nurse_name': user.full_name,
         'department': getattr(user.nurse_profile, 'department', 'General') if hasattr(user, 'nurse_profile') else 'General'
     }
 
 def get_full_analytics_data():
     """Get all analytics data"""
-    return {
-        'patient_demographics': get_latest_analytics('patient_demographics'),
-        'illness_prediction': get_latest_analytics('illness_prediction'),
-        'medication_analysis': get_latest_analytics('medication_analysis'),
-        'health_trends': get_latest_analytics('patient_health_trends'),
-        'volume_prediction': get_latest_analytics('patient_volume_prediction'),
-        'surge_prediction': get_latest_analytics('illness_surge_prediction'),
-        'monthly_illness_forecast': get_latest_analytics('monthly_illness_forecast'),
-    }
-
-def get_latest_analytics(analysis_type):
-    """Get latest analytics result for a specific type"""
-    result = AnalyticsResult.objects.filter(
-        analysis_type=analysis_type,
-        status='completed'
-    ).order_by('-created_at').first()
-    return result.results if result else None
+    return dict(get_snapshot('full')['sections'])
 
 def map_doctor_analytics_to_pdf_data(analytics_data):
     """Map raw analytics data to DoctorAnalyticsPDF structure"""
@@ -1155,7 +1018,7 @@ def map_doctor_analytics_to_pdf_data(analytics_data):
     }
     
     try:
-        model = MediSyncAIInsights()
+        model = get_serving_model()
         insights = model.generate_insights(analytics_data)
         
         # Get comprehensive recommendations if available
@@ -1301,7 +1164,7 @@ def map_nurse_analytics_to_pdf_data(analytics_data):
     else:
         # Fallback: Generate on the fly
         try:
-            model = MediSyncAIInsights()
+            model = get_serving_model()
             insights = model.generate_insights(analytics_data)
             
             if 'comprehensive_recommendations' in insights:
@@ -1316,7 +1179,7 @@ def map_nurse_analytics_to_pdf_data(analytics_data):
         'analytics_results': {
             'metrics': metrics,
             'visualization': visualization,
-            'medication_records': analytics_data.get('medication_analysis', {}).get('medication_categories', {}), # Preserve this data
+            'medication_records': (analytics_data.get('medication_analysis') or {}).get('medication_categories', {}), # Preserve this data
             'comparative_data': comparative_data
         },
         'performance_factors': {
@@ -1403,153 +1266,12 @@ def normalize_gender_proportions(gender_data):
 
 def get_custom_styles():
     """
-    Get responsive custom styles for the standardized PDF template
+    Get responsive custom styles for the standardized PDF template.
+
+    The stylesheet is built once per process by the shared PDF style registry;
+    treat it as read-only.
     """
-    from reportlab.lib.pagesizes import A4
-    
-    styles = getSampleStyleSheet()
-    
-    # Calculate responsive font sizes based on page dimensions
-    page_width, page_height = A4
-    base_font_size = min(page_width, page_height) / 60  # Responsive base size
-    
-    # Add custom styles for consistent branding with responsive design
-    styles.add(ParagraphStyle(
-        name='HospitalName',
-        parent=styles['Heading1'],
-        fontSize=max(18, int(base_font_size * 1.8)),
-        fontName='Helvetica-Bold',
-        textColor=colors.darkblue,
-        alignment=TA_CENTER,
-        spaceAfter=8,
-        leading=max(20, int(base_font_size * 2.2))  # Responsive line height
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='HospitalAddress',
-        parent=styles['Normal'],
-        fontSize=max(9, int(base_font_size * 1.0)),
-        fontName='Helvetica',
-        textColor=colors.grey,
-        alignment=TA_CENTER,
-        spaceAfter=12,
-        leading=max(11, int(base_font_size * 1.3))
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='ReportTitle',
-        parent=styles['Heading1'],
-        fontSize=max(16, int(base_font_size * 1.6)),
-        fontName='Helvetica-Bold',
-        textColor=colors.darkblue,
-        alignment=TA_CENTER,
-        spaceAfter=10,
-        spaceBefore=6,
-        leading=max(18, int(base_font_size * 1.9))
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='UserInfo',
-        parent=styles['Normal'],
-        fontSize=max(10, int(base_font_size * 1.1)),
-        fontName='Helvetica',
-        textColor=colors.black,
-        alignment=TA_CENTER,
-        spaceAfter=20,
-        leading=max(12, int(base_font_size * 1.4))
-    ))
-    
-    # Department header style (used for underlined department at top)
-    styles.add(ParagraphStyle(
-        name='DepartmentHeader',
-        parent=styles['Heading2'],
-        fontSize=max(14, int(base_font_size * 1.5)),
-        fontName='Helvetica-Bold',
-        textColor=colors.black,
-        alignment=TA_CENTER,
-        spaceAfter=8,
-        leading=max(16, int(base_font_size * 1.8))
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='SectionHeader',
-        parent=styles['Heading2'],
-        fontSize=max(13, int(base_font_size * 1.4)),
-        fontName='Helvetica-Bold',
-        textColor=colors.darkblue,
-        spaceAfter=12,
-        spaceBefore=20,
-        leading=max(15, int(base_font_size * 1.7)),
-        borderWidth=1,
-        borderColor=colors.lightgrey,
-        borderPadding=4
-    ))
-    
-    # Borderless section header for Overview
-    styles.add(ParagraphStyle(
-        name='SectionHeaderNoBorder',
-        parent=styles['Heading2'],
-        fontSize=max(13, int(base_font_size * 1.4)),
-        fontName='Helvetica-Bold',
-        textColor=colors.darkblue,
-        spaceAfter=12,
-        spaceBefore=20,
-        leading=max(15, int(base_font_size * 1.7))
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='SubsectionHeader',
-        parent=styles['Heading3'],
-        fontSize=max(11, int(base_font_size * 1.2)),
-        fontName='Helvetica-Bold',
-        textColor=colors.darkgreen,
-        spaceAfter=8,
-        spaceBefore=12,
-        leading=max(13, int(base_font_size * 1.5))
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='ContentText',
-        parent=styles['Normal'],
-        fontSize=max(9, int(base_font_size * 1.0)),
-        fontName='Helvetica',
-        textColor=colors.black,
-        spaceAfter=6,
-        alignment=TA_JUSTIFY,
-        leading=max(11, int(base_font_size * 1.3)),
-        leftIndent=8,  # Better readability with indentation
-        rightIndent=8
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='FooterText',
-        parent=styles['Normal'],
-        fontSize=max(7, int(base_font_size * 0.8)),
-        fontName='Helvetica',
-        textColor=colors.grey,
-        alignment=TA_CENTER,
-        spaceAfter=4,
-        leading=max(9, int(base_font_size * 1.1))
-    ))
-    
-    # Add a highlight style for important information
-    styles.add(ParagraphStyle(
-        name='HighlightText',
-        parent=styles['Normal'],
-        fontSize=max(10, int(base_font_size * 1.1)),
-        fontName='Helvetica-Bold',
-        textColor=colors.darkblue,
-        alignment=TA_LEFT,
-        spaceAfter=6,
-        spaceBefore=4,
-        leading=max(12, int(base_font_size * 1.4)),
-        backColor=colors.lightblue,
-        borderWidth=1,
-        borderColor=colors.blue,
-        borderPadding=6
-    ))
-    
-    return styles
+    return get_analytics_styles()
 
 def create_standardized_pdf_template(response, hospital_info, user_info):
     """
@@ -1970,7 +1692,7 @@ def add_ai_interpretation_section(story, analytics_data, styles):
     story.append(Spacer(1, 10))
     
     try:
-        model = MediSyncAIInsights()
+        model = get_serving_model()
         insights = model.generate_insights(analytics_data)
         
         # Risk Assessment
@@ -2113,7 +1835,7 @@ def add_factor_analysis_section(story, analytics_data, styles):
 
     story.append(Paragraph("Factor Analysis", section_style))
     try:
-        model = MediSyncAIInsights()
+        model = get_serving_model()
         risk = model.get_detailed_risk_assessment(analytics_data)
     except Exception:
         risk = {}
@@ -2429,13 +2151,14 @@ def _extract_clinical_context(analytics_data):
 
 def build_recommendations(analytics_data, role: str):
     """Return suggestions grouped by priority using MediSyncAIInsights outputs."""
-    model = MediSyncAIInsights()
+    model = get_serving_model()
     full = model.generate_insights(analytics_data)
     risk = (full.get('risk_assessment') or {}).get('consensus', 'moderate_risk')
     rec_list = (full.get('recommendations') or {}).get('doctors' if role == 'doctor' else 'nurses', [])
 
     # Priority bucketing: top 3 -> high, next 3 -> medium, rest -> low;
     # Override bucket by overall risk level for emphasis
+    ctx = _extract_clinical_context(analytics_data)
     high, med, low = [], [], []
     for idx, rec in enumerate(rec_list):
         bucket = 'low'
@@ -2448,7 +2171,6 @@ def build_recommendations(analytics_data, role: str):
             bucket = 'high' if idx < 6 else 'medium'
         elif risk == 'moderate_risk' and bucket == 'low':
             bucket = 'medium'
-        ctx = _extract_clinical_context(analytics_data)
         item = {
             'text': rec if isinstance(rec, str) else str(rec),
             'clinical_data': ctx,
@@ -2816,38 +2538,62 @@ def create_forecast_chart(forecast_data):
 
 # --- Usage Events Endpoints ---
 
+def _client_ip(request):
+    ip = request.META.get('HTTP_X_FORWARDED_FOR')
+    if ip:
+        return ip.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR')
+
+
+def _queue_usage_events(request, events):
+    try:
+        counts = ingest_usage_events_batch(
+            events,
+            user_id=request.user.id if request.user and request.user.is_authenticated else None,
+            ip_address=_client_ip(request),
+        )
+    except BufferFull as e:
+        response = Response({'success': False, 'message': str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        response['Retry-After'] = str(get_usage_buffer().retry_after)
+        return response
+    return Response({'success': True, 'message': 'Events queued', 'data': counts}, status=status.HTTP_202_ACCEPTED)
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def log_usage_event(request):
-    """Log a usage event for analytics. Expects: event_type, context (JSON), source, session_id."""
+    """Queue one usage event. Expects: event_type, context (JSON), source, session_id, timestamp (ISO)."""
     try:
         payload = request.data or {}
-        event_type = payload.get('event_type')
-        if not event_type:
+        if not payload.get('event_type'):
             return Response({'success': False, 'message': 'event_type is required'}, status=status.HTTP_400_BAD_REQUEST)
+        return _queue_usage_events(request, [payload])
+    except Exception as e:
+        return Response({'success': False, 'message': f'Failed to log event: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        context = payload.get('context') or {}
-        source = payload.get('source')
-        session_id = payload.get('session_id')
 
-        ip = request.META.get('HTTP_X_FORWARDED_FOR')
-        if ip:
-            ip = ip.split(',')[0].strip()
-        else:
-            ip = request.META.get('REMOTE_ADDR')
-
-        event = UsageEvent.objects.create(
-            user=request.user if request.user and request.user.is_authenticated else None,
-            event_type=event_type,
-            source=source,
-            session_id=session_id,
-            ip_address=ip,
-            context=context,
-        )
-
-        return Response({'success': True, 'message': 'Event logged', 'data': UsageEventSerializer(event).data}, status=status.HTTP_201_CREATED)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def ingest_usage_events(request):
+    """
+    Queue a batch of usage events: ``{"events": [...]}`` or a bare list of
+    ``log_usage_event`` payloads. Answers 202 once queued, with counts of
+    accepted, sampled-out and rejected events; 429 with Retry-After when the
+    ingestion buffer is full.
+    """
+    try:
+        payload = request.data
+        events = payload.get('events') if isinstance(payload, dict) else payload
+        if not isinstance(events, list):
+            return Response({'success': False, 'message': 'events must be a list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(events) > usage_events_per_request():
+            return Response({
+                'success': False,
+                'message': f'At most {usage_events_per_request()} events per request'
+            }, status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        return _queue_usage_events(request, events)
     except Exception as e:
-        return Response({'success': False, 'message': f'Failed to log event: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response({'success': False, 'message': f'Failed to queue events: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 @api_view(['GET'])
@@ -2876,8 +2622,51 @@ def list_usage_events(request):
         return Response({'success': False, 'message': f'Failed to retrieve events: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def usage_event_rollups(request):
+    """
+    Hourly usage event counts from the rollup table. Filters: event_type,
+    since / until (ISO; default the last 24 hours, at most 90 days).
+    """
+    try:
+        now = timezone.now()
+        until = _parse_iso(request.query_params.get('until')) or now
+        since = _parse_iso(request.query_params.get('since')) or until - timedelta(hours=24)
+        since = max(since, until - timedelta(days=90))
+
+        qs = UsageEventRollup.objects.filter(hour__gte=since, hour__lte=until)
+        event_type = request.query_params.get('event_type')
+        if event_type:
+            qs = qs.filter(event_type=event_type)
+        rows = list(qs.order_by('hour', 'event_type').values('event_type', 'hour', 'count', 'estimated_count'))
+
+        totals = {}
+        for row in rows:
+            totals[row['event_type']] = totals.get(row['event_type'], 0) + row['estimated_count']
+        return Response({
+            'success': True,
+            'message': 'Usage rollups retrieved',
+            'data': {'since': since, 'until': until, 'hours': rows, 'totals': totals}
+        })
+    except Exception as e:
+        return Response({'success': False, 'message': f'Failed to retrieve usage rollups: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _parse_iso(value):
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
 # --- Uptime Ping Endpoints ---
 
+UPTIME_MAX_WINDOW_MINUTES = 30 * 1440
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def uptime_ping(request):
@@ -2906,44 +2695,27 @@ def uptime_ping(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def uptime_status(request):
-    """Return recent uptime status with optional filters: service, region, window_minutes."""
+    """
+    Uptime summary from the per-minute/hour rollups (see uptime.py), with p50/p95/p99
+    latency per service and region. Filters: service, region, and window_minutes or
+    window_days (at most 30 days).
+    """
     try:
         service = request.query_params.get('service')
         region = request.query_params.get('region')
-        window_minutes = int(request.query_params.get('window_minutes', 60))
-        window_minutes = max(1, min(1440, window_minutes))
-        since = timezone.now() - timedelta(minutes=window_minutes)
-
-        qs = UptimePing.objects.filter(created_at__gte=since)
-        if service:
-            qs = qs.filter(service=service)
-        if region:
-            qs = qs.filter(region=region)
-
-        # Latest by service/region
-        latest_map = {}
-        for ping in qs.order_by('-created_at'):
-            key = (ping.service, ping.region or 'unknown')
-            if key not in latest_map:
-                latest_map[key] = ping
-
-        # Aggregate simple stats
-        total = qs.count()
-        up = qs.filter(status='up').count()
-        down = qs.filter(status='down').count()
-        degraded = qs.filter(status='degraded').count()
-        avg_latency = qs.exclude(latency_ms__isnull=True).aggregate(v=models.Avg('latency_ms'))['v']
+        if request.query_params.get('window_days'):
+            window_minutes = int(float(request.query_params['window_days']) * 1440)
+        else:
+            window_minutes = int(request.query_params.get('window_minutes', 60))
+        window_minutes = max(1, min(UPTIME_MAX_WINDOW_MINUTES, window_minutes))
+        now = timezone.now()
+        since = now - timedelta(minutes=window_minutes)
 
+        stats = uptime_summary(since, now, service, region)
         data = {
-            'summary': {
-                'total': total,
-                'up': up,
-                'down': down,
-                'degraded': degraded,
-                'avg_latency_ms': avg_latency,
-                'window_minutes': window_minutes,
-            },
-            'latest': [UptimePingSerializer(p).data for p in latest_map.values()]
+            'summary': {**stats['summary'], 'window_minutes': window_minutes},
+            'services': stats['services'],
+            'latest': UptimePingSerializer(latest_pings(since, now, service, region), many=True).data
         }
 
         return Response({'success': True, 'message': 'Uptime status retrieved', 'data': data})
@@ -1,5 +1,6 @@
 import os
 from celery import Celery
+from celery.schedules import crontab
 from django.conf import settings
 
 # Set the default Django settings module for the 'celery' program.
@@ -20,9 +21,21 @@ app.conf.beat_schedule = {
         'task': 'backend.analytics.tasks.run_scheduled_analytics',
         'schedule': 3600.0,  # Run every hour
     },
-    'cleanup-old-analytics': {
-        'task': 'backend.analytics.tasks.cleanup_old_analytics',
-        'schedule': 86400.0,  # Run daily
+    'apply-data-retention': {
+        'task': 'backend.analytics.tasks.apply_data_retention',
+        'schedule': crontab(hour=19, minute=0),  # Nightly, 03:00 Asia/Manila
+    },
+    'rollup-usage-events': {
+        'task': 'backend.analytics.tasks.rollup_usage_events',
+        'schedule': 600.0,  # Run every 10 minutes
+    },
+    'rollup-uptime': {
+        'task': 'backend.analytics.tasks.rollup_uptime',
+        'schedule': 60.0,  # Run every minute
+    },
+    'train-ai-models': {
+        'task': 'backend.analytics.tasks.train_ai_models',
+        'schedule': crontab(hour=20, minute=0),  # Nightly, 04:00 Asia/Manila
     },
     'refresh-analytics-cache': {
         'task': 'backend.analytics.tasks.refresh_analytics_cache',
@@ -40,6 +53,10 @@ app.conf.beat_schedule = {
         'task': 'backend.operations.tasks.update_queue_statistics',
         'schedule': 120.0,  # Run every 2 minutes
     },
+    'rebuild-patient-summaries': {
+        'task': 'backend.users.tasks.rebuild_patient_summaries',
+        'schedule': crontab(hour=18, minute=30),  # Nightly, 02:30 Asia/Manila
+    },
 }
 
 app.conf.timezone = 'UTC'
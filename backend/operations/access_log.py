@@ -0,0 +1,96 @@
+"""
+Buffered writer for ArchiveAccessLog.
+
+Archive views call ``log_archive_access`` instead of
+``ArchiveAccessLog.objects.create``. Events are queued in a bounded buffer
+and written with ``bulk_create`` by a background thread every
+``ARCHIVE_ACCESS_LOG_BATCH_SIZE`` events or
+``ARCHIVE_ACCESS_LOG_FLUSH_INTERVAL_MS`` milliseconds, so request paths
+(including cache hits) do not touch the database.
+
+Delivery is at-least-once (see backend/utils/buffered_writer.py). With
+``ARCHIVE_ACCESS_LOG_REDIS_URL`` set, the buffer is a Redis list shared by
+every process: events leave it only after their batch has committed, so they
+survive a killed worker or a deploy, and rows that keep failing are kept in a
+dead-letter list. Without it, or while Redis is unreachable, events wait in a
+per-process buffer that is drained at interpreter exit. Events are never
+discarded when the buffer is full: once it holds
+``ARCHIVE_ACCESS_LOG_MAX_BUFFER`` events (e.g. during a database outage) the
+logging request writes its event itself.
+Set ``ARCHIVE_ACCESS_LOG_ASYNC = False`` to write every event inline.
+"""
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.utils import timezone
+
+from backend.utils.buffered_writer import (  # noqa: F401 (MAX_ATTEMPTS re-exported)
+    MAX_ATTEMPTS, BufferedBulkWriter, RedisBufferedBulkWriter,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL_MS = 1000
+DEFAULT_MAX_BUFFER = 10000
+
+
+class ArchiveAccessLogWriter(BufferedBulkWriter):
+    model_label = 'operations.ArchiveAccessLog'
+    thread_name = 'archive-access-log'
+
+    def __init__(self, batch_size=None, flush_interval_ms=None, max_buffer=None, run_async=None):
+        super().__init__(
+            batch_size or getattr(settings, 'ARCHIVE_ACCESS_LOG_BATCH_SIZE', DEFAULT_BATCH_SIZE),
+            flush_interval_ms or getattr(settings, 'ARCHIVE_ACCESS_LOG_FLUSH_INTERVAL_MS', DEFAULT_FLUSH_INTERVAL_MS),
+            max_buffer or getattr(settings, 'ARCHIVE_ACCESS_LOG_MAX_BUFFER', DEFAULT_MAX_BUFFER),
+            getattr(settings, 'ARCHIVE_ACCESS_LOG_ASYNC', True) if run_async is None else run_async,
+        )
+
+    def log(self, **fields):
+        fields.setdefault('accessed_at', timezone.now())
+        self.enqueue([fields])
+
+
+class RedisArchiveAccessLogWriter(ArchiveAccessLogWriter, RedisBufferedBulkWriter):
+    queue_key = 'medisync:archive_access_log'
+
+    @property
+    def redis_url(self):
+        return settings.ARCHIVE_ACCESS_LOG_REDIS_URL
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> ArchiveAccessLogWriter:
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                if getattr(settings, 'ARCHIVE_ACCESS_LOG_REDIS_URL', None):
+                    _writer = RedisArchiveAccessLogWriter()
+                else:
+                    _writer = ArchiveAccessLogWriter()
+                atexit.register(_writer.flush)
+    return _writer
+
+
+def log_archive_access(user, action, record=None, record_id=None, query_params='', duration_ms=None, ip_address=''):
+    """Queue an ArchiveAccessLog row; never raises into the calling view."""
+    try:
+        if record is not None:
+            record_id = record.id
+        get_writer().log(
+            user_id=getattr(user, 'id', None),
+            action=action,
+            record_id=record_id,
+            query_params=query_params or '',
+            duration_ms=duration_ms,
+            ip_address=ip_address or '',
+        )
+    except Exception as e:
+        logger.warning(f"Could not queue archive access log: {e}")
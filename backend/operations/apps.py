@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class OperationsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "backend.operations"
+
+    def ready(self):
+        import backend.operations.signals  # noqa: F401
+
+        # Build the shared PDF style/font registry once per process so the
+        # first report request does not pay for it.
+        from django.conf import settings
+        try:
+            from backend.operations.pdf_templates.styles import warm_registry
+            warm_registry(getattr(settings, 'PDF_PRELOAD_LOGOS', ()))
+        except Exception:
+            pass
@@ -0,0 +1,147 @@
+"""
+Archive search used by ``archive_list``.
+
+Filters run against denormalized, indexed columns of PatientAssessmentArchive
+(``is_archived``, ``patient_name``, ``search_vector``) instead of JSON keys and
+joins. Results are keyset-paginated on (last_assessed_at, id) and the first
+page carries facet counts by assessment type and month.
+"""
+import base64
+import json
+from datetime import datetime, time, timedelta
+
+from django.contrib.postgres.search import SearchQuery
+from django.db import connection
+from django.db.models import Count, Q
+from django.db.models.functions import TruncMonth, Upper
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import PatientAssessmentArchive
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(record) -> str:
+    raw = json.dumps([record.last_assessed_at.isoformat(), record.id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor: str):
+    try:
+        assessed_at, record_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        assessed_at = parse_datetime(assessed_at)
+        if assessed_at is None:
+            raise ValueError
+        return assessed_at, int(record_id)
+    except Exception:
+        raise InvalidCursor('Invalid cursor')
+
+
+def _day_start(value: str):
+    day = datetime.strptime(value, '%Y-%m-%d').date()
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def filter_archives(params):
+    """Apply archive_list query parameters; unparseable dates are ignored as before."""
+    qs = PatientAssessmentArchive.objects.filter(is_archived=True)
+
+    patient_id = params.get('patient_id')
+    patient_name = params.get('patient_name')
+    assessment_type = params.get('assessment_type')
+    condition = params.get('condition')
+    text = (params.get('q') or '').strip()
+
+    if patient_id:
+        qs = qs.filter(user_id=patient_id)
+    if patient_name:
+        qs = qs.filter(patient_name__icontains=patient_name)
+    if assessment_type:
+        qs = qs.alias(assessment_type_upper=Upper('assessment_type')).filter(
+            assessment_type_upper=assessment_type.upper()
+        )
+    if condition:
+        qs = qs.filter(medical_condition__icontains=condition)
+    if text:
+        if connection.vendor == 'postgresql':
+            qs = qs.filter(search_vector=SearchQuery(text, config='simple', search_type='websearch'))
+        else:
+            qs = qs.filter(
+                Q(patient_name__icontains=text)
+                | Q(medical_condition__icontains=text)
+                | Q(medical_history_summary__icontains=text)
+            )
+    # Half-open datetime ranges instead of a __date cast keep the index usable.
+    if params.get('start'):
+        try:
+            qs = qs.filter(last_assessed_at__gte=_day_start(params['start']))
+        except Exception:
+            pass
+    if params.get('end'):
+        try:
+            qs = qs.filter(last_assessed_at__lt=_day_start(params['end']) + timedelta(days=1))
+        except Exception:
+            pass
+    return qs
+
+
+def facet_counts(qs) -> dict:
+    by_type = (
+        qs.order_by().values('assessment_type').annotate(count=Count('id')).order_by('-count', 'assessment_type')
+    )
+    by_month = (
+        qs.order_by().annotate(month=TruncMonth('last_assessed_at'))
+        .values('month').annotate(count=Count('id')).order_by('-month')
+    )
+    return {
+        'assessment_type': [{'value': row['assessment_type'], 'count': row['count']} for row in by_type],
+        'month': [
+            {'value': row['month'].strftime('%Y-%m') if row['month'] else None, 'count': row['count']}
+            for row in by_month
+        ],
+    }
+
+
+def search_archives(params, serializer_class):
+    """
+    Run an archive search and return ``(payload, first_record)``.
+
+    ``payload`` is ``{'results', 'next_cursor', 'facets'}`` (facets only on the
+    first page, and unless ``facets=0``); ``first_record`` is the first row of
+    the page, used for the access log without another query.
+    """
+    try:
+        limit = int(params.get('limit') or DEFAULT_PAGE_SIZE)
+    except (TypeError, ValueError):
+        limit = DEFAULT_PAGE_SIZE
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    cursor = params.get('cursor')
+
+    qs = filter_archives(params)
+    facets = None
+    if not cursor and params.get('facets', '1') not in ('0', 'false'):
+        facets = facet_counts(qs)
+
+    page_qs = qs.select_related('user', 'archived_by').order_by('-last_assessed_at', '-id')
+    if cursor:
+        assessed_at, record_id = decode_cursor(cursor)
+        page_qs = page_qs.filter(
+            Q(last_assessed_at__lt=assessed_at) | Q(last_assessed_at=assessed_at, id__lt=record_id)
+        )
+    rows = list(page_qs[:limit + 1])
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1]) if len(rows) > limit else None
+
+    payload = {
+        'results': serializer_class(page, many=True).data,
+        'next_cursor': next_cursor,
+    }
+    if facets is not None:
+        payload['facets'] = facets
+    return payload, (page[0] if page else None)
@@ -3,7 +3,6 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from django.utils import timezone
-from datetime import datetime
 from django.core.cache import cache
 from django.db import transaction
 from django.http import HttpResponse
@@ -11,9 +10,13 @@ import os
 
 from backend.users.models import User, GeneralDoctorProfile
 from backend.users.models import PatientProfile
+from backend.users.lifecycle import sync_patient_lifecycle
 from .models import PatientAssessmentArchive, ArchiveAccessLog
 from .serializers import PatientAssessmentArchiveSerializer, ArchiveAccessLogSerializer
 from .pdf_service import generate_archive_pdf
+from .archive_search import InvalidCursor, search_archives
+from .access_log import log_archive_access
+from .signals import archive_detail_cache_key, archive_export_cache_key
 
 import hmac
 import hashlib
@@ -144,103 +147,40 @@ def _collect_full_profile(user: User) -> dict:
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def archive_list(request):
-    """List archived patient assessments with search and filters"""
+    """
+    List archived patient assessments with search and filters.
+
+    Keyset-paginated: pass ``limit`` (max 200) and the returned ``next_cursor``
+    as ``cursor``. The first page includes facet counts; ``q`` runs a
+    full-text search over patient name, condition and history summary.
+    """
     start_time = timezone.now()
-    try:
-        qs = PatientAssessmentArchive.objects.filter(assessment_data__archived=True)
-        patient_id = request.GET.get('patient_id')
-        patient_name = request.GET.get('patient_name')
-        start_date = request.GET.get('start')
-        end_date = request.GET.get('end')
-        assessment_type = request.GET.get('assessment_type')
-        condition = request.GET.get('condition')
 
-        if patient_id:
-            qs = qs.filter(user__id=patient_id)
-        if patient_name:
-            qs = qs.filter(user__full_name__icontains=patient_name)
-        if assessment_type:
-            qs = qs.filter(assessment_type__iexact=assessment_type)
-        if condition:
-            qs = qs.filter(medical_condition__icontains=condition)
-        if start_date:
-            try:
-                sd = datetime.strptime(start_date, '%Y-%m-%d').date()
-                qs = qs.filter(last_assessed_at__date__gte=sd)
-            except Exception:
-                pass
-        if end_date:
-            try:
-                ed = datetime.strptime(end_date, '%Y-%m-%d').date()
-                qs = qs.filter(last_assessed_at__date__lte=ed)
-            except Exception:
-                pass
+    def _log_search(record_id=None):
+        log_archive_access(
+            request.user, 'search', record_id=record_id,
+            query_params=str(dict(request.GET)), duration_ms=int((timezone.now()-start_time).total_seconds()*1000)
+        )
 
+    try:
         cache_key = f"archives:list:{request.user.id}:{hash(frozenset(request.GET.items()))}"
         cached = _safe_cache_get(cache_key)
         if cached:
-            try:
-                ArchiveAccessLog.objects.create(
-                    user=request.user, action='search', record=qs.first() if qs.exists() else None,
-                    query_params=str(dict(request.GET)), duration_ms=int((timezone.now()-start_time).total_seconds()*1000)
-                )
-            except Exception:
-                pass
+            results = cached.get('results') or []
+            _log_search(record_id=results[0]['id'] if results else None)
             return Response(cached, status=status.HTTP_200_OK)
 
-        serializer = PatientAssessmentArchiveSerializer(qs.order_by('-last_assessed_at')[:200], many=True)
-        data = serializer.data
+        data, first_record = search_archives(request.GET, PatientAssessmentArchiveSerializer)
         _safe_cache_set(cache_key, data, timeout=60)
-
-        try:
-            ArchiveAccessLog.objects.create(
-                user=request.user, action='search', record=qs.first() if qs.exists() else None,
-                query_params=str(dict(request.GET)), duration_ms=int((timezone.now()-start_time).total_seconds()*1000)
-            )
-        except Exception:
-            pass
+        _log_search(first_record.id if first_record else None)
         return Response(data, status=status.HTTP_200_OK)
+    except InvalidCursor as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception:
         # Fallback path: compute response without any cache operations and return 200
         try:
-            qs = PatientAssessmentArchive.objects.filter(assessment_data__archived=True)
-            patient_id = request.GET.get('patient_id')
-            patient_name = request.GET.get('patient_name')
-            start_date = request.GET.get('start')
-            end_date = request.GET.get('end')
-            assessment_type = request.GET.get('assessment_type')
-            condition = request.GET.get('condition')
-
-            if patient_id:
-                qs = qs.filter(user__id=patient_id)
-            if patient_name:
-                qs = qs.filter(user__full_name__icontains=patient_name)
-            if assessment_type:
-                qs = qs.filter(assessment_type__iexact=assessment_type)
-            if condition:
-                qs = qs.filter(medical_condition__icontains=condition)
-            if start_date:
-                try:
-                    sd = datetime.strptime(start_date, '%Y-%m-%d').date()
-                    qs = qs.filter(last_assessed_at__date__gte=sd)
-                except Exception:
-                    pass
-            if end_date:
-                try:
-                    ed = datetime.strptime(end_date, '%Y-%m-%d').date()
-                    qs = qs.filter(last_assessed_at__date__lte=ed)
-                except Exception:
-                    pass
-
-            serializer = PatientAssessmentArchiveSerializer(qs.order_by('-last_assessed_at')[:200], many=True)
-            data = serializer.data
-            try:
-                ArchiveAccessLog.objects.create(
-                    user=request.user, action='search', record=qs.first() if qs.exists() else None,
-                    query_params=str(dict(request.GET)), duration_ms=int((timezone.now()-start_time).total_seconds()*1000)
-                )
-            except Exception:
-                pass
+            data, first_record = search_archives(request.GET, PatientAssessmentArchiveSerializer)
+            _log_search(first_record.id if first_record else None)
             return Response(data, status=status.HTTP_200_OK)
         except Exception as db_err:
             return Response({'error': 'Failed to list archives', 'detail': str(db_err), 'cache_available': _is_cache_available()}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -251,33 +191,29 @@ def archive_detail(request, archive_id):
     """Get a single archived assessment (decrypted)"""
     start_time = timezone.now()
     try:
-        record = PatientAssessmentArchive.objects.filter(id=archive_id).first()
-        if not record:
-            return Response({'error': 'Archive record not found'}, status=status.HTTP_404_NOT_FOUND)
-
-        cache_key = f"archives:detail:{archive_id}"
+        # Cache hits are served without touching the database; the entry is
+        # dropped whenever the record is saved or deleted (see signals.py).
+        cache_key = archive_detail_cache_key(archive_id)
         cached = _safe_cache_get(cache_key)
         if cached:
-            try:
-                ArchiveAccessLog.objects.create(
-                    user=request.user, action='view', record=record,
-                    duration_ms=int((timezone.now()-start_time).total_seconds()*1000),
-                )
-            except Exception:
-                pass
+            log_archive_access(
+                request.user, 'view', record_id=cached.get('id', archive_id),
+                duration_ms=int((timezone.now()-start_time).total_seconds()*1000),
+            )
             return Response(cached, status=status.HTTP_200_OK)
 
+        record = PatientAssessmentArchive.objects.filter(id=archive_id).first()
+        if not record:
+            return Response({'error': 'Archive record not found'}, status=status.HTTP_404_NOT_FOUND)
+
         serializer = PatientAssessmentArchiveSerializer(record)
         data = serializer.data
         _safe_cache_set(cache_key, data, timeout=120)
 
-        try:
-            ArchiveAccessLog.objects.create(
-                user=request.user, action='view', record=record,
-                duration_ms=int((timezone.now()-start_time).total_seconds()*1000),
-            )
-        except Exception:
-            pass
+        log_archive_access(
+            request.user, 'view', record=record,
+            duration_ms=int((timezone.now()-start_time).total_seconds()*1000),
+        )
         return Response(data, status=status.HTTP_200_OK)
     except Exception:
         # Fallback: attempt to read from DB and serialize without cache
@@ -287,13 +223,10 @@ def archive_detail(request, archive_id):
                 return Response({'error': 'Archive record not found'}, status=status.HTTP_404_NOT_FOUND)
             serializer = PatientAssessmentArchiveSerializer(record)
             data = serializer.data
-            try:
-                ArchiveAccessLog.objects.create(
-                    user=request.user, action='view', record=record,
-                    duration_ms=int((timezone.now()-start_time).total_seconds()*1000),
-                )
-            except Exception:
-                pass
+            log_archive_access(
+                request.user, 'view', record=record,
+                duration_ms=int((timezone.now()-start_time).total_seconds()*1000),
+            )
             return Response(data, status=status.HTTP_200_OK)
         except Exception as db_err:
             return Response({'error': 'Failed to fetch archive', 'detail': str(db_err), 'cache_available': _is_cache_available()}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -351,7 +284,7 @@ def archive_create(request):
         # Authorization: only doctors, nurses, and admins may archive
         actor_role = str(getattr(request.user, 'role', '') or '').lower()
         if actor_role not in ('doctor', 'nurse', 'admin'):
-            ArchiveAccessLog.objects.create(user=request.user, action='create', record=None, query_params=json.dumps({'status': 'failure', 'code': 'ERR_FORBIDDEN_ROLE', 'actor_role': actor_role}))
+            log_archive_access(request.user, 'create', query_params=json.dumps({'status': 'failure', 'code': 'ERR_FORBIDDEN_ROLE', 'actor_role': actor_role}))
             return Response({'error': 'Not authorized to archive records', 'code': 'ERR_FORBIDDEN_ROLE'}, status=status.HTTP_403_FORBIDDEN)
 
         # Basic validation
@@ -363,15 +296,15 @@ def archive_create(request):
         # Verify specialization/doctor if provided
         if doctor_id or specialization:
             if not (doctor_id and specialization):
-                ArchiveAccessLog.objects.create(user=request.user, action='create', record=None, query_params=json.dumps({'doctor_id': doctor_id, 'specialization': specialization, 'status': 'failure', 'code': 'ERR_MISSING_DOCTOR_SPECIALIZATION'}))
+                log_archive_access(request.user, 'create', query_params=json.dumps({'doctor_id': doctor_id, 'specialization': specialization, 'status': 'failure', 'code': 'ERR_MISSING_DOCTOR_SPECIALIZATION'}))
                 return Response({'error': 'Doctor ID and specialization are required', 'code': 'ERR_MISSING_DOCTOR_SPECIALIZATION'}, status=status.HTTP_400_BAD_REQUEST)
             if not _doctor_specialization_is_valid(int(doctor_id), str(specialization)):
-                ArchiveAccessLog.objects.create(user=request.user, action='create', record=None, query_params=json.dumps({'doctor_id': doctor_id, 'specialization': specialization, 'status': 'failure', 'code': 'ERR_SPECIALIZATION_MISMATCH'}))
+                log_archive_access(request.user, 'create', query_params=json.dumps({'doctor_id': doctor_id, 'specialization': specialization, 'status': 'failure', 'code': 'ERR_SPECIALIZATION_MISMATCH'}))
                 return Response({'error': 'Doctor verification/specialization mismatch', 'code': 'ERR_SPECIALIZATION_MISMATCH'}, status=status.HTTP_403_FORBIDDEN)
 
         # Verify digital signature if provided
         if signature and not _verify_signature(assessment_data_val, signature):
-            ArchiveAccessLog.objects.create(user=request.user, action='create', record=None, query_params=json.dumps({'doctor_id': doctor_id, 'specialization': specialization, 'status': 'failure', 'code': 'ERR_BAD_SIGNATURE'}))
+            log_archive_access(request.user, 'create', query_params=json.dumps({'doctor_id': doctor_id, 'specialization': specialization, 'status': 'failure', 'code': 'ERR_BAD_SIGNATURE'}))
             return Response({'error': 'Bad digital signature', 'code': 'ERR_BAD_SIGNATURE'}, status=status.HTTP_401_UNAUTHORIZED)
         # Full record aggregation if requested
         full_record = bool(payload.get('full_record'))
@@ -406,19 +339,20 @@ def archive_create(request):
                 last_assessed_at=payload.get('last_assessed_at') or timezone.now(),
                 hospital_name=payload.get('hospital_name', ''),
             )
+            sync_patient_lifecycle(user.id)
             # Write to dual store; throw to trigger rollback if failed
             _dual_store_write(record.id, _record_payload_for_dual_store(record))
         serializer = PatientAssessmentArchiveSerializer(record)
-        ArchiveAccessLog.objects.create(
-            user=request.user,
-            action='create',
+        log_archive_access(
+            request.user,
+            'create',
             record=record,
             query_params=json.dumps({'doctor_id': doctor_id, 'specialization': specialization, 'status': 'success', 'full_record': full_record}),
             duration_ms=int((timezone.now()-start_time).total_seconds()*1000)
         )
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     except Exception as e:
-        ArchiveAccessLog.objects.create(user=request.user, action='create', record=None, query_params=json.dumps({'status': 'failure', 'code': 'ERR_SERVER', 'message': str(e)}))
+        log_archive_access(request.user, 'create', query_params=json.dumps({'status': 'failure', 'code': 'ERR_SERVER', 'message': str(e)}))
         return Response({'error': f'Failed to create archive: {str(e)}', 'code': 'ERR_SERVER'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @api_view(['GET'])
@@ -427,35 +361,30 @@ def archive_export(request, archive_id):
     """Export a single archived assessment as a PDF with header and selected forms."""
     start_time = timezone.now()
     try:
-        record = PatientAssessmentArchive.objects.filter(id=archive_id).first()
-        if not record:
-            return Response({'error': 'Archive record not found'}, status=status.HTTP_404_NOT_FOUND)
-
-        cache_key = f"archives:export_pdf:{archive_id}"
+        # Cache hits are served without touching the database.
+        cache_key = archive_export_cache_key(archive_id)
         cached_pdf = _safe_cache_get(cache_key)
         if cached_pdf:
-            try:
-                ArchiveAccessLog.objects.create(
-                    user=request.user, action='export', record=record,
-                    duration_ms=int((timezone.now()-start_time).total_seconds()*1000),
-                )
-            except Exception:
-                pass
+            log_archive_access(
+                request.user, 'export', record_id=archive_id,
+                duration_ms=int((timezone.now()-start_time).total_seconds()*1000),
+            )
             return HttpResponse(cached_pdf, content_type='application/pdf', headers={
                 'Content-Disposition': f'attachment; filename="archive_{archive_id}.pdf"'
             })
 
+        record = PatientAssessmentArchive.objects.filter(id=archive_id).first()
+        if not record:
+            return Response({'error': 'Archive record not found'}, status=status.HTTP_404_NOT_FOUND)
+
         # Generate the PDF bytes using the pdf service
         pdf_bytes = generate_archive_pdf(record)
         _safe_cache_set(cache_key, pdf_bytes, timeout=180)
 
-        try:
-            ArchiveAccessLog.objects.create(
-                user=request.user, action='export', record=record,
-                duration_ms=int((timezone.now()-start_time).total_seconds()*1000),
-            )
-        except Exception:
-            pass
+        log_archive_access(
+            request.user, 'export', record=record,
+            duration_ms=int((timezone.now()-start_time).total_seconds()*1000),
+        )
 
         return HttpResponse(pdf_bytes, content_type='application/pdf', headers={
             'Content-Disposition': f'attachment; filename="archive_{archive_id}.pdf"'
@@ -525,6 +454,7 @@ def archive_update(request, archive_id):
             for k, v in updated_fields.items():
                 setattr(record, k, v)
             record.save()
+            sync_patient_lifecycle(record.user_id)
             _dual_store_write(record.id, _record_payload_for_dual_store(record))
 
         serializer = PatientAssessmentArchiveSerializer(record)
@@ -550,6 +480,7 @@ def archive_unarchive(request, archive_id):
         with transaction.atomic():
             record.assessment_data = data
             record.save()
+            sync_patient_lifecycle(record.user_id)
             _dual_store_write(record.id, _record_payload_for_dual_store(record))
 
         return Response({'success': True, 'message': 'Record unarchived', 'id': record.id}, status=status.HTTP_200_OK)
@@ -9,54 +9,58 @@ from datetime import datetime
 from django.contrib.auth import get_user_model
 from asgiref.sync import sync_to_async
 
-from .models import (
-    AppointmentManagement, QueueManagement, PriorityQueue,
-    Notification, Conversation, Message,
-    MessageNotification, MedicineInventory
-)
-from backend.users.models import PatientProfile
+from .models import AppointmentManagement, QueueManagement, Notification
 from backend.utils.async_db import AsyncModelManager, async_safe
 
+# Messaging, medicine inventory and the priority queue models were removed
+# (migration 0033); their services below fail at call time until they return.
+try:
+    from .models import Conversation, Message, MessageNotification, MedicineInventory
+except ImportError:
+    Conversation = Message = MessageNotification = MedicineInventory = None
+
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+
+def _seconds(duration):
+    return duration.total_seconds() if duration is not None else None
+
+
 class AsyncAppointmentService:
     """Async service for appointment management."""
-    
+
     @staticmethod
     @async_safe(timeout=30)
     async def get_user_appointments(user_id: int, filters: Dict[str, Any] = None) -> List[Dict]:
-        """Get appointments for a user asynchronously."""
+        """
+        Get a doctor's appointments asynchronously.
+        Patients and their profiles come from the same query (select_related),
+        so the cost stays one query regardless of the number of appointments.
+        """
         try:
-            filter_kwargs = {'doctor_id': user_id}
-            if filters:
-                filter_kwargs.update(filters)
-            
-            appointments = await AsyncModelManager.filter_objects(
-                AppointmentManagement, **filter_kwargs
+            queryset = (
+                AppointmentManagement.objects.filter(doctor__user_id=user_id, **(filters or {}))
+                .select_related('patient__user')
+                .order_by('appointment_date', 'appointment_time')
             )
-            
+
             # Convert to serializable format
             result = []
-            for appointment in appointments:
-                patient = await AsyncModelManager.get_object_or_none(
-                    User, id=appointment.patient_id
-                )
-                patient_profile = await AsyncModelManager.get_object_or_none(
-                    PatientProfile, user=patient
-                ) if patient else None
-                
+            async for appointment in queryset:
+                profile = appointment.patient
+                patient = profile.user
                 result.append({
-                    'id': appointment.id,
-                    'patient_name': f"{patient.first_name} {patient.last_name}" if patient else "Unknown",
-                    'patient_email': patient.email if patient else "",
+                    'id': appointment.pk,
+                    'patient_name': patient.full_name or patient.email,
+                    'patient_email': patient.email,
                     'appointment_date': appointment.appointment_date.isoformat(),
                     'appointment_time': appointment.appointment_time.strftime('%H:%M'),
                     'status': appointment.status,
-                    'blood_type': patient_profile.blood_type if patient_profile else "",
-                    'medical_condition': patient_profile.medical_condition if patient_profile else "",
+                    'blood_type': profile.blood_type,
+                    'medical_condition': profile.medical_condition,
                 })
-            
+
             return result
         except Exception as e:
             logger.error(f"Error getting user appointments: {str(e)}")
@@ -106,61 +110,38 @@ class AsyncAppointmentService:
 
 class AsyncQueueService:
     """Async service for queue management."""
-    
+
     @staticmethod
     @async_safe(timeout=30)
     async def get_queue_patients(department: str = None) -> Dict[str, List]:
-        """Get queue patients asynchronously."""
+        """
+        Get waiting queue patients asynchronously, in queue order.
+        Patient names come from the same query (select_related). The priority
+        queue model was removed, so ``priority_queue`` is always empty.
+        """
         try:
-            filter_kwargs = {'status': 'waiting'}
+            queryset = QueueManagement.objects.filter(status='waiting')
             if department:
-                filter_kwargs['department'] = department
-            
-            # Get normal queue
-            normal_queue = await AsyncModelManager.filter_objects(
-                QueueManagement, **filter_kwargs
-            )
-            
-            # Get priority queue
-            priority_queue = await AsyncModelManager.filter_objects(
-                PriorityQueue, **filter_kwargs
-            )
-            
-            # Process normal queue
+                queryset = queryset.filter(department=department)
+            queryset = queryset.select_related('patient__user').order_by('queue_number', 'id')
+
             normal_patients = []
-            for queue_item in normal_queue:
-                patient = await AsyncModelManager.get_object_or_none(
-                    User, id=queue_item.patient_id
-                )
-                if patient:
-                    normal_patients.append({
-                        'id': queue_item.id,
-                        'patient_name': f"{patient.first_name} {patient.last_name}",
-                        'patient_email': patient.email,
-                        'position': queue_item.position_in_queue,
-                        'queue_number': queue_item.queue_number,
-                        'estimated_wait': queue_item.estimated_wait_time
-                    })
-            
-            # Process priority queue
-            priority_patients = []
-            for queue_item in priority_queue:
-                patient = await AsyncModelManager.get_object_or_none(
-                    User, id=queue_item.patient_id
-                )
-                if patient:
-                    priority_patients.append({
-                        'id': queue_item.id,
-                        'patient_name': f"{patient.first_name} {patient.last_name}",
-                        'patient_email': patient.email,
-                        'priority_level': queue_item.priority_level,
-                        'queue_number': queue_item.queue_number,
-                        'estimated_wait': queue_item.estimated_wait_time
-                    })
-            
+            position = 0
+            async for queue_item in queryset:
+                patient = queue_item.patient.user
+                position += 1
+                normal_patients.append({
+                    'id': queue_item.id,
+                    'patient_name': patient.full_name or patient.email,
+                    'patient_email': patient.email,
+                    'position': position,
+                    'queue_number': queue_item.queue_number,
+                    'estimated_wait': _seconds(queue_item.estimated_wait_time),
+                })
+
             return {
                 'normal_queue': normal_patients,
-                'priority_queue': priority_patients
+                'priority_queue': []
             }
         except Exception as e:
             logger.error(f"Error getting queue patients: {str(e)}")
@@ -0,0 +1,122 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from asgiref.sync import async_to_sync, sync_to_async
+from datetime import time as dt_time, timedelta
+import time
+
+from backend.operations.async_services import AsyncAppointmentService, AsyncQueueService
+from backend.operations.models import AppointmentManagement, QueueManagement
+from backend.users.models import GeneralDoctorProfile, PatientProfile, User
+
+DEPARTMENT = 'BENCH'
+
+
+class _Rollback(Exception):
+    pass
+
+
+async def _legacy_queue_patients(department):
+    """The previous per-row implementation: one thread hop and two lookups per queue entry."""
+    rows = await sync_to_async(list)(QueueManagement.objects.filter(status='waiting', department=department))
+    result = []
+    for item in rows:
+        profile = await sync_to_async(PatientProfile.objects.get)(id=item.patient_id)
+        patient = await sync_to_async(User.objects.get)(id=profile.user_id)
+        result.append({'id': item.id, 'patient_name': patient.full_name, 'queue_number': item.queue_number})
+    return result
+
+
+async def _legacy_user_appointments(user_id):
+    rows = await sync_to_async(list)(AppointmentManagement.objects.filter(doctor__user_id=user_id))
+    result = []
+    for appointment in rows:
+        profile = await sync_to_async(PatientProfile.objects.get)(id=appointment.patient_id)
+        patient = await sync_to_async(User.objects.get)(id=profile.user_id)
+        result.append({'id': appointment.pk, 'patient_name': patient.full_name, 'blood_type': profile.blood_type})
+    return result
+
+
+async def _normal_queue(coroutine):
+    return (await coroutine)['normal_queue']
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark AsyncQueueService.get_queue_patients and AsyncAppointmentService.get_user_appointments '
+        '(query count and latency) against the previous per-row lookups. Fixture rows are created in a '
+        'transaction that is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help='Queue entries and appointments to create')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per variant (best is reported)')
+
+    def _seed(self, rows):
+        stamp = timezone.now().strftime('%Y%m%d%H%M%S%f')
+        doctor = User.objects.create_user(
+            email=f'bench_doctor_{stamp}@example.com', password=None, role=User.Role.DOCTOR, full_name='Bench Doctor',
+        )
+        doctor_profile = GeneralDoctorProfile.objects.create(user=doctor)
+        users = User.objects.bulk_create([
+            User(email=f'bench_patient_{stamp}_{i}@example.com', role=User.Role.PATIENT, full_name=f'Bench Patient {i}')
+            for i in range(rows)
+        ])
+        if users[0].pk is None:
+            users = list(User.objects.filter(email__startswith=f'bench_patient_{stamp}_').order_by('id'))
+        PatientProfile.objects.bulk_create([PatientProfile(user=u) for u in users])
+        profiles = list(PatientProfile.objects.filter(user__in=users).order_by('id'))
+        base_number = (AppointmentManagement.objects.order_by('-queue_number').values_list('queue_number', flat=True)
+                       .first() or 0) + 1
+        now = timezone.now()
+        QueueManagement.objects.bulk_create([
+            QueueManagement(patient=p, queue_number=i + 1, department=DEPARTMENT,
+                            estimated_wait_time=timedelta(minutes=5 * i))
+            for i, p in enumerate(profiles)
+        ])
+        AppointmentManagement.objects.bulk_create([
+            AppointmentManagement(doctor=doctor_profile, patient=p, queue_number=base_number + i,
+                                  appointment_date=now, appointment_time=dt_time(9, 0))
+            for i, p in enumerate(profiles)
+        ])
+        return doctor.id
+
+    def _measure(self, label, coroutine_factory, repeat):
+        async def run():
+            return await coroutine_factory()
+
+        connection.queries_log.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            rows = len(async_to_sync(run)())
+        queries = len(ctx.captured_queries)
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            async_to_sync(run)()
+            elapsed = (time.perf_counter() - start) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        self.stdout.write(f"{label:<38} {rows:>6} {queries:>8} {best:>10.1f}")
+        return queries, best
+
+    def handle(self, *args, **options):
+        rows = max(1, options['rows'])
+        repeat = max(1, options['repeat'])
+        try:
+            with transaction.atomic():
+                doctor_id = self._seed(rows)
+                self.stdout.write(f"{'variant':<38} {'rows':>6} {'queries':>8} {'best ms':>10}")
+                variants = [
+                    ('queue: per-row lookups (before)', lambda: _legacy_queue_patients(DEPARTMENT)),
+                    ('queue: select_related (after)',
+                     lambda: _normal_queue(AsyncQueueService.get_queue_patients(DEPARTMENT))),
+                    ('appointments: per-row (before)', lambda: _legacy_user_appointments(doctor_id)),
+                    ('appointments: select_related (after)',
+                     lambda: AsyncAppointmentService.get_user_appointments(doctor_id)),
+                ]
+                for label, factory in variants:
+                    self._measure(label, factory, repeat)
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write(self.style.SUCCESS('Fixture rows rolled back.'))
@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand
+import io
+import os
+import time
+from backend.operations.pdf_templates import DoctorAnalyticsPDF, NurseAnalyticsPDF, PatientArchivePDF
+from backend.operations.pdf_templates import styles as pdf_styles
+
+
+SAMPLE_DATA = {
+    'doctor': {
+        'analytics_results': {'metrics': {'Total Patients': 145, 'Critical Cases': 12, 'Avg Stay': '4 Days'}},
+        'performance_factors': {'significant_factors': ['Seasonal respiratory admissions', 'Weekend staffing']},
+        'ai_recommendations': {'actionable': [{'text': 'Increase flu-season staffing', 'confidence': 0.82}]},
+    },
+    'nurse': {
+        'analytics_results': {'metrics': {'Avg Response Time': '3.5 min', 'Patients per Nurse': '5'}},
+        'performance_factors': {'significant_factors': ['Medication round delays 10:00-11:00']},
+        'ai_recommendations': {'actionable': ['Stagger medication rounds']},
+    },
+    'archive': {
+        'patient_info': {'name': 'Alice Wonderland', 'id': 'P-9988', 'dob': '1990-05-12', 'blood_group': 'O+'},
+        'assessment_context': {'assessment_type': 'intake', 'medical_condition': 'Hypertension'},
+        'sections': [
+            {'title': 'Progress Notes', 'content': [{'note': 'Stable overnight', 'author': 'Dr. Smith'}] * 5},
+        ],
+    },
+}
+
+TEMPLATES = {
+    'doctor': DoctorAnalyticsPDF,
+    'nurse': NurseAnalyticsPDF,
+    'archive': PatientArchivePDF,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Micro-benchmark PDF rendering throughput (PDFs/second on one core) with a cold '
+        'style/logo registry (rebuilt per PDF, the old behaviour) versus the shared warm registry.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50, help='PDFs rendered per template and mode')
+        parser.add_argument('--template', choices=['all'] + sorted(TEMPLATES), default='all')
+        parser.add_argument('--logo', default='frontend/src/assets/logo.png', help='Logo drawn in the page header')
+
+    def _run(self, template_cls, data, logo_path, iterations, cold):
+        pdf_styles.warm_registry([logo_path] if logo_path else ())
+        start = time.perf_counter()
+        for _ in range(iterations):
+            if cold:
+                pdf_styles.clear_registry()
+            buffer = io.BytesIO()
+            template_cls(buffer, {'name': 'MediSync General Hospital', 'address': '123 Healthcare Blvd'},
+                         logo_path=logo_path).generate(data)
+        elapsed = time.perf_counter() - start
+        return iterations / elapsed if elapsed > 0 else 0.0
+
+    def handle(self, *args, **options):
+        iterations = max(1, options['iterations'])
+        logo_path = options['logo']
+        if logo_path and not os.path.exists(logo_path):
+            self.stdout.write(self.style.WARNING(f"Logo not found at {logo_path}; benchmarking without a logo"))
+            logo_path = None
+
+        names = sorted(TEMPLATES) if options['template'] == 'all' else [options['template']]
+        self.stdout.write(f"{'template':<10} {'cold pdf/s':>12} {'warm pdf/s':>12} {'speedup':>9}")
+        for name in names:
+            cold = self._run(TEMPLATES[name], SAMPLE_DATA[name], logo_path, iterations, cold=True)
+            warm = self._run(TEMPLATES[name], SAMPLE_DATA[name], logo_path, iterations, cold=False)
+            speedup = warm / cold if cold else 0.0
+            self.stdout.write(f"{name:<10} {cold:>12.1f} {warm:>12.1f} {speedup:>8.2f}x")
+
+        self.stdout.write(self.style.SUCCESS(
+            'Single-process run: figures are PDFs per second per core.'
+        ))
@@ -0,0 +1,112 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from backend.operations import report_batch
+
+ROLE_CHOICES = ('doctor', 'nurse', 'patient')
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate PDF reports for every doctor, nurse and archived patient (optionally filtered by role '
+        'or hospital) over a process pool. Files are written atomically to the output directory together '
+        'with a manifest; reports whose inputs have not changed since the last run are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--role', action='append', choices=ROLE_CHOICES,
+                            help='Limit to a role (repeatable). Defaults to all roles.')
+        parser.add_argument('--hospital', help='Only users/archives whose hospital name matches (case-insensitive)')
+        parser.add_argument('--output-dir', default='reports', help='Directory for PDFs and manifest.json')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Worker processes (0 renders inline in this process)')
+        parser.add_argument('--max-worker-memory-mb', type=int, default=1536,
+                            help='Address-space limit per worker in MB (0 disables)')
+        parser.add_argument('--tasks-per-worker', type=int, default=25,
+                            help='Recycle each worker after this many reports to release memory')
+        parser.add_argument('--force', action='store_true', help='Regenerate even if inputs are unchanged')
+
+    def handle(self, *args, **options):
+        roles = set(options['role'] or ROLE_CHOICES)
+        output_dir = os.path.abspath(options['output_dir'])
+        workers = max(0, options['workers'])
+        try:
+            os.makedirs(output_dir, exist_ok=True)
+        except OSError as e:
+            raise CommandError(f"Cannot create output directory {output_dir}: {e}")
+
+        plan_started = time.perf_counter()
+        jobs, shared_inputs = report_batch.plan_jobs(roles, hospital=options.get('hospital'))
+        manifest = report_batch.load_manifest(output_dir)
+        pending = jobs if options['force'] else [
+            job for job in jobs if not report_batch.is_up_to_date(manifest, output_dir, job)
+        ]
+        skipped = len(jobs) - len(pending)
+        self.stdout.write(
+            f"Planned {len(jobs)} report(s) in {time.perf_counter() - plan_started:.2f}s: "
+            f"{len(pending)} to render, {skipped} unchanged"
+        )
+        if not pending:
+            self.stdout.write(self.style.SUCCESS('All reports are up to date.'))
+            return
+
+        started = time.perf_counter()
+        results = []
+        if workers == 0:
+            report_batch.set_shared_inputs(shared_inputs)
+            for job in pending:
+                results.append(self._record(report_batch.render_report_job(job, output_dir)))
+        else:
+            # Workers never touch the database; don't leak our connections into them.
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=min(workers, len(pending)),
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=report_batch.init_worker,
+                initargs=(shared_inputs, options['max_worker_memory_mb']),
+                max_tasks_per_child=max(1, options['tasks_per_worker']),
+            ) as pool:
+                futures = {pool.submit(report_batch.render_report_job, job, output_dir): job for job in pending}
+                for future in as_completed(futures):
+                    try:
+                        result = future.result()
+                    except Exception as e:  # worker crashed (e.g. killed for memory)
+                        result = {'key': futures[future]['key'], 'ok': False, 'error': f'worker failure: {e}', 'render_seconds': 0}
+                    results.append(self._record(result))
+        wall = time.perf_counter() - started
+
+        for result in results:
+            if result['ok']:
+                manifest['reports'][result['key']] = {
+                    k: result[k] for k in ('file', 'fingerprint', 'sha256', 'bytes', 'render_seconds', 'generated_at')
+                }
+        report_batch.save_manifest(output_dir, manifest)
+
+        ok = [r for r in results if r['ok']]
+        failed = len(results) - len(ok)
+        total_bytes = sum(r['bytes'] for r in ok)
+        cpu_seconds = sum(r['render_seconds'] for r in ok)
+        self.stdout.write(
+            f"Rendered {len(ok)} report(s), {failed} failed, {skipped} skipped in {wall:.2f}s: "
+            f"{len(ok) / wall if wall else 0:.2f} reports/s, "
+            f"{total_bytes / (1024 * 1024) / wall if wall else 0:.2f} MB/s, "
+            f"{cpu_seconds / len(ok) if ok else 0:.3f}s avg render per report"
+        )
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{failed} report(s) failed; see messages above."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Reports written to {output_dir}"))
+
+    def _record(self, result):
+        if result['ok']:
+            self.stdout.write(
+                f"  {result['key']:<20} {result['bytes'] / 1024:8.1f} KB  {result['render_seconds']:.3f}s"
+            )
+        else:
+            self.stdout.write(self.style.ERROR(f"  {result['key']:<20} FAILED: {result['error']}"))
+        return result
@@ -0,0 +1,94 @@
+# Generated by Django 5.2.5 on 2026-10-19 15:39
+
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+POSTGRES_FORWARD_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    # Django's icontains compiles to UPPER(col) LIKE UPPER(...), so index that expression.
+    "CREATE INDEX IF NOT EXISTS archive_patient_name_trgm_idx ON patient_assessment_archives "
+    "USING gin (UPPER(patient_name) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS archive_condition_trgm_idx ON patient_assessment_archives "
+    "USING gin (UPPER(medical_condition) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS archive_search_vector_idx ON patient_assessment_archives USING gin (search_vector)",
+    "DROP TRIGGER IF EXISTS archive_search_vector_update ON patient_assessment_archives",
+    "CREATE TRIGGER archive_search_vector_update BEFORE INSERT OR UPDATE ON patient_assessment_archives "
+    "FOR EACH ROW EXECUTE FUNCTION tsvector_update_trigger("
+    "search_vector, 'pg_catalog.simple', patient_name, medical_condition, medical_history_summary)",
+    "UPDATE patient_assessment_archives SET search_vector = to_tsvector('pg_catalog.simple', "
+    "coalesce(patient_name, '') || ' ' || coalesce(medical_condition, '') || ' ' || "
+    "coalesce(medical_history_summary, ''))",
+]
+
+POSTGRES_REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS archive_search_vector_update ON patient_assessment_archives",
+    "DROP INDEX IF EXISTS archive_search_vector_idx",
+    "DROP INDEX IF EXISTS archive_condition_trgm_idx",
+    "DROP INDEX IF EXISTS archive_patient_name_trgm_idx",
+]
+
+
+def backfill_search_columns(apps, schema_editor):
+    Archive = apps.get_model('operations', 'PatientAssessmentArchive')
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Archive.objects.update(is_archived=False)
+    Archive.objects.filter(assessment_data__archived=True).update(is_archived=True)
+    Archive.objects.update(patient_name=Coalesce(
+        Subquery(User.objects.filter(pk=OuterRef('user_id')).values('full_name')[:1]), Value(''),
+    ))
+    Archive.objects.filter(last_assessed_at__isnull=True).update(last_assessed_at=F('archived_at'))
+
+
+def create_postgres_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in POSTGRES_FORWARD_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_postgres_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in POSTGRES_REVERSE_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0036_dailysequencecounter'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patientassessmentarchive',
+            name='is_archived',
+            field=models.BooleanField(default=True, help_text="Mirror of assessment_data['archived']"),
+        ),
+        migrations.AddField(
+            model_name='patientassessmentarchive',
+            name='patient_name',
+            field=models.CharField(blank=True, help_text='Copy of user.full_name for indexed search', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='patientassessmentarchive',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_search_columns, migrations.RunPython.noop),
+        migrations.RunPython(create_postgres_search_indexes, drop_postgres_search_indexes),
+        migrations.AddIndex(
+            model_name='patientassessmentarchive',
+            index=models.Index(condition=models.Q(('is_archived', True)), fields=['-last_assessed_at', '-id'], name='archive_active_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patientassessmentarchive',
+            index=models.Index(django.db.models.functions.text.Upper('assessment_type'), name='archive_type_upper_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 15:42
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0037_archive_search'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='archiveaccesslog',
+            name='accessed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
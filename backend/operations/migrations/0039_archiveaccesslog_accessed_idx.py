@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('operations', '0038_archiveaccesslog_event_time'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archiveaccesslog',
+            index=models.Index(fields=['accessed_at'], name='archive_acc_accesse_bbdc90_idx'),
+        ),
+    ]
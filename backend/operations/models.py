@@ -1,5 +1,7 @@
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from backend.users.models import GeneralDoctorProfile, NurseProfile, PatientProfile
 from backend.admin_site.models import Hospital
@@ -277,15 +279,41 @@ class PatientAssessmentArchive(models.Model):
     archived_at = models.DateTimeField(auto_now_add=True)
     archived_by = models.ForeignKey(Users, on_delete=models.SET_NULL, null=True, related_name="archived_assessments")
 
+    # Search columns, denormalized on save (see archive_search.py)
+    is_archived = models.BooleanField(default=True, help_text="Mirror of assessment_data['archived']")
+    patient_name = models.CharField(max_length=255, blank=True, help_text="Copy of user.full_name for indexed search")
+    # Maintained by a PostgreSQL trigger over patient_name, medical_condition and
+    # medical_history_summary (migration 0037); unused on other databases.
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         ordering = ["-archived_at"]
         db_table = "patient_assessment_archives"
         verbose_name = "Patient Assessment Archive"
         verbose_name_plural = "Patient Assessment Archives"
+        indexes = [
+            # Keyset pagination of archive_list: WHERE is_archived ORDER BY last_assessed_at DESC, id DESC
+            models.Index(fields=["-last_assessed_at", "-id"], condition=models.Q(is_archived=True),
+                         name="archive_active_recent_idx"),
+            models.Index(Upper("assessment_type"), name="archive_type_upper_idx"),
+        ]
 
     def __str__(self):
         return f"Archive for {self.user.full_name if self.user else 'Unknown'} - {self.assessment_type}"
 
+    def save(self, *args, **kwargs):
+        data = self.assessment_data
+        self.is_archived = bool(data.get('archived')) if isinstance(data, dict) else False
+        if self.user_id and (not self.patient_name or type(self).user.is_cached(self)):
+            self.patient_name = getattr(self.user, 'full_name', '') or ''
+        # Keyset pagination needs a non-null sort key.
+        if self.last_assessed_at is None:
+            self.last_assessed_at = timezone.now()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'is_archived', 'patient_name', 'last_assessed_at'}
+        super().save(*args, **kwargs)
+
 class ArchiveAccessLog(models.Model):
     ACTION_CHOICES = [
         ('view', 'View'),
@@ -298,7 +326,8 @@ class ArchiveAccessLog(models.Model):
     user = models.ForeignKey(Users, on_delete=models.SET_NULL, null=True, related_name="archive_access_logs")
     record = models.ForeignKey("PatientAssessmentArchive", on_delete=models.SET_NULL, null=True, blank=True, related_name="access_logs")
     action = models.CharField(max_length=20, choices=ACTION_CHOICES)
-    accessed_at = models.DateTimeField(auto_now_add=True)
+    # Set when the event happens, not when the buffered writer flushes it (see access_log.py)
+    accessed_at = models.DateTimeField(default=timezone.now)
     ip_address = models.CharField(max_length=64, blank=True)
     query_params = models.TextField(blank=True)
     duration_ms = models.PositiveIntegerField(null=True, blank=True)
@@ -308,6 +337,10 @@ class ArchiveAccessLog(models.Model):
         db_table = "archive_access_logs"
         verbose_name = "Archive Access Log"
         verbose_name_plural = "Archive Access Logs"
+        indexes = [
+            # Retention deletes (backend/analytics/retention.py)
+            models.Index(fields=["accessed_at"]),
+        ]
 
 class MFAChallenge(models.Model):
     user = models.ForeignKey(Users, on_delete=models.CASCADE, related_name="mfa_challenges")
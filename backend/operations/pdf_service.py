@@ -1,5 +1,10 @@
+import base64
+import hashlib
 import io
-from typing import Dict, Any, List
+import logging
+import os
+import struct
+from typing import Callable, Dict, Any, List
 from reportlab.lib.pagesizes import A4
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import inch
@@ -8,6 +13,9 @@ from django.core.mail import EmailMessage
 from django.conf import settings
 from .models import PatientAssessmentArchive
 from .pdf_templates import DoctorAnalyticsPDF, NurseAnalyticsPDF, PatientArchivePDF
+from .pdf_templates.styles import get_archive_styles
+
+logger = logging.getLogger(__name__)
 
 # Import analytics PDF components for standardized formatting
 try:
@@ -25,14 +33,120 @@ except Exception:  # pragma: no cover
     PdfReader = None
     PdfWriter = None
 
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    from reportlab.lib.pdfencrypt import StandardEncryption
+    from reportlab.pdfbase.pdfdoc import DummyDoc, PDFDictionary, PDFName, PDFObject
+except ImportError:  # pragma: no cover
+    StandardEncryption = None
+
+
+def _aes(key: bytes, data: bytes, iv: bytes = None) -> bytes:
+    """AES-CBC (or ECB when no IV is given) over block-aligned ``data``."""
+    mode = modes.CBC(iv) if iv is not None else modes.ECB()
+    encryptor = Cipher(algorithms.AES(key), mode).encryptor()
+    return encryptor.update(data) + encryptor.finalize()
+
+
+def _hex(value: bytes) -> str:
+    return '<%s>' % value.hex().upper()
+
+
+_SHA2 = (hashlib.sha256, hashlib.sha384, hashlib.sha512)
+
+
+def _hash_r6(password: bytes, salt: bytes, user_key: bytes = b'') -> bytes:
+    """Password hash of revision 6 (ISO 32000-2, algorithm 2.B): at least 64 rounds of AES and SHA-2."""
+    k = hashlib.sha256(password + salt + user_key).digest()
+    rounds = 0
+    while True:
+        e = _aes(k[:16], (password + k + user_key) * 64, k[16:32])
+        k = _SHA2[sum(e[:16]) % 3](e).digest()
+        rounds += 1
+        if rounds >= 64 and e[-1] <= rounds - 32:
+            return k[:32]
+
+
+if StandardEncryption is not None:
+    class AES256Encryption(StandardEncryption):
+        """
+        AES-256 (PDF standard security handler, revision 6 / AESV3) applied by
+        ReportLab while the document is written, so no second parse/serialize
+        pass is needed.
+
+        Revision 6 derives the password keys with the iterated hash of
+        ``_hash_r6``; ReportLab only implements the deprecated revision 5
+        (a single SHA-256), so the keys and the /Encrypt dictionary are built
+        here and ReportLab only calls ``encode`` for every string and stream.
+        """
+
+        def __init__(self, password: str):
+            super().__init__(password, password, strength=128)
+            self.revision = 6
+
+        def prepare(self, document, overrideID=None):
+            if self.prepared:
+                raise ValueError("encryption already prepared!")
+            # Passwords are UTF-8, truncated to 127 bytes (SASLprep is left out).
+            user_pw = self.userPassword.encode('utf-8')[:127]
+            owner_pw = self.ownerPassword.encode('utf-8')[:127]
+            zero_iv = bytes(16)
+
+            self.P = int(self.permissionBits() - 2**31)
+            self.key = os.urandom(32)
+
+            uvs, uks, ovs, oks = (os.urandom(8) for _ in range(4))
+            self.U = _hash_r6(user_pw, uvs) + uvs + uks
+            self.UE = _aes(_hash_r6(user_pw, uks), self.key, zero_iv)
+            self.O = _hash_r6(owner_pw, ovs, self.U) + ovs + oks
+            self.OE = _aes(_hash_r6(owner_pw, oks, self.U), self.key, zero_iv)
+            perms = struct.pack('<i', self.P) + b'\xff\xff\xff\xffTadb' + os.urandom(4)
+            self.Perms = _aes(self.key, perms)
+
+            self.objnum = self.version = None
+            self.prepared = 1
+
+        def encode(self, t):
+            if not self.prepared:
+                raise ValueError("encryption not prepared!")
+            if isinstance(t, str):
+                t = t.encode('latin-1')
+            pad = 16 - len(t) % 16
+            iv = os.urandom(16)
+            return iv + _aes(self.key, t + bytes([pad]) * pad, iv)
+
+        def info(self):
+            if not self.prepared:
+                raise ValueError("encryption not prepared!")
+            return _AES256EncryptionDictionary(self)
+
+    class _AES256EncryptionDictionary(PDFObject):
+        __RefOnly__ = 1
+
+        def __init__(self, encryption):
+            self.encryption = encryption
+
+        def format(self, document):
+            e = self.encryption
+            stdcf = PDFDictionary({'Length': 32, 'AuthEvent': PDFName('DocOpen'), 'CFM': PDFName('AESV3')})
+            fields = {
+                'Filter': PDFName('Standard'), 'V': 5, 'R': 6, 'Length': 256, 'P': e.P,
+                'O': _hex(e.O), 'U': _hex(e.U), 'OE': _hex(e.OE), 'UE': _hex(e.UE), 'Perms': _hex(e.Perms),
+                'CF': PDFDictionary({'StdCF': stdcf}), 'StmF': PDFName('StdCF'), 'StrF': PDFName('StdCF'),
+            }
+            # A dummy document writes the dictionary itself unencrypted.
+            return PDFDictionary(fields).format(DummyDoc())
+else:  # pragma: no cover
+    AES256Encryption = None
+
 
-def generate_records_pdf(patient_name: str, patient_email: str, details: Dict[str, Any]) -> bytes:
+def generate_records_pdf(patient_name: str, patient_email: str, details: Dict[str, Any], encrypt=None) -> bytes:
     """
     Generate a simple PDF containing requested medical records summary using reportlab.
-    Returns raw PDF bytes (unencrypted).
+    Returns raw PDF bytes, unencrypted unless a ReportLab ``encrypt`` object is given.
     """
     buffer = io.BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
+    c = canvas.Canvas(buffer, pagesize=A4, encrypt=encrypt)
     width, height = A4
 
     y = height - 1 * inch
@@ -113,117 +227,11 @@ def _get_archive_user_information(user, record):
 
 
 def _get_archive_custom_styles():
-    """Get custom styles matching analytics PDF format"""
+    """Get custom styles matching analytics PDF format (shared, read-only)"""
     if not PLATYPUS_AVAILABLE:
         return {}
     
-    styles = getSampleStyleSheet()
-    
-    # Hospital branding styles
-    styles.add(ParagraphStyle(
-        name='HospitalName',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=6,
-        textColor=colors.HexColor('#2c3e50'),
-        fontName='Helvetica-Bold',
-        alignment=TA_LEFT
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='HospitalAddress',
-        parent=styles['Normal'],
-        fontSize=10,
-        spaceAfter=12,
-        textColor=colors.HexColor('#7f8c8d'),
-        fontName='Helvetica',
-        alignment=TA_LEFT
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='ReportTitle',
-        parent=styles['Heading1'],
-        fontSize=16,
-        spaceAfter=12,
-        spaceBefore=6,
-        textColor=colors.HexColor('#34495e'),
-        fontName='Helvetica-Bold',
-        alignment=TA_CENTER
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='UserInfo',
-        parent=styles['Normal'],
-        fontSize=9,
-        spaceAfter=12,
-        textColor=colors.HexColor('#7f8c8d'),
-        fontName='Helvetica',
-        alignment=TA_RIGHT
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='DepartmentHeader',
-        parent=styles['Heading2'],
-        fontSize=14,
-        spaceAfter=8,
-        spaceBefore=16,
-        textColor=colors.HexColor('#2980b9'),
-        fontName='Helvetica-Bold',
-        alignment=TA_LEFT
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='SectionHeader',
-        parent=styles['Heading3'],
-        fontSize=12,
-        spaceAfter=6,
-        spaceBefore=12,
-        textColor=colors.HexColor('#27ae60'),
-        fontName='Helvetica-Bold',
-        alignment=TA_LEFT
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='SubsectionHeader',
-        parent=styles['Heading4'],
-        fontSize=11,
-        spaceAfter=4,
-        spaceBefore=8,
-        textColor=colors.HexColor('#8e44ad'),
-        fontName='Helvetica-Bold',
-        alignment=TA_LEFT
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='ContentText',
-        parent=styles['Normal'],
-        fontSize=10,
-        spaceAfter=6,
-        textColor=colors.HexColor('#2c3e50'),
-        fontName='Helvetica',
-        alignment=TA_LEFT,
-        leftIndent=12
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='FooterText',
-        parent=styles['Normal'],
-        fontSize=8,
-        textColor=colors.HexColor('#95a5a6'),
-        fontName='Helvetica',
-        alignment=TA_CENTER
-    ))
-    
-    styles.add(ParagraphStyle(
-        name='HighlightText',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=colors.HexColor('#e74c3c'),
-        fontName='Helvetica-Bold',
-        alignment=TA_LEFT
-    ))
-    
-    return styles
+    return get_archive_styles()
 
 
 def _create_archive_pdf_template(buffer, hospital_info, user_info):
@@ -492,7 +500,10 @@ def _add_archive_standardized_footer(story, styles):
 
 def encrypt_pdf_aes256(pdf_bytes: bytes, password: str) -> bytes:
     """
-    Encrypt PDF bytes using AES-256 (requires PyPDF2 >= 3.0.0).
+    Encrypt already-rendered PDF bytes using AES-256.
+
+    Fallback for when render-time encryption is unavailable: the PDF is parsed
+    and re-serialized, so prefer ``render_encrypted_pdf``.
     """
     if PdfReader is None or PdfWriter is None:
         raise RuntimeError("PyPDF2 is required for AES-256 PDF encryption. Please install it.")
@@ -503,14 +514,34 @@ def encrypt_pdf_aes256(pdf_bytes: bytes, password: str) -> bytes:
         writer.add_page(page)
 
     # AES-256 encryption
-    writer.encrypt(user_password=password, owner_password=password, use_128bit=False, permissions={})
+    try:
+        writer.encrypt(user_password=password, owner_password=password, algorithm="AES-256")
+    except TypeError:
+        raise RuntimeError(
+            "The installed PyPDF2 cannot write AES-256 encrypted PDFs. "
+            "Install cryptography to enable render-time encryption."
+        )
 
     out_buf = io.BytesIO()
     writer.write(out_buf)
     return out_buf.getvalue()
 
 
-def send_encrypted_pdf_to_patient(patient_email: str, encrypted_pdf: bytes, filename: str, message: str = None):
+def render_encrypted_pdf(render: Callable[..., bytes], password: str) -> bytes:
+    """
+    Render a PDF with AES-256 encryption applied while it is written.
+
+    ``render`` is called with an ``encrypt`` keyword (e.g. ``generate_records_pdf``
+    or ``generate_archive_pdf`` bound with ``functools.partial``). Without
+    ``cryptography`` the PDF is rendered plain and re-encrypted via
+    ``encrypt_pdf_aes256``.
+    """
+    if AES256Encryption is not None:
+        return render(encrypt=AES256Encryption(password))
+    return encrypt_pdf_aes256(render(encrypt=None), password)
+
+
+def _send_encrypted_pdf_email(patient_email: str, encrypted_pdf: bytes, filename: str, message: str = None):
     subject = "Your Requested Medical Records (Encrypted PDF)"
     body = message or (
         "Attached is your encrypted medical records PDF. "
@@ -521,6 +552,27 @@ def send_encrypted_pdf_to_patient(patient_email: str, encrypted_pdf: bytes, file
     email.send(fail_silently=False)
 
 
+def send_encrypted_pdf_to_patient(patient_email: str, encrypted_pdf: bytes, filename: str, message: str = None,
+                                  background: bool = True):
+    """
+    Email an encrypted PDF to a patient.
+
+    By default the email is handed to a Celery task so the request returns
+    immediately; the PDF is already encrypted, so the password never reaches
+    the broker. Falls back to sending inline if the broker is unreachable.
+    """
+    if background:
+        from .tasks import send_encrypted_pdf
+        try:
+            return send_encrypted_pdf.delay(
+                patient_email, base64.b64encode(encrypted_pdf).decode('ascii'), filename, message
+            )
+        except Exception as e:
+            logger.warning(f"Could not queue encrypted PDF email for {patient_email}, sending inline: {e}")
+    _send_encrypted_pdf_email(patient_email, encrypted_pdf, filename, message)
+    return None
+
+
 def _draw_wrapped(c: canvas.Canvas, text: str, x: float, y: float, max_width: float, font_name: str = "Helvetica", font_size: int = 11) -> float:
     from reportlab.pdfbase.pdfmetrics import stringWidth
     words = (text or "").split()
@@ -625,14 +677,15 @@ def _map_archive_to_pdf_data(record: PatientAssessmentArchive) -> Dict[str, Any]
     }
 
 
-def generate_archive_pdf(record: PatientAssessmentArchive) -> bytes:
+def generate_archive_pdf(record: PatientAssessmentArchive, encrypt=None) -> bytes:
     """
     Build a PDF for an archived record using standardized analytics PDF format
     with proper styling, header, and footer matching the analytics template.
+    Pass a ReportLab ``encrypt`` object to encrypt while rendering.
     """
     if not PLATYPUS_AVAILABLE:
         # Fallback to basic canvas if platypus not available
-        return _generate_archive_pdf_basic(record)
+        return _generate_archive_pdf_basic(record, encrypt=encrypt)
     
     buffer = io.BytesIO()
     user = getattr(record, 'user', None)
@@ -647,18 +700,18 @@ def generate_archive_pdf(record: PatientAssessmentArchive) -> bytes:
     pdf_data = _map_archive_to_pdf_data(record)
     
     # Generate PDF using class-based template
-    template = PatientArchivePDF(buffer, hospital_info, user_info)
+    template = PatientArchivePDF(buffer, hospital_info, user_info, encrypt=encrypt)
     template.generate(pdf_data)
     
     return buffer.getvalue()
 
 
-def _generate_archive_pdf_basic(record: PatientAssessmentArchive) -> bytes:
+def _generate_archive_pdf_basic(record: PatientAssessmentArchive, encrypt=None) -> bytes:
     """
     Fallback basic PDF generation when platypus is not available
     """
     buffer = io.BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
+    c = canvas.Canvas(buffer, pagesize=A4, encrypt=encrypt)
     width, height = A4
 
     user = getattr(record, 'user', None)
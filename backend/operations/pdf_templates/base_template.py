@@ -6,73 +6,29 @@ from reportlab.lib.colors import CMYKColor
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import inch
 from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate, Paragraph, Spacer, Table, TableStyle, Image as ReportLabImage
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.pdfgen import canvas
 
+from .styles import ACCENT_COLOR, PRIMARY_COLOR, get_logo_reader, get_template_styles
+
 class BasePDFTemplate(ABC):
-    def __init__(self, buffer, hospital_info, user_info=None, logo_path=None, page_size=A4):
+    def __init__(self, buffer, hospital_info, user_info=None, logo_path=None, page_size=A4, encrypt=None):
         self.buffer = buffer
         self.hospital_info = hospital_info
         self.user_info = user_info
         self.logo_path = logo_path
         self.page_size = page_size
+        # Optional ReportLab encryption (e.g. pdf_service.AES256Encryption),
+        # applied while the document is written rather than as a second pass.
+        self.encrypt = encrypt
         self.width, self.height = page_size
-        self.styles = getSampleStyleSheet()
+        self.styles = get_template_styles()
         self._setup_styles()
 
     def _setup_styles(self):
-        # Consistent text color scheme (CMYK Black for professional print)
-        self.primary_color = CMYKColor(0, 0, 0, 1)  # Black
-        self.accent_color = CMYKColor(1, 0.6, 0, 0) # Blue-ish (C=100, M=60)
-        
-        self.styles.add(ParagraphStyle(
-            name='ReportTitle',
-            parent=self.styles['Heading1'],
-            fontSize=18,
-            leading=22,
-            spaceAfter=20,
-            textColor=self.primary_color,
-            alignment=1 # Center
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='SectionHeader',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            leading=16,
-            spaceAfter=12,
-            textColor=self.primary_color,
-            borderPadding=5,
-            borderColor=self.accent_color,
-            borderWidth=0,
-            borderBottomWidth=1
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='ContentText',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            leading=14,
-            textColor=self.primary_color
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='FooterText',
-            parent=self.styles['Normal'],
-            fontSize=8,
-            leading=10,
-            textColor=colors.grey
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='SubHeader',
-            parent=self.styles['Heading3'],
-            fontSize=12,
-            leading=14,
-            spaceAfter=8,
-            textColor=self.primary_color,
-            fontName='Helvetica-Bold'
-        ))
+        # Colors are shared module constants; the stylesheet itself comes from
+        # the process-level registry (see styles.py) and must not be mutated.
+        self.primary_color = PRIMARY_COLOR
+        self.accent_color = ACCENT_COLOR
 
     def _draw_header(self, canvas, doc):
         """
@@ -86,20 +42,18 @@ class BasePDFTemplate(ABC):
         logo_max_height = 1.2 * inch
         logo_y = self.height - margin - logo_max_height
         
-        if self.logo_path and os.path.exists(self.logo_path):
+        logo = get_logo_reader(self.logo_path)
+        if logo is not None:
             try:
-                # Use mask='auto' for transparency if using simple drawImage
-                # Or ReportLab handles PNG alpha channel automatically
-                img = ReportLabImage(self.logo_path)
-                img_w = img.drawWidth
-                img_h = img.drawHeight
+                # ReportLab handles the PNG alpha channel via mask='auto'
+                img_w, img_h = logo.getSize()
                 
                 # Scale maintaining aspect ratio
                 aspect = img_w / img_h
                 draw_h = logo_max_height
                 draw_w = draw_h * aspect
                 
-                canvas.drawImage(self.logo_path, margin, logo_y, width=draw_w, height=draw_h, mask='auto', preserveAspectRatio=True)
+                canvas.drawImage(logo, margin, logo_y, width=draw_w, height=draw_h, mask='auto', preserveAspectRatio=True)
                 
                 # Text offset
                 text_x = margin + draw_w + 0.3 * inch
@@ -176,7 +130,8 @@ class BasePDFTemplate(ABC):
             topMargin=top_margin,
             bottomMargin=bottom_margin,
             title="MediSync Report",
-            author="MediSync System"
+            author="MediSync System",
+            encrypt=self.encrypt
         )
         doc.addPageTemplates([template])
         
@@ -0,0 +1,491 @@
+"""
+Process-level registry of ReportLab styles, fonts and logos.
+
+Building a stylesheet, resolving font metrics and decoding the hospital logo
+used to happen on every PDF. Everything here is built once per process and
+shared by all templates, so callers must treat the returned objects as
+read-only.
+"""
+import os
+import threading
+from functools import lru_cache
+from types import MappingProxyType
+
+from reportlab.lib import colors
+from reportlab.lib.colors import CMYKColor
+from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT, TA_JUSTIFY
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+
+# Consistent text color scheme (CMYK Black for professional print)
+PRIMARY_COLOR = CMYKColor(0, 0, 0, 1)  # Black
+ACCENT_COLOR = CMYKColor(1, 0.6, 0, 0)  # Blue-ish (C=100, M=60)
+
+# Standard Type 1 fonts used across the templates. Their AFM metrics are
+# parsed lazily by ReportLab the first time a font is used.
+STANDARD_FONTS = (
+    'Helvetica',
+    'Helvetica-Bold',
+    'Helvetica-Oblique',
+    'Helvetica-BoldOblique',
+    'Times-Roman',
+    'Times-Bold',
+    'Times-Italic',
+    'Times-BoldItalic',
+)
+
+_fonts_lock = threading.Lock()
+_fonts_registered = False
+
+
+class FrozenStyleSheet:
+    """
+    Read-only view over a ReportLab StyleSheet1.
+
+    Supports the lookups the templates rely on (``styles['Name']``, ``in``,
+    ``get`` and ``byName``) but refuses ``add`` so one request cannot leak
+    styles into every other PDF rendered by the process.
+    """
+
+    def __init__(self, stylesheet):
+        self._sheet = stylesheet
+        self.byName = MappingProxyType(stylesheet.byName)
+        self.byAlias = MappingProxyType(stylesheet.byAlias)
+
+    def __getitem__(self, key):
+        return self._sheet[key]
+
+    def __contains__(self, key):
+        return key in self.byName or key in self.byAlias
+
+    def get(self, key, default=None):
+        return self._sheet.get(key, default)
+
+    def add(self, style, alias=None):
+        raise TypeError(
+            "Shared PDF stylesheets are read-only; create a ParagraphStyle "
+            "with parent=styles[...] instead of adding to the registry."
+        )
+
+    def list(self):
+        return self._sheet.list()
+
+
+def register_fonts():
+    """Resolve the standard font metrics once per process (idempotent)."""
+    global _fonts_registered
+    if _fonts_registered:
+        return
+    with _fonts_lock:
+        if _fonts_registered:
+            return
+        for font_name in STANDARD_FONTS:
+            pdfmetrics.getFont(font_name)
+        pdfmetrics.registerFontFamily(
+            'Helvetica',
+            normal='Helvetica',
+            bold='Helvetica-Bold',
+            italic='Helvetica-Oblique',
+            boldItalic='Helvetica-BoldOblique',
+        )
+        pdfmetrics.registerFontFamily(
+            'Times-Roman',
+            normal='Times-Roman',
+            bold='Times-Bold',
+            italic='Times-Italic',
+            boldItalic='Times-BoldItalic',
+        )
+        _fonts_registered = True
+
+
+def _base_sheet():
+    register_fonts()
+    return getSampleStyleSheet()
+
+
+@lru_cache(maxsize=None)
+def get_template_styles():
+    """Styles used by BasePDFTemplate subclasses (doctor, nurse, archive)."""
+    styles = _base_sheet()
+
+    styles.add(ParagraphStyle(
+        name='ReportTitle',
+        parent=styles['Heading1'],
+        fontSize=18,
+        leading=22,
+        spaceAfter=20,
+        textColor=PRIMARY_COLOR,
+        alignment=1  # Center
+    ))
+
+    styles.add(ParagraphStyle(
+        name='SectionHeader',
+        parent=styles['Heading2'],
+        fontSize=14,
+        leading=16,
+        spaceAfter=12,
+        textColor=PRIMARY_COLOR,
+        borderPadding=5,
+        borderColor=ACCENT_COLOR,
+        borderWidth=0,
+        borderBottomWidth=1
+    ))
+
+    styles.add(ParagraphStyle(
+        name='ContentText',
+        parent=styles['Normal'],
+        fontSize=10,
+        leading=14,
+        textColor=PRIMARY_COLOR
+    ))
+
+    styles.add(ParagraphStyle(
+        name='FooterText',
+        parent=styles['Normal'],
+        fontSize=8,
+        leading=10,
+        textColor=colors.grey
+    ))
+
+    styles.add(ParagraphStyle(
+        name='SubHeader',
+        parent=styles['Heading3'],
+        fontSize=12,
+        leading=14,
+        spaceAfter=8,
+        textColor=PRIMARY_COLOR,
+        fontName='Helvetica-Bold'
+    ))
+
+    return FrozenStyleSheet(styles)
+
+
+@lru_cache(maxsize=None)
+def get_professional_styles():
+    """Styles used by ProfessionalPDFGenerator."""
+    styles = _base_sheet()
+
+    styles.add(ParagraphStyle(
+        name='SectionHeader',
+        parent=styles['Heading2'],
+        fontSize=14,
+        leading=16,
+        spaceAfter=12,
+        textColor=PRIMARY_COLOR
+    ))
+    styles.add(ParagraphStyle(
+        name='NormalText',
+        parent=styles['Normal'],
+        fontSize=10,
+        leading=12,
+    ))
+
+    return FrozenStyleSheet(styles)
+
+
+@lru_cache(maxsize=None)
+def get_archive_styles():
+    """Styles for the standardized archive PDF (matches analytics format)."""
+    styles = _base_sheet()
+
+    # Hospital branding styles
+    styles.add(ParagraphStyle(
+        name='HospitalName',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=6,
+        textColor=colors.HexColor('#2c3e50'),
+        fontName='Helvetica-Bold',
+        alignment=TA_LEFT
+    ))
+
+    styles.add(ParagraphStyle(
+        name='HospitalAddress',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=12,
+        textColor=colors.HexColor('#7f8c8d'),
+        fontName='Helvetica',
+        alignment=TA_LEFT
+    ))
+
+    styles.add(ParagraphStyle(
+        name='ReportTitle',
+        parent=styles['Heading1'],
+        fontSize=16,
+        spaceAfter=12,
+        spaceBefore=6,
+        textColor=colors.HexColor('#34495e'),
+        fontName='Helvetica-Bold',
+        alignment=TA_CENTER
+    ))
+
+    styles.add(ParagraphStyle(
+        name='UserInfo',
+        parent=styles['Normal'],
+        fontSize=9,
+        spaceAfter=12,
+        textColor=colors.HexColor('#7f8c8d'),
+        fontName='Helvetica',
+        alignment=TA_RIGHT
+    ))
+
+    styles.add(ParagraphStyle(
+        name='DepartmentHeader',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceAfter=8,
+        spaceBefore=16,
+        textColor=colors.HexColor('#2980b9'),
+        fontName='Helvetica-Bold',
+        alignment=TA_LEFT
+    ))
+
+    styles.add(ParagraphStyle(
+        name='SectionHeader',
+        parent=styles['Heading3'],
+        fontSize=12,
+        spaceAfter=6,
+        spaceBefore=12,
+        textColor=colors.HexColor('#27ae60'),
+        fontName='Helvetica-Bold',
+        alignment=TA_LEFT
+    ))
+
+    styles.add(ParagraphStyle(
+        name='SubsectionHeader',
+        parent=styles['Heading4'],
+        fontSize=11,
+        spaceAfter=4,
+        spaceBefore=8,
+        textColor=colors.HexColor('#8e44ad'),
+        fontName='Helvetica-Bold',
+        alignment=TA_LEFT
+    ))
+
+    styles.add(ParagraphStyle(
+        name='ContentText',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=6,
+        textColor=colors.HexColor('#2c3e50'),
+        fontName='Helvetica',
+        alignment=TA_LEFT,
+        leftIndent=12
+    ))
+
+    styles.add(ParagraphStyle(
+        name='FooterText',
+        parent=styles['Normal'],
+        fontSize=8,
+        textColor=colors.HexColor('#95a5a6'),
+        fontName='Helvetica',
+        alignment=TA_CENTER
+    ))
+
+    styles.add(ParagraphStyle(
+        name='HighlightText',
+        parent=styles['Normal'],
+        fontSize=10,
+        textColor=colors.HexColor('#e74c3c'),
+        fontName='Helvetica-Bold',
+        alignment=TA_LEFT
+    ))
+
+    return FrozenStyleSheet(styles)
+
+
+@lru_cache(maxsize=None)
+def get_analytics_styles():
+    """
+    Responsive styles for the standardized analytics report (general role).
+    """
+    styles = _base_sheet()
+
+    # Calculate responsive font sizes based on page dimensions
+    page_width, page_height = A4
+    base_font_size = min(page_width, page_height) / 60  # Responsive base size
+
+    # Add custom styles for consistent branding with responsive design
+    styles.add(ParagraphStyle(
+        name='HospitalName',
+        parent=styles['Heading1'],
+        fontSize=max(18, int(base_font_size * 1.8)),
+        fontName='Helvetica-Bold',
+        textColor=colors.darkblue,
+        alignment=TA_CENTER,
+        spaceAfter=8,
+        leading=max(20, int(base_font_size * 2.2))  # Responsive line height
+    ))
+
+    styles.add(ParagraphStyle(
+        name='HospitalAddress',
+        parent=styles['Normal'],
+        fontSize=max(9, int(base_font_size * 1.0)),
+        fontName='Helvetica',
+        textColor=colors.grey,
+        alignment=TA_CENTER,
+        spaceAfter=12,
+        leading=max(11, int(base_font_size * 1.3))
+    ))
+
+    styles.add(ParagraphStyle(
+        name='ReportTitle',
+        parent=styles['Heading1'],
+        fontSize=max(16, int(base_font_size * 1.6)),
+        fontName='Helvetica-Bold',
+        textColor=colors.darkblue,
+        alignment=TA_CENTER,
+        spaceAfter=10,
+        spaceBefore=6,
+        leading=max(18, int(base_font_size * 1.9))
+    ))
+
+    styles.add(ParagraphStyle(
+        name='UserInfo',
+        parent=styles['Normal'],
+        fontSize=max(10, int(base_font_size * 1.1)),
+        fontName='Helvetica',
+        textColor=colors.black,
+        alignment=TA_CENTER,
+        spaceAfter=20,
+        leading=max(12, int(base_font_size * 1.4))
+    ))
+
+    # Department header style (used for underlined department at top)
+    styles.add(ParagraphStyle(
+        name='DepartmentHeader',
+        parent=styles['Heading2'],
+        fontSize=max(14, int(base_font_size * 1.5)),
+        fontName='Helvetica-Bold',
+        textColor=colors.black,
+        alignment=TA_CENTER,
+        spaceAfter=8,
+        leading=max(16, int(base_font_size * 1.8))
+    ))
+
+    styles.add(ParagraphStyle(
+        name='SectionHeader',
+        parent=styles['Heading2'],
+        fontSize=max(13, int(base_font_size * 1.4)),
+        fontName='Helvetica-Bold',
+        textColor=colors.darkblue,
+        spaceAfter=12,
+        spaceBefore=20,
+        leading=max(15, int(base_font_size * 1.7)),
+        borderWidth=1,
+        borderColor=colors.lightgrey,
+        borderPadding=4
+    ))
+
+    # Borderless section header for Overview
+    styles.add(ParagraphStyle(
+        name='SectionHeaderNoBorder',
+        parent=styles['Heading2'],
+        fontSize=max(13, int(base_font_size * 1.4)),
+        fontName='Helvetica-Bold',
+        textColor=colors.darkblue,
+        spaceAfter=12,
+        spaceBefore=20,
+        leading=max(15, int(base_font_size * 1.7))
+    ))
+
+    styles.add(ParagraphStyle(
+        name='SubsectionHeader',
+        parent=styles['Heading3'],
+        fontSize=max(11, int(base_font_size * 1.2)),
+        fontName='Helvetica-Bold',
+        textColor=colors.darkgreen,
+        spaceAfter=8,
+        spaceBefore=12,
+        leading=max(13, int(base_font_size * 1.5))
+    ))
+
+    styles.add(ParagraphStyle(
+        name='ContentText',
+        parent=styles['Normal'],
+        fontSize=max(9, int(base_font_size * 1.0)),
+        fontName='Helvetica',
+        textColor=colors.black,
+        spaceAfter=6,
+        alignment=TA_JUSTIFY,
+        leading=max(11, int(base_font_size * 1.3)),
+        leftIndent=8,  # Better readability with indentation
+        rightIndent=8
+    ))
+
+    styles.add(ParagraphStyle(
+        name='FooterText',
+        parent=styles['Normal'],
+        fontSize=max(7, int(base_font_size * 0.8)),
+        fontName='Helvetica',
+        textColor=colors.grey,
+        alignment=TA_CENTER,
+        spaceAfter=4,
+        leading=max(9, int(base_font_size * 1.1))
+    ))
+
+    # Add a highlight style for important information
+    styles.add(ParagraphStyle(
+        name='HighlightText',
+        parent=styles['Normal'],
+        fontSize=max(10, int(base_font_size * 1.1)),
+        fontName='Helvetica-Bold',
+        textColor=colors.darkblue,
+        alignment=TA_LEFT,
+        spaceAfter=6,
+        spaceBefore=4,
+        leading=max(12, int(base_font_size * 1.4)),
+        backColor=colors.lightblue,
+        borderWidth=1,
+        borderColor=colors.blue,
+        borderPadding=6
+    ))
+
+    return FrozenStyleSheet(styles)
+
+
+@lru_cache(maxsize=32)
+def _load_logo(path, mtime, size):
+    reader = ImageReader(path)
+    # Force the decode now so every PDF reuses the same pixel data.
+    reader.getSize()
+    return reader
+
+
+def get_logo_reader(logo_path):
+    """
+    Return a shared ImageReader for a logo file, or None if it is missing.
+
+    Readers are keyed by path, mtime and size so replacing a hospital logo on
+    disk is picked up without restarting the process.
+    """
+    if not logo_path:
+        return None
+    try:
+        stat = os.stat(logo_path)
+    except OSError:
+        return None
+    return _load_logo(os.path.abspath(logo_path), stat.st_mtime_ns, stat.st_size)
+
+
+def warm_registry(logo_paths=()):
+    """Pre-build every stylesheet and pre-load the given logos."""
+    register_fonts()
+    get_template_styles()
+    get_professional_styles()
+    get_archive_styles()
+    get_analytics_styles()
+    for path in logo_paths:
+        get_logo_reader(path)
+
+
+def clear_registry():
+    """Drop cached stylesheets and logos (used by tests and benchmarks)."""
+    get_template_styles.cache_clear()
+    get_professional_styles.cache_clear()
+    get_archive_styles.cache_clear()
+    get_analytics_styles.cache_clear()
+    _load_logo.cache_clear()
@@ -7,10 +7,11 @@ from reportlab.lib.pagesizes import A4, letter
 from reportlab.lib.units import inch
 from reportlab.pdfgen import canvas
 from reportlab.platypus import BaseDocTemplate, Frame, PageTemplate, Paragraph, Spacer, Table, TableStyle, Image as ReportLabImage
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_LEFT, TA_CENTER
 from reportlab.lib.utils import ImageReader
 
+from .pdf_templates.styles import get_logo_reader, get_professional_styles
+
 class ProfessionalPDFGenerator:
     def __init__(self, buffer, hospital_info, logo_path=None, page_size=A4):
         self.buffer = buffer
@@ -18,26 +19,7 @@ class ProfessionalPDFGenerator:
         self.logo_path = logo_path
         self.page_size = page_size
         self.width, self.height = page_size
-        self.styles = getSampleStyleSheet()
-        self._setup_styles()
-
-    def _setup_styles(self):
-        # Define custom styles
-        cmyk_black = CMYKColor(0, 0, 0, 1)
-        self.styles.add(ParagraphStyle(
-            name='SectionHeader',
-            parent=self.styles['Heading2'],
-            fontSize=14,
-            leading=16,
-            spaceAfter=12,
-            textColor=cmyk_black
-        ))
-        self.styles.add(ParagraphStyle(
-            name='NormalText',
-            parent=self.styles['Normal'],
-            fontSize=10,
-            leading=12,
-        ))
+        self.styles = get_professional_styles()
 
     def _draw_header(self, canvas, doc):
         """
@@ -59,7 +41,8 @@ class ProfessionalPDFGenerator:
         radius = logo_size / 2
 
         # Draw logo if exists
-        if self.logo_path and os.path.exists(self.logo_path):
+        logo = get_logo_reader(self.logo_path)
+        if logo is not None:
             try:
                 # Create a circular clipping path
                 path = canvas.beginPath()
@@ -67,7 +50,7 @@ class ProfessionalPDFGenerator:
                 canvas.clipPath(path, stroke=0, fill=0)
                 
                 # Draw image
-                canvas.drawImage(self.logo_path, logo_x, logo_y, width=logo_size, height=logo_size, preserveAspectRatio=True, anchor='c')
+                canvas.drawImage(logo, logo_x, logo_y, width=logo_size, height=logo_size, preserveAspectRatio=True, anchor='c')
                 
                 # Reset clip
                 canvas.restoreState()
@@ -0,0 +1,253 @@
+"""
+Batch PDF report generation helpers used by the ``generate_reports`` command.
+
+Jobs are planned in the parent process (all DB access happens there) and
+rendered in worker processes. This module only imports Django lazily so it can
+be unpickled by freshly spawned workers before ``django.setup()`` has run.
+"""
+import hashlib
+import io
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timezone as dt_timezone
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+# Analytics inputs shared by every doctor/nurse report, installed once per
+# worker by ``init_worker`` instead of being pickled with every job.
+_SHARED_INPUTS = {}
+
+
+def fingerprint(*parts) -> str:
+    """Stable SHA-256 over JSON-serialisable report inputs."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(json.dumps(part, sort_keys=True, default=str, ensure_ascii=False).encode('utf-8'))
+        digest.update(b'\x1e')
+    return digest.hexdigest()
+
+
+def atomic_write(path: str, data: bytes):
+    """Write bytes to ``path`` via a temp file + rename so readers never see partial files."""
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def load_manifest(output_dir: str) -> dict:
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(path, 'r', encoding='utf-8') as fh:
+            manifest = json.load(fh)
+        if manifest.get('version') == MANIFEST_VERSION and isinstance(manifest.get('reports'), dict):
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {'version': MANIFEST_VERSION, 'reports': {}}
+
+
+def save_manifest(output_dir: str, manifest: dict):
+    manifest['version'] = MANIFEST_VERSION
+    manifest['updated_at'] = datetime.now(dt_timezone.utc).isoformat()
+    data = json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8')
+    atomic_write(os.path.join(output_dir, MANIFEST_NAME), data)
+
+
+def is_up_to_date(manifest: dict, output_dir: str, job: dict) -> bool:
+    entry = manifest.get('reports', {}).get(job['key'])
+    if not entry or entry.get('fingerprint') != job['fingerprint']:
+        return False
+    return os.path.exists(os.path.join(output_dir, entry.get('file', '')))
+
+
+def set_shared_inputs(shared_inputs):
+    _SHARED_INPUTS.clear()
+    _SHARED_INPUTS.update(shared_inputs or {})
+
+
+def init_worker(shared_inputs, memory_limit_mb=0):
+    """Process-pool initializer: bound memory, set up Django, warm PDF styles."""
+    if memory_limit_mb:
+        try:
+            import resource
+            limit = int(memory_limit_mb) * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError):
+            pass
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    import django
+    django.setup()
+
+    from backend.operations.pdf_templates.styles import warm_registry
+    warm_registry()
+
+    set_shared_inputs(shared_inputs)
+
+
+def _render(job: dict) -> bytes:
+    from backend.operations.pdf_templates import DoctorAnalyticsPDF, NurseAnalyticsPDF, PatientArchivePDF
+
+    buffer = io.BytesIO()
+    kind = job['kind']
+    if kind == 'doctor':
+        from backend.analytics.views import map_doctor_analytics_to_pdf_data
+        analytics_data = dict(_SHARED_INPUTS.get('doctor') or {})
+        analytics_data.update(job['analytics_overrides'])
+        pdf_data = map_doctor_analytics_to_pdf_data(analytics_data)
+        DoctorAnalyticsPDF(buffer, job['hospital_info'], job['user_info']).generate(pdf_data)
+    elif kind == 'nurse':
+        from backend.analytics.views import map_nurse_analytics_to_pdf_data
+        analytics_data = dict(_SHARED_INPUTS.get('nurse') or {})
+        analytics_data.update(job['analytics_overrides'])
+        pdf_data = map_nurse_analytics_to_pdf_data(analytics_data)
+        NurseAnalyticsPDF(buffer, job['hospital_info'], job['user_info']).generate(pdf_data)
+    elif kind == 'archive':
+        PatientArchivePDF(buffer, job['hospital_info'], job['user_info']).generate(job['pdf_data'])
+    else:
+        raise ValueError(f"Unknown report kind: {kind}")
+    return buffer.getvalue()
+
+
+def render_report_job(job: dict, output_dir: str) -> dict:
+    """
+    Render one report and write it atomically. Runs inside a worker process.
+    Returns the manifest entry (or an error entry) for the report.
+    """
+    started = time.perf_counter()
+    try:
+        pdf_bytes = _render(job)
+        path = os.path.join(output_dir, job['filename'])
+        atomic_write(path, pdf_bytes)
+        return {
+            'key': job['key'],
+            'ok': True,
+            'file': job['filename'],
+            'fingerprint': job['fingerprint'],
+            'sha256': hashlib.sha256(pdf_bytes).hexdigest(),
+            'bytes': len(pdf_bytes),
+            'render_seconds': round(time.perf_counter() - started, 4),
+            'generated_at': datetime.now(dt_timezone.utc).isoformat(),
+        }
+    except MemoryError:
+        return {'key': job['key'], 'ok': False, 'error': 'worker memory limit exceeded',
+                'render_seconds': round(time.perf_counter() - started, 4)}
+    except Exception as e:
+        return {'key': job['key'], 'ok': False, 'error': str(e),
+                'render_seconds': round(time.perf_counter() - started, 4)}
+
+
+# Per-user keys of get_doctor_analytics_data / get_nurse_analytics_data.
+_USER_KEYS = {
+    'doctor': ('doctor_name', 'specialization'),
+    'nurse': ('nurse_name', 'department'),
+}
+
+
+def _user_overrides(role, user):
+    if role == 'doctor':
+        profile = getattr(user, 'doctor_profile', None)
+        return {
+            'doctor_name': user.full_name,
+            'specialization': getattr(profile, 'specialization', 'General Practice') if profile else 'General Practice',
+        }
+    profile = getattr(user, 'nurse_profile', None)
+    return {
+        'nurse_name': user.full_name,
+        'department': getattr(profile, 'department', 'General') if profile else 'General',
+    }
+
+
+def plan_jobs(roles, hospital=None):
+    """
+    Build report jobs for the requested roles. Must run in the parent process.
+
+    Returns ``(jobs, shared_inputs)``. Doctor/nurse analytics are global, so
+    they are fetched and fingerprinted once per role and shipped to workers
+    through the pool initializer rather than with each job.
+    """
+    from backend.users.models import User
+    from backend.operations.models import PatientAssessmentArchive
+    from backend.analytics.views import (
+        get_doctor_analytics_data, get_nurse_analytics_data, get_hospital_information,
+    )
+    from backend.operations.pdf_service import (
+        _get_archive_hospital_information, _get_archive_user_information, _map_archive_to_pdf_data,
+    )
+
+    jobs = []
+    shared_inputs = {}
+
+    for role in ('doctor', 'nurse'):
+        if role not in roles:
+            continue
+        users = User.objects.filter(role=role, is_active=True)
+        if hospital:
+            users = users.filter(hospital_name__iexact=hospital)
+        if role == 'doctor':
+            users = users.select_related('doctor_profile')
+        else:
+            users = users.select_related('nurse_profile')
+
+        shared_hash = None
+        for user in users.order_by('id').iterator():
+            if shared_hash is None:
+                # Analytics inputs are identical for every user of the role,
+                # so the latest results are queried once, not per user.
+                loader = get_doctor_analytics_data if role == 'doctor' else get_nurse_analytics_data
+                shared = {k: v for k, v in loader(user).items() if k not in _USER_KEYS[role]}
+                shared_hash = fingerprint(shared)
+                shared_inputs[role] = shared
+            overrides = _user_overrides(role, user)
+            user_info = {
+                'name': user.full_name,
+                'role': role.title(),
+                'specialization': overrides[_USER_KEYS[role][1]],
+                'department': overrides[_USER_KEYS[role][1]],
+            }
+            hospital_info = get_hospital_information(user)
+            jobs.append({
+                'key': f"{role}:{user.id}",
+                'kind': role,
+                'filename': f"{role}_{user.id}_analytics.pdf",
+                'hospital_info': hospital_info,
+                'user_info': user_info,
+                'analytics_overrides': overrides,
+                'fingerprint': fingerprint(role, shared_hash, hospital_info, user_info, overrides),
+            })
+
+    if 'patient' in roles:
+        records = PatientAssessmentArchive.objects.filter(is_archived=True).select_related('user')
+        if hospital:
+            records = records.filter(hospital_name__iexact=hospital)
+        for record in records.order_by('id').iterator():
+            user = record.user
+            hospital_info = _get_archive_hospital_information(user, record)
+            user_info = _get_archive_user_information(user, record)
+            pdf_data = _map_archive_to_pdf_data(record)
+            stable_user_info = {k: v for k, v in user_info.items() if k != 'generated_at'}
+            jobs.append({
+                'key': f"archive:{record.id}",
+                'kind': 'archive',
+                'filename': f"patient_archive_{record.id}.pdf",
+                'hospital_info': hospital_info,
+                'user_info': user_info,
+                'pdf_data': pdf_data,
+                'fingerprint': fingerprint('archive', hospital_info, stable_user_info, pdf_data),
+            })
+
+    return jobs, shared_inputs
@@ -0,0 +1,62 @@
+"""
+Cache invalidation for archived assessments.
+
+``archive_detail`` and ``archive_export`` serve cached payloads and PDFs
+without a database lookup, so the cached entries of a record are dropped as
+soon as the record is saved or deleted, and again once the transaction
+commits (a concurrent request may have re-cached the old row in between).
+
+``patient_name`` copies ``User.full_name`` for the name search; renaming a
+user rewrites it on their archives (the PostgreSQL trigger refreshes
+``search_vector`` with it) and drops their cached entries.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from backend.users.models import User
+
+from .models import PatientAssessmentArchive
+
+
+def archive_detail_cache_key(archive_id):
+    return f"archives:detail:{archive_id}"
+
+
+def archive_export_cache_key(archive_id):
+    return f"archives:export_pdf:{archive_id}"
+
+
+def _cache_keys(archive_ids):
+    return [key for archive_id in archive_ids
+            for key in (archive_detail_cache_key(archive_id), archive_export_cache_key(archive_id))]
+
+
+def _delete_cached(keys):
+    try:
+        cache.delete_many(keys)
+    except Exception:
+        pass
+
+
+@receiver([post_save, post_delete], sender=PatientAssessmentArchive)
+def invalidate_archive_detail(sender, instance, **kwargs):
+    keys = _cache_keys([instance.pk])
+    _delete_cached(keys)
+    transaction.on_commit(lambda: _delete_cached(keys))
+
+
+@receiver(post_save, sender=User)
+def rename_patient_archives(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw or created or (update_fields is not None and 'full_name' not in update_fields):
+        return
+    name = instance.full_name or ''
+    stale = PatientAssessmentArchive.objects.filter(user=instance).exclude(patient_name=name)
+    ids = list(stale.values_list('id', flat=True))
+    if not ids:
+        return
+    PatientAssessmentArchive.objects.filter(id__in=ids).update(patient_name=name)
+    keys = _cache_keys(ids)
+    _delete_cached(keys)
+    transaction.on_commit(lambda: _delete_cached(keys))
@@ -223,3 +223,27 @@ def update_queue_statistics():
         return {'error': str(e)}
 
 
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60,
+             name='backend.operations.tasks.send_encrypted_pdf')
+def send_encrypted_pdf(self, patient_email, pdf_b64, filename, message=None):
+    """
+    Email an already-encrypted PDF (base64 encoded for the JSON serializer)
+    to a patient. Queued by pdf_service.send_encrypted_pdf_to_patient.
+    """
+    import base64
+    from .pdf_service import _send_encrypted_pdf_email
+
+    try:
+        _send_encrypted_pdf_email(patient_email, base64.b64decode(pdf_b64), filename, message)
+    except Exception as e:
+        logger.warning(f"Failed to send encrypted PDF to {patient_email}: {str(e)}")
+        raise self.retry(exc=e)
+
+    logger.info(f"Encrypted PDF {filename} sent to {patient_email}")
+    return {
+        'sent_to': patient_email,
+        'filename': filename,
+        'timestamp': timezone.now().isoformat()
+    }
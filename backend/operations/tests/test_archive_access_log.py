@@ -0,0 +1,176 @@
+import uuid
+from datetime import timedelta
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from backend.operations import access_log
+from backend.operations.models import ArchiveAccessLog, PatientAssessmentArchive
+
+
+class ArchiveAccessLogWriterTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="nurse@example.com", password="Pass1234", full_name="Nurse Joy", role="nurse",
+        )
+        # No background thread: flushes are driven explicitly by the tests.
+        patcher = mock.patch.object(access_log.ArchiveAccessLogWriter, '_ensure_thread')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _writer(self, **kwargs):
+        kwargs.setdefault('flush_interval_ms', 60000)
+        return access_log.ArchiveAccessLogWriter(run_async=True, **kwargs)
+
+    def test_events_are_buffered_until_flush_and_keep_event_time(self):
+        writer = self._writer(batch_size=10)
+        happened = timezone.now() - timedelta(seconds=30)
+        writer.log(user_id=self.user.id, action='view', accessed_at=happened)
+        writer.log(user_id=self.user.id, action='search')
+        self.assertEqual(ArchiveAccessLog.objects.count(), 0)
+
+        with self.assertNumQueries(3):  # savepoint, one INSERT, release
+            writer.flush()
+        self.assertEqual(writer.stats(), {'pending': 0, 'written': 2, 'dropped': 0})
+        self.assertEqual(ArchiveAccessLog.objects.get(action='view').accessed_at, happened)
+
+    def test_full_buffer_writes_in_caller_instead_of_dropping(self):
+        writer = self._writer(batch_size=2, max_buffer=3)
+        for action in ('view', 'search', 'export'):
+            writer.log(user_id=self.user.id, action=action)
+        self.assertEqual(ArchiveAccessLog.objects.count(), 0)
+        writer.log(user_id=self.user.id, action='update')
+        self.assertEqual(list(ArchiveAccessLog.objects.values_list('action', flat=True)), ['update'])
+        writer.flush()
+        self.assertEqual(writer.stats(), {'pending': 0, 'written': 4, 'dropped': 0})
+
+    def test_full_buffer_keeps_events_the_caller_cannot_write(self):
+        writer = self._writer(batch_size=2, max_buffer=1)
+        with mock.patch.object(ArchiveAccessLog.objects, 'bulk_create', side_effect=RuntimeError('db down')), \
+                mock.patch.object(ArchiveAccessLog.objects, 'create', side_effect=RuntimeError('db down')):
+            writer.log(user_id=self.user.id, action='view')
+            writer.log(user_id=self.user.id, action='search')
+        self.assertEqual(writer.pending(), 2)
+        writer.flush()
+        self.assertEqual(ArchiveAccessLog.objects.count(), 2)
+
+    def test_failed_events_are_retried_then_dropped(self):
+        writer = self._writer()
+        writer.log(user_id=self.user.id, action='view')
+        with mock.patch.object(ArchiveAccessLog.objects, 'bulk_create', side_effect=RuntimeError('db down')), \
+                mock.patch.object(ArchiveAccessLog.objects, 'create', side_effect=RuntimeError('db down')):
+            for attempt in range(1, access_log.MAX_ATTEMPTS):
+                writer.flush()
+                self.assertEqual(writer.pending(), 1)
+            writer.flush()
+        self.assertEqual(writer.stats(), {'pending': 0, 'written': 0, 'dropped': 1})
+
+    def test_cached_archive_detail_does_not_query_the_database(self):
+        record = PatientAssessmentArchive.objects.create(
+            user=self.user, assessment_type="intake", assessment_data={"archived": True},
+        )
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        writer = self._writer()
+        with mock.patch.object(access_log, '_writer', writer), \
+                mock.patch('backend.operations.archive_views._safe_cache_get', return_value={'id': record.id}):
+            with self.assertNumQueries(0):
+                resp = client.get(reverse('archive_detail', args=[record.id]))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(writer.pending(), 1)
+        writer.flush()
+        self.assertEqual(ArchiveAccessLog.objects.get().record_id, record.id)
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_archive_detail_is_not_served_from_cache_after_delete(self):
+        record = PatientAssessmentArchive.objects.create(
+            user=self.user, assessment_type="intake", assessment_data={"archived": True},
+        )
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        url = reverse('archive_detail', args=[record.id])
+        with mock.patch.object(access_log, '_writer', self._writer()):
+            self.assertEqual(client.get(url).status_code, 200)
+            with self.assertNumQueries(0):
+                self.assertEqual(client.get(url).status_code, 200)
+            record.delete()
+            self.assertEqual(client.get(url).status_code, 404)
+
+
+def _redis_available():
+    try:
+        import redis
+        return redis.Redis.from_url(settings.ARCHIVE_ACCESS_LOG_REDIS_URL, socket_connect_timeout=0.2).ping()
+    except Exception:
+        return False
+
+
+class RedisArchiveAccessLogWriterTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email="nurse@example.com", password="Pass1234", full_name="Nurse Joy", role="nurse",
+        )
+        patcher = mock.patch.object(access_log.RedisArchiveAccessLogWriter, '_ensure_thread')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.queue_key = f'test:archive_access_log:{uuid.uuid4().hex}'
+
+    def _writer(self, **kwargs):
+        kwargs.setdefault('flush_interval_ms', 60000)
+        writer = access_log.RedisArchiveAccessLogWriter(run_async=True, **kwargs)
+        writer.queue_key = self.queue_key
+        return writer
+
+    def test_unreachable_redis_falls_back_to_memory(self):
+        with override_settings(ARCHIVE_ACCESS_LOG_REDIS_URL='redis://localhost:1/0'):
+            writer = self._writer()
+            writer.log(user_id=self.user.id, action='view')
+            self.assertEqual(writer.pending(), 1)
+            writer.flush()
+        self.assertEqual(ArchiveAccessLog.objects.get().action, 'view')
+
+    @skipUnless(_redis_available(), 'Redis is not reachable')
+    def test_events_survive_the_process_that_queued_them(self):
+        happened = timezone.now() - timedelta(seconds=30)
+        self._writer().log(user_id=self.user.id, action='view', accessed_at=happened)
+        self._writer().log(user_id=self.user.id, action='search')
+        self.assertEqual(ArchiveAccessLog.objects.count(), 0)
+
+        writer = self._writer()  # e.g. a worker started after the first was killed
+        self.addCleanup(writer._redis().delete, self.queue_key, writer.dead_letter_key)
+        writer.flush()
+        self.assertEqual(writer.pending(), 0)
+        self.assertEqual(ArchiveAccessLog.objects.get(action='view').accessed_at, happened)
+        self.assertEqual(ArchiveAccessLog.objects.count(), 2)
+
+    @skipUnless(_redis_available(), 'Redis is not reachable')
+    def test_failing_events_stay_queued_then_move_to_dead_letters(self):
+        writer = self._writer()
+        self.addCleanup(writer._redis().delete, self.queue_key, writer.dead_letter_key)
+        writer.log(user_id=self.user.id, action='view')
+        with mock.patch.object(ArchiveAccessLog.objects, 'bulk_create', side_effect=RuntimeError('db down')), \
+                mock.patch.object(ArchiveAccessLog.objects, 'create', side_effect=RuntimeError('db down')):
+            for attempt in range(1, access_log.MAX_ATTEMPTS):
+                writer.flush()
+                self.assertEqual(writer.pending(), 1)
+            writer.flush()
+        self.assertEqual(writer.pending(), 0)
+        self.assertEqual(writer._redis().llen(writer.dead_letter_key), 1)
+
+    @skipUnless(_redis_available(), 'Redis is not reachable')
+    def test_only_the_lock_holder_drains_the_queue(self):
+        writer = self._writer()
+        client = writer._redis()
+        self.addCleanup(client.delete, self.queue_key, writer.lock_key)
+        writer.log(user_id=self.user.id, action='view')
+        client.set(writer.lock_key, 'another-process', px=60000)
+        writer.flush()
+        self.assertEqual(ArchiveAccessLog.objects.count(), 0)
+        client.delete(writer.lock_key)
+        writer.flush()
+        self.assertEqual(ArchiveAccessLog.objects.count(), 1)
@@ -0,0 +1,53 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from backend.operations.models import PatientAssessmentArchive
+from backend.operations.signals import archive_export_cache_key
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class ArchiveCacheInvalidationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.user = User.objects.create_user(
+            email="patient1@example.com",
+            password="Pass1234",
+            full_name="Patient One",
+            role="patient",
+            hospital_name="Test Hospital",
+            verification_status="approved",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.record = PatientAssessmentArchive.objects.create(
+            user=self.user,
+            assessment_type="intake",
+            medical_condition="test",
+            assessment_data={"archived": True, "note": "ok"},
+            last_assessed_at=timezone.now(),
+            hospital_name="Test Hospital",
+        )
+
+    def test_export_of_deleted_archive_is_not_served_from_cache(self):
+        url = reverse("archive_export", args=[self.record.id])
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertIsNotNone(cache.get(archive_export_cache_key(self.record.id)))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.record.delete()
+
+        self.assertIsNone(cache.get(archive_export_cache_key(self.record.id)))
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_export_is_regenerated_after_an_edit(self):
+        self.client.get(reverse("archive_export", args=[self.record.id]))
+        self.record.medical_condition = "edited"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.record.save()
+        self.assertIsNone(cache.get(archive_export_cache_key(self.record.id)))
@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from backend.operations.models import PatientAssessmentArchive
+
+
+class ArchiveSearchTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.doctor = User.objects.create_user(
+            email="doc@example.com", password="Pass1234", full_name="Doc Tor", role="doctor",
+        )
+        self.alice = User.objects.create_user(
+            email="alice@example.com", password="Pass1234", full_name="Alice Santos", role="patient",
+        )
+        self.bob = User.objects.create_user(
+            email="bob@example.com", password="Pass1234", full_name="Bob Reyes", role="patient",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.doctor)
+
+        base = timezone.make_aware(datetime(2026, 3, 15, 10, 0))
+        for i in range(5):
+            PatientAssessmentArchive.objects.create(
+                user=self.alice, assessment_type="intake" if i % 2 else "discharge",
+                medical_condition="Hypertension", medical_history_summary="Family history of stroke",
+                assessment_data={"archived": True}, last_assessed_at=base - timedelta(days=20 * i),
+            )
+        # Same timestamp as the newest record, to exercise the id tie-breaker.
+        PatientAssessmentArchive.objects.create(
+            user=self.bob, assessment_type="intake", medical_condition="Asthma",
+            assessment_data={"archived": True}, last_assessed_at=base,
+        )
+        PatientAssessmentArchive.objects.create(
+            user=self.bob, assessment_type="intake", medical_condition="Asthma",
+            assessment_data={"archived": False}, last_assessed_at=base,
+        )
+
+    def _get(self, **params):
+        resp = self.client.get(reverse("archive_list"), params)
+        self.assertEqual(resp.status_code, 200)
+        return resp.json()
+
+    def test_denormalized_columns_follow_the_record(self):
+        record = PatientAssessmentArchive.objects.filter(user=self.bob, is_archived=True).first()
+        self.assertEqual(record.patient_name, "Bob Reyes")
+        record.assessment_data = {"archived": False}
+        record.save(update_fields=["assessment_data"])
+        record.refresh_from_db()
+        self.assertFalse(record.is_archived)
+
+    def test_renaming_a_patient_updates_their_archives(self):
+        self.bob.full_name = "Robert Reyes"
+        self.bob.save(update_fields=["full_name"])
+        self.assertEqual(
+            set(PatientAssessmentArchive.objects.filter(user=self.bob).values_list("patient_name", flat=True)),
+            {"Robert Reyes"},
+        )
+        self.assertEqual(len(self._get(patient_name="robert")["results"]), 1)
+        self.assertEqual(len(self._get(patient_name="bob")["results"]), 0)
+
+    def test_keyset_pages_cover_every_archived_record_once(self):
+        seen, cursor = [], None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            page = self._get(**params)
+            seen.extend(r["id"] for r in page["results"])
+            cursor = page["next_cursor"]
+            if not cursor:
+                break
+        expected = list(
+            PatientAssessmentArchive.objects.filter(is_archived=True)
+            .order_by("-last_assessed_at", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(seen), 6)
+
+    def test_first_page_has_facets(self):
+        page = self._get(patient_name="alice")
+        self.assertEqual(len(page["results"]), 5)
+        types = {f["value"]: f["count"] for f in page["facets"]["assessment_type"]}
+        self.assertEqual(types, {"discharge": 3, "intake": 2})
+        self.assertEqual(sum(f["count"] for f in page["facets"]["month"]), 5)
+        self.assertEqual(page["facets"]["month"][0]["value"], "2026-03")
+
+        next_page = self._get(limit=1)
+        self.assertNotIn("facets", self._get(limit=1, cursor=next_page["next_cursor"]))
+
+    def test_text_type_and_date_filters(self):
+        self.assertEqual(len(self._get(q="stroke")["results"]), 5)
+        self.assertEqual(len(self._get(condition="asth")["results"]), 1)
+        self.assertEqual(len(self._get(assessment_type="INTAKE")["results"]), 3)
+        dated = self._get(start="2026-03-15", end="2026-03-15")["results"]
+        self.assertEqual(len(dated), 2)
+
+    def test_invalid_cursor_is_rejected(self):
+        resp = self.client.get(reverse("archive_list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(resp.status_code, 400)
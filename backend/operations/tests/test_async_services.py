@@ -0,0 +1,46 @@
+from datetime import time, timedelta
+
+from asgiref.sync import async_to_sync
+from django.test import TestCase
+from django.utils import timezone
+
+from backend.users.models import User, GeneralDoctorProfile, PatientProfile
+from backend.operations.models import AppointmentManagement, QueueManagement
+from backend.operations.async_services import AsyncAppointmentService, AsyncQueueService
+
+
+class AsyncServiceQueryCountTests(TestCase):
+    def setUp(self):
+        doctor = User.objects.create_user(
+            email='async_doc@example.com', password='testpass', role='doctor', full_name='Dr. Async'
+        )
+        self.doctor_id = doctor.id
+        doctor_profile = GeneralDoctorProfile.objects.create(user=doctor)
+        for i in range(3):
+            patient = User.objects.create_user(
+                email=f'async_patient{i}@example.com', password='testpass', role='patient', full_name=f'Patient {i}'
+            )
+            profile = PatientProfile.objects.create(user=patient, blood_type='O+')
+            QueueManagement.objects.create(
+                patient=profile, department='OPD', queue_number=3 - i, estimated_wait_time=timedelta(minutes=i)
+            )
+            AppointmentManagement.objects.create(
+                doctor=doctor_profile, patient=profile, queue_number=900 + i,
+                appointment_date=timezone.now(), appointment_time=time(9, i),
+            )
+
+    def test_queue_patients_single_query_in_queue_order(self):
+        with self.assertNumQueries(1):
+            result = async_to_sync(AsyncQueueService.get_queue_patients)('OPD')
+        normal = result['normal_queue']
+        self.assertEqual([p['patient_name'] for p in normal], ['Patient 2', 'Patient 1', 'Patient 0'])
+        self.assertEqual([p['position'] for p in normal], [1, 2, 3])
+        self.assertEqual(normal[0]['estimated_wait'], 120.0)
+        self.assertEqual(result['priority_queue'], [])
+
+    def test_user_appointments_single_query(self):
+        with self.assertNumQueries(1):
+            result = async_to_sync(AsyncAppointmentService.get_user_appointments)(self.doctor_id)
+        self.assertEqual(len(result), 3)
+        self.assertEqual(result[0]['patient_email'], 'async_patient0@example.com')
+        self.assertEqual(result[0]['blood_type'], 'O+')
@@ -0,0 +1,99 @@
+import json
+import os
+import tempfile
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from backend.operations.models import PatientAssessmentArchive
+
+
+class CrashingPool:
+    """Stands in for the worker pool: every worker dies before returning."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_exception(BrokenProcessPool('worker killed'))
+        return future
+
+
+class GenerateReportsCommandTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.patient = User.objects.create_user(
+            email="archived@example.com",
+            password="Pass1234",
+            full_name="Archived Patient",
+            role="patient",
+            hospital_name="Test Hospital",
+        )
+        self.record = PatientAssessmentArchive.objects.create(
+            user=self.patient,
+            assessment_type="intake",
+            medical_condition="Hypertension",
+            assessment_data={"archived": True, "note": "stable"},
+            last_assessed_at=timezone.now(),
+            hospital_name="Test Hospital",
+        )
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _run(self, *extra):
+        out = StringIO()
+        call_command('generate_reports', '--role', 'patient', '--workers', '0',
+                     '--output-dir', self.tmp.name, *extra, stdout=out)
+        return out.getvalue()
+
+    def _manifest(self):
+        with open(os.path.join(self.tmp.name, 'manifest.json')) as fh:
+            return json.load(fh)
+
+    def test_renders_archive_pdf_and_manifest(self):
+        self._run()
+        entry = self._manifest()['reports'][f"archive:{self.record.id}"]
+        path = os.path.join(self.tmp.name, entry['file'])
+        with open(path, 'rb') as fh:
+            self.assertTrue(fh.read(4) == b'%PDF')
+        self.assertEqual(entry['bytes'], os.path.getsize(path))
+        self.assertFalse([n for n in os.listdir(self.tmp.name) if n.startswith('.tmp-')])
+
+    def test_unchanged_inputs_are_skipped(self):
+        self._run()
+        first = self._manifest()['reports'][f"archive:{self.record.id}"]
+        output = self._run()
+        self.assertIn('All reports are up to date', output)
+
+        self.record.medical_condition = "Hypertension, controlled"
+        self.record.save()
+        self._run()
+        second = self._manifest()['reports'][f"archive:{self.record.id}"]
+        self.assertNotEqual(first['fingerprint'], second['fingerprint'])
+
+    def test_hospital_filter_excludes_other_hospitals(self):
+        output = self._run('--hospital', 'Other Hospital')
+        self.assertIn('Planned 0 report(s)', output)
+
+    def test_worker_failure_names_the_report(self):
+        out = StringIO()
+        with mock.patch('backend.operations.management.commands.generate_reports.ProcessPoolExecutor',
+                        CrashingPool):
+            call_command('generate_reports', '--role', 'patient', '--workers', '2',
+                         '--output-dir', self.tmp.name, stdout=out)
+        self.assertIn(f"archive:{self.record.id}", out.getvalue())
+        self.assertIn('worker failure: worker killed', out.getvalue())
+        self.assertNotIn('?', out.getvalue())
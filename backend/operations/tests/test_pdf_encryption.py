@@ -0,0 +1,72 @@
+import base64
+import functools
+import io
+from unittest import mock
+
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from django.core import mail
+from django.test import SimpleTestCase
+from PyPDF2 import PdfReader
+
+from backend.operations import pdf_service
+
+
+def _decrypt(key, data, iv=None):
+    mode = modes.CBC(iv) if iv is not None else modes.ECB()
+    decryptor = Cipher(algorithms.AES(key), mode).decryptor()
+    return decryptor.update(data) + decryptor.finalize()
+
+
+class RenderTimeEncryptionTests(SimpleTestCase):
+    def _render(self, password='s3cret'):
+        render = functools.partial(pdf_service.generate_records_pdf, 'Jane Doe', 'jane@example.com', {'note': 'stable'})
+        return pdf_service.render_encrypted_pdf(render, password)
+
+    def test_pdf_is_aes256_encrypted_while_rendering(self):
+        pdf_bytes = self._render()
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+        self.assertTrue(reader.is_encrypted)
+
+        encrypt = reader.trailer['/Encrypt'].get_object()
+        self.assertEqual((encrypt['/V'], encrypt['/R']), (5, 6))
+        self.assertEqual(encrypt['/CF']['/StdCF']['/CFM'], '/AESV3')
+        u, ue, perms = (encrypt[k].original_bytes for k in ('/U', '/UE', '/Perms'))
+        self.assertEqual((len(u), len(ue), len(perms)), (48, 32, 16))
+
+        # The user password unlocks the file key, which in turn decrypts /Perms.
+        key = _decrypt(pdf_service._hash_r6(b's3cret', u[40:48]), ue, bytes(16))
+        self.assertEqual(_decrypt(key, perms)[9:12], b'adb')
+        self.assertNotIn(b'Jane Doe', pdf_bytes)
+
+    def test_reader_decrypts_with_the_password(self):
+        pdf_bytes = self._render()
+        self.assertFalse(PdfReader(io.BytesIO(pdf_bytes)).decrypt('wrong'))
+
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+        self.assertTrue(reader.decrypt('s3cret'))
+        text = reader.pages[0].extract_text()
+        self.assertIn('Patient: Jane Doe', text)
+        self.assertIn('stable', text)
+
+    def test_falls_back_to_post_render_encryption(self):
+        with mock.patch.object(pdf_service, 'AES256Encryption', None), \
+                mock.patch.object(pdf_service, 'encrypt_pdf_aes256', return_value=b'encrypted') as fallback:
+            self.assertEqual(self._render('pw'), b'encrypted')
+        plain, password = fallback.call_args[0]
+        self.assertTrue(plain.startswith(b'%PDF'))
+        self.assertEqual(password, 'pw')
+
+
+class SendEncryptedPdfTests(SimpleTestCase):
+    def test_email_is_queued_in_background(self):
+        with mock.patch('backend.operations.tasks.send_encrypted_pdf.delay') as delay:
+            pdf_service.send_encrypted_pdf_to_patient('p@example.com', b'%PDF-data', 'records.pdf')
+        delay.assert_called_once_with('p@example.com', base64.b64encode(b'%PDF-data').decode('ascii'),
+                                      'records.pdf', None)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_sends_inline_when_broker_unavailable(self):
+        with mock.patch('backend.operations.tasks.send_encrypted_pdf.delay', side_effect=ConnectionError):
+            pdf_service.send_encrypted_pdf_to_patient('p@example.com', b'%PDF-data', 'records.pdf')
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].attachments[0][0], 'records.pdf')
@@ -0,0 +1,47 @@
+import io
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+from PIL import Image
+
+from backend.operations.pdf_templates import DoctorAnalyticsPDF, PatientArchivePDF
+from backend.operations.pdf_templates import styles as pdf_styles
+
+
+class PDFStyleRegistryTests(SimpleTestCase):
+    def test_templates_share_one_stylesheet(self):
+        a = DoctorAnalyticsPDF(io.BytesIO(), {'name': 'H'})
+        b = PatientArchivePDF(io.BytesIO(), {'name': 'H'})
+        self.assertIs(a.styles, b.styles)
+        self.assertIn('ReportTitle', a.styles)
+
+    def test_shared_stylesheet_is_read_only(self):
+        styles = pdf_styles.get_template_styles()
+        with self.assertRaises(TypeError):
+            styles.add(styles['Normal'])
+
+    def test_logo_reader_is_cached_until_file_changes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'logo.png')
+            Image.new('RGB', (20, 10)).save(path)
+            first = pdf_styles.get_logo_reader(path)
+            self.assertIs(first, pdf_styles.get_logo_reader(path))
+            self.assertEqual(first.getSize(), (20, 10))
+
+            Image.new('RGB', (40, 10)).save(path)
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+            self.assertEqual(pdf_styles.get_logo_reader(path).getSize(), (40, 10))
+
+        self.assertIsNone(pdf_styles.get_logo_reader(os.path.join(tmp, 'missing.png')))
+
+    def test_pdf_renders_with_shared_logo(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'logo.png')
+            Image.new('RGBA', (30, 30)).save(path)
+            for _ in range(2):
+                buffer = io.BytesIO()
+                PatientArchivePDF(buffer, {'name': 'H', 'address': 'A'}, logo_path=path).generate({
+                    'patient_info': {'name': 'Test Patient'},
+                })
+                self.assertTrue(buffer.getvalue().startswith(b'%PDF'))
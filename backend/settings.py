@@ -90,6 +90,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "backend.utils.request_metrics.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -334,6 +335,88 @@ CACHES = {
     }
 }
 
+# Archive access audit log: buffered and bulk-inserted off the request path
+# (see backend/operations/access_log.py)
+ARCHIVE_ACCESS_LOG_ASYNC = True
+ARCHIVE_ACCESS_LOG_BATCH_SIZE = 100
+ARCHIVE_ACCESS_LOG_FLUSH_INTERVAL_MS = 1000
+ARCHIVE_ACCESS_LOG_MAX_BUFFER = 10000
+# Durable, shared buffer; unset to buffer in process memory only
+ARCHIVE_ACCESS_LOG_REDIS_URL = 'redis://localhost:6379/0'
+
+# Per-request query/cache/latency instrumentation: Server-Timing headers,
+# rolling per-endpoint stats and query budgets keyed by URL name
+# (see backend/utils/request_metrics.py)
+REQUEST_METRICS_ENABLED = True
+REQUEST_METRICS_SERVER_TIMING = True
+REQUEST_METRICS_WINDOW = 500
+REQUEST_QUERY_BUDGET_DEFAULT = None
+REQUEST_QUERY_BUDGETS = {
+    'get_doctor_patients': 4,
+    'get_nurse_patients': 4,
+    'nurse_patient_forms_overview': 10,
+    'doctor_patient_forms_overview': 10,
+    'patient_form_schema': 2,
+    'archive_list': 6,
+}
+
+# Analytics change events: published on Redis pub/sub when an AnalyticsResult
+# completes and relayed to dashboards by the async /api/analytics/stream/ SSE
+# endpoint (backend/analytics/events.py; serve it under ASGI)
+ANALYTICS_EVENTS_REDIS_URL = 'redis://localhost:6379/0'
+ANALYTICS_EVENTS_CHANNEL = 'medisync:analytics:results'
+ANALYTICS_STREAM_KEEPALIVE = 20
+
+# Shared analytics result cache (backend/analytics/result_cache.py): per-process
+# LRU in front of the default cache, one entry per analysis type and version
+ANALYTICS_LOCAL_CACHE_SIZE = 32
+ANALYTICS_LOCAL_CACHE_TTL = 5
+ANALYTICS_CACHE_TIMEOUT = 24 * 3600
+
+# Usage telemetry (backend/analytics/usage_events.py): events are buffered per
+# process and bulk-inserted; a full buffer answers 429 with Retry-After.
+# Sample rates are per event type ('*' is the default); rollup_usage_events
+# keeps hourly counts for dashboards
+USAGE_EVENTS_ASYNC = True
+USAGE_EVENTS_BATCH_SIZE = 500
+USAGE_EVENTS_FLUSH_INTERVAL_MS = 2000
+USAGE_EVENTS_MAX_BUFFER = 20000
+USAGE_EVENTS_MAX_PER_REQUEST = 500
+USAGE_EVENTS_SAMPLE_RATES = {'*': 1.0}
+
+# Data retention (backend/analytics/retention.py): rows older than `days` are
+# deleted nightly in keyset-ordered, throttled batches; `days: None` keeps a
+# table forever. Preview with `manage.py apply_retention --dry-run`.
+DATA_RETENTION = {
+    'analytics.AnalyticsResult': {'days': 30},
+    'analytics.UsageEvent': {'days': 90},
+    'analytics.UsageEventRollup': {'days': 2 * 365},
+    'analytics.UptimePing': {'days': 30},
+    'analytics.UptimeRollup': {'days': 90},
+    'analytics.DataUpdateLog': {'days': 30},
+    'operations.ArchiveAccessLog': {'days': 6 * 365},
+}
+DATA_RETENTION_BATCH_SIZE = 1000
+DATA_RETENTION_BATCH_PAUSE = 0.1
+DATA_RETENTION_MAX_SECONDS = 300
+
+# AI insights model registry (backend/analytics/model_registry.py): versions are
+# trained nightly on AnalyticsResult history and promoted only when they beat the
+# current one on held-out samples newer than its training data (at least
+# AI_MODEL_MIN_COMPARISON_SAMPLES of them); web processes re-read the promoted version every
+# AI_MODEL_RELOAD_SECONDS. The directory must be shared by web and worker hosts.
+AI_MODEL_REGISTRY_DIR = BASE_DIR / 'ai_models'
+AI_MODEL_RELOAD_SECONDS = 30
+AI_MODEL_MIN_IMPROVEMENT = 0.0
+AI_MODEL_MIN_COMPARISON_SAMPLES = 10
+AI_MODEL_KEEP_VERSIONS = 5
+AI_TRAINING_MIN_SAMPLES = 50
+AI_TRAINING_MAX_SAMPLES = 50000
+
+# Load-test reports written by `manage.py load_test` (backend/analytics/load_testing.py);
+# the latest one is served to the admin dashboard by /api/analytics/stress-test/
+LOAD_TEST_REPORT_DIR = BASE_DIR / 'load_test_reports'
+
 # Message Encryption Settings
 MESSAGE_ENCRYPTION_KEY = "your-32-character-secret-key-here"  # Change this in production
 
@@ -9,4 +9,11 @@ DATABASES = {
 }
 
 # Speed up tests: disable password validators, channels layers, etc. as needed
-AUTH_PASSWORD_VALIDATORS = []
\ No newline at end of file
+AUTH_PASSWORD_VALIDATORS = []
+
+# Write archive access logs inline so tests can assert on them immediately
+ARCHIVE_ACCESS_LOG_ASYNC = False
+USAGE_EVENTS_ASYNC = False
+
+# Always consult the shared cache tier so results never leak between tests
+ANALYTICS_LOCAL_CACHE_TTL = 0
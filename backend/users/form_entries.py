@@ -0,0 +1,131 @@
+"""
+Paginated reads and compact write responses for PatientProfile list forms.
+
+GET endpoints stay backwards compatible: without query parameters they
+return the whole list. Passing any of ``since``, ``until``, ``limit``,
+``cursor`` or ``fields`` switches to a page of entries ordered by
+(recorded_at, id), served from the (patient, recorded_at) index:
+
+    ?since=2025-03-01T00:00:00Z&until=...&limit=50&fields=bp,hr
+
+``fields`` projects entry keys in the database so large entries are not
+transferred in full. Each item is ``{id, version, recorded_at, entry}``; the
+page carries ``next_cursor`` to pass back as ``cursor``. Items are edited
+with ``PUT <form>/entries/<id>/``; the older ``<form>/<index>/`` routes count
+positions in the full (insertion-ordered) list, not in a page.
+"""
+import base64
+import json
+import re
+from datetime import datetime, time, timezone as dt_timezone
+
+from django.db.models import Q
+from django.db.models.fields.json import KeyTransform
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+PAGE_PARAMS = ('since', 'until', 'limit', 'cursor', 'fields')
+MAX_FIELDS = 20
+_FIELD_RE = re.compile(r'^[A-Za-z][A-Za-z0-9]*(_[A-Za-z0-9]+)*$')
+
+
+class InvalidPageQuery(ValueError):
+    pass
+
+
+def wants_page(params) -> bool:
+    return any(params.get(name) for name in PAGE_PARAMS)
+
+
+def encode_cursor(recorded_at, row_id) -> str:
+    raw = json.dumps([recorded_at.isoformat(), row_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def decode_cursor(cursor: str):
+    try:
+        recorded_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        recorded_at = parse_datetime(recorded_at)
+        if recorded_at is None:
+            raise ValueError
+        return recorded_at, int(row_id)
+    except Exception:
+        raise InvalidPageQuery('Invalid cursor')
+
+
+def parse_moment(value: str, name: str):
+    """ISO datetime or date; naive values are UTC like entry timestamps."""
+    try:
+        moment = parse_datetime(value)
+        if moment is None:
+            day = parse_date(value)
+            moment = datetime.combine(day, time.min) if day else None
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise InvalidPageQuery(f'{name} must be an ISO 8601 date or datetime')
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment, dt_timezone.utc)
+    return moment
+
+
+def parse_fields(value):
+    if not value:
+        return []
+    keys = [k.strip() for k in value.split(',') if k.strip()]
+    if len(keys) > MAX_FIELDS or not all(_FIELD_RE.match(k) for k in keys):
+        raise InvalidPageQuery(f'fields must be up to {MAX_FIELDS} comma-separated entry keys')
+    return list(dict.fromkeys(keys))
+
+
+def entry_payload(row) -> dict:
+    return {
+        'id': row.pk,
+        'version': row.version,
+        'recorded_at': row.recorded_at.isoformat() if row.recorded_at else None,
+        'entry': row.data,
+    }
+
+
+def page_form_entries(profile, field, params) -> dict:
+    """Return ``{'data', 'next_cursor'}`` for one page of a list form."""
+    try:
+        limit = int(params.get('limit') or DEFAULT_PAGE_SIZE)
+    except (TypeError, ValueError):
+        raise InvalidPageQuery('limit must be an integer')
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    keys = parse_fields(params.get('fields'))
+
+    qs = profile.form_entries(field)
+    if params.get('since'):
+        qs = qs.filter(recorded_at__gte=parse_moment(params['since'], 'since'))
+    if params.get('until'):
+        qs = qs.filter(recorded_at__lt=parse_moment(params['until'], 'until'))
+    if params.get('cursor'):
+        recorded_at, row_id = decode_cursor(params['cursor'])
+        qs = qs.filter(Q(recorded_at__gt=recorded_at) | Q(recorded_at=recorded_at, id__gt=row_id))
+    qs = qs.order_by('recorded_at', 'id')
+
+    if keys:
+        aliases = {f'_f{i}': KeyTransform(key, 'data') for i, key in enumerate(keys)}
+        rows = list(qs.values('id', 'version', 'recorded_at', **aliases)[:limit + 1])
+        items = [
+            {
+                'id': r['id'],
+                'version': r['version'],
+                'recorded_at': r['recorded_at'].isoformat(),
+                'entry': {key: r[f'_f{i}'] for i, key in enumerate(keys)},
+            }
+            for r in rows[:limit]
+        ]
+        last = rows[limit - 1] if len(rows) > limit else None
+        next_cursor = encode_cursor(last['recorded_at'], last['id']) if last else None
+    else:
+        rows = list(qs[:limit + 1])
+        items = [entry_payload(row) for row in rows[:limit]]
+        last = rows[limit - 1] if len(rows) > limit else None
+        next_cursor = encode_cursor(last.recorded_at, last.pk) if last else None
+
+    return {'data': items, 'next_cursor': next_cursor}
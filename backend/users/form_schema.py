@@ -0,0 +1,304 @@
+"""
+Form-field schema for PatientProfile forms.
+
+The labels, types, choices and document shapes of the patient forms only
+change with the code, so they are built once per process into an immutable
+``FormSchema`` (pre-serialized JSON plus an ETag derived from it and
+FORM_SCHEMA_VERSION). ``GET /api/users/forms/schema/`` serves it with that
+ETag so clients keep it across requests and deploys; per-patient requests
+only need the values from ``profile_form_values``. ``merge_form_context``
+rebuilds the combined structure returned by
+``PatientProfile.get_form_fields_context`` without rebuilding the schema.
+
+Bump FORM_SCHEMA_VERSION when the meaning of the schema changes without its
+content changing (the ETag already follows content changes).
+"""
+import hashlib
+import json
+from functools import lru_cache
+from types import MappingProxyType
+from typing import NamedTuple
+
+FORM_SCHEMA_VERSION = "2"
+
+GROUPS = (
+    "demographics",
+    "medical",
+    "administrative",
+    "nursing_admin",
+    "nursing_intake",
+    "flow_sheets",
+    "mar",
+    "education",
+    "discharge",
+    "history_physical",
+    "progress_notes",
+    "provider_orders",
+    "operative_reports",
+)
+
+# Groups of single fields: each field spec gets the patient's value as "default".
+FIELD_GROUPS = ("demographics", "medical", "administrative", "nursing_admin")
+# Groups describing a JSON document: the group gets the stored document as "default".
+DOCUMENT_GROUPS = tuple(g for g in GROUPS if g not in FIELD_GROUPS)
+
+_VITALS = {"bp": "", "hr": None, "rr": None, "temp_c": None, "o2_sat": None}
+_VITALS_WITH_PAIN = {**_VITALS, "pain": None}
+
+
+class FormSchema(NamedTuple):
+    version: str
+    etag: str
+    json: bytes
+    data: MappingProxyType
+
+
+def _field_specs(blood_type_choices):
+    demographics = {
+        "full_name": {"label": "Full Name", "type": "text", "readonly": True},
+        "date_of_birth": {"label": "Date of Birth", "type": "date", "readonly": True},
+        "gender": {"label": "Gender", "type": "text", "readonly": True},
+        "hospital_address": {"label": "Hospital Address", "type": "textarea", "readonly": True},
+    }
+    medical = {
+        "blood_type": {"label": "Blood Type", "type": "select", "choices": blood_type_choices, "required": False},
+        "medical_condition": {"label": "Medical Condition", "type": "textarea", "required": False},
+        "date_of_admission": {"label": "Date of Admission", "type": "date", "required": False},
+        "discharge_date": {"label": "Discharge Date", "type": "date", "required": False},
+        "assigned_doctor": {"label": "Assigned Doctor", "type": "relation", "required": False,
+                            "relation": {"model": "users.User", "filter": {"role": "doctor"}}},
+        "medication": {"label": "Current Medications", "type": "textarea", "required": False},
+        "test_results": {"label": "Test Results", "type": "textarea", "required": False},
+    }
+    administrative = {
+        "hospital": {"label": "Hospital", "type": "text", "required": False},
+        "insurance_provider": {"label": "Insurance Provider", "type": "text", "required": False},
+        "billing_amount": {"label": "Billing Amount", "type": "decimal", "required": False,
+                           "attrs": {"max_digits": 10, "decimal_places": 2}},
+        "room_number": {"label": "Room Number", "type": "text", "required": False, "attrs": {"max_length": 20}},
+        "admission_type": {"label": "Admission Type", "type": "text", "required": False, "attrs": {"max_length": 50}},
+    }
+    return {
+        "demographics": demographics,
+        "medical": medical,
+        "administrative": administrative,
+        # Nurse-centric grouping of core medical/admin fields
+        "nursing_admin": {**medical, **administrative},
+    }
+
+
+_DOCUMENT_SCHEMAS = {
+    "nursing_intake": {
+        "vitals": _VITALS,
+        "weight_kg": None,
+        "height_cm": None,
+        "chief_complaint": "",
+        "pain_score": None,
+        "allergies": [],  # [{substance, reaction}]
+        "current_medications": [],
+        "mental_status": "",
+        "fall_risk_score": None,
+        "assessed_at": None,
+    },
+    "flow_sheets": {
+        "time_of_reading": None,
+        "repeated_vitals": _VITALS_WITH_PAIN,
+        "intake_ml": None,
+        "output_ml": None,
+        "site_checks": "",
+        "nursing_interventions": [],
+    },
+    "mar": {
+        "datetime_administered": None,
+        "name": "",
+        "dose": "",
+        "route": "",
+        "nurse_initials": "",
+        "prn_reason": None,
+        "prn_response": None,
+        "withheld_reason": None,
+    },
+    "education": {
+        "topics": [],
+        "teaching_method": "",
+        "comprehension_level": "",
+        "return_demonstration": "",
+        "barriers_to_learning": [],
+        "recorded_at": None,
+    },
+    "discharge": {
+        "discharge_vitals": _VITALS_WITH_PAIN,
+        "understanding_confirmed": False,
+        "written_instructions_provided": False,
+        "follow_up_appointments_made": False,
+        "equipment_needs": [],
+        "transportation_status": "",
+        "nurse_signature": "",
+        "patient_acknowledgment": False,
+        "discharged_at": None,
+    },
+    # Doctor-centric forms
+    "history_physical": {
+        "patient_name": "",
+        "dob": None,
+        "mrn": "",
+        "provider_signature": "",
+        "provider_id": "",
+        "chief_complaint": "",
+        "history_present_illness": "",
+        "past_medical_history": "",
+        "social_history": "",
+        "review_of_systems": [],
+        "physical_exam": "",
+        "assessment": "",
+        "diagnoses_icd_codes": [],
+        "initial_plan": "",
+        "created_at": None,
+    },
+    "progress_notes": {
+        "date_time_note": None,
+        "subjective": "",
+        "objective": "",
+        "vitals": _VITALS,
+        "lab_imaging_results": "",
+        "assessment": "",
+        "plan": "",
+        "follow_up_date": None,
+        "provider_signature": "",
+        "created_at": None,
+    },
+    "provider_orders": {
+        "ordering_provider": "",
+        "date_time_placed": None,
+        "order_type": "",
+        "medication_orders": {"drug_name": "", "dose": "", "route": "", "frequency": ""},
+        "diagnostic_orders": {"test_name": "", "priority": "", "reason": ""},
+        "consultation_orders": {"specialty": "", "question": ""},
+        "general_orders": "",
+        "order_status": "",
+        "created_at": None,
+    },
+    "operative_reports": {
+        "patient_id": "",
+        "date_time_performed": None,
+        "procedure_name": "",
+        "indications": "",
+        "consent_status": "",
+        "anesthesia_type": "",
+        "anesthesia_dose": "",
+        "procedure_steps": "",
+        "findings": "",
+        "complications": "",
+        "disposition_plan": "",
+        "surgeon_provider_signature": "",
+        "created_at": None,
+    },
+}
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+@lru_cache(maxsize=1)
+def form_schema() -> FormSchema:
+    """The static form schema, built once per process."""
+    from .models import PatientProfile
+
+    schema = {"model": "patient_profiles", "version": FORM_SCHEMA_VERSION, "groups": list(GROUPS)}
+    schema.update(_field_specs([list(choice) for choice in PatientProfile.BloodType.choices]))
+    for group in DOCUMENT_GROUPS:
+        schema[group] = {"schema": _DOCUMENT_SCHEMAS[group]}
+    raw = json.dumps(schema, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    etag = f'"form-schema-v{FORM_SCHEMA_VERSION}-{hashlib.sha256(raw).hexdigest()[:16]}"'
+    return FormSchema(FORM_SCHEMA_VERSION, etag, raw, _freeze(schema))
+
+
+@lru_cache(maxsize=1)
+def _template() -> dict:
+    return json.loads(form_schema().json)
+
+
+def _iso(value):
+    try:
+        return value.isoformat() if value else None
+    except Exception:
+        return None
+
+
+def profile_form_values(profile) -> dict:
+    """Per-patient values: ``{'fields': {name: value}, 'documents': {group: document}}``."""
+    user = profile.user
+    return {
+        "fields": {
+            "full_name": user.full_name,
+            "date_of_birth": _iso(user.date_of_birth),
+            "gender": user.gender,
+            "hospital_address": user.hospital_address,
+            "blood_type": profile.blood_type,
+            "medical_condition": profile.medical_condition,
+            "date_of_admission": _iso(profile.date_of_admission),
+            "discharge_date": _iso(profile.discharge_date),
+            "assigned_doctor": profile.assigned_doctor_id,
+            "medication": profile.medication,
+            "test_results": profile.test_results,
+            "hospital": profile.hospital or user.hospital_name,
+            "insurance_provider": profile.insurance_provider,
+            "billing_amount": float(profile.billing_amount) if profile.billing_amount is not None else None,
+            "room_number": profile.room_number,
+            "admission_type": profile.admission_type,
+        },
+        "documents": {
+            "nursing_intake": profile.nursing_intake_assessment or {},
+            "flow_sheets": list(profile.graphic_flow_sheets or []),
+            "mar": list(profile.medication_administration_records or []),
+            "education": list(profile.patient_education_record or []),
+            "discharge": {},
+            "history_physical": [],
+            "progress_notes": [],
+            "provider_orders": [],
+            "operative_reports": [],
+        },
+    }
+
+
+def blank_form_values() -> dict:
+    """Values of a profile that has not been created yet (model defaults)."""
+    from .models import PatientProfile
+
+    fields = dict.fromkeys(
+        ("date_of_birth", "gender", "date_of_admission", "discharge_date", "assigned_doctor", "billing_amount")
+    )
+    for name in ("full_name", "hospital_address", "medical_condition", "medication", "test_results",
+                 "hospital", "insurance_provider", "room_number", "admission_type"):
+        fields[name] = ""
+    fields["blood_type"] = PatientProfile.BloodType.UNKNOWN.value
+    documents = {group: [] for group in DOCUMENT_GROUPS}
+    documents.update(nursing_intake={}, discharge={})
+    return {"fields": fields, "documents": documents}
+
+
+def merge_form_context(values, for_role=None) -> dict:
+    """
+    The schema with ``values`` merged in as defaults. Group and field dicts
+    are fresh per call; nested schema parts (choices, attrs, document
+    schemas) are shared with the cached schema and must not be mutated.
+    """
+    template = _template()
+    context = {
+        "model": template["model"],
+        "version": template["version"],
+        "role": for_role,
+        "groups": list(GROUPS),
+    }
+    fields = values["fields"]
+    for group in FIELD_GROUPS:
+        context[group] = {name: {**spec, "default": fields[name]} for name, spec in template[group].items()}
+    documents = values["documents"]
+    for group in DOCUMENT_GROUPS:
+        context[group] = {"schema": template[group]["schema"], "default": documents[group]}
+    return context
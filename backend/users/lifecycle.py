@@ -0,0 +1,73 @@
+"""
+Patient lifecycle state (PatientProfile.lifecycle_state).
+
+A patient is ``archived`` while they have at least one archived assessment
+(PatientAssessmentArchive.is_archived), otherwise ``discharged`` when their
+profile has a discharge_date and ``active`` in every other case. The nurse
+list only shows active patients and reads them from the partial
+``patient_active_idx`` index instead of joining the archive table.
+
+``sync_patient_lifecycle`` is called by archive_create, archive_update and
+archive_unarchive inside their transactions; PatientProfile.save() keeps
+the discharged/active part in step with discharge_date. ``find_lifecycle_drift``
+backs the check_patient_lifecycle command.
+"""
+from django.db.models import Case, Exists, F, OuterRef, Value, When
+
+from .models import PatientProfile
+from .patient_summary import refresh_patient_summaries
+
+State = PatientProfile.LifecycleState
+
+
+def _has_archive():
+    from backend.operations.models import PatientAssessmentArchive
+    return Exists(PatientAssessmentArchive.objects.filter(user_id=OuterRef('user_id'), is_archived=True))
+
+
+def expected_state_expression():
+    """SQL expression of the state a profile should be in."""
+    return Case(
+        When(_has_archive(), then=Value(State.ARCHIVED)),
+        When(discharge_date__isnull=False, then=Value(State.DISCHARGED)),
+        default=Value(State.ACTIVE),
+    )
+
+
+def sync_patient_lifecycle(user_id) -> int:
+    """Recompute the lifecycle state of a patient user's profile; returns rows changed."""
+    if not user_id:
+        return 0
+    stale = list(
+        PatientProfile.objects.filter(user_id=user_id)
+        .annotate(expected=expected_state_expression())
+        .values_list('id', 'lifecycle_state', 'expected')
+    )
+    changed = 0
+    for profile_id, state, expected in stale:
+        if state != expected:
+            changed += PatientProfile.objects.filter(id=profile_id).update(lifecycle_state=expected)
+    if changed:
+        refresh_patient_summaries([profile_id for profile_id, _, _ in stale])
+    return changed
+
+
+def find_lifecycle_drift():
+    """Profiles whose stored state disagrees with their archives/discharge date."""
+    return (
+        PatientProfile.objects.annotate(expected=expected_state_expression())
+        .exclude(lifecycle_state=F('expected'))
+        .order_by('id')
+        .values('id', 'user_id', 'lifecycle_state', 'expected')
+    )
+
+
+def repair_lifecycle_drift() -> int:
+    """Move every drifted profile to its expected state; returns rows changed."""
+    drift = list(find_lifecycle_drift())
+    for state in State.values:
+        ids = [row['id'] for row in drift if row['expected'] == state]
+        if ids:
+            PatientProfile.objects.filter(id__in=ids).update(lifecycle_state=state)
+    refresh_patient_summaries([row['id'] for row in drift])
+    return len(drift)
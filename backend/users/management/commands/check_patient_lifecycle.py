@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from backend.users.lifecycle import find_lifecycle_drift, repair_lifecycle_drift
+
+
+class Command(BaseCommand):
+    help = "Report patient profiles whose lifecycle_state disagrees with their archives and discharge date"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Move drifted profiles to their expected state",
+        )
+        parser.add_argument(
+            "--show",
+            type=int,
+            default=20,
+            help="Number of drifted profiles to list",
+        )
+
+    def handle(self, *args, **options):
+        drift = find_lifecycle_drift()
+        total = drift.count()
+        if not total:
+            self.stdout.write(self.style.SUCCESS("All patient lifecycle states are consistent."))
+            return
+
+        self.stdout.write(self.style.WARNING(f"{total} patient profile(s) have an inconsistent lifecycle_state:"))
+        for row in drift[:max(0, options["show"])]:
+            self.stdout.write(
+                f"  profile {row['id']} (user {row['user_id']}): {row['lifecycle_state']} -> {row['expected']}"
+            )
+
+        if options["fix"]:
+            fixed = repair_lifecycle_drift()
+            self.stdout.write(self.style.SUCCESS(f"Repaired {fixed} patient profile(s)."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from backend.users.patient_summary import DEFAULT_BATCH_SIZE, rebuild_patient_summaries
+
+
+class Command(BaseCommand):
+    help = 'Recompute the PatientSummary search/summary row of every patient profile.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        written = rebuild_patient_summaries(batch_size=max(1, options['batch_size']))
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} patient summaries."))
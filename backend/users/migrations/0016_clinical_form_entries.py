@@ -0,0 +1,195 @@
+# Generated by Django 5.2.5 on 2026-10-19 15:48
+
+from datetime import datetime, time, timezone as dt_timezone
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+
+# PatientProfile JSON list field -> (entry model, entry keys tried for recorded_at).
+FORM_ENTRY_MODELS = {
+    'graphic_flow_sheets': ('FlowSheetEntry', ('time_of_reading',)),
+    'medication_administration_records': ('MAREntry', ('datetime_administered',)),
+    'patient_education_record': ('EducationEntry', ('recorded_at',)),
+    'history_physical_forms': ('HPFormEntry', ('created_at',)),
+    'progress_notes': ('ProgressNoteEntry', ('date_time', 'date_time_note', 'created_at')),
+    'provider_order_sheets': ('ProviderOrderEntry', ('date_time_placed', 'created_at')),
+    'operative_procedure_reports': ('OperativeReportEntry', ('date_time_performed', 'created_at')),
+}
+BATCH_SIZE = 1000
+
+
+def _recorded_at(entry, keys, fallback):
+    # Frozen copy of backend.users.models.entry_recorded_at.
+    for key in keys:
+        value = entry.get(key)
+        if not isinstance(value, str) or not value:
+            continue
+        try:
+            moment = parse_datetime(value)
+            if moment is None:
+                day = parse_date(value)
+                moment = datetime.combine(day, time.min) if day else None
+        except ValueError:
+            moment = None
+        if moment is not None:
+            if timezone.is_naive(moment):
+                moment = timezone.make_aware(moment, dt_timezone.utc)
+            return moment
+    return fallback
+
+
+def copy_lists_to_entries(apps, schema_editor):
+    PatientProfile = apps.get_model('users', 'PatientProfile')
+    fallback = timezone.now()
+    for field, (model_name, keys) in FORM_ENTRY_MODELS.items():
+        Entry = apps.get_model('users', model_name)
+        batch = []
+        profiles = PatientProfile.objects.order_by('id').values_list('id', field)
+        for profile_id, entries in profiles.iterator(chunk_size=BATCH_SIZE):
+            for entry in entries or []:
+                if not isinstance(entry, dict):
+                    entry = {'value': entry}
+                batch.append(Entry(patient_id=profile_id, data=entry, recorded_at=_recorded_at(entry, keys, fallback)))
+            if len(batch) >= BATCH_SIZE:
+                Entry.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+                batch = []
+        if batch:
+            Entry.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+
+
+def copy_entries_to_lists(apps, schema_editor):
+    PatientProfile = apps.get_model('users', 'PatientProfile')
+    for field, (model_name, _keys) in FORM_ENTRY_MODELS.items():
+        Entry = apps.get_model('users', model_name)
+        lists = {}
+        for profile_id, data in Entry.objects.order_by('patient_id', 'id').values_list('patient_id', 'data').iterator():
+            lists.setdefault(profile_id, []).append(data)
+        for profile_id, entries in lists.items():
+            PatientProfile.objects.filter(id=profile_id).update(**{field: entries})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0015_remove_patientprofile_hospital_fk'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EducationEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users.patientprofile')),
+            ],
+            options={
+                'db_table': 'patient_education_entries',
+                'ordering': ['id'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['patient', 'recorded_at'], name='educationentry_recorded')],
+            },
+        ),
+        migrations.CreateModel(
+            name='FlowSheetEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users.patientprofile')),
+            ],
+            options={
+                'db_table': 'patient_flow_sheet_entries',
+                'ordering': ['id'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['patient', 'recorded_at'], name='flowsheetentry_recorded')],
+            },
+        ),
+        migrations.CreateModel(
+            name='HPFormEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users.patientprofile')),
+            ],
+            options={
+                'db_table': 'patient_hp_form_entries',
+                'ordering': ['id'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['patient', 'recorded_at'], name='hpformentry_recorded')],
+            },
+        ),
+        migrations.CreateModel(
+            name='MAREntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users.patientprofile')),
+            ],
+            options={
+                'db_table': 'patient_mar_entries',
+                'ordering': ['id'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['patient', 'recorded_at'], name='marentry_recorded')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OperativeReportEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users.patientprofile')),
+            ],
+            options={
+                'db_table': 'patient_operative_report_entries',
+                'ordering': ['id'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['patient', 'recorded_at'], name='operativereportentry_recorded')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProgressNoteEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users.patientprofile')),
+            ],
+            options={
+                'db_table': 'patient_progress_note_entries',
+                'ordering': ['id'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['patient', 'recorded_at'], name='progressnoteentry_recorded')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProviderOrderEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('patient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='users.patientprofile')),
+            ],
+            options={
+                'db_table': 'patient_provider_order_entries',
+                'ordering': ['id'],
+                'abstract': False,
+                'indexes': [models.Index(fields=['patient', 'recorded_at'], name='providerorderentry_recorded')],
+            },
+        ),
+        migrations.RunPython(copy_lists_to_entries, copy_entries_to_lists),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-19 15:48
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """Drop the JSON list columns once 0016 has copied them into the entry tables."""
+
+    dependencies = [
+        ('users', '0016_clinical_form_entries'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='patientprofile',
+            name='graphic_flow_sheets',
+        ),
+        migrations.RemoveField(
+            model_name='patientprofile',
+            name='history_physical_forms',
+        ),
+        migrations.RemoveField(
+            model_name='patientprofile',
+            name='medication_administration_records',
+        ),
+        migrations.RemoveField(
+            model_name='patientprofile',
+            name='operative_procedure_reports',
+        ),
+        migrations.RemoveField(
+            model_name='patientprofile',
+            name='patient_education_record',
+        ),
+        migrations.RemoveField(
+            model_name='patientprofile',
+            name='progress_notes',
+        ),
+        migrations.RemoveField(
+            model_name='patientprofile',
+            name='provider_order_sheets',
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:05
+
+from django.db import migrations
+
+# Django's icontains compiles to UPPER(col) LIKE UPPER(...), so the trigram
+# indexes are built on that expression. PostgreSQL only.
+POSTGRES_FORWARD_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS user_full_name_trgm_idx ON users_user USING gin (UPPER(full_name) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS user_email_trgm_idx ON users_user USING gin (UPPER(email) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS profile_condition_trgm_idx ON patient_profiles "
+    "USING gin (UPPER(medical_condition) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS profile_room_trgm_idx ON patient_profiles USING gin (UPPER(room_number) gin_trgm_ops)",
+]
+
+POSTGRES_REVERSE_SQL = [
+    "DROP INDEX IF EXISTS profile_room_trgm_idx",
+    "DROP INDEX IF EXISTS profile_condition_trgm_idx",
+    "DROP INDEX IF EXISTS user_email_trgm_idx",
+    "DROP INDEX IF EXISTS user_full_name_trgm_idx",
+]
+
+
+def create_postgres_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in POSTGRES_FORWARD_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_postgres_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in POSTGRES_REVERSE_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0018_form_entry_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_postgres_search_indexes, drop_postgres_search_indexes),
+    ]
@@ -0,0 +1,147 @@
+# Generated by Django 5.2.5 on 2026-10-19 15:57
+
+import re
+import unicodedata
+from datetime import date
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+BATCH_SIZE = 1000
+
+# The summary's trigram index replaces the per-column ones from 0019.
+POSTGRES_FORWARD_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS summary_search_trgm_idx ON patient_summaries USING gin (search_text gin_trgm_ops)",
+    "DROP INDEX IF EXISTS profile_room_trgm_idx",
+    "DROP INDEX IF EXISTS profile_condition_trgm_idx",
+    "DROP INDEX IF EXISTS user_email_trgm_idx",
+    "DROP INDEX IF EXISTS user_full_name_trgm_idx",
+]
+
+POSTGRES_REVERSE_SQL = [
+    "DROP INDEX IF EXISTS summary_search_trgm_idx",
+    "CREATE INDEX IF NOT EXISTS user_full_name_trgm_idx ON users_user USING gin (UPPER(full_name) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS user_email_trgm_idx ON users_user USING gin (UPPER(email) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS profile_condition_trgm_idx ON patient_profiles "
+    "USING gin (UPPER(medical_condition) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS profile_room_trgm_idx ON patient_profiles USING gin (UPPER(room_number) gin_trgm_ops)",
+]
+
+
+# Frozen copies of backend.users.patient_summary helpers as of this migration,
+# so later changes there cannot change what this migration writes.
+_TOKEN_RE = re.compile(r'[0-9a-z]+')
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKD', str(text or ''))
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower().strip()
+
+
+def search_tokens(*values):
+    tokens = []
+    for value in values:
+        tokens.extend(_TOKEN_RE.findall(normalize(value)))
+    return ' '.join(dict.fromkeys(tokens))
+
+
+def age_on(born, today):
+    if not born:
+        return None
+    return today.year - born.year - ((today.month, today.day) < (born.month, born.day))
+
+
+def age_band(age):
+    if age is None:
+        return 'unknown'
+    if age < 20:
+        return '0-19'
+    if age < 40:
+        return '20-39'
+    if age < 60:
+        return '40-59'
+    if age < 80:
+        return '60-79'
+    return '80+'
+
+
+def build_summaries(apps, schema_editor):
+    PatientProfile = apps.get_model('users', 'PatientProfile')
+    PatientSummary = apps.get_model('users', 'PatientSummary')
+    Archive = apps.get_model('operations', 'PatientAssessmentArchive')
+    today = date.today()
+    rows = PatientProfile.objects.annotate(
+        has_archive=Exists(Archive.objects.filter(user_id=OuterRef('user_id')))
+    ).order_by('id').values(
+        'id', 'user__full_name', 'user__email', 'user__date_of_birth', 'user__gender',
+        'medical_condition', 'room_number', 'assigned_doctor__full_name', 'has_archive',
+    )
+    batch = []
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        age = age_on(row['user__date_of_birth'], today)
+        batch.append(PatientSummary(
+            profile_id=row['id'],
+            age=age,
+            age_band=age_band(age),
+            gender=row['user__gender'] or '',
+            sort_name=normalize(row['user__full_name'])[:255],
+            search_text=search_tokens(
+                row['user__full_name'], row['user__email'], row['medical_condition'], row['room_number'],
+            ),
+            is_dummy='dummy' in (row['user__email'] or ''),
+            is_archived=row['has_archive'],
+            assigned_doctor_name=row['assigned_doctor__full_name'] or '',
+        ))
+        if len(batch) >= BATCH_SIZE:
+            PatientSummary.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        PatientSummary.objects.bulk_create(batch)
+
+
+def create_postgres_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in POSTGRES_FORWARD_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_postgres_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in POSTGRES_REVERSE_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0019_patient_directory_search'),
+        ('operations', '0038_archiveaccesslog_event_time'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PatientSummary',
+            fields=[
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='summary', serialize=False, to='users.patientprofile')),
+                ('age', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('age_band', models.CharField(choices=[('0-19', '0-19'), ('20-39', '20-39'), ('40-59', '40-59'), ('60-79', '60-79'), ('80+', '80+'), ('unknown', 'Unknown')], default='unknown', max_length=8)),
+                ('gender', models.CharField(blank=True, max_length=10)),
+                ('sort_name', models.CharField(blank=True, help_text='Normalized full name for ordering', max_length=255)),
+                ('search_text', models.TextField(blank=True, help_text='Normalized tokens of name, email, condition and room number')),
+                ('is_dummy', models.BooleanField(default=False)),
+                ('is_archived', models.BooleanField(default=False)),
+                ('assigned_doctor_name', models.CharField(blank=True, max_length=255)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'patient_summaries',
+                'indexes': [models.Index(fields=['is_archived', 'is_dummy', 'age'], name='summary_flags_age_idx'), models.Index(fields=['age_band'], name='summary_age_band_idx'), models.Index(fields=['sort_name'], name='summary_sort_name_idx')],
+            },
+        ),
+        migrations.RunPython(build_summaries, migrations.RunPython.noop),
+        migrations.RunPython(create_postgres_search_index, drop_postgres_search_index),
+    ]
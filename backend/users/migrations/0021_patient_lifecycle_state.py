@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-19 16:02
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def backfill_lifecycle_state(apps, schema_editor):
+    PatientProfile = apps.get_model('users', 'PatientProfile')
+    PatientSummary = apps.get_model('users', 'PatientSummary')
+    Archive = apps.get_model('operations', 'PatientAssessmentArchive')
+    archived = Exists(Archive.objects.filter(user_id=OuterRef('user_id'), is_archived=True))
+    PatientProfile.objects.filter(archived).update(lifecycle_state='archived')
+    PatientProfile.objects.filter(~archived, discharge_date__isnull=False).update(lifecycle_state='discharged')
+    # The summary flag now mirrors the lifecycle state (unarchived records no longer count).
+    PatientSummary.objects.update(is_archived=False)
+    PatientSummary.objects.filter(profile__lifecycle_state='archived').update(is_archived=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0020_patient_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='patientprofile',
+            name='lifecycle_state',
+            field=models.CharField(choices=[('active', 'Active'), ('discharged', 'Discharged'), ('archived', 'Archived')], default='active', help_text='Active patients appear on the nurse list; archived ones have an archived assessment.', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='patientprofile',
+            index=models.Index(condition=models.Q(('lifecycle_state', 'active')), fields=['id'], name='patient_active_idx'),
+        ),
+        migrations.RunPython(backfill_lifecycle_state, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,11 @@
+from datetime import datetime, time, timezone as dt_timezone
+
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
 from .managers import CustomUserManager
 
@@ -118,8 +122,44 @@ class NurseProfile(models.Model):
 
     def __str__(self):
         return f"Nurse {self.user.full_name}"
-    
-    #patient profile
+
+
+def _form_entries_property(field, doc=None):
+    """Expose a ClinicalFormEntry child table as a list attribute of PatientProfile."""
+    def getter(self):
+        return self._get_form_entries(field)
+
+    def setter(self, value):
+        self._set_form_entries(field, value)
+
+    return property(getter, setter, doc=doc)
+
+
+class _FormEntryState:
+    """Per-instance view of one list form: loaded rows plus unsaved changes."""
+    __slots__ = ("rows", "pending", "changed", "replaced")
+
+    def __init__(self):
+        self.rows = None        # persisted entries, loaded on first read
+        self.pending = []       # new entries, inserted on save
+        self.changed = {}       # index -> persisted entry edited in place
+        self.replaced = False   # rows hold a new, unsaved list replacing the stored one
+
+
+class _PendingIndex:
+    """List position of an unsaved entry; the stored row count is only looked up when formatted."""
+    def __init__(self, count, offset):
+        self.count = count
+        self.offset = offset
+
+    def __format__(self, spec):
+        return format(self.count() + self.offset, spec)
+
+    def __str__(self):
+        return format(self)
+
+
+#patient profile
 class PatientProfile(models.Model): #can be the content of medical history
     """Profile model for users with the 'patient' role."""
     user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="patient_profile")
@@ -166,6 +206,18 @@ class PatientProfile(models.Model): #can be the content of medical history
     room_number = models.CharField(max_length=20, blank=True, help_text="Hospital room number.")
     admission_type = models.CharField(max_length=50, blank=True, help_text="Type of admission (emergency, scheduled, etc.).")
 
+    class LifecycleState(models.TextChoices):
+        ACTIVE = "active", "Active"
+        DISCHARGED = "discharged", "Discharged"
+        ARCHIVED = "archived", "Archived"
+
+    # Maintained by save() from discharge_date and by backend.users.lifecycle
+    # from the archive endpoints; check_patient_lifecycle reports drift.
+    lifecycle_state = models.CharField(
+        max_length=10, choices=LifecycleState.choices, default=LifecycleState.ACTIVE,
+        help_text="Active patients appear on the nurse list; archived ones have an archived assessment.",
+    )
+
     # Nurse-centric forms storage (JSON fields)
     nursing_intake_assessment = models.JSONField(
         default=dict,
@@ -176,30 +228,29 @@ class PatientProfile(models.Model): #can be the content of medical history
         ),
     )
 
-    graphic_flow_sheets = models.JSONField(
-        default=list,
-        blank=True,
-        help_text=(
+    # List-valued forms live in append-only child tables (ClinicalFormEntry
+    # subclasses below); these properties expose them with the old list shape.
+    graphic_flow_sheets = _form_entries_property(
+        "graphic_flow_sheets",
+        doc=(
             "List of chronological entries with time_of_reading, repeated_vitals, intake_ml, output_ml, "
             "site_checks, and nursing_interventions."
         ),
     )
 
     # 3) Medication Administration Record (MAR)
-    medication_administration_records = models.JSONField(
-        default=list,
-        blank=True,
-        help_text=(
+    medication_administration_records = _form_entries_property(
+        "medication_administration_records",
+        doc=(
             "List of medication events: datetime_administered, name, dose, route, nurse_initials, "
             "optional prn_reason, prn_response, withheld_reason."
         ),
     )
 
     # 4) Patient Education Record
-    patient_education_record = models.JSONField(
-        default=list,
-        blank=True,
-        help_text=(
+    patient_education_record = _form_entries_property(
+        "patient_education_record",
+        doc=(
             "List of education interactions: topics, teaching_method, comprehension_level, "
             "return_demonstration, barriers_to_learning, recorded_at."
         ),
@@ -217,39 +268,35 @@ class PatientProfile(models.Model): #can be the content of medical history
     )
 
     # Doctor-centric forms (restricted to doctors only)
-    history_physical_forms = models.JSONField(
-        default=list,
-        blank=True,
-        help_text=(
+    history_physical_forms = _form_entries_property(
+        "history_physical_forms",
+        doc=(
             "List of H&P forms: patient_name, dob, mrn, provider_signature, provider_id, chief_complaint, "
             "history_present_illness, past_medical_history, social_history, review_of_systems, "
             "physical_exam, assessment, diagnoses_icd_codes, initial_plan, created_at."
         ),
     )
 
-    progress_notes = models.JSONField(
-        default=list,
-        blank=True,
-        help_text=(
+    progress_notes = _form_entries_property(
+        "progress_notes",
+        doc=(
             "List of SOAP progress notes: date_time_note, subjective, objective, vitals, "
             "lab_imaging_results, assessment, plan, follow_up_date, provider_signature, created_at."
         ),
     )
 
-    provider_order_sheets = models.JSONField(
-        default=list,
-        blank=True,
-        help_text=(
+    provider_order_sheets = _form_entries_property(
+        "provider_order_sheets",
+        doc=(
             "List of provider orders: ordering_provider, date_time_placed, order_type, "
             "medication_orders (drug_name, dose, route, frequency), diagnostic_orders (test_name, priority, reason), "
             "consultation_orders (specialty, question), general_orders, order_status, created_at."
         ),
     )
 
-    operative_procedure_reports = models.JSONField(
-        default=list,
-        blank=True,
-        help_text=(
+    operative_procedure_reports = _form_entries_property(
+        "operative_procedure_reports",
+        doc=(
             "List of operative/procedure reports: patient_id, date_time_performed, procedure_name, "
             "indications, consent_status, anesthesia_type, anesthesia_dose, procedure_steps, "
             "findings, complications, disposition_plan, surgeon_provider_signature, created_at."
@@ -260,10 +307,207 @@ class PatientProfile(models.Model): #can be the content of medical history
         db_table = "patient_profiles"
         verbose_name = "Patient Profile"
         verbose_name_plural = "Patient Profiles"
+        indexes = [
+            # Nurse list: WHERE lifecycle_state = 'active' ORDER BY id
+            models.Index(fields=["id"], condition=models.Q(lifecycle_state="active"), name="patient_active_idx"),
+        ]
 
     def __str__(self):
         return f"Patient {self.user.full_name}"
 
+    def save(self, *args, **kwargs):
+        """
+        Save the profile and write pending list-form changes.
+        List form names are accepted in ``update_fields``; only their new or
+        edited entries are written, never the whole list.
+
+        When discharge_date is written, lifecycle_state follows it (active or
+        discharged) unless the stored row is archived: the UPDATE decides
+        that in SQL, so a stale in-memory state never overwrites 'archived'
+        and never sets it (archiving belongs to backend.users.lifecycle).
+        """
+        states = self._form_states()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            form_fields = list(states)
+            sync_state = True
+        else:
+            update_fields = list(update_fields)
+            form_fields = [f for f in update_fields if f in FORM_ENTRY_MODELS]
+            kwargs["update_fields"] = [f for f in update_fields if f not in FORM_ENTRY_MODELS]
+            sync_state = "discharge_date" in update_fields and "lifecycle_state" not in update_fields
+            if sync_state:
+                kwargs["update_fields"].append("lifecycle_state")
+        if sync_state:
+            previous = self.lifecycle_state
+            state = self.LifecycleState.DISCHARGED if self.discharge_date else self.LifecycleState.ACTIVE
+            if self._state.adding:
+                self.lifecycle_state = state if previous != self.LifecycleState.ARCHIVED else previous
+            else:
+                archived = self.LifecycleState.ARCHIVED
+                self.lifecycle_state = models.Case(
+                    models.When(lifecycle_state=archived, then=models.Value(archived)), default=models.Value(state)
+                )
+        form_fields = [f for f in form_fields if f in states]
+        try:
+            if not form_fields:
+                return super().save(*args, **kwargs)
+
+            with transaction.atomic(using=kwargs.get("using")):
+                super().save(*args, **kwargs)
+                for field in form_fields:
+                    self._flush_form_entries(field, states[field])
+        finally:
+            if sync_state and not isinstance(self.lifecycle_state, str):
+                # Best guess without a re-read; refresh_from_db() for the stored state
+                self.lifecycle_state = previous if previous == self.LifecycleState.ARCHIVED else state
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self.__dict__.pop("_form_entry_states", None)
+
+    # ---- List form storage ----
+    def form_entries(self, field):
+        """Queryset of the stored entries of a list form (e.g. "progress_notes"), oldest first."""
+        return FORM_ENTRY_MODELS[field].objects.filter(patient_id=self.pk)
+
+    def set_form_entry(self, field, index, entry):
+        """
+        Replace the entry at ``index`` of a list form and return its row.
+        Raises IndexError when out of range.
+        """
+        state = self._form_state(field)
+        if index < 0:
+            raise IndexError(index)
+        if state.rows is None and not state.pending and self.pk is not None:
+            # Fetch only the row being edited, not the whole list.
+            row = next(iter(self.form_entries(field)[index:index + 1]), None)
+        else:
+            rows = self._load_form_rows(field, state)
+            if index < len(rows):
+                row = rows[index]
+            elif index - len(rows) < len(state.pending):
+                row = state.pending[index - len(rows)]
+                row.set_entry(entry)
+                return row
+            else:
+                row = None
+        if row is None:
+            raise IndexError(index)
+        row.set_entry(entry)
+        if not state.replaced:
+            state.changed[index] = row
+        return row
+
+    def set_form_entry_by_id(self, field, entry_id, entry):
+        """
+        Replace the stored entry of a list form whose row id is ``entry_id``
+        and return its row. Unlike positions, ids do not depend on the order
+        a list is read in. Raises KeyError when there is no such entry.
+        """
+        state = self._form_state(field)
+        if state.rows is None and not state.pending and self.pk is not None:
+            # Fetch only the row being edited; its position keys the pending change.
+            entries = self.form_entries(field)
+            row = entries.filter(pk=entry_id).first()
+            if row is None:
+                raise KeyError(entry_id)
+            index = entries.filter(pk__lt=entry_id).count()
+        else:
+            rows = self._load_form_rows(field, state)
+            index = next((i for i, row in enumerate(rows) if row.pk is not None and row.pk == entry_id), None)
+            if index is None:
+                raise KeyError(entry_id)
+            row = rows[index]
+        row.set_entry(entry)
+        if not state.replaced:
+            state.changed[index] = row
+        return row
+
+    def _form_states(self):
+        states = self.__dict__.get("_form_entry_states")
+        if states is None:
+            states = self.__dict__["_form_entry_states"] = {}
+        return states
+
+    def _form_state(self, field):
+        return self._form_states().setdefault(field, _FormEntryState())
+
+    def _load_form_rows(self, field, state):
+        if state.rows is None:
+            if self.pk is None:
+                state.rows = []
+            else:
+                # Goes through the related manager so prefetch_related() is honoured.
+                manager = getattr(self, FORM_ENTRY_MODELS[field].accessor_name())
+                state.rows = list(manager.all())
+        return state.rows
+
+    def _get_form_entries(self, field):
+        state = self._form_state(field)
+        rows = self._load_form_rows(field, state)
+        entries = [state.changed.get(idx, row).data for idx, row in enumerate(rows)]
+        entries.extend(row.data for row in state.pending)
+        return entries
+
+    def _set_form_entries(self, field, value):
+        model = FORM_ENTRY_MODELS[field]
+        state = self._form_state(field)
+        state.rows = [model.from_entry(self, entry) for entry in (value or [])]
+        state.pending = []
+        state.changed = {}
+        state.replaced = True
+
+    def _append_form_entry(self, field, entry):
+        row = FORM_ENTRY_MODELS[field].from_entry(self, entry)
+        self._form_state(field).pending.append(row)
+        return row
+
+    def _unsaved_form_entries(self, field):
+        """Yield ``(index, entry)`` for entries added or edited since the last save."""
+        state = self._form_states().get(field)
+        if state is None:
+            return
+        if state.replaced:
+            for idx, row in enumerate(state.rows + state.pending):
+                yield idx, row.data
+            return
+        for idx in sorted(state.changed):
+            yield idx, state.changed[idx].data
+        if state.pending:
+            stored = []
+
+            def count():
+                if not stored:
+                    stored.append(len(state.rows) if state.rows is not None else self.form_entries(field).count())
+                return stored[0]
+
+            for offset, row in enumerate(state.pending):
+                yield _PendingIndex(count, offset), row.data
+
+    def _flush_form_entries(self, field, state):
+        model = FORM_ENTRY_MODELS[field]
+        if state.replaced:
+            model.objects.filter(patient_id=self.pk).delete()
+            new_rows = state.rows + state.pending
+            rows_after = None
+        else:
+            for row in state.changed.values():
+                row.save(update_fields=["data", "recorded_at", "version"])
+            new_rows = state.pending
+            rows_after = None if state.rows is None else state.rows + state.pending
+        for row in new_rows:
+            row.patient_id = self.pk
+        if new_rows:
+            model.objects.bulk_create(new_rows)
+            if any(row.pk is None for row in new_rows):
+                rows_after = None
+        state.rows = rows_after
+        state.pending = []
+        state.changed = {}
+        state.replaced = False
+        getattr(self, "_prefetched_objects_cache", {}).pop(model.accessor_name(), None)
+
     # ---- Nurse-centric helpers ----
     def add_flow_sheet_entry(self, entry):
         """
@@ -278,9 +522,7 @@ class PatientProfile(models.Model): #can be the content of medical history
             "nursing_interventions": ["administered analgesic", "repositioned patient"]
         }
         """
-        entries = list(self.graphic_flow_sheets or [])
-        entries.append(entry)
-        self.graphic_flow_sheets = entries
+        return self._append_form_entry("graphic_flow_sheets", entry)
 
     def add_mar_entry(self, entry):
         """
@@ -297,9 +539,7 @@ class PatientProfile(models.Model): #can be the content of medical history
             "withheld_reason": null
         }
         """
-        entries = list(self.medication_administration_records or [])
-        entries.append(entry)
-        self.medication_administration_records = entries
+        return self._append_form_entry("medication_administration_records", entry)
 
     def add_education_entry(self, entry):
         """
@@ -314,9 +554,7 @@ class PatientProfile(models.Model): #can be the content of medical history
             "recorded_at": ISO8601 string
         }
         """
-        entries = list(self.patient_education_record or [])
-        entries.append(entry)
-        self.patient_education_record = entries
+        return self._append_form_entry("patient_education_record", entry)
 
     def set_nursing_intake(self, data):
         """
@@ -353,19 +591,21 @@ class PatientProfile(models.Model): #can be the content of medical history
             except Exception:
                 errors.append("nursing_intake_assessment.pain_score must be numeric")
 
+        # List forms are append-only, so only entries added or changed since
+        # the last save need checking.
         # Flow sheet entries: ensure time_of_reading present
-        for idx, e in enumerate(self.graphic_flow_sheets or []):
+        for idx, e in self._unsaved_form_entries("graphic_flow_sheets"):
             if "time_of_reading" not in e:
                 errors.append(f"graphic_flow_sheets[{idx}].time_of_reading is required")
 
         # MAR entries: ensure required keys
-        for idx, e in enumerate(self.medication_administration_records or []):
+        for idx, e in self._unsaved_form_entries("medication_administration_records"):
             for key in ("datetime_administered", "name", "dose", "route", "nurse_initials"):
                 if key not in e:
                     errors.append(f"medication_administration_records[{idx}].{key} is required")
 
         # Education entries: ensure topics and teaching_method
-        for idx, e in enumerate(self.patient_education_record or []):
+        for idx, e in self._unsaved_form_entries("patient_education_record"):
             if not e.get("topics"):
                 errors.append(f"patient_education_record[{idx}].topics is required")
             if not e.get("teaching_method"):
@@ -401,9 +641,7 @@ class PatientProfile(models.Model): #can be the content of medical history
             "created_at": ISO8601 string
         }
         """
-        entries = list(self.history_physical_forms or [])
-        entries.append(entry)
-        self.history_physical_forms = entries
+        return self._append_form_entry("history_physical_forms", entry)
 
     def add_progress_note(self, entry):
         """
@@ -422,9 +660,7 @@ class PatientProfile(models.Model): #can be the content of medical history
             "created_at": ISO8601 string
         }
         """
-        entries = list(self.progress_notes or [])
-        entries.append(entry)
-        self.progress_notes = entries
+        return self._append_form_entry("progress_notes", entry)
 
     def add_provider_order(self, entry):
         """
@@ -442,9 +678,7 @@ class PatientProfile(models.Model): #can be the content of medical history
             "created_at": ISO8601 string
         }
         """
-        entries = list(self.provider_order_sheets or [])
-        entries.append(entry)
-        self.provider_order_sheets = entries
+        return self._append_form_entry("provider_order_sheets", entry)
 
     def add_operative_report(self, entry):
         """
@@ -466,9 +700,7 @@ class PatientProfile(models.Model): #can be the content of medical history
             "created_at": ISO8601 string
         }
         """
-        entries = list(self.operative_procedure_reports or [])
-        entries.append(entry)
-        self.operative_procedure_reports = entries
+        return self._append_form_entry("operative_procedure_reports", entry)
 
     def validate_doctor_forms_minimal(self):
         """
@@ -477,26 +709,27 @@ class PatientProfile(models.Model): #can be the content of medical history
         """
         errors = []
 
+        # Only entries added or changed since the last save are checked.
         # H&P forms: ensure required header fields
-        for idx, e in enumerate(self.history_physical_forms or []):
+        for idx, e in self._unsaved_form_entries("history_physical_forms"):
             for key in ("patient_name", "dob", "mrn", "provider_signature", "chief_complaint"):
                 if not e.get(key):
                     errors.append(f"history_physical_forms[{idx}].{key} is required")
 
         # Progress notes: ensure SOAP structure
-        for idx, e in enumerate(self.progress_notes or []):
+        for idx, e in self._unsaved_form_entries("progress_notes"):
             for key in ("date_time", "subjective", "provider_signature"):
                 if not e.get(key):
                     errors.append(f"progress_notes[{idx}].{key} is required")
 
         # Provider orders: ensure ordering provider and date/time
-        for idx, e in enumerate(self.provider_order_sheets or []):
+        for idx, e in self._unsaved_form_entries("provider_order_sheets"):
             for key in ("ordering_provider", "date_time_placed"):
                 if not e.get(key):
                     errors.append(f"provider_order_sheets[{idx}].{key} is required")
 
         # Operative reports: ensure procedure details
-        for idx, e in enumerate(self.operative_procedure_reports or []):
+        for idx, e in self._unsaved_form_entries("operative_procedure_reports"):
             for key in ("procedure_name", "surgeon_signature", "date_time_performed"):
                 if not e.get(key):
                     errors.append(f"operative_procedure_reports[{idx}].{key} is required")
@@ -507,420 +740,191 @@ class PatientProfile(models.Model): #can be the content of medical history
         """
         Structured form context describing fields, types, and defaults for frontend forms.
         Includes demographics, medical/admin, and nurse-centric forms.
+        The static part is built once per process (see backend.users.form_schema);
+        only this patient's values are filled in here.
         """
-        def iso(dt):
-            try:
-                return dt.isoformat() if dt else None
-            except Exception:
-                return None
-
-        context = {
-            "model": "patient_profiles",
-            "version": "2",
-            "role": for_role,
-            "groups": [
-                "demographics",
-                "medical",
-                "administrative",
-                "nursing_admin",
-                "nursing_intake",
-                "flow_sheets",
-                "mar",
-                "education",
-                "discharge",
-                "history_physical",
-                "progress_notes",
-                "provider_orders",
-                "operative_reports",
-            ],
-            "demographics": {
-                "full_name": {"label": "Full Name", "type": "text", "readonly": True, "default": self.user.full_name},
-                "date_of_birth": {"label": "Date of Birth", "type": "date", "readonly": True, "default": iso(self.user.date_of_birth)},
-                "gender": {"label": "Gender", "type": "text", "readonly": True, "default": self.user.gender},
-                "hospital_address": {"label": "Hospital Address", "type": "textarea", "readonly": True, "default": self.user.hospital_address},
-            },
-            "medical": {
-                "blood_type": {"label": "Blood Type", "type": "select", "choices": list(self.BloodType.choices), "required": False, "default": self.blood_type},
-                "medical_condition": {"label": "Medical Condition", "type": "textarea", "required": False, "default": self.medical_condition},
-                "date_of_admission": {"label": "Date of Admission", "type": "date", "required": False, "default": iso(self.date_of_admission)},
-                "discharge_date": {"label": "Discharge Date", "type": "date", "required": False, "default": iso(self.discharge_date)},
-                "assigned_doctor": {"label": "Assigned Doctor", "type": "relation", "required": False, "default": getattr(self.assigned_doctor, "id", None), "relation": {"model": "users.User", "filter": {"role": "doctor"}}},
-                "medication": {"label": "Current Medications", "type": "textarea", "required": False, "default": self.medication},
-                "test_results": {"label": "Test Results", "type": "textarea", "required": False, "default": self.test_results},
-            },
-            "administrative": {
-                "hospital": {"label": "Hospital", "type": "text", "required": False, "default": self.hospital or self.user.hospital_name},
-                "insurance_provider": {"label": "Insurance Provider", "type": "text", "required": False, "default": self.insurance_provider},
-                "billing_amount": {"label": "Billing Amount", "type": "decimal", "required": False, "default": float(self.billing_amount) if self.billing_amount is not None else None, "attrs": {"max_digits": 10, "decimal_places": 2}},
-                "room_number": {"label": "Room Number", "type": "text", "required": False, "default": self.room_number, "attrs": {"max_length": 20}},
-                "admission_type": {"label": "Admission Type", "type": "text", "required": False, "default": self.admission_type, "attrs": {"max_length": 50}},
-            },
-            # Nurse-centric grouping of core medical/admin fields
-            "nursing_admin": {
-                "blood_type": {"label": "Blood Type", "type": "select", "choices": list(self.BloodType.choices), "required": False, "default": self.blood_type},
-                "medical_condition": {"label": "Medical Condition", "type": "textarea", "required": False, "default": self.medical_condition},
-                "date_of_admission": {"label": "Date of Admission", "type": "date", "required": False, "default": iso(self.date_of_admission)},
-                "discharge_date": {"label": "Discharge Date", "type": "date", "required": False, "default": iso(self.discharge_date)},
-                "assigned_doctor": {"label": "Assigned Doctor", "type": "relation", "required": False, "default": getattr(self.assigned_doctor, "id", None), "relation": {"model": "users.User", "filter": {"role": "doctor"}}},
-                "medication": {"label": "Current Medications", "type": "textarea", "required": False, "default": self.medication},
-                "test_results": {"label": "Test Results", "type": "textarea", "required": False, "default": self.test_results},
-                "hospital": {"label": "Hospital", "type": "text", "required": False, "default": self.hospital or self.user.hospital_name},
-                "insurance_provider": {"label": "Insurance Provider", "type": "text", "required": False, "default": self.insurance_provider},
-                "billing_amount": {"label": "Billing Amount", "type": "decimal", "required": False, "default": float(self.billing_amount) if self.billing_amount is not None else None, "attrs": {"max_digits": 10, "decimal_places": 2}},
-                "room_number": {"label": "Room Number", "type": "text", "required": False, "default": self.room_number, "attrs": {"max_length": 20}},
-                "admission_type": {"label": "Admission Type", "type": "text", "required": False, "default": self.admission_type, "attrs": {"max_length": 50}},
-            },
-            "nursing_intake": {
-                "schema": {
-                    "vitals": {"bp": "", "hr": None, "rr": None, "temp_c": None, "o2_sat": None},
-                    "weight_kg": None,
-                    "height_cm": None,
-                    "chief_complaint": "",
-                    "pain_score": None,
-                    "allergies": [],  # [{substance, reaction}]
-                    "current_medications": [],
-                    "mental_status": "",
-                    "fall_risk_score": None,
-                    "assessed_at": None,
-                },
-                "default": self.nursing_intake_assessment or {},
-            },
-            "flow_sheets": {
-                "schema": {
-                    "time_of_reading": None,
-                    "repeated_vitals": {"bp": "", "hr": None, "rr": None, "temp_c": None, "o2_sat": None, "pain": None},
-                    "intake_ml": None,
-                    "output_ml": None,
-                    "site_checks": "",
-                    "nursing_interventions": [],
-                },
-                "default": list(self.graphic_flow_sheets or []),
-            },
-            "mar": {
-                "schema": {
-                    "datetime_administered": None,
-                    "name": "",
-                    "dose": "",
-                    "route": "",
-                    "nurse_initials": "",
-                    "prn_reason": None,
-                    "prn_response": None,
-                    "withheld_reason": None,
-                },
-                "default": list(self.medication_administration_records or []),
-            },
-            "education": {
-                "schema": {
-                    "topics": [],
-                    "teaching_method": "",
-                    "comprehension_level": "",
-                    "return_demonstration": "",
-                    "barriers_to_learning": [],
-                    "recorded_at": None,
-                },
-                "default": list(self.patient_education_record or []),
-            },
-            "discharge": {
-                "schema": {
-                    "discharge_vitals": {"bp": "", "hr": None, "rr": None, "temp_c": None, "o2_sat": None, "pain": None},
-                    "understanding_confirmed": False,
-                    "written_instructions_provided": False,
-                    "follow_up_appointments_made": False,
-                    "equipment_needs": [],
-                    "transportation_status": "",
-                    "nurse_signature": "",
-                    "patient_acknowledgment": False,
-                    "discharged_at": None,
-                },
-                "default": {},
-            },
-            # Doctor-centric forms
-            "history_physical": {
-                "schema": {
-                    "patient_name": "",
-                    "dob": None,
-                    "mrn": "",
-                    "provider_signature": "",
-                    "provider_id": "",
-                    "chief_complaint": "",
-                    "history_present_illness": "",
-                    "past_medical_history": "",
-                    "social_history": "",
-                    "review_of_systems": [],
-                    "physical_exam": "",
-                    "assessment": "",
-                    "diagnoses_icd_codes": [],
-                    "initial_plan": "",
-                    "created_at": None,
-                },
-                "default": [],
-            },
-            "progress_notes": {
-                "schema": {
-                    "date_time_note": None,
-                    "subjective": "",
-                    "objective": "",
-                    "vitals": {"bp": "", "hr": None, "rr": None, "temp_c": None, "o2_sat": None},
-                    "lab_imaging_results": "",
-                    "assessment": "",
-                    "plan": "",
-                    "follow_up_date": None,
-                    "provider_signature": "",
-                    "created_at": None,
-                },
-                "default": [],
-            },
-            "provider_orders": {
-                "schema": {
-                    "ordering_provider": "",
-                    "date_time_placed": None,
-                    "order_type": "",
-                    "medication_orders": {
-                        "drug_name": "",
-                        "dose": "",
-                        "route": "",
-                        "frequency": "",
-                    },
-                    "diagnostic_orders": {
-                        "test_name": "",
-                        "priority": "",
-                        "reason": "",
-                    },
-                    "consultation_orders": {
-                        "specialty": "",
-                        "question": "",
-                    },
-                    "general_orders": "",
-                    "order_status": "",
-                    "created_at": None,
-                },
-                "default": [],
-            },
-            "operative_reports": {
-                "schema": {
-                    "patient_id": "",
-                    "date_time_performed": None,
-                    "procedure_name": "",
-                    "indications": "",
-                    "consent_status": "",
-                    "anesthesia_type": "",
-                    "anesthesia_dose": "",
-                    "procedure_steps": "",
-                    "findings": "",
-                    "complications": "",
-                    "disposition_plan": "",
-                    "surgeon_provider_signature": "",
-                    "created_at": None,
-                },
-                "default": [],
-            },
-        }
-        return context
+        from .form_schema import merge_form_context, profile_form_values
+
+        return merge_form_context(profile_form_values(self), for_role)
 
     @classmethod
     def get_blank_form_fields_context(cls, for_role=None):
         """
         Blank/creation context with model defaults only.
         """
-        context = {
-            "model": "patient_profiles",
-            "version": "2",
-            "role": for_role,
-            "groups": [
-                "demographics",
-                "medical",
-                "administrative",
-                "nursing_admin",
-                "nursing_intake",
-                "flow_sheets",
-                "mar",
-                "education",
-                "discharge",
-                "history_physical",
-                "progress_notes",
-                "provider_orders",
-                "operative_reports",
-            ],
-            "demographics": {
-                "full_name": {"label": "Full Name", "type": "text", "readonly": True, "default": ""},
-                "date_of_birth": {"label": "Date of Birth", "type": "date", "readonly": True, "default": None},
-                "gender": {"label": "Gender", "type": "text", "readonly": True, "default": None},
-                "hospital_address": {"label": "Hospital Address", "type": "textarea", "readonly": True, "default": ""},
-            },
-            "medical": {
-                "blood_type": {"label": "Blood Type", "type": "select", "choices": list(cls.BloodType.choices), "required": False, "default": cls.BloodType.UNKNOWN},
-                "medical_condition": {"label": "Medical Condition", "type": "textarea", "required": False, "default": ""},
-                "date_of_admission": {"label": "Date of Admission", "type": "date", "required": False, "default": None},
-                "discharge_date": {"label": "Discharge Date", "type": "date", "required": False, "default": None},
-                "assigned_doctor": {"label": "Assigned Doctor", "type": "relation", "required": False, "default": None, "relation": {"model": "users.User", "filter": {"role": "doctor"}}},
-                "medication": {"label": "Current Medications", "type": "textarea", "required": False, "default": ""},
-                "test_results": {"label": "Test Results", "type": "textarea", "required": False, "default": ""},
-            },
-            "administrative": {
-                "hospital": {"label": "Hospital", "type": "text", "required": False, "default": ""},
-                "insurance_provider": {"label": "Insurance Provider", "type": "text", "required": False, "default": ""},
-                "billing_amount": {"label": "Billing Amount", "type": "decimal", "required": False, "default": None, "attrs": {"max_digits": 10, "decimal_places": 2}},
-                "room_number": {"label": "Room Number", "type": "text", "required": False, "default": "", "attrs": {"max_length": 20}},
-                "admission_type": {"label": "Admission Type", "type": "text", "required": False, "default": "", "attrs": {"max_length": 50}},
-            },
-            # Nurse-centric grouping of core medical/admin fields
-            "nursing_admin": {
-                "blood_type": {"label": "Blood Type", "type": "select", "choices": list(cls.BloodType.choices), "required": False, "default": cls.BloodType.UNKNOWN},
-                "medical_condition": {"label": "Medical Condition", "type": "textarea", "required": False, "default": ""},
-                "date_of_admission": {"label": "Date of Admission", "type": "date", "required": False, "default": None},
-                "discharge_date": {"label": "Discharge Date", "type": "date", "required": False, "default": None},
-                "assigned_doctor": {"label": "Assigned Doctor", "type": "relation", "required": False, "default": None, "relation": {"model": "users.User", "filter": {"role": "doctor"}}},
-                "medication": {"label": "Current Medications", "type": "textarea", "required": False, "default": ""},
-                "test_results": {"label": "Test Results", "type": "textarea", "required": False, "default": ""},
-                "hospital": {"label": "Hospital", "type": "text", "required": False, "default": ""},
-                "insurance_provider": {"label": "Insurance Provider", "type": "text", "required": False, "default": ""},
-                "billing_amount": {"label": "Billing Amount", "type": "decimal", "required": False, "default": None, "attrs": {"max_digits": 10, "decimal_places": 2}},
-                "room_number": {"label": "Room Number", "type": "text", "required": False, "default": "", "attrs": {"max_length": 20}},
-                "admission_type": {"label": "Admission Type", "type": "text", "required": False, "default": "", "attrs": {"max_length": 50}},
-            },
-            "nursing_intake": {
-                "schema": {
-                    "vitals": {"bp": "", "hr": None, "rr": None, "temp_c": None, "o2_sat": None},
-                    "weight_kg": None,
-                    "height_cm": None,
-                    "chief_complaint": "",
-                    "pain_score": None,
-                    "allergies": [],
-                    "current_medications": [],
-                    "mental_status": "",
-                    "fall_risk_score": None,
-                    "assessed_at": None,
-                },
-                "default": {},
-            },
-            "flow_sheets": {
-                "schema": {
-                    "time_of_reading": None,
-                    "repeated_vitals": {"bp": "", "hr": None, "rr": None, "temp_c": None, "o2_sat": None, "pain": None},
-                    "intake_ml": None,
-                    "output_ml": None,
-                    "site_checks": "",
-                    "nursing_interventions": [],
-                },
-                "default": [],
-            },
-            "mar": {
-                "schema": {
-                    "datetime_administered": None,
-                    "name": "",
-                    "dose": "",
-                    "route": "",
-                    "nurse_initials": "",
-                    "prn_reason": None,
-                    "prn_response": None,
-                    "withheld_reason": None,
-                },
-                "default": [],
-            },
-            "education": {
-                "schema": {
-                    "topics": [],
-                    "teaching_method": "",
-                    "comprehension_level": "",
-                    "return_demonstration": "",
-                    "barriers_to_learning": [],
-                    "recorded_at": None,
-                },
-                "default": [],
-            },
-            "discharge": {
-                "schema": {
-                    "discharge_vitals": {"bp": "", "hr": None, "rr": None, "temp_c": None, "o2_sat": None, "pain": None},
-                    "understanding_confirmed": False,
-                    "written_instructions_provided": False,
-                    "follow_up_appointments_made": False,
-                    "equipment_needs": [],
-                    "transportation_status": "",
-                    "nurse_signature": "",
-                    "patient_acknowledgment": False,
-                    "discharged_at": None,
-                },
-                "default": {},
-            },
-            # Doctor-centric forms
-            "history_physical": {
-                "schema": {
-                    "patient_name": "",
-                    "dob": None,
-                    "mrn": "",
-                    "provider_signature": "",
-                    "provider_id": "",
-                    "chief_complaint": "",
-                    "history_present_illness": "",
-                    "past_medical_history": "",
-                    "social_history": "",
-                    "review_of_systems": [],
-                    "physical_exam": "",
-                    "assessment": "",
-                    "diagnoses_icd_codes": [],
-                    "initial_plan": "",
-                    "created_at": None,
-                },
-                "default": [],
-            },
-            "progress_notes": {
-                "schema": {
-                    "date_time_note": None,
-                    "subjective": "",
-                    "objective": "",
-                    "vitals": {"bp": "", "hr": None, "rr": None, "temp_c": None, "o2_sat": None},
-                    "lab_imaging_results": "",
-                    "assessment": "",
-                    "plan": "",
-                    "follow_up_date": None,
-                    "provider_signature": "",
-                    "created_at": None,
-                },
-                "default": [],
-            },
-            "provider_orders": {
-                "schema": {
-                    "ordering_provider": "",
-                    "date_time_placed": None,
-                    "order_type": "",
-                    "medication_orders": {
-                        "drug_name": "",
-                        "dose": "",
-                        "route": "",
-                        "frequency": "",
-                    },
-                    "diagnostic_orders": {
-                        "test_name": "",
-                        "priority": "",
-                        "reason": "",
-                    },
-                    "consultation_orders": {
-                        "specialty": "",
-                        "question": "",
-                    },
-                    "general_orders": "",
-                    "order_status": "",
-                    "created_at": None,
-                },
-                "default": [],
-            },
-            "operative_reports": {
-                "schema": {
-                    "patient_id": "",
-                    "date_time_performed": None,
-                    "procedure_name": "",
-                    "indications": "",
-                    "consent_status": "",
-                    "anesthesia_type": "",
-                    "anesthesia_dose": "",
-                    "procedure_steps": "",
-                    "findings": "",
-                    "complications": "",
-                    "disposition_plan": "",
-                    "surgeon_provider_signature": "",
-                    "created_at": None,
-                },
-                "default": [],
-            },
-        }
-        return context
+        from .form_schema import blank_form_values, merge_form_context
+
+        return merge_form_context(blank_form_values(), for_role)
+
+
+def entry_recorded_at(entry, keys):
+    """
+    Timestamp of a form entry taken from the first parseable of ``keys``,
+    falling back to now. Naive values are treated as UTC, matching the
+    ``datetime.utcnow().isoformat()`` defaults the form views fill in.
+    """
+    for key in keys:
+        value = entry.get(key)
+        moment = None
+        if isinstance(value, datetime):
+            moment = value
+        elif isinstance(value, str) and value:
+            try:
+                moment = parse_datetime(value)
+                if moment is None:
+                    day = parse_date(value)
+                    moment = datetime.combine(day, time.min) if day else None
+            except ValueError:
+                moment = None
+        if moment is not None:
+            if timezone.is_naive(moment):
+                moment = timezone.make_aware(moment, dt_timezone.utc)
+            return moment
+    return timezone.now()
+
+
+class ClinicalFormEntry(models.Model):
+    """
+    One entry of a list-valued PatientProfile form, stored as its own row so
+    that adding an entry is a single insert. The entry payload is kept as-is
+    in ``data``; ``recorded_at`` is derived from the entry's own timestamp for
+    time-range queries.
+    """
+    # Entry keys tried, in order, for recorded_at.
+    TIMESTAMP_KEYS = ("created_at",)
+
+    patient = models.ForeignKey(PatientProfile, on_delete=models.CASCADE)
+    recorded_at = models.DateTimeField(default=timezone.now)
+    data = models.JSONField(default=dict, blank=True)
+    # Bumped on every in-place edit; exposed to clients as the entry ETag.
+    version = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        abstract = True
+        ordering = ["id"]
+        indexes = [models.Index(fields=["patient", "recorded_at"], name="%(class)s_recorded")]
+
+    @classmethod
+    def accessor_name(cls):
+        return f"{cls._meta.model_name}_set"
+
+    @classmethod
+    def from_entry(cls, profile, entry):
+        row = cls(patient_id=profile.pk)
+        row.set_entry(entry)
+        return row
+
+    @property
+    def etag(self):
+        return f'"{self._meta.model_name}-{self.pk}-{self.version}"'
+
+    def set_entry(self, entry):
+        if self.pk is not None:
+            self.version += 1
+        self.data = dict(entry or {})
+        self.recorded_at = entry_recorded_at(self.data, self.TIMESTAMP_KEYS)
+
+
+class FlowSheetEntry(ClinicalFormEntry):
+    TIMESTAMP_KEYS = ("time_of_reading",)
+
+    class Meta(ClinicalFormEntry.Meta):
+        db_table = "patient_flow_sheet_entries"
+
+
+class MAREntry(ClinicalFormEntry):
+    TIMESTAMP_KEYS = ("datetime_administered",)
+
+    class Meta(ClinicalFormEntry.Meta):
+        db_table = "patient_mar_entries"
+
+
+class EducationEntry(ClinicalFormEntry):
+    TIMESTAMP_KEYS = ("recorded_at",)
+
+    class Meta(ClinicalFormEntry.Meta):
+        db_table = "patient_education_entries"
+
+
+class HPFormEntry(ClinicalFormEntry):
+    TIMESTAMP_KEYS = ("created_at",)
+
+    class Meta(ClinicalFormEntry.Meta):
+        db_table = "patient_hp_form_entries"
+
+
+class ProgressNoteEntry(ClinicalFormEntry):
+    TIMESTAMP_KEYS = ("date_time", "date_time_note", "created_at")
+
+    class Meta(ClinicalFormEntry.Meta):
+        db_table = "patient_progress_note_entries"
+
+
+class ProviderOrderEntry(ClinicalFormEntry):
+    TIMESTAMP_KEYS = ("date_time_placed", "created_at")
+
+    class Meta(ClinicalFormEntry.Meta):
+        db_table = "patient_provider_order_entries"
+
+
+class OperativeReportEntry(ClinicalFormEntry):
+    TIMESTAMP_KEYS = ("date_time_performed", "created_at")
+
+    class Meta(ClinicalFormEntry.Meta):
+        db_table = "patient_operative_report_entries"
+
+
+# PatientProfile list attribute -> child table holding its entries.
+FORM_ENTRY_MODELS = {
+    "graphic_flow_sheets": FlowSheetEntry,
+    "medication_administration_records": MAREntry,
+    "patient_education_record": EducationEntry,
+    "history_physical_forms": HPFormEntry,
+    "progress_notes": ProgressNoteEntry,
+    "provider_order_sheets": ProviderOrderEntry,
+    "operative_procedure_reports": OperativeReportEntry,
+}
+
+
+class PatientSummary(models.Model):
+    """
+    Denormalized, indexed search/summary row per patient profile.
+
+    Maintained by signal handlers on write (see backend.users.signals) and
+    rebuilt nightly so ``age``/``age_band`` follow birthdays. Read by the
+    patient directory and demographic analytics so they can filter and sort
+    in SQL instead of deriving values per row in Python.
+    """
+
+    class AgeBand(models.TextChoices):
+        UNDER_20 = "0-19", "0-19"
+        AGE_20_39 = "20-39", "20-39"
+        AGE_40_59 = "40-59", "40-59"
+        AGE_60_79 = "60-79", "60-79"
+        AGE_80_PLUS = "80+", "80+"
+        UNKNOWN = "unknown", "Unknown"
+
+    profile = models.OneToOneField(PatientProfile, on_delete=models.CASCADE, primary_key=True, related_name="summary")
+    age = models.PositiveSmallIntegerField(null=True, blank=True)
+    age_band = models.CharField(max_length=8, choices=AgeBand.choices, default=AgeBand.UNKNOWN)
+    gender = models.CharField(max_length=10, blank=True)
+    sort_name = models.CharField(max_length=255, blank=True, help_text="Normalized full name for ordering")
+    search_text = models.TextField(
+        blank=True, help_text="Normalized tokens of name, email, condition and room number"
+    )
+    is_dummy = models.BooleanField(default=False)
+    is_archived = models.BooleanField(default=False)
+    assigned_doctor_name = models.CharField(max_length=255, blank=True)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "patient_summaries"
+        indexes = [
+            models.Index(fields=["is_archived", "is_dummy", "age"], name="summary_flags_age_idx"),
+            models.Index(fields=["age_band"], name="summary_age_band_idx"),
+            models.Index(fields=["sort_name"], name="summary_sort_name_idx"),
+        ]
+
+    def __str__(self):
+        return f"Summary for patient profile {self.profile_id}"
@@ -0,0 +1,161 @@
+"""
+Patient directory used by ``get_doctor_patients`` and ``get_nurse_patients``.
+
+Rows are read with a single ``.values()`` projection joined to
+PatientSummary, which carries the precomputed age, dummy flag,
+assigned doctor name and normalized search tokens, so nothing is derived
+per row in Python and filtering/sorting by age happens in SQL. ``search``
+matches every token against the summary's trigram-indexed ``search_text``
+(name, email, condition, room). Pages are keyset-paginated on the chosen
+``order`` (``id``, ``name``, ``age`` or ``-age``); counts for the whole
+result come from one aggregate query on the first page.
+"""
+import base64
+import json
+
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Coalesce
+
+from .models import PatientProfile
+from .patient_summary import search_tokens
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+DIRECTORY_FIELDS = (
+    'id', 'user_id', 'user__full_name', 'user__email', 'user__gender',
+    'blood_type', 'medical_condition', 'hospital', 'insurance_provider', 'billing_amount',
+    'room_number', 'admission_type', 'date_of_admission', 'discharge_date', 'medication',
+    'test_results', 'summary__age', 'summary__is_dummy', 'summary__assigned_doctor_name',
+)
+
+DUMMY_Q = Q(summary__is_dummy=True)
+
+# order -> (sort key expression, descending)
+ORDERINGS = {
+    'id': (F('id'), False),
+    'name': (Coalesce(F('summary__sort_name'), Value('')), False),
+    'age': (Coalesce(F('summary__age'), Value(-1)), False),
+    '-age': (Coalesce(F('summary__age'), Value(-1)), True),
+}
+
+
+class InvalidDirectoryQuery(ValueError):
+    pass
+
+
+def encode_cursor(sort_value, profile_id) -> str:
+    return base64.urlsafe_b64encode(json.dumps([sort_value, profile_id]).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str):
+    try:
+        sort_value, profile_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if not isinstance(sort_value, (int, str)):
+            raise ValueError
+        return sort_value, int(profile_id)
+    except Exception:
+        raise InvalidDirectoryQuery('Invalid cursor')
+
+
+def _row_to_patient(row) -> dict:
+    return {
+        'id': row['id'],
+        'user_id': row['user_id'],
+        'full_name': row['user__full_name'],
+        'email': row['user__email'],
+        'age': row['summary__age'],
+        'gender': row['user__gender'],
+        'blood_type': row['blood_type'],
+        'medical_condition': row['medical_condition'],
+        'hospital': row['hospital'],
+        'insurance_provider': row['insurance_provider'],
+        'billing_amount': float(row['billing_amount']) if row['billing_amount'] else None,
+        'room_number': row['room_number'],
+        'admission_type': row['admission_type'],
+        'date_of_admission': row['date_of_admission'],
+        'discharge_date': row['discharge_date'],
+        'medication': row['medication'],
+        'test_results': row['test_results'],
+        'is_dummy': bool(row['summary__is_dummy']),
+        'assigned_doctor': row['summary__assigned_doctor_name'] or None,
+    }
+
+
+def _int_param(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise InvalidDirectoryQuery(f'{name} must be an integer')
+
+
+def directory_queryset(params, active_only=False):
+    qs = PatientProfile.objects.all()
+    if active_only:
+        # Only active patients: discharged and archived ones are left off (patient_active_idx).
+        qs = qs.filter(lifecycle_state=PatientProfile.LifecycleState.ACTIVE)
+
+    for token in search_tokens(params.get('search')).split():
+        qs = qs.filter(summary__search_text__contains=token)
+
+    dummy = (params.get('dummy') or '').lower()
+    if dummy in ('0', 'false'):
+        qs = qs.filter(summary__is_dummy=False)
+    elif dummy in ('1', 'true'):
+        qs = qs.filter(DUMMY_Q)
+
+    min_age = _int_param(params, 'min_age')
+    max_age = _int_param(params, 'max_age')
+    if min_age is not None:
+        qs = qs.filter(summary__age__gte=min_age)
+    if max_age is not None:
+        qs = qs.filter(summary__age__lte=max_age)
+    if params.get('age_band'):
+        qs = qs.filter(summary__age_band=params['age_band'])
+    return qs
+
+
+def list_patients(params, active_only=False) -> dict:
+    """
+    Return one directory page:
+    ``{'patients', 'next_cursor', 'total_count', 'dummy_count', 'real_count'}``.
+    Counts are only computed on the first page (no ``cursor``).
+    """
+    try:
+        limit = int(params.get('limit') or DEFAULT_PAGE_SIZE)
+    except (TypeError, ValueError):
+        limit = DEFAULT_PAGE_SIZE
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    cursor = params.get('cursor')
+
+    qs = directory_queryset(params, active_only=active_only)
+    payload = {}
+    if not cursor:
+        counts = qs.order_by().aggregate(total=Count('id'), dummy=Count('id', filter=DUMMY_Q))
+        payload = {
+            'total_count': counts['total'],
+            'dummy_count': counts['dummy'],
+            'real_count': counts['total'] - counts['dummy'],
+        }
+
+    order = params.get('order') or 'id'
+    if order not in ORDERINGS:
+        raise InvalidDirectoryQuery(f"order must be one of {', '.join(ORDERINGS)}")
+    sort_key, descending = ORDERINGS[order]
+    page_qs = qs.annotate(_sort=sort_key)
+    page_qs = page_qs.order_by('-_sort', '-id') if descending else page_qs.order_by('_sort', 'id')
+    if cursor:
+        sort_value, profile_id = decode_cursor(cursor)
+        if descending:
+            page_qs = page_qs.filter(Q(_sort__lt=sort_value) | Q(_sort=sort_value, id__lt=profile_id))
+        else:
+            page_qs = page_qs.filter(Q(_sort__gt=sort_value) | Q(_sort=sort_value, id__gt=profile_id))
+    rows = list(page_qs.values(*DIRECTORY_FIELDS, '_sort')[:limit + 1])
+    page = rows[:limit]
+
+    payload['patients'] = [_row_to_patient(row) for row in page]
+    payload['next_cursor'] = encode_cursor(page[-1]['_sort'], page[-1]['id']) if len(rows) > limit else None
+    return payload
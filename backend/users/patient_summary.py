@@ -0,0 +1,134 @@
+"""
+Maintenance of PatientSummary rows.
+
+``refresh_patient_summaries`` recomputes the rows for a set of profiles and is
+called from signal handlers whenever a patient, their profile or their
+assigned doctor change, and after lifecycle changes (backend.users.lifecycle). ``rebuild_patient_summaries``
+recomputes every row in batches; it runs nightly so ages follow birthdays.
+"""
+import re
+import unicodedata
+from datetime import date
+
+from django.db.models import Count
+
+from .models import PatientProfile, PatientSummary
+
+DEFAULT_BATCH_SIZE = 1000
+
+SUMMARY_SOURCE_FIELDS = (
+    'id', 'user__full_name', 'user__email', 'user__date_of_birth', 'user__gender',
+    'medical_condition', 'room_number', 'assigned_doctor__full_name', 'lifecycle_state',
+)
+SUMMARY_UPDATE_FIELDS = (
+    'age', 'age_band', 'gender', 'sort_name', 'search_text', 'is_dummy', 'is_archived',
+    'assigned_doctor_name', 'refreshed_at',
+)
+
+_TOKEN_RE = re.compile(r'[0-9a-z]+')
+
+
+def normalize(text) -> str:
+    """Lower-case, accent-free text used for sorting and search."""
+    text = unicodedata.normalize('NFKD', str(text or ''))
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower().strip()
+
+
+def search_tokens(*values) -> str:
+    tokens = []
+    for value in values:
+        tokens.extend(_TOKEN_RE.findall(normalize(value)))
+    return ' '.join(dict.fromkeys(tokens))
+
+
+def age_on(born, today=None):
+    if not born:
+        return None
+    today = today or date.today()
+    return today.year - born.year - ((today.month, today.day) < (born.month, born.day))
+
+
+def age_band(age) -> str:
+    if age is None:
+        return PatientSummary.AgeBand.UNKNOWN
+    if age < 20:
+        return PatientSummary.AgeBand.UNDER_20
+    if age < 40:
+        return PatientSummary.AgeBand.AGE_20_39
+    if age < 60:
+        return PatientSummary.AgeBand.AGE_40_59
+    if age < 80:
+        return PatientSummary.AgeBand.AGE_60_79
+    return PatientSummary.AgeBand.AGE_80_PLUS
+
+
+def _build(row, today) -> PatientSummary:
+    age = age_on(row['user__date_of_birth'], today)
+    return PatientSummary(
+        profile_id=row['id'],
+        age=age,
+        age_band=age_band(age),
+        gender=row['user__gender'] or '',
+        sort_name=normalize(row['user__full_name'])[:255],
+        search_text=search_tokens(
+            row['user__full_name'], row['user__email'], row['medical_condition'], row['room_number'],
+        ),
+        # Dummy analytics patients are recognised by their email.
+        is_dummy='dummy' in (row['user__email'] or ''),
+        is_archived=row['lifecycle_state'] == PatientProfile.LifecycleState.ARCHIVED,
+        assigned_doctor_name=row['assigned_doctor__full_name'] or '',
+    )
+
+
+def _upsert(profiles, today):
+    rows = profiles.values(*SUMMARY_SOURCE_FIELDS)
+    summaries = [_build(row, today) for row in rows]
+    if summaries:
+        PatientSummary.objects.bulk_create(
+            summaries,
+            update_conflicts=True,
+            unique_fields=['profile'],
+            update_fields=list(SUMMARY_UPDATE_FIELDS),
+        )
+    return len(summaries)
+
+
+def refresh_patient_summaries(profile_ids) -> int:
+    """Recompute the summaries of the given PatientProfile ids."""
+    profile_ids = [pk for pk in set(profile_ids) if pk is not None]
+    if not profile_ids:
+        return 0
+    return _upsert(PatientProfile.objects.filter(id__in=profile_ids), date.today())
+
+
+def rebuild_patient_summaries(batch_size=DEFAULT_BATCH_SIZE) -> int:
+    """Recompute every summary, keyset-batched on the profile id."""
+    today = date.today()
+    written = 0
+    last_id = 0
+    while True:
+        ids = list(
+            PatientProfile.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        written += _upsert(PatientProfile.objects.filter(id__in=ids), today)
+        last_id = ids[-1]
+    return written
+
+
+def patient_demographics_summary(include_dummy=False) -> dict:
+    """Age band and gender breakdown of patients, aggregated in SQL."""
+    qs = PatientSummary.objects.all()
+    if not include_dummy:
+        qs = qs.filter(is_dummy=False)
+    bands = dict(qs.order_by().values_list('age_band').annotate(n=Count('profile')))
+    genders = dict(qs.order_by().values_list('gender').annotate(n=Count('profile')))
+    total = sum(bands.values())
+    return {
+        'total_patients': total,
+        'age_distribution': {band: bands.get(band, 0) for band in PatientSummary.AgeBand.values},
+        'gender_proportions': {
+            (gender or 'Unknown'): round(count * 100.0 / total, 2) for gender, count in genders.items()
+        } if total else {},
+    }
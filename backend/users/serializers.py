@@ -18,6 +18,15 @@ class NurseProfileSerializer(serializers.ModelSerializer):
 
 
 class PatientProfileSerializer(serializers.ModelSerializer):
+    # List forms are stored in child tables and exposed as list properties.
+    graphic_flow_sheets = serializers.ListField(read_only=True)
+    medication_administration_records = serializers.ListField(read_only=True)
+    patient_education_record = serializers.ListField(read_only=True)
+    history_physical_forms = serializers.ListField(read_only=True)
+    progress_notes = serializers.ListField(read_only=True)
+    provider_order_sheets = serializers.ListField(read_only=True)
+    operative_procedure_reports = serializers.ListField(read_only=True)
+
     class Meta:
         model = PatientProfile
         fields = "__all__"
@@ -0,0 +1,45 @@
+import logging
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import PatientProfile, PatientSummary, User
+from .patient_summary import refresh_patient_summaries
+
+logger = logging.getLogger(__name__)
+
+# Only saves touching these fields can change a PatientSummary row.
+PROFILE_SUMMARY_FIELDS = {'medical_condition', 'room_number', 'assigned_doctor', 'assigned_doctor_id', 'lifecycle_state'}
+USER_SUMMARY_FIELDS = {'full_name', 'email', 'date_of_birth', 'gender'}
+
+
+def _touches(update_fields, fields):
+    return update_fields is None or bool(set(update_fields) & fields)
+
+
+def _refresh(profile_ids):
+    try:
+        refresh_patient_summaries(profile_ids)
+    except Exception as e:
+        # The nightly rebuild repairs anything missed here.
+        logger.error(f"Could not refresh patient summaries for {profile_ids}: {e}")
+
+
+@receiver(post_save, sender=PatientProfile)
+def patient_profile_summary(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw or not _touches(update_fields, PROFILE_SUMMARY_FIELDS):
+        return
+    _refresh([instance.pk])
+
+
+@receiver(post_save, sender=User)
+def user_summary(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    if raw or created or not _touches(update_fields, USER_SUMMARY_FIELDS):
+        return
+    if instance.role == User.Role.PATIENT:
+        _refresh(PatientProfile.objects.filter(user_id=instance.pk).values_list('id', flat=True))
+    elif instance.role == User.Role.DOCTOR:
+        PatientSummary.objects.filter(profile__assigned_doctor_id=instance.pk).update(
+            assigned_doctor_name=instance.full_name or ''
+        )
+
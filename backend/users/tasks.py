@@ -0,0 +1,20 @@
+"""
+Celery tasks for users module.
+"""
+import logging
+from celery import shared_task
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='backend.users.tasks.rebuild_patient_summaries')
+def rebuild_patient_summaries():
+    """
+    Nightly rebuild of PatientSummary rows so ages and age bands follow
+    birthdays, and anything missed by the on-write refresh is repaired.
+    """
+    from .patient_summary import rebuild_patient_summaries as rebuild
+
+    written = rebuild()
+    logger.info(f"Rebuilt {written} patient summaries")
+    return written
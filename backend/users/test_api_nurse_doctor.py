@@ -1,11 +1,17 @@
-from django.test import TestCase
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
 from django.utils import timezone
 from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
 from backend.users.models import User, PatientProfile
+from backend.utils.request_metrics import RequestMetricsMiddleware, endpoint_stats, measure
+from backend.utils.testing import QueryBudgetTestMixin
 
 
-class NurseDoctorAPITests(TestCase):
+class NurseDoctorAPITests(QueryBudgetTestMixin, TestCase):
     def setUp(self):
         self.client = APIClient()
         # Create users
@@ -107,4 +113,172 @@ class NurseDoctorAPITests(TestCase):
             f"/api/users/doctor/patient/{self.profile.id}/nurse-intake/"
         )
         self.assertEqual(resp_admin.status_code, 200)
-        self.assertTrue(resp_admin.data.get("success"))
\ No newline at end of file
+        self.assertTrue(resp_admin.data.get("success"))
+
+    def test_flow_sheet_pagination_projection_and_entry_response(self):
+        self.client.force_authenticate(user=self.nurse)
+        url = f"/api/users/nurse/patient/{self.profile.id}/flow-sheets/"
+        # Recorded out of order: list positions and page order differ
+        for day in (3, 1, 4, 2):
+            resp = self.client.post(url, {
+                "time_of_reading": f"2025-03-0{day}T08:00:00Z",
+                "repeated_vitals": {"hr": 70 + day},
+                "site_checks": "clean",
+            }, format="json")
+            self.assertEqual(resp.status_code, 201)
+            # Only the new entry is echoed back, with an ETag.
+            self.assertEqual(resp.data["data"]["entry"]["repeated_vitals"], {"hr": 70 + day})
+            self.assertEqual(resp["ETag"], f'"flowsheetentry-{resp.data["data"]["id"]}-1"')
+
+        # Without paging parameters the full list is returned as before.
+        self.assertEqual(len(self.client.get(url).data["data"]), 4)
+
+        resp = self.client.get(url, {"since": "2025-03-02", "limit": 2, "fields": "repeated_vitals"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([i["entry"] for i in resp.data["data"]],
+                         [{"repeated_vitals": {"hr": 72}}, {"repeated_vitals": {"hr": 73}}])
+        resp = self.client.get(url, {"since": "2025-03-02", "limit": 2, "cursor": resp.data["next_cursor"]})
+        self.assertEqual([i["entry"]["repeated_vitals"]["hr"] for i in resp.data["data"]], [74])
+        self.assertIsNone(resp.data["next_cursor"])
+
+        # Entries are updated by the id of their page item
+        page = self.client.get(url, {"limit": 1}).data["data"]
+        self.assertEqual(page[0]["entry"]["repeated_vitals"], {"hr": 71})
+        resp = self.client.put(f"{url}entries/{page[0]['id']}/", {
+            "time_of_reading": "2025-03-01T09:00:00Z", "repeated_vitals": {"hr": 90},
+        }, format="json")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual((resp.data["data"]["id"], resp.data["data"]["version"]), (page[0]["id"], 2))
+        self.assertEqual(self.client.get(url, {"limit": 1}).data["data"][0]["entry"]["repeated_vitals"], {"hr": 90})
+        resp = self.client.put(f"{url}entries/999999/", {"time_of_reading": "2025-03-01T09:00:00Z"}, format="json")
+        self.assertEqual(resp.status_code, 404)
+
+        # The positional route still addresses the full list in insertion order
+        resp = self.client.put(f"{url}0/", {"time_of_reading": "2025-03-03T09:00:00Z"}, format="json")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.client.get(url).data["data"][0]["time_of_reading"], "2025-03-03T09:00:00Z")
+
+        self.assertEqual(self.client.get(url, {"until": "yesterday"}).status_code, 400)
+
+    def test_patient_directory_pages_counts_and_search(self):
+        for i, email in enumerate(["ann@example.com", "dummy_bob@example.com", "cy@example.com"]):
+            user = User.objects.create_user(email=email, password="Password123",
+                                            role=User.Role.PATIENT, full_name=f"Patient {i}")
+            PatientProfile.objects.create(user=user, assigned_doctor=self.doctor, room_number=f"R{i}")
+        self.client.force_authenticate(user=self.doctor)
+        url = "/api/users/doctor/patients/"
+
+        resp = self.client.get(url, {"limit": 2})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual((resp.data["total_count"], resp.data["dummy_count"], resp.data["real_count"]), (4, 1, 3))
+        self.assertEqual(len(resp.data["patients"]), 2)
+        resp = self.client.get(url, {"limit": 2, "cursor": resp.data["next_cursor"]})
+        self.assertEqual([p["full_name"] for p in resp.data["patients"]], ["Patient 1", "Patient 2"])
+        self.assertEqual(resp.data["patients"][0]["assigned_doctor"], "Dr. Smith")
+        self.assertIsNone(resp.data["next_cursor"])
+        self.assertNotIn("total_count", resp.data)
+
+        resp = self.client.get(url, {"search": "r2"})
+        self.assertEqual([p["email"] for p in resp.data["patients"]], ["cy@example.com"])
+        resp = self.client.get(url, {"dummy": "false"})
+        self.assertFalse(any(p["is_dummy"] for p in resp.data["patients"]))
+        self.assertEqual(self.client.get(url, {"cursor": "bogus"}).status_code, 400)
+
+    def test_patient_directory_filters_and_sorts_by_age(self):
+        from datetime import date
+        for i, years in enumerate([30, 70, 50]):
+            user = User.objects.create_user(email=f"aged{i}@example.com", password="Password123",
+                                            role=User.Role.PATIENT, full_name=f"Aged {i}",
+                                            date_of_birth=date(date.today().year - years, 1, 1))
+            PatientProfile.objects.create(user=user)
+        self.client.force_authenticate(user=self.doctor)
+        url = "/api/users/doctor/patients/"
+
+        resp = self.client.get(url, {"min_age": 40, "order": "-age", "limit": 1})
+        self.assertEqual([p["age"] for p in resp.data["patients"]], [70])
+        resp = self.client.get(url, {"min_age": 40, "order": "-age", "limit": 1, "cursor": resp.data["next_cursor"]})
+        self.assertEqual([p["age"] for p in resp.data["patients"]], [50])
+        resp = self.client.get(url, {"age_band": "20-39"})
+        self.assertEqual([p["full_name"] for p in resp.data["patients"]], ["Aged 0"])
+        self.assertEqual(self.client.get(url, {"order": "height"}).status_code, 400)
+
+    def test_nurse_directory_lists_only_active_patients(self):
+        from datetime import date
+        from backend.operations.models import PatientAssessmentArchive
+        from backend.users.lifecycle import sync_patient_lifecycle
+        for i, email in enumerate(["gone@example.com", "home@example.com"]):
+            user = User.objects.create_user(email=email, password="Password123",
+                                            role=User.Role.PATIENT, full_name=f"Inactive {i}")
+            PatientProfile.objects.create(user=user, discharge_date=date(2025, 1, 1) if i else None)
+            if not i:
+                PatientAssessmentArchive.objects.create(user=user, assessment_data={"archived": True})
+                sync_patient_lifecycle(user.id)
+        self.client.force_authenticate(user=self.nurse)
+        resp = self.client.get("/api/users/nurse/patients/")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([p["email"] for p in resp.data["patients"]], ["patient@example.com"])
+
+    def test_form_schema_is_served_once_and_revalidated_by_etag(self):
+        self.client.force_authenticate(user=self.nurse)
+        resp = self.client.get("/api/users/forms/schema/")
+        self.assertEqual(resp.status_code, 200)
+        etag = resp["ETag"]
+        schema = resp.json()
+        self.assertIn("schema", schema["mar"])
+        self.assertNotIn("default", schema["medical"]["blood_type"])
+
+        resp = self.client.get("/api/users/forms/schema/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+
+        resp = self.client.get(f"/api/users/nurse/patient/{self.profile.id}/forms/")
+        self.assertEqual(resp.data["form_schema"]["etag"], etag)
+
+    def test_patient_directories_stay_within_query_budget(self):
+        for i in range(5):
+            user = User.objects.create_user(email=f"budget{i}@example.com", password="Password123",
+                                            role=User.Role.PATIENT, full_name=f"Budget {i}")
+            PatientProfile.objects.create(user=user, assigned_doctor=self.doctor)
+        self.client.force_authenticate(user=self.doctor)
+        with self.assertQueryBudget("get_doctor_patients"):
+            resp = self.client.get("/api/users/doctor/patients/")
+        self.assertEqual(resp.status_code, 200)
+        self.client.force_authenticate(user=self.nurse)
+        with self.assertQueryBudget("get_nurse_patients"):
+            resp = self.client.get("/api/users/nurse/patients/")
+        self.assertEqual(resp.status_code, 200)
+
+    def test_request_metrics_headers_and_endpoint_stats(self):
+        endpoint_stats.reset()
+        self.client.force_authenticate(user=self.doctor)
+        resp = self.client.get("/api/users/doctor/patients/")
+        self.assertRegex(resp["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries", cache;dur=')
+        self.assertNotIn("X-Query-Budget-Exceeded", resp)
+
+        with self.settings(REQUEST_QUERY_BUDGETS={"get_doctor_patients": 0}):
+            resp = self.client.get("/api/users/doctor/patients/")
+        self.assertIn("X-Query-Budget-Exceeded", resp)
+        stats = endpoint_stats.snapshot()["get_doctor_patients"]
+        self.assertEqual((stats["requests"], stats["over_budget"], stats["window"]), (2, 1, 2))
+        self.assertEqual(sum(stats["latency_histogram"].values()), 2)
+
+    @override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_cache_get_many_counts_each_key_once(self):
+        cache = caches["default"]
+        cache.set("metrics:a", 1)
+        # LocMemCache inherits BaseCache.get_many, which calls get per key
+        with measure() as metrics:
+            self.assertEqual(cache.get_many(["metrics:a", "metrics:b"]), {"metrics:a": 1})
+            cache.get("metrics:a")
+        self.assertEqual((metrics.cache_hits, metrics.cache_misses), (2, 1))
+
+    async def test_request_metrics_middleware_runs_natively_under_asgi(self):
+        async def get_response(request):
+            return HttpResponse()
+
+        self.assertTrue(iscoroutinefunction(RequestMetricsMiddleware(get_response)))
+        token = await sync_to_async(lambda: str(AccessToken.for_user(self.doctor)))()
+        resp = await self.async_client.get("/api/users/doctor/patients/", headers={"Authorization": f"Bearer {token}"})
+        self.assertEqual(resp.status_code, 200)
+        # Queries run by the sync view in a worker thread are still counted
+        self.assertRegex(resp["Server-Timing"], r'^db;dur=[\d.]+;desc="[1-9]\d* queries"')
+
@@ -1,7 +1,12 @@
+from datetime import date
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
 from django.utils import timezone
 
-from backend.users.models import User, PatientProfile
+from backend.users.lifecycle import find_lifecycle_drift, sync_patient_lifecycle
+from backend.users.models import User, PatientProfile, PatientSummary, MAREntry, ProgressNoteEntry
 
 
 class PatientProfileNurseFormsTests(TestCase):
@@ -280,6 +285,19 @@ class PatientProfileDoctorFormsTests(TestCase):
         self.assertIn("provider_orders", blank_context["groups"])
         self.assertIn("operative_reports", blank_context["groups"])
 
+    def test_form_context_merges_values_into_cached_schema(self):
+        self.profile.blood_type = PatientProfile.BloodType.O_POSITIVE
+        context = self.profile.get_form_fields_context(for_role="doctor")
+        self.assertEqual(context["role"], "doctor")
+        self.assertEqual(context["medical"]["blood_type"]["default"], "O+")
+        self.assertEqual(context["nursing_admin"]["blood_type"]["default"], "O+")
+        self.assertEqual(context["demographics"]["full_name"]["default"], self.user.full_name)
+
+        context["medical"]["blood_type"]["default"] = "changed"
+        blank = PatientProfile.get_blank_form_fields_context()
+        self.assertEqual(blank["medical"]["blood_type"]["default"], PatientProfile.BloodType.UNKNOWN)
+        self.assertEqual(blank["mar"]["default"], [])
+
     def test_multiple_doctor_forms_entries(self):
         # Add multiple H&P forms
         for i in range(3):
@@ -303,3 +321,180 @@ class PatientProfileDoctorFormsTests(TestCase):
         self.profile.save()
         self.assertEqual(len(self.profile.history_physical_forms), 3)
         self.assertEqual(len(self.profile.progress_notes), 2)
+
+
+class PatientProfileFormEntryStorageTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="entries@example.com",
+            password="Testpass123",
+            full_name="Entry Patient",
+            role=User.Role.PATIENT,
+        )
+        self.profile = PatientProfile.objects.create(user=self.user)
+
+    def _note(self, subjective, when="2025-03-01T08:00:00"):
+        return {"date_time": when, "subjective": subjective, "provider_signature": "Dr. A"}
+
+    def test_append_inserts_single_row_with_recorded_at(self):
+        self.profile.add_progress_note(self._note("first"))
+        self.profile.save(update_fields=["progress_notes"])
+        self.profile.add_progress_note(self._note("second", "2025-03-02T08:00:00Z"))
+        self.profile.save(update_fields=["progress_notes"])
+
+        rows = list(ProgressNoteEntry.objects.filter(patient=self.profile))
+        self.assertEqual([r.data["subjective"] for r in rows], ["first", "second"])
+        self.assertEqual(rows[0].recorded_at.isoformat(), "2025-03-01T08:00:00+00:00")
+
+        fresh = PatientProfile.objects.get(pk=self.profile.pk)
+        self.assertEqual([n["subjective"] for n in fresh.progress_notes], ["first", "second"])
+
+    def test_validation_only_checks_new_entries(self):
+        # A legacy entry missing required keys must not block new writes.
+        ProgressNoteEntry.objects.create(patient=self.profile, data={"subjective": "legacy"})
+        self.profile.add_progress_note(self._note("new"))
+        valid, errors = self.profile.validate_doctor_forms_minimal()
+        self.assertTrue(valid, errors)
+
+        self.profile.add_progress_note({"subjective": "unsigned"})
+        valid, errors = self.profile.validate_doctor_forms_minimal()
+        self.assertFalse(valid)
+        self.assertIn("progress_notes[2].date_time is required", errors)
+
+    def test_set_form_entry_and_replace(self):
+        for i in range(3):
+            self.profile.add_mar_entry({"datetime_administered": f"2025-03-0{i + 1}T10:00:00",
+                                        "name": f"Drug {i}", "dose": "1", "route": "PO", "nurse_initials": "AB"})
+        self.profile.save()
+
+        profile = PatientProfile.objects.get(pk=self.profile.pk)
+        profile.set_form_entry("medication_administration_records", 1, {"name": "Changed"})
+        valid, errors = profile.validate_nurse_forms_minimal()
+        self.assertFalse(valid)
+        self.assertTrue(any(e.startswith("medication_administration_records[1].") for e in errors))
+        with self.assertRaises(IndexError):
+            profile.set_form_entry("medication_administration_records", 3, {"name": "Missing"})
+        profile.save(update_fields=["medication_administration_records"])
+        self.assertEqual(
+            [e["name"] for e in PatientProfile.objects.get(pk=profile.pk).medication_administration_records],
+            ["Drug 0", "Changed", "Drug 2"],
+        )
+
+        profile.medication_administration_records = [{"name": "Only"}]
+        profile.save()
+        self.assertEqual(MAREntry.objects.filter(patient=profile).count(), 1)
+
+    def test_list_read_uses_prefetched_rows(self):
+        self.profile.add_flow_sheet_entry({"time_of_reading": "2025-03-01T08:00:00"})
+        self.profile.save()
+        profile = PatientProfile.objects.prefetch_related("flowsheetentry_set").get(pk=self.profile.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(len(profile.graphic_flow_sheets), 1)
+
+
+class PatientSummaryTests(TestCase):
+    def setUp(self):
+        self.doctor = User.objects.create_user(
+            email="summary_doc@example.com", password="Testpass123",
+            full_name="Dr. House", role=User.Role.DOCTOR,
+        )
+        self.user = User.objects.create_user(
+            email="summary@example.com", password="Testpass123", full_name="Zoë Summary",
+            role=User.Role.PATIENT, date_of_birth=date(date.today().year - 45, 1, 1), gender="Female",
+        )
+        self.profile = PatientProfile.objects.create(
+            user=self.user, assigned_doctor=self.doctor, medical_condition="Asthma", room_number="B12",
+        )
+
+    def test_summary_maintained_on_write(self):
+        summary = PatientSummary.objects.get(profile=self.profile)
+        self.assertEqual((summary.age, summary.age_band), (45, PatientSummary.AgeBand.AGE_40_59))
+        self.assertEqual(summary.sort_name, "zoe summary")
+        self.assertEqual(summary.search_text, "zoe summary example com asthma b12")
+        self.assertEqual(summary.assigned_doctor_name, "Dr. House")
+        self.assertFalse(summary.is_archived)
+
+        self.doctor.full_name = "Dr. Wilson"
+        self.doctor.save(update_fields=["full_name"])
+        self.user.date_of_birth = date(date.today().year - 85, 1, 1)
+        self.user.save()
+        from backend.operations.models import PatientAssessmentArchive
+        PatientAssessmentArchive.objects.create(user=self.user, assessment_data={"archived": True})
+        sync_patient_lifecycle(self.user.id)
+
+        summary.refresh_from_db()
+        self.assertEqual(summary.assigned_doctor_name, "Dr. Wilson")
+        self.assertEqual(summary.age_band, PatientSummary.AgeBand.AGE_80_PLUS)
+        self.assertTrue(summary.is_archived)
+
+    def test_rebuild_command_recreates_rows(self):
+        PatientSummary.objects.all().delete()
+        call_command("rebuild_patient_summaries", batch_size=1, stdout=StringIO())
+        self.assertEqual(PatientSummary.objects.get(profile=self.profile).age, 45)
+
+
+class PatientLifecycleTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="lifecycle@example.com", password="Testpass123",
+            full_name="Life Cycle", role=User.Role.PATIENT,
+        )
+        self.profile = PatientProfile.objects.create(user=self.user)
+
+    def test_discharge_and_archive_transitions(self):
+        from backend.operations.models import PatientAssessmentArchive
+        State = PatientProfile.LifecycleState
+        self.assertEqual(self.profile.lifecycle_state, State.ACTIVE)
+
+        self.profile.discharge_date = date(2025, 3, 1)
+        self.profile.save(update_fields=["discharge_date"])
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.lifecycle_state, State.DISCHARGED)
+
+        archive = PatientAssessmentArchive.objects.create(user=self.user, assessment_data={"archived": True})
+        self.assertEqual(sync_patient_lifecycle(self.user.id), 1)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.lifecycle_state, State.ARCHIVED)
+        self.assertTrue(PatientSummary.objects.get(profile=self.profile).is_archived)
+
+        # Archived patients stay archived when other fields change.
+        self.profile.discharge_date = None
+        self.profile.save()
+        self.assertEqual(self.profile.lifecycle_state, State.ARCHIVED)
+
+        archive.assessment_data = {"archived": False}
+        archive.save()
+        sync_patient_lifecycle(self.user.id)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.lifecycle_state, State.ACTIVE)
+        self.assertFalse(PatientSummary.objects.get(profile=self.profile).is_archived)
+
+    def test_stale_instance_does_not_overwrite_archived_state(self):
+        State = PatientProfile.LifecycleState
+        stale = PatientProfile.objects.get(pk=self.profile.pk)
+        PatientProfile.objects.filter(pk=self.profile.pk).update(lifecycle_state=State.ARCHIVED)
+
+        stale.room_number = "12B"
+        stale.save()
+        stale.discharge_date = date(2025, 3, 1)
+        stale.save(update_fields=["discharge_date"])
+        self.profile.refresh_from_db()
+        self.assertEqual((self.profile.lifecycle_state, self.profile.room_number), (State.ARCHIVED, "12B"))
+
+        # Nor does an instance that still believes it is archived re-archive the row
+        PatientProfile.objects.filter(pk=self.profile.pk).update(lifecycle_state=State.DISCHARGED)
+        self.profile.discharge_date = None
+        self.profile.save(update_fields=["discharge_date"])
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.lifecycle_state, State.ACTIVE)
+
+    def test_check_command_reports_and_fixes_drift(self):
+        PatientProfile.objects.filter(pk=self.profile.pk).update(lifecycle_state=PatientProfile.LifecycleState.ARCHIVED)
+        out = StringIO()
+        call_command("check_patient_lifecycle", stdout=out)
+        self.assertIn(f"profile {self.profile.pk} (user {self.user.pk}): archived -> active", out.getvalue())
+        self.assertEqual(find_lifecycle_drift().count(), 1)
+
+        call_command("check_patient_lifecycle", "--fix", stdout=StringIO())
+        self.assertEqual(find_lifecycle_drift().count(), 0)
+
@@ -1,9 +1,9 @@
 from django.db import transaction
-from django.db.models import Q
 from django.contrib.auth import authenticate
 from django.contrib.auth.tokens import default_token_generator
 from django.core.mail import send_mail
 from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from rest_framework import status
@@ -21,6 +21,9 @@ import io
 import base64
 
 from .models import User, GeneralDoctorProfile, NurseProfile, PatientProfile
+from .form_entries import InvalidPageQuery, entry_payload, page_form_entries, wants_page
+from .form_schema import form_schema
+from .patient_directory import InvalidDirectoryQuery, list_patients
 from .serializers import (
     UserSerializer, UserRegistrationSerializer, VerificationDocumentSerializer, 
     ProfileUpdateSerializer,
@@ -458,146 +461,44 @@ def reset_password(request, uidb64, token):
 @permission_classes([IsAuthenticated])
 def get_doctor_patients(request):
     """
-    Get all patients for a doctor with optional search functionality (including dummy data for analytics)
+    Get patients for a doctor with optional search (including dummy data for analytics).
+    Keyset-paginated: pass ``limit`` (max 500) and the returned ``next_cursor`` as ``cursor``;
+    ``dummy=false`` hides dummy patients.
     """
     if request.user.role != 'doctor':
         return Response({
             'error': 'Only doctors can access this endpoint.'
         }, status=status.HTTP_403_FORBIDDEN)
-    
-    try:
-        # Get search parameter
-        search_query = request.GET.get('search', '').strip()
-        
-        # Get all patients (including dummy data)
-        patients = PatientProfile.objects.select_related('user').all()
-        
-        # Apply search filter if search query is provided
-        if search_query:
-            patients = patients.filter(
-                Q(user__full_name__icontains=search_query) |
-                Q(user__email__icontains=search_query) |
-                Q(medical_condition__icontains=search_query) |
-                Q(blood_type__icontains=search_query) |
-                Q(hospital__icontains=search_query) |
-                Q(insurance_provider__icontains=search_query) |
-                Q(room_number__icontains=search_query) |
-                Q(medication__icontains=search_query)
-            )
-        
-        # Serialize patient data
-        patient_data = []
-        for patient in patients:
-            patient_info = {
-                'id': patient.id,
-                'user_id': patient.user.id,
-                'full_name': patient.user.full_name,
-                'email': patient.user.email,
-                'age': calculate_age(patient.user.date_of_birth) if patient.user.date_of_birth else None,
-                'gender': patient.user.gender,
-                'blood_type': patient.blood_type,
-                'medical_condition': patient.medical_condition,
-                'hospital': patient.hospital,
-                'insurance_provider': patient.insurance_provider,
-                'billing_amount': float(patient.billing_amount) if patient.billing_amount else None,
-                'room_number': patient.room_number,
-                'admission_type': patient.admission_type,
-                'date_of_admission': patient.date_of_admission,
-                'discharge_date': patient.discharge_date,
-                'medication': patient.medication,
-                'test_results': patient.test_results,
-                'is_dummy': 'dummy' in patient.user.email,
-                'assigned_doctor': patient.assigned_doctor.full_name if patient.assigned_doctor else None
-            }
-            patient_data.append(patient_info)
-        
-        return Response({
-            'success': True,
-            'patients': patient_data,
-            'total_count': len(patient_data),
-            'dummy_count': len([p for p in patient_data if p['is_dummy']]),
-            'real_count': len([p for p in patient_data if not p['is_dummy']])
-        })
-        
-    except Exception as e:
-        return Response({
-            'success': False,
-            'error': f'Error fetching patients: {str(e)}'
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    return _patient_directory_response(request, active_only=False)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_nurse_patients(request):
     """
-    Get all patients for a nurse with optional search functionality (including dummy data for analytics)
+    Get patients for a nurse with optional search (including dummy data for analytics).
+    Only active patients are listed (lifecycle_state; discharged and archived ones are left off).
+    Paginated like get_doctor_patients.
     """
     if request.user.role != 'nurse':
         return Response({
             'error': 'Only nurses can access this endpoint.'
         }, status=status.HTTP_403_FORBIDDEN)
-    
+
+    return _patient_directory_response(request, active_only=True)
+
+
+def _patient_directory_response(request, active_only):
     try:
-        # Get search parameter
-        search_query = request.GET.get('search', '').strip()
-        
-        # Get all patients (including dummy data) and EXCLUDE archived profiles
-        # A patient is considered archived if a related PatientAssessmentArchive exists
-        # via PatientAssessmentArchive.user -> User.
-        # We only return profiles with no related archives to keep the active nurse list clean.
-        patients = PatientProfile.objects.select_related('user').filter(user__assessment_archives__isnull=True)
-        
-        # Apply search filter if search query is provided
-        if search_query:
-            patients = patients.filter(
-                Q(user__full_name__icontains=search_query) |
-                Q(user__email__icontains=search_query) |
-                Q(medical_condition__icontains=search_query) |
-                Q(blood_type__icontains=search_query) |
-                Q(hospital__icontains=search_query) |
-                Q(insurance_provider__icontains=search_query) |
-                Q(room_number__icontains=search_query) |
-                Q(medication__icontains=search_query)
-            )
-        
-        # Serialize patient data
-        patient_data = []
-        for patient in patients:
-            patient_info = {
-                'id': patient.id,
-                'user_id': patient.user.id,
-                'full_name': patient.user.full_name,
-                'email': patient.user.email,
-                'age': calculate_age(patient.user.date_of_birth) if patient.user.date_of_birth else None,
-                'gender': patient.user.gender,
-                'blood_type': patient.blood_type,
-                'medical_condition': patient.medical_condition,
-                'hospital': patient.hospital,
-                'insurance_provider': patient.insurance_provider,
-                'billing_amount': float(patient.billing_amount) if patient.billing_amount else None,
-                'room_number': patient.room_number,
-                'admission_type': patient.admission_type,
-                'date_of_admission': patient.date_of_admission,
-                'discharge_date': patient.discharge_date,
-                'medication': patient.medication,
-                'test_results': patient.test_results,
-                'is_dummy': 'dummy' in patient.user.email,
-                'assigned_doctor': patient.assigned_doctor.full_name if patient.assigned_doctor else None
-            }
-            patient_data.append(patient_info)
-        
-        return Response({
-            'success': True,
-            'patients': patient_data,
-            'total_count': len(patient_data),
-            'dummy_count': len([p for p in patient_data if p['is_dummy']]),
-            'real_count': len([p for p in patient_data if not p['is_dummy']])
-        })
-        
+        payload = list_patients(request.GET, active_only=active_only)
+    except InvalidDirectoryQuery as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({
             'success': False,
             'error': f'Error fetching patients: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    return Response({'success': True, **payload})
 
 
 # ============================================
@@ -617,6 +518,57 @@ def _get_patient_profile(patient_id):
         return None
 
 
+def _form_list_response(request, profile, field):
+    """Whole list form, or one page of it when paging parameters are given (see form_entries)."""
+    if not wants_page(request.query_params):
+        return Response({'success': True, 'data': list(getattr(profile, field) or [])})
+    try:
+        page = page_form_entries(profile, field, request.query_params)
+    except InvalidPageQuery as e:
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response({'success': True, **page})
+
+
+def _form_entry_response(row, status_code=status.HTTP_200_OK):
+    """Echo only the written entry, with its version as ETag."""
+    response = Response({'success': True, 'data': entry_payload(row)}, status=status_code)
+    response['ETag'] = row.etag
+    return response
+
+
+def _set_form_entry(profile, field, index, entry_id, entry):
+    """
+    Replace a list-form entry addressed by its ``id`` (``entries/<id>/``, the
+    ``id`` of paged items) or by its position in the full list (``<index>/``).
+    """
+    if entry_id is not None:
+        return profile.set_form_entry_by_id(field, entry_id, entry)
+    return profile.set_form_entry(field, index, entry)
+
+
+def _form_schema_ref():
+    schema = form_schema()
+    return {'version': schema.version, 'etag': schema.etag}
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def patient_form_schema(request):
+    """
+    Static field/type/default schema of the patient forms. It only changes with
+    the code, so clients cache it by ETag and merge per-patient values from the
+    forms endpoints into it.
+    """
+    schema = form_schema()
+    if schema.etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(schema.json, content_type='application/json')
+    response['ETag'] = schema.etag
+    response['Cache-Control'] = 'private, max-age=86400'
+    return response
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def nurse_patient_forms_overview(request, patient_id):
@@ -645,7 +597,8 @@ def nurse_patient_forms_overview(request, patient_id):
             'medication_administration_records': list(profile.medication_administration_records or []),
             'patient_education_record': list(profile.patient_education_record or []),
             'discharge_checklist_summary': profile.discharge_checklist_summary or {},
-        }
+        },
+        'form_schema': _form_schema_ref(),
     })
 
 
@@ -701,20 +654,20 @@ def nurse_flow_sheets(request, patient_id):
         return Response({'error': 'Patient not found.'}, status=status.HTTP_404_NOT_FOUND)
 
     if request.method == 'GET':
-        return Response({'success': True, 'data': list(profile.graphic_flow_sheets or [])})
+        return _form_list_response(request, profile, 'graphic_flow_sheets')
 
     if request.method == 'POST':
         serializer = FlowSheetEntrySerializer(data=request.data)
         if not serializer.is_valid():
             return Response({'success': False, 'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
         with transaction.atomic():
-            profile.add_flow_sheet_entry(serializer.validated_data)
+            row = profile.add_flow_sheet_entry(serializer.validated_data)
             valid, errors = profile.validate_nurse_forms_minimal()
             if not valid:
                 transaction.set_rollback(True)
                 return Response({'success': False, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
             profile.save(update_fields=['graphic_flow_sheets'])
-        return Response({'success': True, 'data': list(profile.graphic_flow_sheets or [])}, status=status.HTTP_201_CREATED)
+        return _form_entry_response(row, status.HTTP_201_CREATED)
 
     # PUT replace full list
     if isinstance(request.data, list):
@@ -736,14 +689,14 @@ def nurse_flow_sheets(request, patient_id):
                 transaction.set_rollback(True)
                 return Response({'success': False, 'errors': val_errors}, status=status.HTTP_400_BAD_REQUEST)
             profile.save(update_fields=['graphic_flow_sheets'])
-        return Response({'success': True, 'data': list(profile.graphic_flow_sheets or [])})
+        return Response({'success': True, 'count': len(cleaned)})
 
     return Response({'error': 'Invalid payload; expected list for PUT.'}, status=status.HTTP_400_BAD_REQUEST)
 
 
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
-def nurse_flow_sheets_update(request, patient_id, index):
+def nurse_flow_sheets_update(request, patient_id, index=None, entry_id=None):
     deny = _require_nurse(request.user)
     if deny:
         return deny
@@ -757,17 +710,18 @@ def nurse_flow_sheets_update(request, patient_id, index):
         return Response({'success': False, 'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
     with transaction.atomic():
-        items = list(profile.graphic_flow_sheets or [])
-        if index < 0 or index >= len(items):
+        try:
+            row = _set_form_entry(profile, 'graphic_flow_sheets', index, entry_id, serializer.validated_data)
+        except IndexError:
             return Response({'error': 'Index out of range.'}, status=status.HTTP_400_BAD_REQUEST)
-        items[index] = serializer.validated_data
-        profile.graphic_flow_sheets = items
+        except KeyError:
+            return Response({'error': 'Entry not found.'}, status=status.HTTP_404_NOT_FOUND)
         valid, errors = profile.validate_nurse_forms_minimal()
         if not valid:
             transaction.set_rollback(True)
             return Response({'success': False, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
         profile.save(update_fields=['graphic_flow_sheets'])
-    return Response({'success': True, 'data': list(profile.graphic_flow_sheets or [])})
+    return _form_entry_response(row)
 
 
 @api_view(['GET', 'POST', 'PUT'])
@@ -782,22 +736,20 @@ def nurse_mar_records(request, patient_id):
         return Response({'error': 'Patient not found.'}, status=status.HTTP_404_NOT_FOUND)
 
     if request.method == 'GET':
-        return Response({'success': True, 'data': list(profile.medication_administration_records or [])})
+        return _form_list_response(request, profile, 'medication_administration_records')
 
     if request.method == 'POST':
         serializer = MARRecordSerializer(data=request.data)
         if not serializer.is_valid():
             return Response({'success': False, 'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
         with transaction.atomic():
-            mar = list(profile.medication_administration_records or [])
-            mar.append(serializer.validated_data)
-            profile.medication_administration_records = mar
+            row = profile.add_mar_entry(serializer.validated_data)
             valid, errors = profile.validate_nurse_forms_minimal()
             if not valid:
                 transaction.set_rollback(True)
                 return Response({'success': False, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
             profile.save(update_fields=['medication_administration_records'])
-        return Response({'success': True, 'data': list(profile.medication_administration_records or [])}, status=status.HTTP_201_CREATED)
+        return _form_entry_response(row, status.HTTP_201_CREATED)
 
     # PUT replace full list
     if isinstance(request.data, list):
@@ -818,14 +770,14 @@ def nurse_mar_records(request, patient_id):
                 transaction.set_rollback(True)
                 return Response({'success': False, 'errors': val_errors}, status=status.HTTP_400_BAD_REQUEST)
             profile.save(update_fields=['medication_administration_records'])
-        return Response({'success': True, 'data': list(profile.medication_administration_records or [])})
+        return Response({'success': True, 'count': len(cleaned)})
 
     return Response({'error': 'Invalid payload; expected list for PUT.'}, status=status.HTTP_400_BAD_REQUEST)
 
 
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
-def nurse_mar_update(request, patient_id, index):
+def nurse_mar_update(request, patient_id, index=None, entry_id=None):
     deny = _require_nurse(request.user)
     if deny:
         return deny
@@ -839,17 +791,18 @@ def nurse_mar_update(request, patient_id, index):
         return Response({'success': False, 'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
     with transaction.atomic():
-        items = list(profile.medication_administration_records or [])
-        if index < 0 or index >= len(items):
+        try:
+            row = _set_form_entry(profile, 'medication_administration_records', index, entry_id, serializer.validated_data)
+        except IndexError:
             return Response({'error': 'Index out of range.'}, status=status.HTTP_400_BAD_REQUEST)
-        items[index] = serializer.validated_data
-        profile.medication_administration_records = items
+        except KeyError:
+            return Response({'error': 'Entry not found.'}, status=status.HTTP_404_NOT_FOUND)
         valid, errors = profile.validate_nurse_forms_minimal()
         if not valid:
             transaction.set_rollback(True)
             return Response({'success': False, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
         profile.save(update_fields=['medication_administration_records'])
-    return Response({'success': True, 'data': list(profile.medication_administration_records or [])})
+    return _form_entry_response(row)
 
 
 @api_view(['GET', 'POST', 'PUT'])
@@ -864,22 +817,20 @@ def nurse_education_records(request, patient_id):
         return Response({'error': 'Patient not found.'}, status=status.HTTP_404_NOT_FOUND)
 
     if request.method == 'GET':
-        return Response({'success': True, 'data': list(profile.patient_education_record or [])})
+        return _form_list_response(request, profile, 'patient_education_record')
 
     if request.method == 'POST':
         serializer = EducationEntrySerializer(data=request.data)
         if not serializer.is_valid():
             return Response({'success': False, 'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
         with transaction.atomic():
-            edu = list(profile.patient_education_record or [])
-            edu.append(serializer.validated_data)
-            profile.patient_education_record = edu
+            row = profile.add_education_entry(serializer.validated_data)
             valid, errors = profile.validate_nurse_forms_minimal()
             if not valid:
                 transaction.set_rollback(True)
                 return Response({'success': False, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
             profile.save(update_fields=['patient_education_record'])
-        return Response({'success': True, 'data': list(profile.patient_education_record or [])}, status=status.HTTP_201_CREATED)
+        return _form_entry_response(row, status.HTTP_201_CREATED)
 
     # PUT replace full list
     if isinstance(request.data, list):
@@ -900,14 +851,14 @@ def nurse_education_records(request, patient_id):
                 transaction.set_rollback(True)
                 return Response({'success': False, 'errors': val_errors}, status=status.HTTP_400_BAD_REQUEST)
             profile.save(update_fields=['patient_education_record'])
-        return Response({'success': True, 'data': list(profile.patient_education_record or [])})
+        return Response({'success': True, 'count': len(cleaned)})
 
     return Response({'error': 'Invalid payload; expected list for PUT.'}, status=status.HTTP_400_BAD_REQUEST)
 
 
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
-def nurse_education_update(request, patient_id, index):
+def nurse_education_update(request, patient_id, index=None, entry_id=None):
     deny = _require_nurse(request.user)
     if deny:
         return deny
@@ -921,17 +872,18 @@ def nurse_education_update(request, patient_id, index):
         return Response({'success': False, 'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
     with transaction.atomic():
-        items = list(profile.patient_education_record or [])
-        if index < 0 or index >= len(items):
+        try:
+            row = _set_form_entry(profile, 'patient_education_record', index, entry_id, serializer.validated_data)
+        except IndexError:
             return Response({'error': 'Index out of range.'}, status=status.HTTP_400_BAD_REQUEST)
-        items[index] = serializer.validated_data
-        profile.patient_education_record = items
+        except KeyError:
+            return Response({'error': 'Entry not found.'}, status=status.HTTP_404_NOT_FOUND)
         valid, errors = profile.validate_nurse_forms_minimal()
         if not valid:
             transaction.set_rollback(True)
             return Response({'success': False, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
         profile.save(update_fields=['patient_education_record'])
-    return Response({'success': True, 'data': list(profile.patient_education_record or [])})
+    return _form_entry_response(row)
 
 
 @api_view(['GET', 'PUT'])
@@ -1033,7 +985,8 @@ def doctor_patient_forms_overview(request, patient_id):
             'progress_notes': list(profile.progress_notes or []),
             'provider_order_sheets': list(profile.provider_order_sheets or []),
             'operative_procedure_reports': list(profile.operative_procedure_reports or []),
-        }
+        },
+        'form_schema': _form_schema_ref(),
     })
 
 
@@ -1068,7 +1021,7 @@ def doctor_hp_forms(request, patient_id):
         return Response({'error': 'Not authorized for this patient.'}, status=status.HTTP_403_FORBIDDEN)
 
     if request.method == 'GET':
-        return Response({'success': True, 'data': list(profile.history_physical_forms or [])})
+        return _form_list_response(request, profile, 'history_physical_forms')
 
     serializer = HPFormSerializer(data=request.data)
     if not serializer.is_valid():
@@ -1081,18 +1034,18 @@ def doctor_hp_forms(request, patient_id):
     entry.setdefault('created_at', datetime.utcnow().isoformat())
 
     with transaction.atomic():
-        profile.add_hp_form(entry)
+        row = profile.add_hp_form(entry)
         valid, errors = profile.validate_doctor_forms_minimal()
         if not valid:
             transaction.set_rollback(True)
             return Response({'success': False, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
         profile.save(update_fields=['history_physical_forms'])
-    return Response({'success': True, 'data': list(profile.history_physical_forms or [])})
+    return _form_entry_response(row)
 
 
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
-def doctor_hp_forms_update(request, patient_id, index):
+def doctor_hp_forms_update(request, patient_id, index=None, entry_id=None):
     deny = _require_doctor(request.user)
     if deny:
         return deny
@@ -1108,21 +1061,22 @@ def doctor_hp_forms_update(request, patient_id, index):
         return Response({'success': False, 'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
     with transaction.atomic():
-        items = list(profile.history_physical_forms or [])
-        if index < 0 or index >= len(items):
-            return Response({'error': 'Index out of range.'}, status=status.HTTP_400_BAD_REQUEST)
         entry = dict(serializer.validated_data)
         entry.setdefault('provider_signature', request.user.full_name)
         entry.setdefault('provider_id', str(request.user.id))
         entry.setdefault('created_at', datetime.utcnow().isoformat())
-        items[index] = entry
-        profile.history_physical_forms = items
+        try:
+            row = _set_form_entry(profile, 'history_physical_forms', index, entry_id, entry)
+        except IndexError:
+            return Response({'error': 'Index out of range.'}, status=status.HTTP_400_BAD_REQUEST)
+        except KeyError:
+            return Response({'error': 'Entry not found.'}, status=status.HTTP_404_NOT_FOUND)
         valid, errors = profile.validate_doctor_forms_minimal()
         if not valid:
             transaction.set_rollback(True)
             return Response({'success': False, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
         profile.save(update_fields=['history_physical_forms'])
-    return Response({'success': True, 'data': list(profile.history_physical_forms or [])})
+    return _form_entry_response(row)
 
 
 @api_view(['GET', 'POST'])
@@ -1139,7 +1093,7 @@ def doctor_progress_notes(request, patient_id):
         return Response({'error': 'Not authorized for this patient.'}, status=status.HTTP_403_FORBIDDEN)
 
     if request.method == 'GET':
-        return Response({'success': True, 'data': list(profile.progress_notes or [])})
+        return _form_list_response(request, profile, 'progress_notes')
 
     serializer = ProgressNoteSerializer(data=request.data)
     if not serializer.is_valid():
@@ -1153,20 +1107,18 @@ def doctor_progress_notes(request, patient_id):
     entry.setdefault('created_at', datetime.utcnow().isoformat())
 
     with transaction.atomic():
-        items = list(profile.progress_notes or [])
-        items.append(entry)
-        profile.progress_notes = items
+        row = profile.add_progress_note(entry)
         valid, errors = profile.validate_doctor_forms_minimal()
         if not valid:
             transaction.set_rollback(True)
             return Response({'success': False, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
         profile.save(update_fields=['progress_notes'])
-    return Response({'success': True, 'data': list(profile.progress_notes or [])})
+    return _form_entry_response(row)
 
 
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
-def doctor_progress_notes_update(request, patient_id, index):
+def doctor_progress_notes_update(request, patient_id, index=None, entry_id=None):
     deny = _require_doctor(request.user)
     if deny:
         return deny
@@ -1182,22 +1134,23 @@ def doctor_progress_notes_update(request, patient_id, index):
         return Response({'success': False, 'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
     with transaction.atomic():
-        items = list(profile.progress_notes or [])
-        if index < 0 or index >= len(items):
-            return Response({'error': 'Index out of range.'}, status=status.HTTP_400_BAD_REQUEST)
         entry = dict(serializer.validated_data)
         entry['date_time'] = entry.get('date_time') or entry.get('date_time_note') or datetime.utcnow().isoformat()
         entry.pop('date_time_note', None)
         entry.setdefault('provider_signature', request.user.full_name)
         entry.setdefault('created_at', datetime.utcnow().isoformat())
-        items[index] = entry
-        profile.progress_notes = items
+        try:
+            row = _set_form_entry(profile, 'progress_notes', index, entry_id, entry)
+        except IndexError:
+            return Response({'error': 'Index out of range.'}, status=status.HTTP_400_BAD_REQUEST)
+        except KeyError:
+            return Response({'error': 'Entry not found.'}, status=status.HTTP_404_NOT_FOUND)
         valid, errors = profile.validate_doctor_forms_minimal()
         if not valid:
             transaction.set_rollback(True)
             return Response({'success': False, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
         profile.save(update_fields=['progress_notes'])
-    return Response({'success': True, 'data': list(profile.progress_notes or [])})
+    return _form_entry_response(row)
 
 
 @api_view(['GET', 'POST'])
@@ -1214,7 +1167,7 @@ def doctor_provider_orders(request, patient_id):
         return Response({'error': 'Not authorized for this patient.'}, status=status.HTTP_403_FORBIDDEN)
 
     if request.method == 'GET':
-        return Response({'success': True, 'data': list(profile.provider_order_sheets or [])})
+        return _form_list_response(request, profile, 'provider_order_sheets')
 
     serializer = ProviderOrderSerializer(data=request.data)
     if not serializer.is_valid():
@@ -1226,20 +1179,18 @@ def doctor_provider_orders(request, patient_id):
     entry.setdefault('created_at', datetime.utcnow().isoformat())
 
     with transaction.atomic():
-        items = list(profile.provider_order_sheets or [])
-        items.append(entry)
-        profile.provider_order_sheets = items
+        row = profile.add_provider_order(entry)
         valid, errors = profile.validate_doctor_forms_minimal()
         if not valid:
             transaction.set_rollback(True)
             return Response({'success': False, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
         profile.save(update_fields=['provider_order_sheets'])
-    return Response({'success': True, 'data': list(profile.provider_order_sheets or [])})
+    return _form_entry_response(row)
 
 
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
-def doctor_provider_orders_update(request, patient_id, index):
+def doctor_provider_orders_update(request, patient_id, index=None, entry_id=None):
     deny = _require_doctor(request.user)
     if deny:
         return deny
@@ -1255,21 +1206,22 @@ def doctor_provider_orders_update(request, patient_id, index):
         return Response({'success': False, 'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
     with transaction.atomic():
-        items = list(profile.provider_order_sheets or [])
-        if index < 0 or index >= len(items):
-            return Response({'error': 'Index out of range.'}, status=status.HTTP_400_BAD_REQUEST)
         entry = dict(serializer.validated_data)
         entry.setdefault('ordering_provider', request.user.full_name)
         entry.setdefault('date_time_placed', datetime.utcnow().isoformat())
         entry.setdefault('created_at', datetime.utcnow().isoformat())
-        items[index] = entry
-        profile.provider_order_sheets = items
+        try:
+            row = _set_form_entry(profile, 'provider_order_sheets', index, entry_id, entry)
+        except IndexError:
+            return Response({'error': 'Index out of range.'}, status=status.HTTP_400_BAD_REQUEST)
+        except KeyError:
+            return Response({'error': 'Entry not found.'}, status=status.HTTP_404_NOT_FOUND)
         valid, errors = profile.validate_doctor_forms_minimal()
         if not valid:
             transaction.set_rollback(True)
             return Response({'success': False, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
         profile.save(update_fields=['provider_order_sheets'])
-    return Response({'success': True, 'data': list(profile.provider_order_sheets or [])})
+    return _form_entry_response(row)
 
 
 @api_view(['GET', 'POST'])
@@ -1286,7 +1238,7 @@ def doctor_operative_reports(request, patient_id):
         return Response({'error': 'Not authorized for this patient.'}, status=status.HTTP_403_FORBIDDEN)
 
     if request.method == 'GET':
-        return Response({'success': True, 'data': list(profile.operative_procedure_reports or [])})
+        return _form_list_response(request, profile, 'operative_procedure_reports')
 
     serializer = OperativeReportSerializer(data=request.data)
     if not serializer.is_valid():
@@ -1299,20 +1251,18 @@ def doctor_operative_reports(request, patient_id):
     entry.setdefault('created_at', datetime.utcnow().isoformat())
 
     with transaction.atomic():
-        items = list(profile.operative_procedure_reports or [])
-        items.append(entry)
-        profile.operative_procedure_reports = items
+        row = profile.add_operative_report(entry)
         valid, errors = profile.validate_doctor_forms_minimal()
         if not valid:
             transaction.set_rollback(True)
             return Response({'success': False, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
         profile.save(update_fields=['operative_procedure_reports'])
-    return Response({'success': True, 'data': list(profile.operative_procedure_reports or [])})
+    return _form_entry_response(row)
 
 
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
-def doctor_operative_reports_update(request, patient_id, index):
+def doctor_operative_reports_update(request, patient_id, index=None, entry_id=None):
     deny = _require_doctor(request.user)
     if deny:
         return deny
@@ -1328,22 +1278,23 @@ def doctor_operative_reports_update(request, patient_id, index):
         return Response({'success': False, 'errors': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
     with transaction.atomic():
-        items = list(profile.operative_procedure_reports or [])
-        if index < 0 or index >= len(items):
-            return Response({'error': 'Index out of range.'}, status=status.HTTP_400_BAD_REQUEST)
         entry = dict(serializer.validated_data)
         entry.setdefault('patient_id', str(profile.user_id))
         entry.setdefault('surgeon_signature', request.user.full_name)
         entry.setdefault('date_time_performed', datetime.utcnow().isoformat())
         entry.setdefault('created_at', datetime.utcnow().isoformat())
-        items[index] = entry
-        profile.operative_procedure_reports = items
+        try:
+            row = _set_form_entry(profile, 'operative_procedure_reports', index, entry_id, entry)
+        except IndexError:
+            return Response({'error': 'Index out of range.'}, status=status.HTTP_400_BAD_REQUEST)
+        except KeyError:
+            return Response({'error': 'Entry not found.'}, status=status.HTTP_404_NOT_FOUND)
         valid, errors = profile.validate_doctor_forms_minimal()
         if not valid:
             transaction.set_rollback(True)
             return Response({'success': False, 'errors': errors}, status=status.HTTP_400_BAD_REQUEST)
         profile.save(update_fields=['operative_procedure_reports'])
-    return Response({'success': True, 'data': list(profile.operative_procedure_reports or [])})
+    return _form_entry_response(row)
 def calculate_age(birth_date):
     """Calculate age from birth date"""
     if not birth_date:
@@ -28,7 +28,8 @@ def async_db_operation(func: Callable) -> Callable:
 
 class AsyncModelManager:
     """
-    Async wrapper for Django model operations.
+    Async wrapper for Django model operations, using Django's native async
+    ORM (aget, acreate, asave, async iteration) instead of sync_to_async.
     """
     
     @staticmethod
@@ -37,7 +38,7 @@ class AsyncModelManager:
         Async version of get_object_or_404 that returns None instead of raising.
         """
         try:
-            return await sync_to_async(model_class.objects.get)(**kwargs)
+            return await model_class.objects.aget(**kwargs)
         except ObjectDoesNotExist:
             return None
         except Exception as e:
@@ -50,7 +51,7 @@ class AsyncModelManager:
         Async object creation.
         """
         try:
-            return await sync_to_async(model_class.objects.create)(**kwargs)
+            return await model_class.objects.acreate(**kwargs)
         except Exception as e:
             logger.error(f"Error creating object: {str(e)}")
             raise
@@ -63,7 +64,7 @@ class AsyncModelManager:
         try:
             for key, value in kwargs.items():
                 setattr(instance, key, value)
-            await sync_to_async(instance.save)()
+            await instance.asave()
             return instance
         except Exception as e:
             logger.error(f"Error updating object: {str(e)}")
@@ -75,7 +76,7 @@ class AsyncModelManager:
         Async object deletion.
         """
         try:
-            await sync_to_async(instance.delete)()
+            await instance.adelete()
             return True
         except Exception as e:
             logger.error(f"Error deleting object: {str(e)}")
@@ -87,8 +88,7 @@ class AsyncModelManager:
         Async queryset filtering.
         """
         try:
-            queryset = model_class.objects.filter(**kwargs)
-            return await sync_to_async(list)(queryset)
+            return [obj async for obj in model_class.objects.filter(**kwargs)]
         except Exception as e:
             logger.error(f"Error filtering objects: {str(e)}")
             raise
@@ -99,7 +99,7 @@ class AsyncModelManager:
         Async object count.
         """
         try:
-            return await sync_to_async(model_class.objects.filter(**kwargs).count)()
+            return await model_class.objects.filter(**kwargs).acount()
         except Exception as e:
             logger.error(f"Error counting objects: {str(e)}")
             raise
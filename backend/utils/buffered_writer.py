@@ -0,0 +1,343 @@
+"""
+Write buffers flushed with ``bulk_create``.
+
+High-volume, append-only rows (audit logs, telemetry) are queued in a
+bounded buffer. A background thread inserts them every ``batch_size`` rows
+or ``flush_interval`` seconds, so request paths do not touch the database
+while the buffer has room.
+
+``BufferedBulkWriter`` keeps its buffer in process memory. Rows leave the
+buffer only after their batch has committed. A failed batch is retried row
+by row, and a row that keeps failing on its own is given up after
+``MAX_ATTEMPTS``. Whoever creates a writer registers its ``flush`` with
+``atexit`` so the buffer is drained at interpreter exit; rows still
+buffered when a process is killed are lost.
+
+``RedisBufferedBulkWriter`` keeps its buffer in a Redis list shared by every
+process, so rows survive a killed process or a deploy. One process at a time
+(holding a lock in Redis) drains the list: it reads the oldest batch,
+inserts it and only then removes it from the list, so a crash between the
+two writes the batch again (at-least-once). Rows that keep failing are moved
+to a dead-letter list (``<queue_key>:dead``) instead of being discarded.
+While Redis is unreachable, rows fall back to the in-memory buffer.
+
+When the buffer is full, ``reject_when_full`` decides what happens:
+
+- False (default): the caller writes its rows synchronously. Rows that
+  cannot be written (the database is down) are buffered anyway, past the
+  bound, rather than lost.
+- True: the new rows are refused, and the caller reports backpressure to
+  its client.
+
+See backend/operations/access_log.py and backend/analytics/usage_events.py.
+"""
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import datetime
+
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# A row that keeps failing on its own (e.g. its foreign key target was
+# deleted) is given up after this many attempts so it cannot block the queue.
+MAX_ATTEMPTS = 5
+
+
+class BufferedBulkWriter:
+    model_label = None
+    thread_name = 'buffered-writer'
+    reject_when_full = False
+
+    def __init__(self, batch_size, flush_interval_ms, max_buffer, run_async=True):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_buffer = max_buffer
+        self.run_async = run_async
+
+        self._buffer = deque()
+        self._lock = threading.Lock()          # guards _buffer
+        self._flush_lock = threading.Lock()    # one flush at a time
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.written = 0
+        self.dropped = 0
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    # -- producer side -------------------------------------------------
+    def enqueue(self, rows):
+        """
+        Queue rows (dicts of model field values). Returns False when they were
+        refused because the buffer is full (only with ``reject_when_full``);
+        otherwise a full buffer makes the caller write its rows itself.
+        """
+        events = [{'fields': fields, 'attempts': 0} for fields in rows]
+        if not self.run_async:
+            self._write_inline(events)
+            return True
+
+        self._ensure_thread()
+        with self._lock:
+            full = len(self._buffer) + len(events) > self.max_buffer
+            if full and self.reject_when_full:
+                return False
+            if not full:
+                self._buffer.extend(events)
+            size = len(self._buffer)
+        if full:
+            self._overflow(events)
+        elif size >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def _write_inline(self, events):
+        for start in range(0, len(events), self.batch_size):
+            self._write(events[start:start + self.batch_size])
+
+    def _overflow(self, events):
+        """Write the rows of a full buffer in the caller; keep what fails past the bound."""
+        logger.warning(f"{self.model_label} buffer full: writing {len(events)} rows synchronously")
+        failed = self._write(events)
+        if failed:
+            with self._lock:
+                self._buffer.extend(failed)
+
+    def pending(self):
+        with self._lock:
+            return len(self._buffer)
+
+    def stats(self):
+        return {'pending': self.pending(), 'written': self.written, 'dropped': self.dropped}
+
+    # -- consumer side -------------------------------------------------
+    def flush(self):
+        """Write everything currently buffered. Safe to call from any thread."""
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = [self._buffer[i] for i in range(min(self.batch_size, len(self._buffer)))]
+                if not batch:
+                    return
+                failed = self._write(batch)
+                with self._lock:
+                    for _ in batch:
+                        self._buffer.popleft()
+                    # Retry failures first on the next pass, keeping their order.
+                    self._buffer.extendleft(reversed(failed))
+                if failed:
+                    return
+
+    def _write(self, batch):
+        """Insert a batch; returns the events that must be retried."""
+        model = self.model
+        try:
+            with transaction.atomic():
+                model.objects.bulk_create([model(**e['fields']) for e in batch])
+            self.written += len(batch)
+            return []
+        except Exception as e:
+            logger.warning(f"{self.model_label} batch of {len(batch)} failed, retrying per row: {e}")
+
+        failed = []
+        for event in batch:
+            try:
+                model.objects.create(**event['fields'])
+                self.written += 1
+            except Exception as e:
+                event['attempts'] += 1
+                if event['attempts'] >= MAX_ATTEMPTS:
+                    self._give_up(event, e)
+                else:
+                    failed.append(event)
+        return failed
+
+    def _give_up(self, event, error):
+        self.dropped += 1
+        logger.error(f"Dropping {self.model_label} row after {MAX_ATTEMPTS} attempts: {error}")
+
+    def _ensure_thread(self):
+        # Re-create the flusher after fork (e.g. preforking app servers).
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                close_old_connections()
+                self.flush()
+            except Exception as e:
+                logger.error(f"{self.model_label} flush failed: {e}", exc_info=True)
+                time.sleep(self.flush_interval)
+            finally:
+                close_old_connections()
+
+
+# Removes a drained batch from the queue (and re-queues its failed rows at the
+# oldest end) only while the caller still holds the drain lock, renewing it.
+_ACK_SCRIPT = """
+if redis.call('get', KEYS[2]) ~= ARGV[1] then
+    return 0
+end
+redis.call('ltrim', KEYS[1], 0, -tonumber(ARGV[2]) - 1)
+for i = 4, #ARGV do
+    redis.call('rpush', KEYS[1], ARGV[i])
+end
+redis.call('pexpire', KEYS[2], ARGV[3])
+return 1
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class _RowEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder truncates datetimes to milliseconds
+        if isinstance(o, datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+class RedisBufferedBulkWriter(BufferedBulkWriter):
+    """
+    A ``BufferedBulkWriter`` whose buffer is the Redis list ``queue_key`` at
+    ``redis_url``. Producers ``LPUSH`` rows as JSON; the drainer reads the
+    oldest batch from the right end and acknowledges it with ``_ACK_SCRIPT``.
+    """
+    redis_url = None
+    queue_key = None
+    # Seconds a drainer may go without acknowledging a batch before another
+    # process takes the queue over.
+    lock_timeout = 30
+
+    _client = None
+    _client_pid = None
+
+    @property
+    def lock_key(self):
+        return f'{self.queue_key}:lock'
+
+    @property
+    def dead_letter_key(self):
+        return f'{self.queue_key}:dead'
+
+    def _redis(self):
+        if self._client is None or self._client_pid != os.getpid():
+            import redis
+            client = redis.Redis.from_url(self.redis_url, socket_connect_timeout=0.5, socket_timeout=2)
+            self._ack = client.register_script(_ACK_SCRIPT)
+            self._release = client.register_script(_RELEASE_SCRIPT)
+            self._client, self._client_pid = client, os.getpid()
+        return self._client
+
+    def _dump(self, event):
+        return json.dumps(event, cls=_RowEncoder)
+
+    def _load(self, raw):
+        event = json.loads(raw)
+        meta = self.model._meta
+        event['fields'] = {name: meta.get_field(name).to_python(value) for name, value in event['fields'].items()}
+        return event
+
+    # -- producer side -------------------------------------------------
+    def enqueue(self, rows):
+        if not self.run_async:
+            return super().enqueue(rows)
+        events = [{'fields': fields, 'attempts': 0} for fields in rows]
+        try:
+            client = self._redis()
+            size = client.llen(self.queue_key) + len(events)
+            if size > self.max_buffer:
+                if self.reject_when_full:
+                    return False
+                logger.warning(f"{self.model_label} queue full: writing {len(events)} rows synchronously")
+                events = self._write(events)
+            if events:
+                client.lpush(self.queue_key, *[self._dump(e) for e in events])
+        except Exception as e:
+            logger.warning(f"{self.model_label} Redis queue unavailable, buffering in memory: {e}")
+            return super().enqueue([e['fields'] for e in events])
+        self._ensure_thread()
+        if size >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def pending(self):
+        pending = super().pending()
+        try:
+            pending += self._redis().llen(self.queue_key)
+        except Exception:
+            pass
+        return pending
+
+    # -- consumer side -------------------------------------------------
+    def flush(self):
+        """
+        Write the rows buffered in memory while Redis was unreachable, then
+        drain the Redis queue unless another process is draining it.
+        """
+        super().flush()
+        if not self.run_async:
+            return
+        with self._flush_lock:
+            try:
+                client = self._redis()
+                token = uuid.uuid4().hex
+                if not client.set(self.lock_key, token, nx=True, px=self.lock_timeout * 1000):
+                    return
+                try:
+                    self._drain(client, token)
+                finally:
+                    self._release(keys=[self.lock_key], args=[token])
+            except Exception as e:
+                # Rows stay queued in Redis for the next flush.
+                logger.warning(f"{self.model_label} could not drain {self.queue_key}: {e}")
+
+    def _drain(self, client, token):
+        while True:
+            raw = client.lrange(self.queue_key, -self.batch_size, -1)
+            if not raw:
+                return
+            # The right end of the list holds the oldest rows.
+            batch = [self._load(item) for item in reversed(raw)]
+            failed = self._write(batch)
+            retry = [self._dump(e) for e in reversed(failed)]
+            if not self._ack(keys=[self.queue_key, self.lock_key],
+                             args=[token, len(raw), self.lock_timeout * 1000, *retry]):
+                logger.warning(f"{self.model_label} drain lock lost; another process takes over")
+                return
+            if failed:
+                return
+
+    def _give_up(self, event, error):
+        try:
+            self._redis().lpush(self.dead_letter_key, self._dump(event))
+        except Exception:
+            return super()._give_up(event, error)
+        self.dropped += 1
+        logger.error(
+            f"Moved {self.model_label} row to {self.dead_letter_key} after {MAX_ATTEMPTS} attempts: {error}"
+        )
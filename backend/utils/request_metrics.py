@@ -0,0 +1,324 @@
+"""
+Per-request query, cache and latency instrumentation.
+
+``measure()`` is a context manager that counts database queries and their
+time (through an execute wrapper installed on every database connection)
+and cache hits/misses and their time (through a wrapper around the
+configured cache backends' ``get``/``get_many``) while it is active. Both
+wrappers report to the ``measure()`` blocks of the current context, so
+queries run through ``sync_to_async`` in another thread still count, and
+concurrent async requests do not count each other's. Python time is what is
+left of the wall time after database and cache time.
+
+``RequestMetricsMiddleware`` (sync and async capable, so ASGI requests and
+streaming views are not run through a thread adapter) measures every
+request and:
+
+- adds a ``Server-Timing`` header (db, cache, app and total durations),
+- records the sample in a rolling per-endpoint window (``endpoint_stats``)
+  exposed by ``/api/analytics/performance/endpoints/``,
+- logs a warning and sets ``X-Query-Budget-Exceeded`` when the endpoint ran
+  more queries than its budget.
+
+Budgets are keyed by URL name in ``REQUEST_QUERY_BUDGETS`` with
+``REQUEST_QUERY_BUDGET_DEFAULT`` as the fallback (``None`` = unbudgeted).
+Tests assert them with ``backend.utils.testing.QueryBudgetTestMixin``.
+"""
+import contextvars
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 500
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Metrics objects of every measure() block active in this context (nesting allowed).
+_active = contextvars.ContextVar('request_metrics_active', default=())
+# Set inside a wrapped cache call: BaseCache.get_many calls self.get per key,
+# which must not be counted again.
+_in_cache_call = contextvars.ContextVar('request_metrics_in_cache_call', default=False)
+_MISSING = object()
+_instrument_lock = threading.Lock()
+
+
+class RequestMetrics:
+    __slots__ = ('queries', 'db_time', 'cache_hits', 'cache_misses', 'cache_time', 'started', 'elapsed')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_time = 0.0
+        self.started = time.perf_counter()
+        self.elapsed = None
+
+    @property
+    def total_time(self):
+        return self.elapsed if self.elapsed is not None else time.perf_counter() - self.started
+
+    @property
+    def python_time(self):
+        return max(0.0, self.total_time - self.db_time - self.cache_time)
+
+    def as_dict(self):
+        return {
+            'queries': self.queries,
+            'db_ms': round(self.db_time * 1000, 3),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'cache_ms': round(self.cache_time * 1000, 3),
+            'python_ms': round(self.python_time * 1000, 3),
+            'total_ms': round(self.total_time * 1000, 3),
+        }
+
+    def server_timing(self):
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+            f'cache;dur={self.cache_time * 1000:.1f};desc="{self.cache_hits} hit {self.cache_misses} miss"',
+            f'app;dur={self.python_time * 1000:.1f}',
+            f'total;dur={self.total_time * 1000:.1f}',
+        ])
+
+
+def _record_query(execute, sql, params, many, context):
+    active = _active.get()
+    if not active:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - start
+        for metrics in active:
+            metrics.queries += 1
+            metrics.db_time += elapsed
+
+
+def _instrument_connection(connection, **kwargs):
+    # First in the list: connection.execute_wrapper() blocks pop the last one
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _record_query)
+
+
+connection_created.connect(_instrument_connection)
+
+
+def _record_cache(elapsed, hits, misses):
+    for metrics in _active.get():
+        metrics.cache_time += elapsed
+        metrics.cache_hits += hits
+        metrics.cache_misses += misses
+
+
+def _instrument_cache_class(cls):
+    if cls.__dict__.get('_request_metrics_instrumented'):
+        return
+    original_get = cls.get
+    original_get_many = cls.get_many
+
+    def get(self, key, default=None, version=None):
+        if not _active.get() or _in_cache_call.get():
+            return original_get(self, key, default, version)
+        token = _in_cache_call.set(True)
+        start = time.perf_counter()
+        try:
+            value = original_get(self, key, _MISSING, version)
+        finally:
+            _in_cache_call.reset(token)
+        hit = value is not _MISSING
+        _record_cache(time.perf_counter() - start, int(hit), int(not hit))
+        return value if hit else default
+
+    def get_many(self, keys, version=None):
+        if not _active.get() or _in_cache_call.get():
+            return original_get_many(self, keys, version)
+        keys = list(keys)
+        token = _in_cache_call.set(True)
+        start = time.perf_counter()
+        try:
+            found = original_get_many(self, keys, version)
+        finally:
+            _in_cache_call.reset(token)
+        _record_cache(time.perf_counter() - start, len(found), len(keys) - len(found))
+        return found
+
+    cls.get = get
+    cls.get_many = get_many
+    cls._request_metrics_instrumented = True
+
+
+def instrument_caches():
+    """Wrap get/get_many of every configured cache backend class (idempotent)."""
+    with _instrument_lock:
+        for config in getattr(settings, 'CACHES', {}).values():
+            try:
+                _instrument_cache_class(import_string(config['BACKEND']))
+            except Exception as e:
+                logger.warning(f"Cache instrumentation skipped for {config.get('BACKEND')}: {e}")
+
+
+@contextmanager
+def measure():
+    """Measure queries, cache use and time of the enclosed block."""
+    instrument_caches()
+    metrics = RequestMetrics()
+    token = _active.set(_active.get() + (metrics,))
+    try:
+        # Connections opened later are instrumented by connection_created
+        for connection in connections.all(initialized_only=True):
+            _instrument_connection(connection)
+        yield metrics
+    finally:
+        metrics.elapsed = time.perf_counter() - metrics.started
+        _active.reset(token)
+
+
+def get_query_budget(endpoint):
+    budgets = getattr(settings, 'REQUEST_QUERY_BUDGETS', {}) or {}
+    return budgets.get(endpoint, getattr(settings, 'REQUEST_QUERY_BUDGET_DEFAULT', None))
+
+
+def _percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class EndpointStats:
+    """Rolling window of the last ``window`` samples per endpoint."""
+
+    def __init__(self, window=None):
+        self.window = window or getattr(settings, 'REQUEST_METRICS_WINDOW', DEFAULT_WINDOW)
+        self._samples = {}
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, metrics, over_budget=False):
+        sample = (metrics.total_time * 1000, metrics.queries, metrics.db_time * 1000,
+                  metrics.cache_hits, metrics.cache_misses)
+        with self._lock:
+            samples = self._samples.get(endpoint)
+            if samples is None:
+                samples = self._samples[endpoint] = deque(maxlen=self.window)
+                self._totals[endpoint] = {'requests': 0, 'over_budget': 0}
+            samples.append(sample)
+            totals = self._totals[endpoint]
+            totals['requests'] += 1
+            totals['over_budget'] += int(over_budget)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._totals.clear()
+
+    def snapshot(self):
+        with self._lock:
+            copied = {endpoint: (list(samples), dict(self._totals[endpoint]))
+                      for endpoint, samples in self._samples.items()}
+        result = {}
+        for endpoint, (samples, totals) in copied.items():
+            latency = sorted(s[0] for s in samples)
+            queries = sorted(s[1] for s in samples)
+            db = sorted(s[2] for s in samples)
+            histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            for value in latency:
+                histogram[next((i for i, b in enumerate(LATENCY_BUCKETS_MS) if value <= b),
+                               len(LATENCY_BUCKETS_MS))] += 1
+            hits = sum(s[3] for s in samples)
+            misses = sum(s[4] for s in samples)
+            result[endpoint] = {
+                **totals,
+                'window': len(samples),
+                'query_budget': get_query_budget(endpoint),
+                'latency_ms': {
+                    'p50': _round(_percentile(latency, 50)),
+                    'p95': _round(_percentile(latency, 95)),
+                    'p99': _round(_percentile(latency, 99)),
+                    'max': _round(latency[-1]),
+                },
+                'queries': {'p50': _percentile(queries, 50), 'p95': _percentile(queries, 95), 'max': queries[-1]},
+                'db_ms': {'p50': _round(_percentile(db, 50)), 'p95': _round(_percentile(db, 95))},
+                'cache_hit_ratio': round(hits / (hits + misses), 3) if hits + misses else None,
+                'latency_histogram': {
+                    **{f'le_{b}ms': histogram[i] for i, b in enumerate(LATENCY_BUCKETS_MS)},
+                    f'gt_{LATENCY_BUCKETS_MS[-1]}ms': histogram[-1],
+                },
+            }
+        return result
+
+
+def _round(value):
+    return round(value, 2) if value is not None else None
+
+
+endpoint_stats = EndpointStats()
+
+
+def endpoint_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    return match.url_name or match.route or match.view_name
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'REQUEST_METRICS_ENABLED', True)
+        self.server_timing = getattr(settings, 'REQUEST_METRICS_SERVER_TIMING', True)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        with measure() as metrics:
+            response = self.get_response(request)
+        return self._finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        with measure() as metrics:
+            response = await self.get_response(request)
+        return self._finish(request, response, metrics)
+
+    def _finish(self, request, response, metrics):
+        endpoint = endpoint_name(request)
+        budget = get_query_budget(endpoint)
+        over_budget = budget is not None and metrics.queries > budget
+        try:
+            endpoint_stats.record(endpoint, metrics, over_budget)
+        except Exception as e:
+            logger.error(f"Could not record request metrics for {endpoint}: {e}")
+        if over_budget:
+            logger.warning(
+                f"Query budget exceeded: {endpoint} ran {metrics.queries} queries (budget {budget}) "
+                f"for {request.method} {request.path}"
+            )
+            response['X-Query-Budget-Exceeded'] = f'{metrics.queries}/{budget}'
+        if self.server_timing:
+            response['Server-Timing'] = metrics.server_timing()
+        return response
@@ -0,0 +1,34 @@
+"""
+Test helpers for the per-endpoint query budgets (see backend/utils/request_metrics.py).
+
+    class DirectoryTests(QueryBudgetTestMixin, TestCase):
+        def test_budget(self):
+            with self.assertQueryBudget('get_doctor_patients'):
+                self.client.get('/api/users/doctor/patients/')
+
+The block fails when it runs more queries than the endpoint's configured
+budget (or an explicit ``budget=``), listing the captured SQL so N+1
+regressions are easy to spot.
+"""
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .request_metrics import get_query_budget, measure
+
+
+class QueryBudgetTestMixin:
+    @contextmanager
+    def assertQueryBudget(self, endpoint=None, budget=None):
+        if budget is None:
+            budget = get_query_budget(endpoint)
+            if budget is None:
+                self.fail(f"No query budget configured for {endpoint!r} (REQUEST_QUERY_BUDGETS)")
+        with CaptureQueriesContext(connection) as captured, measure() as metrics:
+            yield metrics
+        if metrics.queries > budget:
+            statements = '\n'.join(f"  {i}. {q['sql']}" for i, q in enumerate(captured.captured_queries, 1))
+            self.fail(
+                f"{endpoint or 'block'} ran {metrics.queries} queries, budget is {budget}:\n{statements}"
+            )